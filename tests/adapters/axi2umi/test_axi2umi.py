@@ -1,3 +1,4 @@
+import copy
 import os
 import random
 
@@ -8,6 +9,7 @@ from siliconcompiler import Design
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles
+from cocotb.utils import get_sim_time
 
 from cocotb_bus.drivers import BitDriver
 
@@ -16,12 +18,71 @@ from cocotbext.axi import AxiBus, AxiMaster, AxiResp
 from cocotbext.umi.drivers.sumi_driver import SumiDriver
 from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
 from cocotbext.umi.models.umi_memory_device import UmiMemoryDevice
-from cocotbext.umi.sumi import SumiCmd, SumiCmdType, SumiTransaction
+from cocotbext.umi.sumi import SumiCmd, SumiCmdType, SumiErrorCode, SumiTransaction
 from cocotbext.umi.utils import generators
 
 from umi.adapters.axi2umi.axi2umi import AXI2UMI
 
 
+class LatencyUmiMemoryDevice(UmiMemoryDevice):
+    """
+    UmiMemoryDevice that answers each request a fixed number of clock
+    cycles after it arrives, modelling a long round trip such as a LUMI
+    link. Requests are pipelined, responses return in request order.
+    """
+
+    def __init__(self, monitor: SumiMonitor, driver: SumiDriver, clock, latency: int, log=None):
+        self.clock = clock
+        self.latency = latency
+        super().__init__(monitor, driver, log)
+
+    def _on_transaction(self, transaction: SumiTransaction):
+        cocotb.start_soon(self._respond(transaction))
+
+    async def _respond(self, transaction: SumiTransaction):
+        await ClockCycles(self.clock, self.latency)
+        super()._on_transaction(transaction)
+
+
+class ReorderUmiMemoryDevice(LatencyUmiMemoryDevice):
+    """
+    UmiMemoryDevice that answers each request after a random number of
+    clock cycles up to latency, so later requests overtake earlier ones.
+    Writes to an address in errors are answered with DEVERR, which tells
+    the AXI responses of same sized writes apart. The indices of the
+    requests, in the order they were answered, are kept in answered.
+    """
+
+    def __init__(self, monitor: SumiMonitor, driver: SumiDriver, clock, latency: int,
+                 errors=(), log=None):
+        self.errors = set(errors)
+        self.requests = 0
+        self.answered = []
+        super().__init__(monitor, driver, clock, latency, log)
+
+    async def _respond(self, transaction: SumiTransaction):
+        index = self.requests
+        self.requests += 1
+        await ClockCycles(self.clock, random.randint(1, self.latency))
+        self.answered.append(index)
+        UmiMemoryDevice._on_transaction(self, transaction)
+
+    def _handle_write(self, transaction: SumiTransaction, send_response: bool = True):
+        super()._handle_write(transaction, send_response=False)
+        if send_response:
+            resp_cmd = copy.deepcopy(transaction.cmd)
+            resp_cmd.cmd_type.from_int(SumiCmdType.UMI_RESP_WRITE)
+            if int(transaction.da) in self.errors:
+                resp_cmd.err = SumiErrorCode.UMI_ERR_DEVERR
+            self.driver.append(SumiTransaction(
+                cmd=resp_cmd,
+                da=int(transaction.sa),
+                sa=int(transaction.da),
+                data=transaction.data,
+                addr_width=transaction._addr_width
+            ))
+
+
 class Env:
     """Reusable test environment for AXI4 Full to UMI adapter tests."""
 
@@ -346,6 +407,233 @@ async def drop_test(dut, test_n_transactions=10, resp_valid_gen=None):
     await ClockCycles(dut.clk, 10)
 
 
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    latency=[100, 400],
+    test_n_transactions=[int(32 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def bandwidth_test(dut, latency=100, test_n_transactions=32):
+    """Bandwidth of single beat writes and reads against a long latency memory.
+
+    With one transaction in flight the adapter moves one bus word per round
+    trip, the outstanding window should scale that by up to OUTSTANDING.
+    """
+
+    ####################################
+    # Setup test
+    ####################################
+
+    Clock(dut.clk, 1, unit="ns").start()
+
+    env = Env(dut)
+    await env.setup()
+
+    sumi_req_monitor = SumiMonitor(entity=dut, name="uhost_req", clock=dut.clk)
+    dut.uhost_req_ready.value = 1
+
+    sumi_resp_driver = SumiDriver(entity=dut, name="uhost_resp", clock=dut.clk)
+
+    LatencyUmiMemoryDevice(
+        monitor=sumi_req_monitor,
+        driver=sumi_resp_driver,
+        clock=dut.clk,
+        latency=latency
+    )
+
+    bus_size = int(dut.DW.value) // 8
+    outstanding = int(dut.OUTSTANDING.value)
+    base = random.randint(0, env.max_addr // bus_size) * bus_size
+    data = [random.randbytes(bus_size) for _ in range(test_n_transactions)]
+
+    # Rate a single outstanding transaction achieves at best
+    serial_rate = bus_size / latency
+
+    ####################################
+    # Run test - pipelined writes
+    ####################################
+
+    start = get_sim_time(unit="ns")
+    events = [env.axi_master.init_write(base + i * bus_size, data[i])
+              for i in range(test_n_transactions)]
+    for event in events:
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+    write_rate = test_n_transactions * bus_size / (get_sim_time(unit="ns") - start)
+
+    ####################################
+    # Run test - pipelined reads
+    ####################################
+
+    start = get_sim_time(unit="ns")
+    events = [env.axi_master.init_read(base + i * bus_size, bus_size)
+              for i in range(test_n_transactions)]
+    for i, event in enumerate(events):
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+        assert bytes(event.data.data) == data[i]
+    read_rate = test_n_transactions * bus_size / (get_sim_time(unit="ns") - start)
+
+    dut._log.info(
+        f"latency={latency} OUTSTANDING={outstanding}: write {write_rate:.3f} B/cycle, "
+        f"read {read_rate:.3f} B/cycle, single outstanding bound {serial_rate:.3f} B/cycle"
+    )
+
+    assert write_rate >= 0.5 * outstanding * serial_rate
+    assert read_rate >= 0.5 * outstanding * serial_rate
+
+    await ClockCycles(dut.clk, 10)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    n_ids=[1, 2],
+    test_n_transactions=[int(64 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def reorder_test(dut, n_ids=2, test_n_transactions=64):
+    """AXI responses of one ID return in order when UMI responses do not.
+
+    Single beat writes and reads with a few IDs are pipelined against a
+    memory that answers in random order. The AXI master matches B and R
+    beats to the oldest outstanding transaction of their ID, so a response
+    returned out of order gives the wrong BRESP for a write answered with
+    DEVERR, or the wrong data for a read.
+    """
+
+    ####################################
+    # Setup test
+    ####################################
+
+    Clock(dut.clk, 1, unit="ns").start()
+
+    env = Env(dut)
+    await env.setup()
+
+    sumi_req_monitor = SumiMonitor(entity=dut, name="uhost_req", clock=dut.clk)
+    dut.uhost_req_ready.value = 1
+
+    sumi_resp_driver = SumiDriver(entity=dut, name="uhost_resp", clock=dut.clk)
+
+    bus_size = int(dut.DW.value) // 8
+    base = random.randint(0, env.max_addr // bus_size) * bus_size
+    addrs = [base + i * bus_size for i in range(test_n_transactions)]
+    ids = [random.randrange(n_ids) for _ in range(test_n_transactions)]
+    data = [random.randbytes(bus_size) for _ in range(test_n_transactions)]
+    errors = set(random.sample(addrs, test_n_transactions // 2))
+
+    umi_memory = ReorderUmiMemoryDevice(
+        monitor=sumi_req_monitor,
+        driver=sumi_resp_driver,
+        clock=dut.clk,
+        latency=50,
+        errors=errors
+    )
+
+    ####################################
+    # Run test - pipelined writes
+    ####################################
+
+    events = [env.axi_master.init_write(addrs[i], data[i], awid=ids[i])
+              for i in range(test_n_transactions)]
+    for i, event in enumerate(events):
+        await event.wait()
+        expected = AxiResp.SLVERR if addrs[i] in errors else AxiResp.OKAY
+        assert event.data.resp == expected, (
+            f"Write {i} with ID {ids[i]} expected {expected}, got {event.data.resp}")
+        assert umi_memory.read(addrs[i], bus_size) == data[i]
+
+    ####################################
+    # Run test - pipelined reads
+    ####################################
+
+    events = [env.axi_master.init_read(addrs[i], bus_size, arid=ids[i])
+              for i in range(test_n_transactions)]
+    for i, event in enumerate(events):
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+        assert bytes(event.data.data) == data[i], f"Read {i} with ID {ids[i]} data mismatch"
+
+    # the memory did answer out of order
+    assert umi_memory.answered != sorted(umi_memory.answered)
+
+    await ClockCycles(dut.clk, 10)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    test_n_writes=[int(50 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def coalescing_test(dut, test_n_writes=50):
+    """INCR write bursts of any beat size are coalesced into one UMI request per DW window.
+
+    Reports the UMI header bytes (cmd + dstaddr + srcaddr) saved compared to
+    issuing one UMI request per AXI beat.
+    """
+
+    ####################################
+    # Setup test
+    ####################################
+
+    Clock(dut.clk, 1, unit="ns").start()
+
+    env = Env(dut)
+    await env.setup()
+
+    sumi_req_monitor = SumiMonitor(entity=dut, name="uhost_req", clock=dut.clk)
+    dut.uhost_req_ready.value = 1
+
+    sumi_resp_driver = SumiDriver(entity=dut, name="uhost_resp", clock=dut.clk)
+
+    umi_memory = UmiMemoryDevice(
+        monitor=sumi_req_monitor,
+        driver=sumi_resp_driver,
+        log=dut._log
+    )
+
+    umi_writes = []
+    sumi_req_monitor.add_callback(
+        lambda txn: umi_writes.append(txn)
+        if int(txn.cmd.cmd_type) == SumiCmdType.UMI_REQ_WRITE else None)
+
+    bus_size = int(dut.DW.value) // 8
+    header_size = (int(dut.CW.value) + 2 * int(dut.AW.value)) // 8
+
+    ####################################
+    # Run test
+    ####################################
+
+    axi_beats = 0
+    windows = 0
+    for i in range(test_n_writes):
+        size = random.randint(0, bus_size.bit_length() - 1)
+        length = random.randint(1, 16 * bus_size)
+        # stay within a 4 KB page so the burst is not split by the master
+        offset = random.randint(0, 4096 - length)
+        test_addr = random.randint(0, env.max_addr // 4096) * 4096 + offset
+        test_data = random.randbytes(length)
+
+        before = len(umi_writes)
+        resp = await env.axi_master.write(test_addr, test_data, size=size)
+        assert resp.resp == AxiResp.OKAY, f"Write {i+1} expected OKAY, got {resp.resp}"
+        assert umi_memory.read(test_addr, length) == test_data
+
+        last = test_addr + length - 1
+        axi_beats += (last >> size) - (test_addr >> size) + 1
+        windows += last // bus_size - test_addr // bus_size + 1
+
+        # one UMI request per DW window touched by the burst
+        assert len(umi_writes) - before == last // bus_size - test_addr // bus_size + 1
+
+    saved = (axi_beats - len(umi_writes)) * header_size
+    dut._log.info(
+        f"{axi_beats} AXI beats sent as {len(umi_writes)} UMI writes, "
+        f"{saved} of {axi_beats * header_size} header bytes saved "
+        f"({100 * saved / (axi_beats * header_size):.1f}%)"
+    )
+    assert len(umi_writes) == windows
+
+    await ClockCycles(dut.clk, 10)
+
+
 class TbDesign(Design):
 
     def __init__(self):
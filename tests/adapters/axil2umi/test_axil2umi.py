@@ -0,0 +1,322 @@
+import copy
+import os
+import random
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles
+from cocotb.utils import get_sim_time
+
+from cocotb_bus.drivers import BitDriver
+
+from cocotbext.axi import AxiLiteBus, AxiLiteMaster, AxiResp
+
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+from cocotbext.umi.models.umi_memory_device import UmiMemoryDevice
+from cocotbext.umi.sumi import SumiCmdType, SumiErrorCode, SumiTransaction
+from cocotbext.umi.utils import generators
+
+from umi.adapters.axil2umi.axil2umi import AXIL2UMI
+
+
+class LatencyUmiMemoryDevice(UmiMemoryDevice):
+    """
+    UmiMemoryDevice that answers each request a fixed number of clock
+    cycles after it arrives. Requests are pipelined, responses return in
+    request order.
+    """
+
+    def __init__(self, monitor: SumiMonitor, driver: SumiDriver, clock, latency: int, log=None):
+        self.clock = clock
+        self.latency = latency
+        super().__init__(monitor, driver, log)
+
+    def _on_transaction(self, transaction: SumiTransaction):
+        cocotb.start_soon(self._respond(transaction))
+
+    async def _respond(self, transaction: SumiTransaction):
+        await ClockCycles(self.clock, self.latency)
+        super()._on_transaction(transaction)
+
+
+class ReorderUmiMemoryDevice(LatencyUmiMemoryDevice):
+    """
+    UmiMemoryDevice that answers each request after a random number of
+    clock cycles up to latency, as devices at different distances would,
+    so later requests overtake earlier ones. Writes to an address in errors
+    are answered with DEVERR, which tells the B responses apart. The
+    indices of the requests, in the order they were answered, are kept in
+    answered.
+    """
+
+    def __init__(self, monitor: SumiMonitor, driver: SumiDriver, clock, latency: int,
+                 errors=(), log=None):
+        self.errors = set(errors)
+        self.requests = 0
+        self.answered = []
+        super().__init__(monitor, driver, clock, latency, log)
+
+    async def _respond(self, transaction: SumiTransaction):
+        index = self.requests
+        self.requests += 1
+        await ClockCycles(self.clock, random.randint(1, self.latency))
+        self.answered.append(index)
+        UmiMemoryDevice._on_transaction(self, transaction)
+
+    def _handle_write(self, transaction: SumiTransaction, send_response: bool = True):
+        super()._handle_write(transaction, send_response=False)
+        if send_response:
+            resp_cmd = copy.deepcopy(transaction.cmd)
+            resp_cmd.cmd_type.from_int(SumiCmdType.UMI_RESP_WRITE)
+            if int(transaction.da) in self.errors:
+                resp_cmd.err = SumiErrorCode.UMI_ERR_DEVERR
+            self.driver.append(SumiTransaction(
+                cmd=resp_cmd,
+                da=int(transaction.sa),
+                sa=int(transaction.da),
+                data=transaction.data,
+                addr_width=transaction._addr_width
+            ))
+
+
+class Env:
+    """Reusable test environment for AXI4-Lite to UMI adapter tests."""
+
+    MEM_SIZE = 2**16
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.bus_size = int(dut.DW.value) // 8
+        self.axi_master = None
+
+    async def setup(self, latency=0, req_ready_gen=None, resp_valid_gen=None, errors=None):
+        """Reset the DUT and attach the AXI-Lite master and UMI memory."""
+        dut = self.dut
+
+        Clock(dut.clk, 1, unit="ns").start()
+
+        dut.chipid.value = 0
+        dut.local_routing.value = 0
+        dut.axi_awvalid.value = 0
+        dut.axi_wvalid.value = 0
+        dut.axi_bready.value = 0
+        dut.axi_arvalid.value = 0
+        dut.axi_rready.value = 0
+        dut.uhost_req_ready.value = 0
+        dut.uhost_resp_valid.value = 0
+
+        # Reset sequence (active-low reset)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 1)
+        dut.nreset.value = 0
+        await ClockCycles(dut.clk, 10)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 5)
+
+        if req_ready_gen is None:
+            dut.uhost_req_ready.value = 1
+        else:
+            BitDriver(signal=dut.uhost_req_ready, clk=dut.clk).start(generator=req_ready_gen)
+
+        sumi_req_monitor = SumiMonitor(entity=dut, name="uhost_req", clock=dut.clk)
+        sumi_resp_driver = SumiDriver(
+            entity=dut, name="uhost_resp", clock=dut.clk, valid_generator=resp_valid_gen
+        )
+        if errors is not None:
+            self.umi_memory = ReorderUmiMemoryDevice(
+                monitor=sumi_req_monitor,
+                driver=sumi_resp_driver,
+                clock=dut.clk,
+                latency=latency,
+                errors=errors
+            )
+        elif latency:
+            self.umi_memory = LatencyUmiMemoryDevice(
+                monitor=sumi_req_monitor,
+                driver=sumi_resp_driver,
+                clock=dut.clk,
+                latency=latency
+            )
+        else:
+            self.umi_memory = UmiMemoryDevice(
+                monitor=sumi_req_monitor,
+                driver=sumi_resp_driver,
+                log=dut._log
+            )
+
+        axi_bus = AxiLiteBus.from_prefix(dut, "axi")
+        self.axi_master = AxiLiteMaster(axi_bus, dut.clk, dut.nreset, reset_active_level=False)
+
+        await ClockCycles(dut.clk, 5)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    req_ready_gen=[None, generators.random_toggle_generator(), generators.wave_generator()],
+    resp_valid_gen=[None, generators.random_toggle_generator(), generators.wave_generator()],
+    test_n_transactions=[int(100 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def backpressure_test(
+    dut,
+    test_n_transactions=100,
+    req_ready_gen=None,
+    resp_valid_gen=None
+):
+    """Pipelined writes followed by pipelined reads of the same words under UMI back pressure."""
+
+    env = Env(dut)
+    await env.setup(req_ready_gen=req_ready_gen, resp_valid_gen=resp_valid_gen)
+
+    bus_size = env.bus_size
+    addrs = random.sample(range(0, env.MEM_SIZE, bus_size), test_n_transactions)
+    data = []
+    events = []
+    for addr in addrs:
+        # random byte range within the word
+        offset = random.randint(0, bus_size - 1)
+        length = random.randint(1, bus_size - offset)
+        data.append((offset, random.randbytes(length)))
+        events.append(env.axi_master.init_write(addr + offset, data[-1][1]))
+
+    for event in events:
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+
+    events = [env.axi_master.init_read(addr, bus_size) for addr in addrs]
+    for addr, (offset, expected), event in zip(addrs, data, events):
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+        read_data = bytes(event.data.data)[offset:offset + len(expected)]
+        assert read_data == expected, (
+            f"Data mismatch at 0x{addr + offset:08x}: "
+            f"expected {expected.hex()}, got {read_data.hex()}"
+        )
+
+    await ClockCycles(dut.clk, 10)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    test_n_transactions=[int(64 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def reorder_test(dut, test_n_transactions=64):
+    """
+    B and R follow request order when UMI responses do not.
+
+    Word writes and reads are pipelined on both channels against a memory
+    answering in random order. A response matched to the wrong request
+    gives the wrong BRESP for writes answered with DEVERR, or the wrong
+    data for reads.
+    """
+
+    bus_size = int(dut.DW.value) // 8
+    addrs = random.sample(range(0, Env.MEM_SIZE, bus_size), 2 * test_n_transactions)
+    wr_addrs = addrs[:test_n_transactions]
+    rd_addrs = addrs[test_n_transactions:]
+    errors = set(random.sample(wr_addrs, test_n_transactions // 2))
+
+    env = Env(dut)
+    await env.setup(latency=50, errors=errors)
+
+    rd_data = [random.randbytes(bus_size) for _ in rd_addrs]
+    for addr, data in zip(rd_addrs, rd_data):
+        env.umi_memory.write(addr, data)
+    wr_data = [random.randbytes(bus_size) for _ in wr_addrs]
+
+    writes = [env.axi_master.init_write(addr, data) for addr, data in zip(wr_addrs, wr_data)]
+    reads = [env.axi_master.init_read(addr, bus_size) for addr in rd_addrs]
+
+    for i, event in enumerate(writes):
+        await event.wait()
+        expected = AxiResp.SLVERR if wr_addrs[i] in errors else AxiResp.OKAY
+        assert event.data.resp == expected, f"Write {i}: expected {expected}, got {event.data.resp}"
+        assert env.umi_memory.read(wr_addrs[i], bus_size) == wr_data[i]
+
+    for i, event in enumerate(reads):
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+        assert bytes(event.data.data) == rd_data[i], f"Read {i}: data mismatch"
+
+    # the memory did answer out of order
+    assert env.umi_memory.answered != sorted(env.umi_memory.answered)
+
+    await ClockCycles(dut.clk, 10)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(latency=[20, 100])
+async def full_throughput_test(dut, latency=20, test_n_transactions=64):
+    """
+    Interleaved word writes and reads against a long latency UMI memory.
+
+    With one transaction in flight per channel each channel moves one word
+    per round trip, the outstanding window should scale that by up to
+    OUTSTANDING.
+    """
+
+    env = Env(dut)
+    await env.setup(latency=latency)
+
+    bus_size = env.bus_size
+    outstanding = int(dut.OUTSTANDING.value)
+    data = [random.randbytes(bus_size) for _ in range(test_n_transactions)]
+
+    # Both channels, a single outstanding transaction each, at best
+    serial_rate = 2 * bus_size / latency
+
+    start = get_sim_time(unit="ns")
+    writes = [env.axi_master.init_write(i * bus_size, data[i])
+              for i in range(test_n_transactions)]
+    reads = [env.axi_master.init_read((test_n_transactions + i) * bus_size, bus_size)
+             for i in range(test_n_transactions)]
+    for event in writes + reads:
+        await event.wait()
+        assert event.data.resp == AxiResp.OKAY
+    rate = 2 * test_n_transactions * bus_size / (get_sim_time(unit="ns") - start)
+
+    assert env.umi_memory.read(0, test_n_transactions * bus_size) == b"".join(data)
+
+    dut._log.info(
+        f"latency={latency} OUTSTANDING={outstanding}: {rate:.3f} B/cycle, "
+        f"single outstanding bound {serial_rate:.3f} B/cycle"
+    )
+
+    assert rate >= 0.5 * outstanding * serial_rate
+
+    await ClockCycles(dut.clk, 10)
+
+
+class TbDesign(Design):
+
+    def __init__(self):
+        super().__init__()
+
+        # Set the design's name
+        self.set_name("tb_axil2umi")
+
+        # Establish the root directory for all design-related files
+        self.set_dataroot("tb_axil2umi", __file__)
+
+        # Configure filesets within the established data root
+        with self.active_dataroot("tb_axil2umi"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("axil2umi")
+                self.add_file("test_axil2umi.py", filetype="python")
+                self.add_depfileset(AXIL2UMI(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_axil2umi(simulator):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
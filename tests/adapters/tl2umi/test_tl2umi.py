@@ -0,0 +1,382 @@
+import os
+import random
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Event, RisingEdge
+from cocotb.utils import get_sim_time
+
+from cocotb_bus.drivers import BitDriver
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.models.umi_memory_device import UmiMemoryDevice
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+from cocotbext.umi.utils.generators import random_toggle_generator
+
+from umi.sumi import messages
+from umi.adapters.tl2umi.tl2umi import TL2UMI
+
+
+TL_OP_GET = 4
+TL_OP_PUTFULLDATA = 0
+TL_OP_ACCESSACK = 0
+TL_OP_ACCESSACKDATA = 1
+
+BEAT_SIZE = 8
+
+
+def lane_mask(address, size):
+    """Byte lanes of a TileLink beat covered by an access of 1 << size bytes."""
+    if size >= 3:
+        return 0xff
+    return ((1 << (1 << size)) - 1) << (address & (BEAT_SIZE - 1))
+
+
+class LatencyUmiMemoryDevice(UmiMemoryDevice):
+    """
+    UmiMemoryDevice answering each request latency cycles after it
+    arrives, or with reorder set after a random number of cycles up to
+    latency, so later requests overtake earlier ones. Read data comes back
+    in pieces of one bus word, the pieces of one response back to back.
+    The indices of the requests, in the order they were answered, are kept
+    in answered.
+    """
+
+    def __init__(self, monitor: SumiMonitor, driver: SumiDriver, clock, latency: int,
+                 reorder=False, log=None):
+        self.clock = clock
+        self.latency = latency
+        self.reorder = reorder
+        self.requests = 0
+        self.answered = []
+        super().__init__(monitor, driver, log)
+
+    def _on_transaction(self, transaction: SumiTransaction):
+        cocotb.start_soon(self._respond(transaction))
+
+    async def _respond(self, transaction: SumiTransaction):
+        index = self.requests
+        self.requests += 1
+        delay = random.randint(1, self.latency) if self.reorder else self.latency
+        await ClockCycles(self.clock, delay)
+        self.answered.append(index)
+        super()._on_transaction(transaction)
+
+    def _handle_read(self, transaction: SumiTransaction):
+        dstaddr = int(transaction.da)
+        srcaddr = int(transaction.sa)
+        size = int(transaction.cmd.size)
+        nbytes = transaction.cmd.total_bytes()
+        step = max(self.driver.get_bus_width() // 8, 1 << size)
+        data = self.read(dstaddr, nbytes)
+
+        for offset in range(0, nbytes, step):
+            piece = data[offset:offset + step]
+            cmd = int(messages.encode(opcode=messages.RESP_READ, size=size,
+                                      len=(len(piece) >> size) - 1,
+                                      eom=int(offset + step >= nbytes)))
+            self.driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=srcaddr + offset,
+                                               sa=dstaddr + offset, data=piece))
+
+
+class TileLinkMaster:
+    """
+    TileLink TL-UH master issuing Get and PutFullData requests, single beat
+    or burst. Requests are sent in the order they are queued, the beats of
+    a burst back to back. Each request waits for the D beats of its source.
+    The most requests seen between their last A beat and their last D beat
+    is kept in max_in_flight.
+    """
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.queue = []
+        self.waiting = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        dut.tl_a_valid.value = 0
+        dut.tl_a_opcode.value = 0
+        dut.tl_a_param.value = 0
+        dut.tl_a_size.value = 0
+        dut.tl_a_source.value = 0
+        dut.tl_a_address.value = 0
+        dut.tl_a_mask.value = 0
+        dut.tl_a_data.value = 0
+        dut.tl_a_corrupt.value = 0
+
+        cocotb.start_soon(self._drive_a())
+        cocotb.start_soon(self._monitor_d())
+
+    async def request(self, opcode, source, address, size, data=None):
+        """
+        Sends one request and returns its D beats as (opcode, size, data)
+        tuples. Put data is given as bytes, in beats of up to 8 bytes.
+        """
+        assert source not in self.waiting, f"source {source} is already in flight"
+        if opcode == TL_OP_GET:
+            beats = [(lane_mask(address, size), 0)]
+            nbeats = max(1, (1 << size) // BEAT_SIZE)
+        else:
+            shift = 8 * (address & (BEAT_SIZE - 1)) if size < 3 else 0
+            beats = [(lane_mask(address, size),
+                      int.from_bytes(data[i:i + BEAT_SIZE], 'little') << shift)
+                     for i in range(0, len(data), BEAT_SIZE)]
+            nbeats = 1
+
+        done = Event()
+        self.waiting[source] = (done, nbeats, [])
+        self.queue.append((opcode, source, address, size, beats))
+        await done.wait()
+        return self.waiting.pop(source)[2]
+
+    async def _drive_a(self):
+        dut = self.dut
+        while True:
+            if not self.queue:
+                dut.tl_a_valid.value = 0
+                await RisingEdge(dut.clk)
+                continue
+
+            opcode, source, address, size, beats = self.queue.pop(0)
+            for mask, data in beats:
+                dut.tl_a_valid.value = 1
+                dut.tl_a_opcode.value = opcode
+                dut.tl_a_size.value = size
+                dut.tl_a_source.value = source
+                dut.tl_a_address.value = address
+                dut.tl_a_mask.value = mask
+                dut.tl_a_data.value = data
+                while True:
+                    await RisingEdge(dut.clk)
+                    if dut.tl_a_ready.value:
+                        break
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    async def _monitor_d(self):
+        dut = self.dut
+        while True:
+            await RisingEdge(dut.clk)
+            if not (dut.tl_d_valid.value and dut.tl_d_ready.value):
+                continue
+
+            source = int(dut.tl_d_source.value)
+            assert source in self.waiting, f"D beat for idle source {source}"
+            done, nbeats, beats = self.waiting[source]
+            assert not done.is_set(), f"Too many D beats for source {source}"
+            beats.append((int(dut.tl_d_opcode.value), int(dut.tl_d_size.value),
+                          int(dut.tl_d_data.value).to_bytes(BEAT_SIZE, 'little')))
+            if len(beats) == nbeats:
+                self.in_flight -= 1
+                done.set()
+
+
+class Env:
+    """Reusable test environment for TileLink to UMI adapter tests."""
+
+    MEM_SIZE = 2**16
+    SRCADDR = 0x0000AE5100000000
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.requests = []
+
+    async def setup(self, latency=1, reorder=False, backpressure=False):
+        """Reset the DUT and attach the TileLink master and UMI memory."""
+        dut = self.dut
+
+        Clock(dut.clk, 1, unit="ns").start()
+
+        dut.srcaddr.value = self.SRCADDR
+        dut.tl_d_ready.value = 0
+        dut.uhost_req_ready.value = 0
+        dut.uhost_resp_valid.value = 0
+
+        self.master = TileLinkMaster(dut)
+
+        # Reset sequence (active-low reset)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 1)
+        dut.nreset.value = 0
+        await ClockCycles(dut.clk, 10)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 5)
+
+        if backpressure:
+            BitDriver(signal=dut.tl_d_ready, clk=dut.clk).start(
+                generator=random_toggle_generator())
+            BitDriver(signal=dut.uhost_req_ready, clk=dut.clk).start(
+                generator=random_toggle_generator())
+        else:
+            dut.tl_d_ready.value = 1
+            dut.uhost_req_ready.value = 1
+
+        sumi_req_monitor = SumiMonitor(entity=dut, name="uhost_req", clock=dut.clk)
+        sumi_req_monitor.add_callback(self.requests.append)
+        sumi_resp_driver = SumiDriver(entity=dut, name="uhost_resp", clock=dut.clk)
+        self.memory = LatencyUmiMemoryDevice(
+            monitor=sumi_req_monitor,
+            driver=sumi_resp_driver,
+            clock=dut.clk,
+            latency=latency,
+            reorder=reorder
+        )
+
+        await ClockCycles(dut.clk, 5)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    reorder=[False, True],
+    backpressure=[False, True],
+    test_n_transactions=[int(400 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def random_test(dut, reorder=True, backpressure=False, test_n_transactions=400):
+    """
+    Random Gets and Puts of 1 to 64 bytes from twelve sources at once,
+    each source working in its own address range. Every D response is
+    checked against a model of the memory, and at most OUTSTANDING sources
+    may be in flight. With reorder set the UMI memory answers requests in
+    random order.
+    """
+
+    env = Env(dut)
+    await env.setup(latency=40, reorder=reorder, backpressure=backpressure)
+
+    outstanding = int(dut.OUTSTANDING.value)
+    sources = random.sample(range(32), 12)
+    region = 0x1000
+    model = bytearray(env.MEM_SIZE)
+    remaining = [test_n_transactions]
+
+    async def worker(index, source):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            size = random.randint(0, 6)
+            address = index * region + random.randrange(0, region, 1 << size)
+            nbytes = 1 << size
+            if random.random() < 0.5:
+                data = random.randbytes(nbytes)
+                model[address:address + nbytes] = data
+                beats = await env.master.request(TL_OP_PUTFULLDATA, source, address, size, data)
+                assert [b[:2] for b in beats] == [(TL_OP_ACCESSACK, size)], \
+                    f"source {source}: expected one AccessAck, got {beats}"
+            else:
+                beats = await env.master.request(TL_OP_GET, source, address, size)
+                assert [b[:2] for b in beats] == [(TL_OP_ACCESSACKDATA, size)] * len(beats), \
+                    f"source {source}: expected AccessAckData beats, got {beats}"
+                if size < 3:
+                    lane = address & (BEAT_SIZE - 1)
+                    data = beats[0][2][lane:lane + nbytes]
+                else:
+                    data = b''.join(b[2] for b in beats)
+                expected = bytes(model[address:address + nbytes])
+                assert data == expected, \
+                    f"Get 0x{address:x} size {size}: expected {expected.hex()}, got {data.hex()}"
+
+    tasks = [cocotb.start_soon(worker(i, s)) for i, s in enumerate(sources)]
+    for task in tasks:
+        await task
+
+    assert env.memory.read(0, env.MEM_SIZE) == bytes(model)
+
+    dut._log.info(f"OUTSTANDING={outstanding}: up to {env.master.max_in_flight} sources "
+                  f"in flight")
+    assert env.master.max_in_flight <= outstanding
+    if outstanding > 1:
+        assert env.master.max_in_flight > 1
+
+    if reorder:
+        # the UMI memory did answer out of order
+        assert env.memory.answered != sorted(env.memory.answered)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    opcode=[TL_OP_GET, TL_OP_PUTFULLDATA],
+    latency=[20, 100],
+    test_n_transactions=[int(64 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def throughput_test(dut, opcode=TL_OP_GET, latency=20, test_n_transactions=64, size=6):
+    """
+    Back to back 64 byte Gets or Put bursts from sixteen sources against a
+    UMI memory answering latency cycles after the request. A single source
+    in flight moves 64 bytes per round trip, OUTSTANDING sources should
+    keep the data channel at least half busy. A Put burst has to become
+    one UMI write per beat with EOM on the last one.
+    """
+
+    env = Env(dut)
+    await env.setup(latency=latency)
+
+    outstanding = int(dut.OUTSTANDING.value)
+    length = 1 << size
+    remaining = [test_n_transactions]
+
+    async def worker(source):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            address = length * random.randrange(env.MEM_SIZE // length)
+            if opcode == TL_OP_GET:
+                await env.master.request(TL_OP_GET, source, address, size)
+            else:
+                await env.master.request(TL_OP_PUTFULLDATA, source, address, size,
+                                         random.randbytes(length))
+
+    start = get_sim_time(unit="ns")
+    tasks = [cocotb.start_soon(worker(source)) for source in range(16)]
+    for task in tasks:
+        await task
+    rate = test_n_transactions * length / (get_sim_time(unit="ns") - start)
+
+    dut._log.info(
+        f"opcode={opcode} latency={latency} OUTSTANDING={outstanding}: "
+        f"{test_n_transactions} requests of {length} bytes at {rate:.2f} bytes/cycle, "
+        f"single source bound {length / latency:.2f} bytes/cycle"
+    )
+
+    if opcode == TL_OP_PUTFULLDATA:
+        writes = [int(r.cmd.eom) for r in env.requests]
+        assert len(writes) == test_n_transactions * (length // BEAT_SIZE)
+        assert sum(writes) == test_n_transactions
+        assert writes[length // BEAT_SIZE - 1::length // BEAT_SIZE] == [1] * test_n_transactions
+
+    assert rate >= 0.5 * min(BEAT_SIZE, outstanding * length / latency)
+
+
+class TbDesign(Design):
+
+    def __init__(self, outstanding):
+        super().__init__()
+
+        # Set the design's name
+        self.set_name(f"tb_tl2umi{outstanding}")
+
+        # Establish the root directory for all design-related files
+        self.set_dataroot("tb_tl2umi", __file__)
+
+        # Configure filesets within the established data root
+        with self.active_dataroot("tb_tl2umi"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("tl2umi")
+                self.set_param("OUTSTANDING", str(outstanding))
+                self.add_file("test_tl2umi.py", filetype="python")
+                self.add_depfileset(TL2UMI(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("outstanding", [1, 8])
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_tl2umi(simulator, outstanding):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(outstanding),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
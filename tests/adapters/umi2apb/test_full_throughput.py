@@ -1,9 +1,12 @@
 import math
+from random import randint, randbytes
+
 import cocotb
 
 from cocotb.triggers import Event, Combine, ClockCycles
+from cocotb.utils import get_sim_time
 
-from env import UMI2APBEnv
+from env import UMI2APBEnv, create_expected_write_response
 from cocotbext.umi.sumi import SumiTransaction, SumiCmdType, SumiCmd
 
 
@@ -13,6 +16,9 @@ async def test_full_throughput(dut):
     Back-to-back full-throughput tests alternating read/write transactions.
 
     - New request arrives in same cycle response becomes valid
+    - PIPELINE=0 takes 3 cycles per transaction with a response, PIPELINE=1
+      overlaps the next SETUP phase with the response for 2 cycles per
+      transaction, the APB limit
     """
 
     env = UMI2APBEnv(dut)
@@ -26,9 +32,12 @@ async def test_full_throughput(dut):
     umi_size = int(math.log2(data_size))
 
     num_transactions = 100
+    pipeline = int(dut.PIPELINE.value)
 
     print("=== Back-to-Back Full Throughput Test ===")
 
+    start = get_sim_time(unit="ns")
+
     send_events = []
     for i in range(num_transactions):
         txn_size = i % (umi_size + 1)
@@ -93,9 +102,122 @@ async def test_full_throughput(dut):
 
     # Wait for all responses
     await Combine(*(e.wait() for e in send_events))
+    while env.expected_responses:
+        await ClockCycles(env.clk, 1)
+
+    cycles = (get_sim_time(unit="ns") - start) / env.clk_period_ns
+    cycles_per_txn = cycles / num_transactions
 
     await ClockCycles(env.clk, 100)
 
     print(f" All {num_transactions} back-to-back transactions completed successfully!")
+    print(f" PIPELINE={pipeline}: {cycles_per_txn:.2f} cycles per transaction")
+
+    if pipeline:
+        assert cycles_per_txn <= 2.1
+    else:
+        assert cycles_per_txn <= 3.1
+
+    raise env.scoreboard.result
+
+
+@cocotb.test(timeout_time=50, timeout_unit="ms")
+async def test_full_throughput_multiword(dut):
+    """
+    Back-to-back unaligned multi-word writes followed by reads of the same
+    bytes, each decomposed into back-to-back APB transfers (PIPELINE=1).
+    """
+
+    if not int(dut.PIPELINE.value):
+        dut._log.info("Multi-word requests need PIPELINE=1, skipping")
+        return
+
+    env = UMI2APBEnv(dut)
+    await env.start()
+
+    dut.udev_resp_ready.value = 1
+
+    data_size = env.data_size
+    addr_width = env.addr_width
+    bus_size = int(dut.DW.value) // 8
+
+    num_transactions = 50
+
+    print("=== Back-to-Back Multi-Word Throughput Test ===")
+
+    requests = []
+    for i in range(num_transactions):
+        size = randint(0, int(math.log2(bus_size)))
+        length = randint(1, bus_size >> size) - 1
+        nbytes = (length + 1) << size
+        addr = (i * 2 * bus_size) + randint(0, bus_size // (1 << size) - 1) * (1 << size)
+        requests.append((addr, size, length, randbytes(nbytes)))
+
+    # APB transfers the requests span, once for the writes and once for the reads
+    apb_words = 2 * sum((addr + ((length + 1) << size) - 1) // data_size - addr // data_size + 1
+                        for addr, size, length, _ in requests)
+
+    start = get_sim_time(unit="ns")
+
+    send_events = []
+    for addr, size, length, data in requests:
+        txn = SumiTransaction(
+            cmd=SumiCmd.from_fields(
+                cmd_type=int(SumiCmdType.UMI_REQ_WRITE),
+                size=size,
+                len=length,
+            ),
+            da=addr,
+            sa=0x0,
+            data=data,
+        )
+        env.expected_responses.append(
+            create_expected_write_response(txn, data_size=data_size, addr_width=addr_width)
+        )
+        evt = Event()
+        env.sumi_driver.append(txn, event=evt)
+        send_events.append(evt)
+
+    for addr, size, length, data in requests:
+        txn = SumiTransaction(
+            cmd=SumiCmd.from_fields(
+                cmd_type=int(SumiCmdType.UMI_REQ_READ),
+                size=size,
+                len=length,
+            ),
+            da=addr,
+            sa=0x0,
+            data=bytearray(len(data)),
+        )
+        env.expected_responses.append(SumiTransaction(
+            cmd=SumiCmd.from_fields(
+                cmd_type=int(SumiCmdType.UMI_RESP_READ),
+                size=size,
+                len=length,
+            ),
+            da=0x0,
+            sa=addr,
+            data=data,
+            addr_width=addr_width,
+        ))
+        evt = Event()
+        env.sumi_driver.append(txn, event=evt)
+        send_events.append(evt)
+
+    await Combine(*(e.wait() for e in send_events))
+    while env.expected_responses:
+        await ClockCycles(env.clk, 1)
+
+    cycles = (get_sim_time(unit="ns") - start) / env.clk_period_ns
+    cycles_per_word = cycles / apb_words
+
+    await ClockCycles(env.clk, 100)
+
+    for addr, size, length, data in requests:
+        assert await env.region.read(addr, len(data)) == data
+
+    print(f" {apb_words} APB transfers at {cycles_per_word:.2f} cycles per transfer")
+
+    assert cycles_per_word <= 2.2
 
     raise env.scoreboard.result
@@ -1,3 +1,5 @@
+import itertools
+
 import pytest
 
 from siliconcompiler import Design
@@ -7,16 +9,17 @@ from umi.adapters.umi2apb.umi2apb import UMI2APB
 
 class TbDesign(Design):
 
-    def __init__(self):
+    def __init__(self, pipeline: int = 0):
         super().__init__()
 
-        self.set_name("tb_umi2apb")
+        self.set_name(f"tb_umi2apb_pipeline_{pipeline}")
 
         self.set_dataroot("tb_umi2apb", __file__)
 
         with self.active_dataroot("tb_umi2apb"):
             with self.active_fileset("testbench.cocotb"):
                 self.set_topmodule("umi2apb")
+                self.set_param("PIPELINE", str(pipeline))
                 self.add_file("env.py", filetype="python")
                 self.add_file("test_basic_WR.py", filetype="python")
                 self.add_file("test_backpressure.py", filetype="python")
@@ -27,11 +30,14 @@ class TbDesign(Design):
 
 
 @pytest.mark.cocotb
-@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
-def test_umi2apb(simulator, output_wave=False):
+@pytest.mark.parametrize("simulator, pipeline", list(itertools.product(
+    ["icarus", "verilator"],
+    [0, 1]
+)))
+def test_umi2apb(simulator, pipeline, output_wave=False):
     from run_cocotb_sim import load_cocotb_test
     load_cocotb_test(
-        design=TbDesign(),
+        design=TbDesign(pipeline),
         simulator=simulator,
         trace=output_wave,
         seed=None
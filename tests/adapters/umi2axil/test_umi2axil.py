@@ -0,0 +1,218 @@
+import os
+import random
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles
+from cocotb.utils import get_sim_time
+
+from cocotb_bus.drivers import BitDriver
+
+from cocotbext.axi import AxiLiteBus, AxiLiteRam
+
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+from cocotbext.umi.sumi import SumiCmd, SumiCmdType, SumiTransaction
+from cocotbext.umi.utils import generators
+
+from umi.adapters.umi2axil.umi2axil import UMI2AXIL
+
+
+def pause_generator(probability):
+    """Yields True (pause) with the given probability every cycle."""
+    while True:
+        yield random.random() < probability
+
+
+class Env:
+    """Reusable test environment for UMI to AXI4-Lite adapter tests."""
+
+    MEM_SIZE = 2**16
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.bus_size = int(dut.DW.value) // 8
+        self.responses = []
+
+    async def setup(self, umi_valid_gen=None, resp_ready_gen=None, axi_pause=0.0):
+        """Reset the DUT and attach the UMI driver/monitor and AXI-Lite memory."""
+        dut = self.dut
+
+        Clock(dut.clk, 1, unit="ns").start()
+
+        dut.udev_req_valid.value = 0
+        dut.udev_resp_ready.value = 0
+
+        # Reset sequence (active-low reset)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 1)
+        dut.nreset.value = 0
+        await ClockCycles(dut.clk, 10)
+        dut.nreset.value = 1
+
+        self.sumi_driver = SumiDriver(
+            entity=dut, name="udev_req", clock=dut.clk, valid_generator=umi_valid_gen
+        )
+
+        self.sumi_monitor = SumiMonitor(entity=dut, name="udev_resp", clock=dut.clk)
+        self.sumi_monitor.add_callback(self.responses.append)
+
+        if resp_ready_gen is None:
+            dut.udev_resp_ready.value = 1
+        else:
+            BitDriver(signal=dut.udev_resp_ready, clk=dut.clk).start(generator=resp_ready_gen)
+
+        axi_bus = AxiLiteBus.from_prefix(dut, "axi")
+        self.ram = AxiLiteRam(axi_bus, dut.clk, dut.nreset, reset_active_level=False,
+                              size=self.MEM_SIZE)
+        if axi_pause:
+            for channel in (self.ram.write_if.aw_channel, self.ram.write_if.w_channel,
+                            self.ram.write_if.b_channel, self.ram.read_if.ar_channel,
+                            self.ram.read_if.r_channel):
+                channel.set_pause_generator(pause_generator(axi_pause))
+
+        await ClockCycles(dut.clk, 5)
+
+    def request(self, opcode, addr, size, data):
+        return SumiTransaction(
+            cmd=SumiCmd.from_fields(cmd_type=int(opcode), size=size, len=0),
+            da=addr,
+            sa=random.randint(0, 2**32 - 1) << 3,
+            data=data,
+        )
+
+
+async def run_random_traffic(env, n_transactions, posted=False):
+    """
+    Sends random single word reads and writes back to back and checks the
+    UMI responses against a model of the memory, in request order.
+    Returns the simulation time at which the last response arrived.
+    """
+    max_size = env.bus_size.bit_length() - 1
+    model = bytearray(env.MEM_SIZE)
+    expected = []
+
+    for _ in range(n_transactions):
+        size = random.randint(0, max_size)
+        nbytes = 1 << size
+        addr = random.randrange(0, env.MEM_SIZE, nbytes)
+
+        if random.random() < 0.5:
+            txn = env.request(SumiCmdType.UMI_REQ_READ, addr, size, bytes(nbytes))
+            expected.append((SumiCmdType.UMI_RESP_READ, txn, bytes(model[addr:addr + nbytes])))
+        else:
+            data = random.randbytes(nbytes)
+            model[addr:addr + nbytes] = data
+            if posted and random.random() < 0.5:
+                txn = env.request(SumiCmdType.UMI_REQ_POSTED, addr, size, data)
+            else:
+                txn = env.request(SumiCmdType.UMI_REQ_WRITE, addr, size, data)
+                expected.append((SumiCmdType.UMI_RESP_WRITE, txn, None))
+
+        env.sumi_driver.append(txn)
+
+    while len(env.responses) < len(expected):
+        await ClockCycles(env.dut.clk, 1)
+    end = get_sim_time(unit="ns")
+
+    # let posted writes drain
+    await ClockCycles(env.dut.clk, 100)
+
+    assert len(env.responses) == len(expected)
+    for i, (resp, (opcode, txn, data)) in enumerate(zip(env.responses, expected)):
+        assert int(resp.cmd.cmd_type) == opcode, f"Response {i}: expected {opcode!r}"
+        assert int(resp.da) == int(txn.sa), f"Response {i}: wrong dstaddr"
+        assert int(resp.sa) == int(txn.da), f"Response {i}: wrong srcaddr"
+        if data is not None:
+            assert bytes(resp.data) == data, (
+                f"Response {i}: read 0x{int(txn.da):04x} expected {data.hex()}, "
+                f"got {bytes(resp.data).hex()}"
+            )
+
+    assert env.ram.read(0, env.MEM_SIZE) == bytes(model)
+
+    return end
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    umi_valid_gen=[None, generators.random_toggle_generator()],
+    resp_ready_gen=[None, generators.random_toggle_generator(), generators.wave_generator()],
+    axi_pause=[0.0, 0.5],
+    test_n_transactions=[int(200 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def backpressure_test(
+    dut,
+    test_n_transactions=200,
+    umi_valid_gen=None,
+    resp_ready_gen=None,
+    axi_pause=0.0
+):
+    """Random reads and writes with back pressure on the UMI and AXI-Lite sides."""
+
+    env = Env(dut)
+    await env.setup(umi_valid_gen=umi_valid_gen, resp_ready_gen=resp_ready_gen,
+                    axi_pause=axi_pause)
+
+    await run_random_traffic(env, test_n_transactions, posted=True)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+async def full_throughput_test(dut, test_n_transactions=200):
+    """
+    Back to back single word reads and writes without back pressure.
+
+    With a single transaction in flight every request waits for the
+    previous AXI response, which takes at least 4 cycles (request register,
+    address handshake, response, UMI response). With OUTSTANDING > 1 the
+    bridge should issue a new AXI request well within that round trip.
+    """
+
+    env = Env(dut)
+    await env.setup()
+
+    outstanding = int(dut.OUTSTANDING.value)
+
+    start = get_sim_time(unit="ns")
+    cycles = await run_random_traffic(env, test_n_transactions) - start
+
+    rate = test_n_transactions / cycles
+    dut._log.info(f"OUTSTANDING={outstanding}: {rate:.3f} transactions/cycle")
+
+    if outstanding > 1:
+        assert rate > 1 / 4
+
+
+class TbDesign(Design):
+
+    def __init__(self):
+        super().__init__()
+
+        # Set the design's name
+        self.set_name("tb_umi2axil")
+
+        # Establish the root directory for all design-related files
+        self.set_dataroot("tb_umi2axil", __file__)
+
+        # Configure filesets within the established data root
+        with self.active_dataroot("tb_umi2axil"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi2axil")
+                self.add_file("test_umi2axil.py", filetype="python")
+                self.add_depfileset(UMI2AXIL(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi2axil(simulator):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
@@ -0,0 +1,305 @@
+import os
+import random
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, RisingEdge
+from cocotb.utils import get_sim_time
+
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+
+from umi.sumi import messages
+from umi.adapters.umi2tl.umi2tl import UMI2TL
+
+
+TL_OP_GET = 4
+TL_OP_PUTFULLDATA = 0
+TL_OP_ACCESSACK = 0
+TL_OP_ACCESSACKDATA = 1
+
+
+class TileLinkMemory:
+    """
+    TileLink TL-UH slave backed by a byte array, answering Get and
+    PutFullData requests, single beat or burst. Each request is answered
+    latency cycles after its last A beat, or with reorder set after a random
+    number of cycles up to latency, so later sources overtake earlier ones.
+    The beats of one response are sent back to back. The indices of the
+    requests, in the order they were answered, are kept in answered.
+    """
+
+    def __init__(self, dut, size, latency=1, reorder=False):
+        self.dut = dut
+        self.mem = bytearray(size)
+        self.latency = latency
+        self.reorder = reorder
+        self.beat_size = int(dut.ODW.value) // 8
+        self.requests = 0
+        self.answered = []
+        self.pending = []
+
+        dut.tl_a_ready.value = 1
+        dut.tl_d_valid.value = 0
+        dut.tl_d_opcode.value = 0
+        dut.tl_d_param.value = 0
+        dut.tl_d_size.value = 0
+        dut.tl_d_source.value = 0
+        dut.tl_d_sink.value = 0
+        dut.tl_d_denied.value = 0
+        dut.tl_d_data.value = 0
+        dut.tl_d_corrupt.value = 0
+
+        cocotb.start_soon(self._run())
+
+    def _access(self, beats):
+        """Applies the A beats of one request, returns its D beats."""
+        opcode, size, source, address = beats[0][:4]
+        base = address & ~(self.beat_size - 1)
+        nbeats = max(1, (1 << size) // self.beat_size)
+
+        if opcode == TL_OP_GET:
+            return [(TL_OP_ACCESSACKDATA, size, source, int.from_bytes(
+                self.mem[base + i * self.beat_size:base + (i + 1) * self.beat_size], 'little'))
+                for i in range(nbeats)]
+
+        assert opcode == TL_OP_PUTFULLDATA, f"Unexpected A opcode {opcode}"
+        for i, (_, _, _, _, mask, data) in enumerate(beats):
+            for b in range(self.beat_size):
+                if (mask >> b) & 1:
+                    self.mem[base + i * self.beat_size + b] = (data >> (8 * b)) & 0xff
+        return [(TL_OP_ACCESSACK, size, source, 0)]
+
+    async def _run(self):
+        dut = self.dut
+        cycle = 0
+        request = []
+        current = []
+
+        while True:
+            await RisingEdge(dut.clk)
+            cycle += 1
+
+            if current and dut.tl_d_ready.value:
+                current.pop(0)
+
+            if dut.tl_a_valid.value and dut.tl_a_ready.value:
+                request.append((int(dut.tl_a_opcode.value), int(dut.tl_a_size.value),
+                                int(dut.tl_a_source.value), int(dut.tl_a_address.value),
+                                int(dut.tl_a_mask.value), int(dut.tl_a_data.value)))
+                opcode, size = request[0][:2]
+                nbeats = 1 if opcode == TL_OP_GET else max(1, (1 << size) // self.beat_size)
+                if len(request) == nbeats:
+                    delay = random.randint(1, self.latency) if self.reorder else self.latency
+                    self.pending.append((cycle + delay, self.requests, self._access(request)))
+                    self.requests += 1
+                    request = []
+
+            if not current:
+                due = [p for p in self.pending if p[0] <= cycle]
+                if due:
+                    entry = random.choice(due) if self.reorder else due[0]
+                    self.pending.remove(entry)
+                    self.answered.append(entry[1])
+                    current = entry[2]
+
+            if current:
+                opcode, size, source, data = current[0]
+                dut.tl_d_valid.value = 1
+                dut.tl_d_opcode.value = opcode
+                dut.tl_d_size.value = size
+                dut.tl_d_source.value = source
+                dut.tl_d_data.value = data
+            else:
+                dut.tl_d_valid.value = 0
+
+
+class Env:
+    """Reusable test environment for UMI to TileLink adapter tests."""
+
+    MEM_SIZE = 2**16
+    SRCADDR = 0x0000110000000000
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.responses = []
+
+    async def setup(self, latency=1, reorder=False):
+        """Reset the DUT and attach the UMI driver/monitor and TileLink memory."""
+        dut = self.dut
+
+        Clock(dut.clk, 1, unit="ns").start()
+
+        dut.udev_req_valid.value = 0
+        dut.udev_resp_ready.value = 1
+
+        self.memory = TileLinkMemory(dut, self.MEM_SIZE, latency=latency, reorder=reorder)
+
+        # Reset sequence (active-low reset)
+        dut.nreset.value = 1
+        await ClockCycles(dut.clk, 1)
+        dut.nreset.value = 0
+        await ClockCycles(dut.clk, 10)
+        dut.nreset.value = 1
+
+        self.sumi_driver = SumiDriver(entity=dut, name="udev_req", clock=dut.clk)
+
+        self.sumi_monitor = SumiMonitor(entity=dut, name="udev_resp", clock=dut.clk)
+        self.sumi_monitor.add_callback(self.responses.append)
+
+        await ClockCycles(dut.clk, 5)
+
+    def request(self, opcode, addr, length, data=None):
+        """
+        Queues a request for length bytes, a power of two, in words of up
+        to 8 bytes. Returns (cmd, srcaddr).
+        """
+        size = min(3, length.bit_length() - 1)
+        cmd = int(messages.encode(opcode=opcode, size=size, len=(length >> size) - 1, eom=1))
+        srcaddr = self.SRCADDR + (random.randrange(2**16) << 8)
+        self.sumi_driver.append(SumiTransaction(
+            cmd=SumiCmd.from_int(cmd),
+            da=addr,
+            sa=srcaddr,
+            data=data if data is not None else bytes(length)
+        ))
+        return cmd, srcaddr
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    reorder=[False, True],
+    test_n_transactions=[int(200 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def reorder_test(dut, reorder=True, test_n_transactions=200):
+    """
+    Random reads, writes and posted writes of one host, checked in request
+    order against a model of the memory. With reorder set the TileLink
+    slave answers the sources in random order.
+    """
+
+    env = Env(dut)
+    await env.setup(latency=40, reorder=reorder)
+
+    idw_bytes = int(dut.IDW.value) // 8
+    model = bytearray(env.MEM_SIZE)
+    expected = []
+
+    for _ in range(test_n_transactions):
+        if random.random() < 0.5:
+            length = random.choice([1, 2, 4, 8, 16, 32, 64, 128])
+            addr = random.randrange(0, env.MEM_SIZE, max(length, 8))
+            addr += random.randrange(0, 8, length) if length < 8 else 0
+            cmd, srcaddr = env.request(messages.REQ_READ, addr, length)
+            data = bytes(model[addr:addr + length])
+            if length > 8:
+                # one response per 8 byte beat, EOM on the last one
+                for i in range(length // 8):
+                    expected.append((messages.RESP_READ, srcaddr + 8 * i,
+                                     data[8 * i:8 * (i + 1)], i == length // 8 - 1))
+            else:
+                expected.append((messages.RESP_READ, srcaddr, data, True))
+        else:
+            length = random.choice([n for n in [1, 2, 4, 8, 16] if n <= idw_bytes])
+            addr = random.randrange(0, env.MEM_SIZE, max(length, 8))
+            addr += random.randrange(0, 8, length) if length < 8 else 0
+            data = random.randbytes(length)
+            model[addr:addr + length] = data
+            if random.random() < 0.25:
+                env.request(messages.REQ_POSTED, addr, length, data)
+            else:
+                _, srcaddr = env.request(messages.REQ_WRITE, addr, length, data)
+                expected.append((messages.RESP_WRITE, srcaddr, None, True))
+
+    while len(env.responses) < len(expected):
+        await ClockCycles(dut.clk, 10)
+
+    # let posted writes drain
+    await ClockCycles(dut.clk, 200)
+
+    assert len(env.responses) == len(expected)
+    for i, (resp, (opcode, dstaddr, data, eom)) in enumerate(zip(env.responses, expected)):
+        assert int(resp.cmd.cmd_type) == opcode, f"Response {i}: expected opcode 0x{opcode:02x}"
+        assert int(resp.da) == dstaddr, f"Response {i}: wrong dstaddr 0x{int(resp.da):x}"
+        assert int(resp.cmd.eom) == eom, f"Response {i}: wrong EOM"
+        if data is not None:
+            assert bytes(resp.data) == data, (
+                f"Response {i}: expected {data.hex()}, got {bytes(resp.data).hex()}")
+
+    assert env.memory.mem == model
+
+    if reorder:
+        # the TileLink slave did answer out of order
+        assert env.memory.answered != sorted(env.memory.answered)
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    latency=[20, 100],
+    test_n_transactions=[int(64 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def throughput_test(dut, latency=20, test_n_transactions=64, length=64):
+    """
+    Back to back 64 byte reads, each one TileLink Get burst, against a
+    memory answering latency cycles after the request. A single source in
+    flight moves length bytes per round trip, OUTSTANDING sources should
+    keep the D channel at least half busy.
+    """
+
+    env = Env(dut)
+    await env.setup(latency=latency)
+
+    outstanding = int(dut.OUTSTANDING.value)
+    beat_size = int(dut.ODW.value) // 8
+
+    start = get_sim_time(unit="ns")
+    for _ in range(test_n_transactions):
+        env.request(messages.REQ_READ, length * random.randrange(env.MEM_SIZE // length), length)
+
+    while len(env.responses) < test_n_transactions * (length // beat_size):
+        await ClockCycles(dut.clk, 1)
+    rate = test_n_transactions * length / (get_sim_time(unit="ns") - start)
+
+    dut._log.info(
+        f"latency={latency} OUTSTANDING={outstanding}: {test_n_transactions} reads of "
+        f"{length} bytes at {rate:.2f} bytes/cycle, "
+        f"single source bound {length / latency:.2f} bytes/cycle"
+    )
+
+    assert rate >= 0.5 * min(beat_size, outstanding * length / latency)
+
+
+class TbDesign(Design):
+
+    def __init__(self):
+        super().__init__()
+
+        # Set the design's name
+        self.set_name("tb_umi2tl")
+
+        # Establish the root directory for all design-related files
+        self.set_dataroot("tb_umi2tl", __file__)
+
+        # Configure filesets within the established data root
+        with self.active_dataroot("tb_umi2tl"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi2tl")
+                self.add_file("test_umi2tl.py", filetype="python")
+                self.add_depfileset(UMI2TL(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi2tl(simulator):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
@@ -0,0 +1,215 @@
+import os
+import random
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, RisingEdge, Timer
+
+from cocotb_bus.drivers import BitDriver
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+
+from cocotbext.umi.utils.generators import random_toggle_generator
+
+from umi.sumi import messages
+from umi.adapters.address_remap import AddressRemap
+
+
+AW = 64
+AMASK = (1 << AW) - 1
+
+CHIPID = 0x0004
+IDW = 16
+IDSB = 40
+OFFSET_LOW = 0x0000_0600_0000_0080
+OFFSET_HIGH = 0x0000_06FF_FFFF_FFFF
+OFFSET = 0xFFFF_FFFF_FFFF_FF80
+
+# opcodes carrying data
+WITH_DATA = (messages.REQ_WRITE, messages.REQ_POSTED, messages.RESP_READ)
+
+
+class AddressRemapModel:
+    '''
+    Reference model of umi_address_remap. Priority: chipid passthrough,
+    region table, offset window, ID remap.
+    '''
+
+    def __init__(self, nmaps, nregions):
+        self.maps = [(i, ~i & ((1 << IDW) - 1)) for i in range(nmaps)]
+        self.regions = [None] * nregions
+
+    def set_region(self, index, base, mask, offset, enable):
+        self.regions[index] = (base, mask, offset) if enable else None
+
+    def remap(self, addr):
+        chip = (addr >> IDSB) & ((1 << IDW) - 1)
+        if chip == CHIPID:
+            return addr
+        for region in self.regions:
+            if region is not None and (addr & region[1]) == region[0]:
+                return (addr + region[2]) & AMASK
+        if OFFSET_LOW <= addr <= OFFSET_HIGH:
+            return (addr + OFFSET) & AMASK
+        for old, new in self.maps:
+            if chip == old:
+                return (addr & ~(((1 << IDW) - 1) << IDSB)) | (new << IDSB)
+        return addr
+
+
+async def reg_write(dut, addr, value):
+    dut.reg_write.value = 1
+    dut.reg_addr.value = addr
+    dut.reg_wdata.value = value
+    await RisingEdge(dut.clk)
+    dut.reg_write.value = 0
+
+
+async def reg_read(dut, addr):
+    dut.reg_read.value = 1
+    dut.reg_addr.value = addr
+    await Timer(1, unit="ps")
+    value = int(dut.reg_rdata.value)
+    dut.reg_read.value = 0
+    return value
+
+
+async def program_regions(dut, model):
+    '''
+    Programs every region with a random window over the ID bits and some
+    of the device address bits, enables most of them and checks the
+    registers read back.
+    '''
+    for i in range(len(model.regions)):
+        mask = 0xFFFF_FF00_0000_0000 | (random.getrandbits(IDSB) & 0xFF_0000_0000)
+        base = random.getrandbits(AW) & mask & 0x0000_07FF_FFFF_FFFF
+        offset = random.getrandbits(AW)
+        enable = int(random.random() < 0.75)
+        model.set_region(i, base, mask, offset, enable)
+
+        regs = [base, mask, offset, enable]
+        for field, value in enumerate(regs):
+            await reg_write(dut, (4 * i + field) * (AW // 8), value)
+        for field, value in enumerate(regs):
+            rdval = await reg_read(dut, (4 * i + field) * (AW // 8))
+            assert rdval == value, \
+                f"Region {i} register {field} readback: 0x{rdval:016x} != 0x{value:016x}"
+
+
+def random_address(model):
+    '''
+    Returns a random address, inside an enabled region half of the time.
+    '''
+    regions = [region for region in model.regions if region is not None]
+    if regions and random.random() < 0.5:
+        base, mask, _ = random.choice(regions)
+        return base | (random.getrandbits(AW) & ~mask & 0x0000_00FF_FFFF_FFF0)
+    addr = random.randrange(0x0000_0000_0000_0000, 0x0000_07FF_FFFF_FFFF)
+    return addr & 0xFFFF_FF00_0000_FFF0  # Allow different devices but reduce address space per device
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    test_n_packets=[int(5000 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def remap_test(dut, test_n_packets=5000):
+    '''
+    Programs the region table with random regions, then sends random
+    packets with random valid and ready. Every packet has to come out once
+    and in order, unchanged apart from dstaddr, which is checked against
+    the reference model.
+    '''
+    nmaps = int(dut.NMAPS.value)
+    bus_size = int(dut.DW.value) // 8
+
+    dut.chipid.value = CHIPID
+    dut.old_row_col_address.value = sum(i << (IDW * i) for i in range(nmaps))
+    dut.new_row_col_address.value = sum((~i & ((1 << IDW) - 1)) << (IDW * i)
+                                        for i in range(nmaps))
+    dut.set_dstaddress_low.value = OFFSET_LOW
+    dut.set_dstaddress_high.value = OFFSET_HIGH
+    dut.set_dstaddress_offset.value = OFFSET
+    dut.reg_write.value = 0
+    dut.reg_read.value = 0
+    dut.reg_addr.value = 0
+    dut.reg_wdata.value = 0
+    dut.umi_in_valid.value = 0
+    dut.umi_out_ready.value = 0
+    dut.nreset.value = 0
+
+    Clock(dut.clk, 1, unit="ns").start()
+    await ClockCycles(dut.clk, 5)
+    dut.nreset.value = 1
+    await ClockCycles(dut.clk, 2)
+
+    model = AddressRemapModel(nmaps, int(dut.NREGIONS.value))
+    await program_regions(dut, model)
+
+    driver = SumiDriver(entity=dut, name="umi_in", clock=dut.clk,
+                        valid_generator=random_toggle_generator())
+    monitor = SumiMonitor(entity=dut, name="umi_out", clock=dut.clk)
+    BitDriver(signal=dut.umi_out_ready, clk=dut.clk).start(generator=random_toggle_generator())
+
+    received = []
+    monitor.add_callback(received.append)
+
+    expected = []
+    for _ in range(test_n_packets):
+        opcode = random.choice([messages.REQ_READ, messages.REQ_WRITE, messages.REQ_POSTED,
+                                messages.RESP_READ, messages.RESP_WRITE])
+        size = random.randint(0, 3)
+        length = random.randint(0, (bus_size >> size) - 1)
+        cmd = int(messages.encode(opcode=opcode, size=size, len=length, eom=1))
+        dstaddr = random_address(model)
+        srcaddr = 0x0000110000000000 + (random.getrandbits(24) << 4)
+        data = random.randbytes((length + 1) << size)
+        expected.append((cmd, model.remap(dstaddr), srcaddr,
+                         data if opcode in WITH_DATA else None))
+        driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=dstaddr, sa=srcaddr,
+                                      data=data))
+
+    while len(received) < test_n_packets:
+        await ClockCycles(dut.clk, 10)
+    await ClockCycles(dut.clk, 10)
+
+    assert len(received) == test_n_packets
+    for i, (packet, (cmd, dstaddr, srcaddr, data)) in enumerate(zip(received, expected)):
+        assert int(packet.cmd) == cmd, f"Packet {i}: cmd changed"
+        assert int(packet.da) == dstaddr, \
+            f"Packet {i}: dstaddr 0x{int(packet.da):016x}, expected 0x{dstaddr:016x}"
+        assert int(packet.sa) == srcaddr, f"Packet {i}: srcaddr changed"
+        if data is not None:
+            assert bytes(packet.data)[:len(data)] == data, f"Packet {i}: data changed"
+
+
+class TbDesign(Design):
+
+    def __init__(self):
+        super().__init__()
+
+        self.set_name("tb_umi_address_remap")
+
+        self.set_dataroot("tb_umi_address_remap", __file__)
+
+        with self.active_dataroot("tb_umi_address_remap"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi_address_remap")
+                self.add_file("test_umi_address_remap.py", filetype="python")
+                self.add_depfileset(AddressRemap(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi_address_remap(simulator):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
@@ -0,0 +1,243 @@
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Timer
+from cocotb.utils import get_sim_time
+
+from cocotb_bus.drivers import BitDriver
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+
+from cocotbext.umi.utils.generators import random_toggle_generator
+
+from umi.sumi import messages
+from umi.adapters.packet_merge_greedy import PacketMergeGreedy
+
+
+IDW = 64
+ODW = 256
+
+# opcodes carrying data
+WITH_DATA = (messages.REQ_WRITE, messages.REQ_POSTED, messages.RESP_READ, messages.REQ_ATOMIC)
+
+# fields that may change when packets are merged
+MERGE_MASK = ~((0xff << messages.FIELDS['len'][0]) | (1 << messages.FIELDS['eom'][0]))
+
+
+def flatten(cmd, dstaddr, srcaddr, data):
+    '''
+    Returns the bytes of one packet as (cmd, dstaddr, srcaddr, data, eom)
+    records, cmd without the fields merging changes and eom set on the
+    last byte only. Merged and unmerged packets give the same records.
+    '''
+    opcode = int(messages.opcode(cmd))
+    nbytes = int(messages.nbytes(cmd))
+    eom = int(messages.decode(cmd)['eom'])
+    if opcode != messages.REQ_ATOMIC:
+        cmd &= MERGE_MASK
+    return [(cmd, dstaddr + i, srcaddr + i,
+             data[i] if opcode in WITH_DATA else None,
+             eom if i == nbytes - 1 else 0)
+            for i in range(nbytes)]
+
+
+async def setup(dut, valid_generator=None, ready_generator=None):
+    '''Resets the DUT, returns the input driver and the list of output packets.'''
+    dut.umi_in_valid.value = 0
+    dut.umi_out_ready.value = 0
+    dut.nreset.value = 0
+
+    Clock(dut.clk, 1, unit="ns").start()
+    await ClockCycles(dut.clk, 5)
+    dut.nreset.value = 1
+    await Timer(1, unit="ns")
+
+    driver = SumiDriver(entity=dut, name="umi_in", clock=dut.clk,
+                        valid_generator=valid_generator)
+    monitor = SumiMonitor(entity=dut, name="umi_out", clock=dut.clk)
+    if ready_generator is None:
+        dut.umi_out_ready.value = 1
+    else:
+        BitDriver(signal=dut.umi_out_ready, clk=dut.clk).start(generator=ready_generator)
+
+    received = []
+    monitor.add_callback(received.append)
+
+    await ClockCycles(dut.clk, 2)
+    return driver, received
+
+
+class Stream:
+    '''
+    Sequential packets of one host to its own address range, changing
+    opcode and word size from time to time.
+    '''
+
+    OPCODES = [messages.REQ_POSTED, messages.REQ_WRITE, messages.REQ_READ,
+               messages.RESP_READ, messages.RESP_WRITE]
+
+    def __init__(self, hostid, base):
+        self.hostid = hostid
+        self.dstaddr = base
+        self.srcaddr = (0x11 << 40) + base
+        self.opcode = random.choice(self.OPCODES)
+        self.size = random.randint(0, 3)
+
+    def packet(self):
+        if random.random() < 0.1:
+            self.opcode = random.choice(self.OPCODES)
+            self.size = random.randint(0, 3)
+
+        if random.random() < 0.03:
+            # atomics and exclusive accesses are never merged
+            size = random.randint(0, 3)
+            if random.random() < 0.5:
+                cmd = messages.encode(opcode=messages.REQ_ATOMIC, size=size,
+                                      len=random.randint(0, 8), hostid=self.hostid, eom=1)
+            else:
+                cmd = messages.encode(opcode=messages.REQ_READ, size=size,
+                                      ex=1, hostid=self.hostid, eom=1)
+            dstaddr = self.dstaddr + 0x10000
+            srcaddr = self.srcaddr + 0x10000
+        else:
+            length = random.randint(0, (IDW // 8 >> self.size) - 1)
+            cmd = messages.encode(opcode=self.opcode, size=self.size, len=length,
+                                  hostid=self.hostid, eom=int(random.random() < 0.1))
+            align = (1 << self.size) - 1
+            self.srcaddr += ((self.dstaddr + align) & ~align) - self.dstaddr
+            self.dstaddr = (self.dstaddr + align) & ~align
+            dstaddr = self.dstaddr
+            srcaddr = self.srcaddr
+            self.dstaddr += (length + 1) << self.size
+            self.srcaddr += (length + 1) << self.size
+
+        cmd = int(cmd)
+        return cmd, dstaddr, srcaddr, random.randbytes(int(messages.nbytes(cmd)))
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    test_n_packets=[int(2000 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def ordering_test(dut, test_n_packets=2000):
+    '''
+    Interleaved packets of four hosts, two address streams each, with
+    random valid and ready. Merging may reorder the hosts, but the bytes
+    of every host have to come out once, in the order they went in, with
+    EOM at the same places (README 3.1).
+    '''
+    driver, received = await setup(dut, valid_generator=random_toggle_generator(),
+                                   ready_generator=random_toggle_generator())
+
+    streams = [Stream(hostid, (hostid << 32) + (s << 24))
+               for hostid in range(4) for s in range(2)]
+
+    expected = {}
+    for _ in range(test_n_packets):
+        stream = random.choice(streams)
+        cmd, dstaddr, srcaddr, data = stream.packet()
+        expected.setdefault(stream.hostid, []).extend(flatten(cmd, dstaddr, srcaddr, data))
+        driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=dstaddr, sa=srcaddr,
+                                      data=data))
+
+    total = sum(len(records) for records in expected.values())
+
+    def received_bytes():
+        return sum(int(messages.nbytes(int(packet.cmd))) for packet in received)
+
+    while received_bytes() < total:
+        await ClockCycles(dut.clk, 10)
+    await ClockCycles(dut.clk, 10)
+
+    actual = {}
+    for packet in received:
+        cmd = int(packet.cmd)
+        actual.setdefault(int(messages.decode(cmd)['hostid']), []).extend(
+            flatten(cmd, int(packet.da), int(packet.sa), packet.data))
+
+    assert received_bytes() == total
+    for hostid, records in expected.items():
+        assert len(actual[hostid]) == len(records)
+        for i, (got, exp) in enumerate(zip(actual[hostid], records)):
+            assert got == exp, f"host {hostid}, byte {i}: got {got}, expected {exp}"
+
+    assert len(received) < test_n_packets, "no packets were merged"
+
+
+@cocotb.test(timeout_time=10, timeout_unit="ms")
+@cocotb.parametrize(
+    test_n_packets=[int(1000 * float(os.getenv("RAND_TEST_LEN_SCALER", default=1)))]
+)
+async def throughput_test(dut, test_n_packets=1000):
+    '''
+    Round robin full width posted writes of LOOKAHEAD streams, each from
+    its own host. Every stream should still be merged into ODW packets
+    while the input takes a packet nearly every cycle.
+    '''
+    driver, received = await setup(dut)
+
+    lookahead = int(dut.LOOKAHEAD.value)
+    nbytes = IDW // 8
+
+    for i in range(test_n_packets):
+        s = i % lookahead
+        offset = (i // lookahead) * nbytes
+        cmd = int(messages.encode(opcode=messages.REQ_POSTED, size=3, len=nbytes // 8 - 1,
+                                  hostid=s))
+        driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=(s << 32) + offset,
+                                      sa=(0x11 << 40) + (s << 32) + offset,
+                                      data=random.randbytes(nbytes)))
+
+    start = get_sim_time(unit="ns")
+    while sum(int(messages.nbytes(int(p.cmd))) for p in received) < test_n_packets * nbytes:
+        await ClockCycles(dut.clk, 1)
+    cycles = get_sim_time(unit="ns") - start
+
+    ratio = test_n_packets / len(received)
+    rate = test_n_packets / cycles
+
+    dut._log.info(f"LOOKAHEAD={lookahead}: {test_n_packets} packets in, {len(received)} out, "
+                  f"merge ratio {ratio:.2f}, {rate:.2f} input packets/cycle")
+
+    assert ratio >= 0.9 * (ODW // IDW)
+    assert rate >= 0.8
+
+
+class TbDesign(Design):
+
+    def __init__(self, lookahead):
+        super().__init__()
+
+        self.set_name(f"tb_umi_packet_merge_greedy{lookahead}")
+
+        self.set_dataroot("tb_umi_packet_merge_greedy", __file__)
+
+        with self.active_dataroot("tb_umi_packet_merge_greedy"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi_packet_merge_greedy")
+                self.set_param("IDW", str(IDW))
+                self.set_param("ODW", str(ODW))
+                self.set_param("LOOKAHEAD", str(lookahead))
+                self.add_file(Path(__file__).name, filetype="python")
+                self.add_depfileset(PacketMergeGreedy(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("lookahead", [1, 4])
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi_packet_merge_greedy(simulator, lookahead):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(lookahead),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
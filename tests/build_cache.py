@@ -0,0 +1,104 @@
+'''
+Content-hashed build cache for switchboard testbenches.
+
+The cache key covers everything that ends up in the compiled simulator:
+the resolved file list of the design (sources, include directories and
+defines, including all dependencies), the contents of those files, the
+fileset parameters, the simulator version and the SbDut build options.
+Builds with the same key share one build directory, so an unchanged
+testbench is compiled once and then reused across tests, pytest
+sessions and xdist workers.
+'''
+
+import fcntl
+import hashlib
+import importlib.metadata
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+
+_VERSION_CMD = {
+    'verilator': ['verilator', '--version'],
+    'icarus': ['iverilog', '-V']
+}
+
+
+def _tool_version(tool):
+    cmd = _VERSION_CMD.get(tool, [tool, '--version'])
+    if shutil.which(cmd[0]) is None:
+        return 'none'
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    return proc.stdout.splitlines()[0] if proc.stdout else 'unknown'
+
+
+def _hash_file(h, path):
+    h.update(str(path).encode())
+    with open(path, 'rb') as f:
+        h.update(hashlib.sha256(f.read()).digest())
+
+
+def build_key(design, fileset, tool, **options):
+    '''
+    Returns a hex digest identifying the simulator built from fileset of
+    design with the given tool and build options.
+    '''
+    h = hashlib.sha256()
+
+    h.update(f'{tool}:{_tool_version(tool)}\n'.encode())
+    for key, value in sorted(options.items()):
+        h.update(f'{key}={value}\n'.encode())
+
+    # Resolved file list, with each source and include directory hashed
+    with tempfile.TemporaryDirectory() as tmpdir:
+        flist = Path(tmpdir) / 'build.f'
+        design.write_fileset(flist, fileset=fileset)
+        lines = flist.read_text().splitlines()
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('//'):
+            continue
+        h.update(f'{line}\n'.encode())
+        if line.startswith('+incdir+'):
+            idir = Path(line[len('+incdir+'):])
+            for path in sorted(idir.iterdir()):
+                if path.is_file():
+                    _hash_file(h, path)
+        elif not line.startswith('+'):
+            _hash_file(h, line)
+
+    # Parameters are not part of the file list
+    for dep in [design, *design.get_dep()]:
+        for fs in dep.getkeys('fileset'):
+            for name in dep.getkeys('fileset', fs, 'param'):
+                value = dep.get('fileset', fs, 'param', name)
+                h.update(f'{dep.name}:{fs}:{name}={value}\n'.encode())
+
+    return h.hexdigest()
+
+
+def build(dut, cache_dir):
+    '''
+    Builds the simulator for dut inside cache_dir, reusing a previous
+    build with the same key if there is one. Returns the simulator path.
+    '''
+    key = build_key(dut.design, dut.fileset, dut.tool,
+                    trace=dut.trace,
+                    trace_type=dut.trace_type,
+                    threads=dut.threads,
+                    switchboard=importlib.metadata.version('switchboard-hw'))
+
+    builddir = Path(cache_dir) / f'{dut.design.name}-{dut.tool}-{key[:16]}'
+    builddir.mkdir(parents=True, exist_ok=True)
+    dut.option.set_builddir(str(builddir))
+
+    # Serialize builds of the same key across processes, the first one
+    # compiles and the rest pick up the existing simulator.
+    with open(builddir / '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            return dut.build(fast=True)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
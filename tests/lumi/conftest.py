@@ -2,8 +2,10 @@ import pytest
 from switchboard import SbDut
 from umi.lumi import LUMI
 from umi.sumi import MemAgent
+from umi.common import get_design
 from siliconcompiler import Design
 from switchboard.verilog.sim.switchboard_sim import SwitchboardSim
+from build_cache import build
 
 
 def pytest_collection_modifyitems(items):
@@ -23,19 +25,21 @@ def lumi_dut(build_dir, request):
 
     class TB(Design):
 
-        def __init__(self):
+        def __init__(self, params: dict = None):
             top_module = "testbench"
             super().__init__("TB")
             self.set_dataroot('localroot', __file__)
 
             deps = [
-                LUMI(),
-                MemAgent()
+                get_design(LUMI),
+                get_design(MemAgent)
             ]
 
             with self.active_fileset('rtl'):
                 self.set_topmodule(top_module)
                 self.add_file("../../umi/lumi/testbench/testbench_lumi.sv")
+                for name, value in (params or {}).items():
+                    self.set_param(name, str(value))
                 for item in deps:
                     self.add_depfileset(item)
 
@@ -50,15 +54,16 @@ def lumi_dut(build_dir, request):
                 self.add_depfileset(SwitchboardSim())
 
     dut = SbDut(
-        design=TB(),
+        # testbench parameters, from indirect parametrization
+        design=TB(params=getattr(request, 'param', None)),
         fileset="verilator",
         tool="verilator",
         default_main=True,
         trace=False
     )
 
-    # Build simulator
-    dut.build()
+    # Build simulator, reusing a cached build if nothing changed
+    build(dut, build_dir)
 
     yield dut
 
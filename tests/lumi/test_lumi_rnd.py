@@ -7,9 +7,57 @@
 import time
 import numpy as np
 from switchboard import UmiTxRx
+from tb_stats import read_stats
 import pytest
 
 
+# lumi counters, summed over both sides of the link
+COUNTERS = {
+    'link': (0x40,),          # bytes sent for umi packets
+    'payload': (0x44,),       # umi data payload bytes
+    'stall': (0x30, 0x34),    # req/resp credit stall cycles
+    'crdt': (0x48,)           # credit update messages
+}
+
+
+def lane_bases(nlane=1):
+    '''
+    Returns the register base address of every lane on both sides of the
+    link, lane i of the host is group 0x70+i and of the device 0x60+i.
+    '''
+    return [base + (lane << 24) for base in (0x70000000, 0x60000000) for lane in range(nlane)]
+
+
+def read_counters(sb, nlane=1):
+    '''
+    Returns the COUNTERS values summed over all lanes on both sides of the
+    link.
+    '''
+    return {name: sum(int(sb.read(base + offset, np.uint32))
+                      for base in lane_bases(nlane) for offset in offsets)
+            for name, offsets in COUNTERS.items()}
+
+
+def run_traffic(sb, host, traffic, posted=False):
+    '''
+    Writes and reads back each (dst_addr, src_addr, data) entry and returns
+    how much the COUNTERS advanced while doing so.
+    '''
+    start = read_counters(sb)
+    for dst_addr, src_addr, data8 in traffic:
+        print(f"umi writing {len(data8)} bytes to addr 0x{dst_addr:08x}")
+        host.write(dst_addr, data8, srcaddr=src_addr, posted=posted)
+        print(f"umi read from addr 0x{dst_addr:08x}")
+        val8 = host.read(dst_addr, len(data8), np.uint8, srcaddr=src_addr)
+        if ~((val8 == data8).all()):
+            print(f"ERROR umi read from addr 0x{dst_addr:08x}")
+            print(f"Expected: {data8}")
+            print(f"Actual: {val8}")
+            assert (val8 == data8).all()
+    end = read_counters(sb)
+    return {name: (end[name] - start[name]) % 2**32 for name in COUNTERS}
+
+
 def test_lumi_rnd(lumi_dut, chip_topo, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
 
     np.random.seed(random_seed)
@@ -126,23 +174,52 @@ def test_lumi_rnd(lumi_dut, chip_topo, random_seed, sb_umi_valid_mode, sb_umi_re
     val32 = sb.read(0x60000010, np.uint32)
     print(f"Read: 0x{val32:08x}")
 
-    print("### UMI WRITE/READ ###")
-
-    for count in range(100):
+    # the same traffic is sent without and with header compression
+    traffic = []
+    for _ in range(100):
         # length should not cross the DW boundary - umi_mem_agent limitation
         length = np.random.randint(0, 511)
         dst_addr = 32*np.random.randint(2**(10-5))  # sb limitation - should align to bus width
         src_addr = 32*np.random.randint(2**(10-5))
         data8 = np.random.randint(0, 255, size=length, dtype=np.uint8)
-        print(f"umi writing {length+1} bytes to addr 0x{dst_addr:08x}")
-        host.write(dst_addr, data8, srcaddr=src_addr)
-        print(f"umi read from addr 0x{dst_addr:08x}")
-        val8 = host.read(dst_addr, length, np.uint8, srcaddr=src_addr)
-        if ~((val8 == data8).all()):
-            print(f"ERROR umi read from addr 0x{dst_addr:08x}")
-            print(f"Expected: {data8}")
-            print(f"Actual: {val8}")
-            assert (val8 == data8).all()
+        traffic.append((dst_addr, src_addr, data8))
+
+    print("### UMI WRITE/READ ###")
+    plain = run_traffic(sb, host, traffic)
+
+    print("### Enable header compression ###")
+    for base in (0x70000000, 0x60000000):
+        val32 = sb.read(base + 0x14, np.uint32)
+        sb.write(base + 0x14, np.uint32(val32 | 0x100), posted=True)
+    for base in (0x70000000, 0x60000000):
+        val32 = sb.read(base + 0x10, np.uint32)
+        sb.write(base + 0x10, np.uint32(val32 | 0x100), posted=True)
+
+    print("### UMI WRITE/READ with header compression ###")
+    comp = run_traffic(sb, host, traffic)
+
+    iow = 1 << int((sb.read(0x70000010, np.uint32) >> 16) & 0xFF)
+    for name, cnt in (('uncompressed', plain), ('compressed', comp)):
+        print(f"{topo} {name}: {cnt['link']} link bytes, {cnt['payload']} payload bytes, "
+              f"efficiency {cnt['payload']/cnt['link']:.3f}, "
+              f"{cnt['payload']*iow/cnt['link']:.2f} payload bytes/beat")
+
+    assert plain['payload'] == comp['payload']
+    assert comp['payload']/comp['link'] > plain['payload']/plain['link']
+
+    print("### Enable adaptive credit updates ###")
+    for base in (0x70000000, 0x60000000):
+        val32 = sb.read(base + 0x10, np.uint32)
+        sb.write(base + 0x10, np.uint32(val32 | 0x20), posted=True)
+
+    print("### UMI WRITE/READ with adaptive credit updates ###")
+    adapt = run_traffic(sb, host, traffic)
+
+    for name, cnt in (('periodic', comp), ('adaptive', adapt)):
+        print(f"{topo} {name} credits: {cnt['crdt']} credit messages, "
+              f"{cnt['stall']} credit stall cycles")
+
+    assert adapt['crdt'] < comp['crdt']
 
     print("### Read loc Tx req credit unavailable ###")
     val32 = sb.read(0x70000030, np.uint32)
@@ -179,5 +256,118 @@ def test_lumi_rnd(lumi_dut, chip_topo, random_seed, sb_umi_valid_mode, sb_umi_re
     print("### TEST PASS ###")
 
 
+@pytest.mark.parametrize('hostdly,devdly', [(0, 0), (0, 400), (400, 0), (400, 400)])
+def test_lumi_latency(lumi_dut, random_seed, hostdly, devdly):
+    '''
+    Average end-to-end latency of requests (posted writes and reads) and
+    read responses crossing the link, store and forward vs. cut-through
+    (RXMODE bit 9).
+    '''
+
+    np.random.seed(random_seed)
+
+    lumi_dut.simulate(
+        plusargs=[
+            ('valid_mode', 1),
+            ('ready_mode', 1),
+            ('hostdly', hostdly),
+            ('devdly', devdly),
+            ('stats', 'stats.txt')
+        ]
+    )
+
+    sb = UmiTxRx("sb2dut_0.q", "dut2sb_0.q", fresh=True)
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    # wait for both sides of the link to come up
+    for base in (0x70000000, 0x60000000):
+        while sb.read(base + 0x04, np.uint32) == 0:
+            pass
+
+    traffic = []
+    for _ in range(50):
+        dst_addr = 32*np.random.randint(2**(10-5))
+        data8 = np.random.randint(0, 255, size=32, dtype=np.uint8)
+        traffic.append((dst_addr, 0, data8))
+
+    latency = {}
+    for mode in ('store and forward', 'cut-through'):
+        if mode == 'cut-through':
+            for base in (0x70000000, 0x60000000):
+                val32 = sb.read(base + 0x14, np.uint32)
+                sb.write(base + 0x14, np.uint32(val32 | 0x200), posted=True)
+
+        start = read_stats('stats.txt', fresh=True)
+        run_traffic(sb, host, traffic, posted=True)
+        end = read_stats('stats.txt', fresh=True)
+
+        _, req, req_first, req_last, resp, resp_first, resp_last, _, _ = \
+            [e - s for s, e in zip(start, end)]
+        latency[mode] = (req_first/req, req_last/req, resp_first/resp, resp_last/resp)
+        print(f"hostdly={hostdly} devdly={devdly} {mode}: "
+              f"request first/last beat {latency[mode][0]:.1f}/{latency[mode][1]:.1f} cycles, "
+              f"read response first/last beat {latency[mode][2]:.1f}/{latency[mode][3]:.1f} cycles")
+
+    assert latency['cut-through'][0] < latency['store and forward'][0]
+    assert latency['cut-through'][2] < latency['store and forward'][2]
+
+
+@pytest.mark.parametrize('lumi_dut', [{'NLANE': 1}, {'NLANE': 2}, {'NLANE': 4}],
+                         ids=['x1', 'x2', 'x4'], indirect=True)
+def test_lumi_bond_bandwidth(lumi_dut, random_seed):
+    '''
+    Write bandwidth of NLANE bonded lumi lanes, each running at one byte
+    per cycle, should scale with the number of lanes.
+    '''
+
+    np.random.seed(random_seed)
+
+    nlane = int(lumi_dut.design.get_param('NLANE', fileset='rtl'))
+    n = 200
+
+    lumi_dut.simulate(
+        plusargs=[
+            ('valid_mode', 1),
+            ('ready_mode', 1),
+            ('hostdly', 0),
+            ('devdly', 0),
+            ('stats', 'stats.txt')
+        ]
+    )
+
+    sb = UmiTxRx("sb2dut_0.q", "dut2sb_0.q", fresh=True)
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    # wait for every lane on both sides of the link to come up
+    for base in lane_bases(nlane):
+        while sb.read(base + 0x04, np.uint32) == 0:
+            pass
+
+    mem = {}
+    start = read_stats('stats.txt', fresh=True)
+    counters = read_counters(sb, nlane)
+    for _ in range(n):
+        addr = 32*np.random.randint(2**(10-5))
+        mem[addr] = np.random.randint(0, 255, size=32, dtype=np.uint8)
+        host.write(addr, mem[addr], posted=True)
+    end = read_stats('stats.txt', 1, start[1] + n, fresh=True)
+    counters = {name: (value - counters[name]) % 2**32
+                for name, value in read_counters(sb, nlane).items()}
+
+    for addr, data8 in mem.items():
+        assert (host.read(addr, 32, np.uint8) == data8).all()
+
+    nbytes = end[7] - start[7]
+    cycles = end[8] - start[8]
+    rate = nbytes / cycles
+
+    # every lane moves one link byte per cycle
+    peak = nlane * counters['payload'] / counters['link']
+    print(f"NLANE={nlane}: {rate:.2f} payload bytes/cycle, link peak {peak:.2f}")
+
+    assert nbytes == 32 * n
+    assert rate >= 0.7 * peak
+
+
 if __name__ == '__main__':
     pytest.main(['-s', '-q', __file__])
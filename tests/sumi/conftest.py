@@ -2,15 +2,18 @@ import pytest
 from switchboard import SbDut, UmiTxRx, random_umi_packet
 from pathlib import Path
 from umi import sumi
+from umi.common import get_design
 import numpy as np
 from siliconcompiler import Design
 from switchboard.verilog.sim.switchboard_sim import SwitchboardSim
+from build_cache import build
 from lambdalib.auxlib import Isolo
 
 
 def pytest_collection_modifyitems(items):
     for item in items:
-        if "sumi_dut" in getattr(item, "fixturenames", ()):
+        fixtures = getattr(item, "fixturenames", ())
+        if ("sumi_dut" in fixtures) or ("sumi_duts" in fixtures):
             item.add_marker("switchboard")
             pass
 
@@ -20,35 +23,42 @@ def build_dir(pytestconfig):
     return pytestconfig.cache.mkdir('sumi_build')
 
 
-@pytest.fixture
-def sumi_dut(build_dir, request):
+def sumi_testbench(build_dir, request, params=None):
+    '''
+    Builds the switchboard simulator of the testbench named after the
+    test file with the given testbench parameters.
+    '''
 
     class TB(Design):
 
         def __init__(
             self,
             testbench_path: str,
-            top_module: str = "testbench"
+            top_module: str = "testbench",
+            params: dict = None
         ):
             super().__init__("TB")
             self.set_dataroot('localroot', __file__)
 
             deps = [
-                Isolo(),
-                sumi.Crossbar(),
-                sumi.Demux(),
-                sumi.FifoFlex(),
-                sumi.MemAgent(),
-                sumi.Fifo(),
-                sumi.Isolate(),
-                sumi.Mux(),
-                sumi.Regif(),
-                sumi.RAM()
+                get_design(Isolo),
+                get_design(sumi.Crossbar),
+                get_design(sumi.Demux),
+                get_design(sumi.FifoFlex),
+                get_design(sumi.MemAgent),
+                get_design(sumi.Fifo),
+                get_design(sumi.Isolate),
+                get_design(sumi.Mux),
+                get_design(sumi.PerfMon),
+                get_design(sumi.Regif),
+                get_design(sumi.RAM)
             ]
 
             with self.active_fileset('rtl'):
                 self.set_topmodule(top_module)
                 self.add_file(testbench_path)
+                for name, value in (params or {}).items():
+                    self.set_param(name, str(value))
                 for item in deps:
                     self.add_depfileset(item)
 
@@ -76,21 +86,48 @@ def sumi_dut(build_dir, request):
         fileset="verilator",
         tool="verilator",
         design=TB(
-            testbench_path=testbench_path
+            testbench_path=testbench_path,
+            params=params
         ),
         cmdline=True,
         extra_args=extra_args,
         default_main=True
     )
 
-    # Build simulator
-    dut.build()
+    # Build simulator, reusing a cached build if nothing changed
+    build(dut, build_dir)
+
+    return dut
+
+
+@pytest.fixture
+def sumi_dut(build_dir, request):
+    # testbench parameters, from indirect parametrization
+    dut = sumi_testbench(build_dir, request, getattr(request, 'param', None))
 
     yield dut
 
     dut.terminate()
 
 
+@pytest.fixture
+def sumi_duts(build_dir, request):
+    '''
+    Returns a function building the testbench for a given parameter set,
+    for tests comparing several configurations within one run.
+    '''
+    duts = []
+
+    def setup(params):
+        duts.append(sumi_testbench(build_dir, request, params))
+        return duts[-1]
+
+    yield setup
+
+    for dut in duts:
+        dut.terminate()
+
+
 @pytest.fixture
 def umi_send(random_seed):
 
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 Zero ASIC
+# This code is licensed under Apache License 2.0 (see LICENSE for details)
+
+import pytest
+import numpy as np
+from switchboard import UmiTxRx
+from tb_stats import read_stats
+
+
+# testbench parameters, with and without the response register
+ENDPOINTS = [{'REG': 0}, {'REG': 1}]
+ENDPOINT_IDS = ['noreg', 'reg']
+
+DW = 64  # Must match testbench
+DEPTH = 1024
+
+
+@pytest.mark.parametrize('sumi_dut', ENDPOINTS, ids=ENDPOINT_IDS, indirect=True)
+def test_endpoint(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
+
+    np.random.seed(random_seed)
+
+    sumi_dut.simulate(plusargs=[('valid_mode', sb_umi_valid_mode), ('ready_mode', sb_umi_ready_mode)])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    print("### Starting test ###")
+
+    mem = np.random.randint(0, 256, size=DEPTH, dtype=np.uint8)
+    host.write(0, mem, max_bytes=DW//8)
+
+    for count in range(200):
+        # reads of up to 256 bytes in a single request, answered as a burst
+        length = np.random.randint(1, 257)
+        addr = np.random.randint(0, DEPTH - length)
+        print(f"[{count}] umi read {length} bytes from addr 0x{addr:08x}")
+        val = host.read(addr, length, np.uint8, max_bytes=256)
+        assert np.array_equal(val, mem[addr:addr+length])
+
+        # single beat writes still work in between
+        addr = np.random.randint(0, DEPTH - DW//8)
+        data = np.random.randint(0, 256, size=np.random.randint(1, DW//8 + 1), dtype=np.uint8)
+        host.write(addr, data, max_bytes=DW//8)
+        mem[addr:addr+len(data)] = data
+
+
+@pytest.mark.parametrize('length', [64, 256])
+def test_endpoint_burst_rate(sumi_dut, length):
+    '''
+    Bytes per cycle achieved while streaming read bursts back, the
+    endpoint should return a full DW beat every cycle.
+    '''
+    n = 50
+
+    sumi_dut.simulate(plusargs=[('valid_mode', 1), ('ready_mode', 1), ('stats', 'stats.txt')])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    for _ in range(n):
+        addr = (DW//8) * np.random.randint(0, (DEPTH - length) // (DW//8))
+        host.read(addr, length, np.uint8, max_bytes=length)
+
+    _, bursts, nbytes, cycles = read_stats('stats.txt', 1, n)
+    rate = nbytes / cycles
+    print(f"{length} byte bursts: {rate:.2f} bytes/cycle ({DW//8} bytes/cycle peak)")
+    assert nbytes == n * length
+    assert rate >= 0.9 * DW // 8
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', '-q', __file__])
@@ -7,6 +7,7 @@ import pytest
 import random
 import numpy as np
 from switchboard import UmiTxRx
+from tb_stats import read_stats
 
 
 def test_fifo_flex(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
@@ -42,5 +43,70 @@ def test_fifo_flex(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
             assert (val8 == data8).all()
 
 
+def test_fifo_flex_wide_words(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
+    '''
+    64 bit words are wider than the 32 bit memory side, fifoflex sends
+    every word as two 32 bit words (SIZE=2). The responses to split
+    non-posted requests come back with SIZE=2, which the switchboard host
+    does not accept for a 64 bit request, so the words are written posted
+    and read back as 32 bit words.
+    '''
+    random.seed(random_seed)
+    np.random.seed(random_seed)
+
+    sumi_dut.simulate(plusargs=[('valid_mode', sb_umi_valid_mode), ('ready_mode', sb_umi_ready_mode)])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    for count in range(200):
+        length = np.random.randint(1, 32)
+        dst_addr = 16*random.randrange((1024 - 8*length) // 16)
+        data64 = np.random.randint(0, 2**63, size=length, dtype=np.uint64)
+        print(f"[{count}] umi writing {length} 64 bit words to addr 0x{dst_addr:08x}")
+        host.write(dst_addr, data64, max_bytes=16, posted=True)
+        val32 = host.read(dst_addr, 2*length, np.uint32, max_bytes=16)
+        assert (val32 == data64.view(np.uint32)).all()
+
+
+def test_fifo_flex_efficiency(sumi_dut, random_seed):
+    '''
+    Read responses come back from the 32 bit memory as 4 byte pieces and
+    are merged back into 128 bit beats. Checks the share of response bus
+    bytes carrying payload for reads of random size and response address
+    alignment, which is at most 25% if the pieces are not merged.
+    '''
+    random.seed(random_seed)
+    np.random.seed(random_seed)
+
+    sumi_dut.simulate(plusargs=[('valid_mode', 1), ('ready_mode', 1), ('stats', 'stats.txt')])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    mem = np.random.randint(0, 255, size=1024, dtype=np.uint8)
+    host.write(0, mem, max_bytes=16)
+
+    total = 0
+    requests = 0
+    for count in range(500):
+        length = np.random.randint(1, 255)
+        dst_addr = 16*random.randrange((1024 - length) // 16)
+        src_addr = random.randrange(2**10)
+        val8 = host.read(dst_addr, length, np.uint8, srcaddr=src_addr, max_bytes=16)
+        assert (val8 == mem[dst_addr:dst_addr+length]).all()
+        total += length
+        requests += (length + 15) // 16
+
+    cycles, beats, nbytes = read_stats('stats.txt', 2, total)
+    efficiency = nbytes / (beats * 16)
+    print(f"{nbytes} bytes in {beats} response beats ({requests} read requests), "
+          f"{efficiency:.1%} of the 128 bit bus")
+    assert nbytes == total
+
+    # every read request of up to 16 bytes fits a single response beat,
+    # allow for responses broken up by gaps between the 4 byte pieces
+    assert beats <= 2 * requests
+    assert efficiency >= 0.5
+
+
 if __name__ == '__main__':
     pytest.main(['-s', '-q', __file__])
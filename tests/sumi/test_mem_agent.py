@@ -8,6 +8,12 @@ import numpy as np
 from switchboard import UmiTxRx
 
 
+# testbench parameters, single array and interleaved banks
+MEMAGENTS = [{'BANKS': 1}, {'BANKS': 4}]
+MEMAGENT_IDS = ['single', 'banked']
+
+
+@pytest.mark.parametrize('sumi_dut', MEMAGENTS, ids=MEMAGENT_IDS, indirect=True)
 def test_mem_agent(sumi_dut, apply_atomic, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
 
     np.random.seed(random_seed)
@@ -28,7 +34,7 @@ def test_mem_agent(sumi_dut, apply_atomic, random_seed, sb_umi_valid_mode, sb_um
     # un-aligned accesses
     for _ in range(100):
         addr = np.random.randint(0, 512)
-        # length should not cross the DW boundary - umi_mem_agent limitation
+        # requests crossing the DW boundary are split by umi_memagent
         length = np.random.randint(0, 256)
         wordindexer = np.random.choice([0, 1, 2])
         maxrange = 2**(8*(2**wordindexer))
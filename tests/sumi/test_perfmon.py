@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2026 Zero ASIC
+# This code is licensed under Apache License 2.0 (see LICENSE for details)
+
+import pytest
+import numpy as np
+from switchboard import UmiTxRx
+
+# umi_perfmon_regmap.vh
+UMI_PERF_CTRL = 0x00
+UMI_PERF_CYCLES = 0x04
+UMI_PERF_REQBEATS = 0x10
+UMI_PERF_REQBYTES = 0x14
+UMI_PERF_RESPBEATS = 0x20
+UMI_PERF_RESPBYTES = 0x24
+UMI_PERF_RDLATCNT = 0x40
+UMI_PERF_RDLATMIN = 0x44
+UMI_PERF_RDLATMAX = 0x48
+UMI_PERF_RDLATSUM = 0x4C
+UMI_PERF_WRLATCNT = 0x50
+UMI_PERF_ATLATCNT = 0x60
+
+
+def test_perfmon(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
+
+    np.random.seed(random_seed)
+
+    # launch the simulation
+    sumi_dut.simulate(plusargs=[('valid_mode', sb_umi_valid_mode),
+                                ('ready_mode', sb_umi_ready_mode)])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+    perf = UmiTxRx("host2dut_1.q", "dut2host_1.q", fresh=True)
+
+    print("### Starting test ###")
+
+    # clear and enable
+    perf.write(UMI_PERF_CTRL, np.uint32(0x3))
+    assert perf.read(UMI_PERF_CTRL, np.uint32) == 0x1
+    assert perf.read(UMI_PERF_REQBEATS, np.uint32) == 0
+
+    # single beat transactions, one outstanding at a time so every
+    # request is timed
+    n = 20
+    for _ in range(n):
+        addr = np.random.randint(0, 128) * 4
+        data = np.random.randint(2**32, dtype=np.uint32)
+        host.write(addr, data)
+        assert host.read(addr, np.uint32) == data
+        host.atomic(addr, np.uint32(1), 0)
+
+    assert perf.read(UMI_PERF_REQBEATS, np.uint32) == 3 * n
+    assert perf.read(UMI_PERF_RESPBEATS, np.uint32) == 3 * n
+    # write and atomic requests, read and atomic responses carry 4 bytes
+    assert perf.read(UMI_PERF_REQBYTES, np.uint32) == 8 * n
+    assert perf.read(UMI_PERF_RESPBYTES, np.uint32) == 8 * n
+
+    assert perf.read(UMI_PERF_RDLATCNT, np.uint32) == n
+    assert perf.read(UMI_PERF_WRLATCNT, np.uint32) == n
+    assert perf.read(UMI_PERF_ATLATCNT, np.uint32) == n
+
+    rdmin = perf.read(UMI_PERF_RDLATMIN, np.uint32)
+    rdmax = perf.read(UMI_PERF_RDLATMAX, np.uint32)
+    rdsum = perf.read(UMI_PERF_RDLATSUM, np.uint32)
+    print(f"read latency min={rdmin} max={rdmax} mean={rdsum / n:.1f}")
+    assert 0 < rdmin <= rdmax
+    assert n * rdmin <= rdsum <= n * rdmax
+
+    # disabled counters hold their value
+    perf.write(UMI_PERF_CTRL, np.uint32(0x0))
+    cycles = perf.read(UMI_PERF_CYCLES, np.uint32)
+    host.write(0, np.uint32(0))
+    assert perf.read(UMI_PERF_CYCLES, np.uint32) == cycles
+    assert perf.read(UMI_PERF_REQBEATS, np.uint32) == 3 * n
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', '-q', __file__])
@@ -5,9 +5,19 @@
 
 import pytest
 import numpy as np
-from switchboard import UmiTxRx
+from switchboard import UmiTxRx, PyUmiPacket, UmiCmd, umi_pack
+from tb_stats import read_stats
 
 
+# testbench parameters, one per register interface mode
+REGIFS = [{'SAFE': 0}, {'SAFE': 1}, {'SAFE': 2}]
+REGIF_IDS = ['comb', 'safe', 'pipelined']
+
+DW = 256  # Must match testbench
+REGS = 512
+
+
+@pytest.mark.parametrize('sumi_dut', REGIFS, ids=REGIF_IDS, indirect=True)
 def test_regif(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
 
     np.random.seed(random_seed)
@@ -27,7 +37,6 @@ def test_regif(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
     # regif accesses are all 32b wide and aligned
     for _ in range(10):
         addr = np.random.randint(0, 16) * 4
-        # length should not cross the DW boundary - umi_mem_agent limitation
         data = np.random.randint(2**32, dtype=np.uint32)
 
         print(f"umi writing 0x{data:08x} to addr 0x{addr:08x}")
@@ -38,6 +47,100 @@ def test_regif(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
             print(f"ERROR umi read from addr 0x{addr:08x} expected {data} actual {val}")
             assert (val == data)
 
+    # bursts over consecutive registers, writes are limited to DW per request
+    regs = np.random.randint(2**32, size=REGS, dtype=np.uint32)
+    host.write(0, regs, max_bytes=DW//8)
+
+    for _ in range(20):
+        count = np.random.randint(1, 257)
+        addr = np.random.randint(0, REGS - count + 1)
+        print(f"umi read {count} registers from addr 0x{addr*4:08x}")
+        val = host.read(addr * 4, count, np.uint32, max_bytes=1024)
+        assert np.array_equal(val, regs[addr:addr+count])
+
+        count = np.random.randint(1, DW//32 + 1)
+        addr = np.random.randint(0, REGS - count + 1)
+        data = np.random.randint(2**32, size=count, dtype=np.uint32)
+        host.write(addr * 4, data, max_bytes=DW//8)
+        regs[addr:addr+count] = data
+
+
+def test_regif_subword(sumi_dut, random_seed):
+    '''
+    Only register sized words (SIZE=2) walk the register file, a request
+    of smaller words with LEN>0 accesses the single register at DSTADDR.
+    Write bursts longer than DW are refused with DEVERR.
+    '''
+    np.random.seed(random_seed)
+
+    sumi_dut.simulate(plusargs=[('valid_mode', 1), ('ready_mode', 1)])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    regs = np.random.randint(2**32, size=REGS, dtype=np.uint32)
+    host.write(0, regs, max_bytes=DW//8)
+
+    for _ in range(20):
+        addr = np.random.randint(0, REGS - 4)
+
+        # SIZE=0, LEN=3 reads the one register
+        val = host.read(addr * 4, 4, np.uint8)
+        assert np.array_equal(val, regs[addr:addr+1].view(np.uint8))
+
+        # SIZE=0, LEN=3 writes the one register, its neighbors are unchanged
+        data = np.random.randint(0, 256, size=4, dtype=np.uint8)
+        host.write(addr * 4, data)
+        regs[addr] = data.view(np.uint32)[0]
+        val = host.read(addr * 4, 4, np.uint32)
+        assert np.array_equal(val, regs[addr:addr+4])
+
+    # one register more than fits the data beat
+    cmd = umi_pack(opcode=UmiCmd.UMI_REQ_WRITE, size=2, len=DW//32, eom=1)
+    data = np.random.randint(0, 256, size=DW//8, dtype=np.uint8)
+    host.send(PyUmiPacket(cmd=cmd, dstaddr=0, srcaddr=0, data=data))
+    resp = host.recv()
+    assert (resp.cmd & 0x1f) == int(UmiCmd.UMI_RESP_WRITE)
+    assert (resp.cmd >> 25) & 0x3 == 0b10  # DEVERR
+    assert (resp.cmd >> 8) & 0xff == DW//32
+    val = host.read(0, DW//32 + 1, np.uint32)
+    assert np.array_equal(val, regs[:DW//32 + 1])
+
+
+def regif_rate(dut):
+    '''
+    Returns the register accesses per cycle while dumping the register
+    file with burst reads.
+    '''
+    safe = dut.design.get_param('SAFE', fileset='rtl')
+
+    dut.simulate(plusargs=[('valid_mode', 1), ('ready_mode', 1),
+                           ('stats', f'stats_safe{safe}.txt')])
+
+    host = UmiTxRx("host2dut_0.q", "dut2host_0.q", fresh=True)
+
+    host.read(0, REGS, np.uint32, max_bytes=1024)
+
+    _, accesses, first, last = read_stats(f'stats_safe{safe}.txt', 1, REGS)
+    dut.terminate()
+
+    rate = accesses / (last - first + 1)
+    print(f"SAFE={safe}: {rate:.2f} register accesses/cycle")
+    assert accesses == REGS
+    return rate
+
+
+def test_regif_benchmark(sumi_duts):
+    '''
+    Register accesses per cycle of every register interface mode, SAFE=1
+    only accepts a request every other cycle, SAFE=0 and SAFE=2 must
+    sustain one access per cycle.
+    '''
+    comb, safe, pipelined = [regif_rate(sumi_duts(params)) for params in REGIFS]
+
+    for rate in (comb, pipelined):
+        assert rate >= 0.9
+        assert rate > safe
+
 
 if __name__ == '__main__':
     pytest.main(['-s', '-q', __file__])
@@ -4,10 +4,19 @@
 # This code is licensed under Apache License 2.0 (see LICENSE for details)
 
 import pytest
+import multiprocessing
 import numpy as np
-from switchboard import UmiTxRx
+from switchboard import PyUmiPacket, UmiTxRx, delete_queue
+from tb_stats import read_stats
+from umi.sumi import messages
 
 
+# testbench parameters, single array and interleaved banks
+RAMS = [{'BANKS': 1}, {'BANKS': 4}]
+RAM_IDS = ['single', 'banked']
+
+
+@pytest.mark.parametrize('sumi_dut', RAMS, ids=RAM_IDS, indirect=True)
 def test_umi_ram(sumi_dut, apply_atomic, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
 
     ports = 5  # Number of input ports of umi_ram. Must match testbench
@@ -35,7 +44,7 @@ def test_umi_ram(sumi_dut, apply_atomic, random_seed, sb_umi_valid_mode, sb_umi_
         psel = np.random.choice([0, 1, 2, 3, 4])
         srcaddr = 1 << (40 + psel)
         addr = np.random.randint(0, 512)
-        # length should not cross the DW boundary - umi_mem_agent limitation
+        # requests crossing the DW boundary are split by umi_ram
         length = np.random.randint(0, 256)
         wordindexer = np.random.choice([0, 1, 2])
         maxrange = 2**(8*(2**wordindexer))
@@ -68,5 +77,115 @@ def test_umi_ram(sumi_dut, apply_atomic, random_seed, sb_umi_valid_mode, sb_umi_
             assert (np.array_equal(val, data))
 
 
+def port_traffic(port, n, seed):
+    '''
+    Writes and reads back random data in a region of memory owned by
+    port, so all ports can run at the same time.
+    '''
+    np.random.seed(seed + port)
+    host = UmiTxRx(f'host2dut_{port}.q', f'dut2host_{port}.q')
+    srcaddr = 1 << (40 + port)
+    base = 0x400 * port
+
+    for _ in range(n):
+        addr = base + np.random.randint(0, 0x300)
+        length = np.random.randint(1, 0x100)
+        data = np.random.randint(0, 256, size=length, dtype=np.uint8)
+        host.write(addr, data, srcaddr=srcaddr)
+        val = host.read(addr, length, dtype=np.uint8, srcaddr=srcaddr)
+        assert np.array_equal(val, data), f"port {port} read mismatch at 0x{addr:08x}"
+
+
+@pytest.mark.parametrize('sumi_dut', RAMS, ids=RAM_IDS, indirect=True)
+def test_umi_ram_concurrent(sumi_dut, random_seed, sb_umi_valid_mode, sb_umi_ready_mode):
+    '''
+    All ports access memory at once, with BANKS>1 ports hitting different
+    banks are served in the same cycle and a port moving between banks
+    must still see its responses in order.
+    '''
+    ports = 5  # Number of input ports of umi_ram. Must match testbench
+    n = 50
+
+    sumi_dut.simulate(
+            plusargs=[('valid_mode', sb_umi_valid_mode),
+                      ('ready_mode', sb_umi_ready_mode)])
+
+    # clear the queues before the ports start
+    [UmiTxRx(f'host2dut_{x}.q', f'dut2host_{x}.q', fresh=True) for x in range(ports)]
+
+    procs = [multiprocessing.Process(target=port_traffic, args=(x, n, random_seed))
+             for x in range(ports)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+    assert all(proc.exitcode == 0 for proc in procs)
+
+
+DW = 256  # Must match testbench
+
+
+def stream_reads(port, n, length=2048):
+    '''
+    Queues n reads of length bytes from the region of memory owned by
+    port without waiting for the responses, then drains them.
+    '''
+    host = UmiTxRx(f'host2dut_{port}.q', f'dut2host_{port}.q')
+    srcaddr = 1 << (40 + port)
+    base = length * port
+    cmd = int(messages.encode(opcode=messages.REQ_READ, size=3, len=length // 8 - 1, eom=1))
+
+    for _ in range(n):
+        host.send(PyUmiPacket(cmd=cmd, dstaddr=base, srcaddr=srcaddr))
+
+    nbytes = 0
+    while nbytes < n * length:
+        resp = host.recv()
+        nbytes += int(messages.nbytes(resp.cmd))
+
+
+def ram_throughput(dut, ports=5, n=20, length=2048):
+    '''
+    All ports stream sequential reads at once, returns the response beats
+    per cycle.
+    '''
+    for x in range(ports):
+        delete_queue(f'host2dut_{x}.q')
+        delete_queue(f'dut2host_{x}.q')
+
+    banks = dut.design.get_param('BANKS', fileset='rtl')
+    stats = f'stats_banks{banks}.txt'
+    dut.simulate(plusargs=[('valid_mode', 1), ('ready_mode', 1), ('stats', stats)])
+
+    procs = [multiprocessing.Process(target=stream_reads, args=(x, n, length))
+             for x in range(ports)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert all(proc.exitcode == 0 for proc in procs)
+
+    _, first, last, beats = read_stats(stats, 3, ports * n * length // (DW // 8))
+    dut.terminate()
+
+    throughput = beats / (last - first + 1)
+    print(f"BANKS={banks}: {throughput:.3f} response beats/cycle")
+    return throughput
+
+
+def test_umi_ram_throughput(sumi_duts):
+    '''
+    Sequential reads from all ports at once, split into DW beats that
+    walk across the banks. A single array returns at most one beat per
+    cycle, interleaved banks should serve several ports per cycle even
+    though every port moves to another bank on each beat.
+    '''
+    single = ram_throughput(sumi_duts({'BANKS': 1}))
+    banked = ram_throughput(sumi_duts({'BANKS': 4}))
+
+    assert banked >= 1.5 * single
+
+
 if __name__ == '__main__':
     pytest.main(['-s', '-q', __file__])
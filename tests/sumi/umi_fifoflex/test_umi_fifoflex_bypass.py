@@ -0,0 +1,140 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Timer
+
+from cocotb_bus.drivers import BitDriver
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+
+from cocotbext.umi.utils.generators import random_toggle_generator
+
+from umi.sumi import messages
+from umi.sumi.umi_fifoflex.umi_fifoflex import FifoFlex
+
+
+IDW = 32
+ODW = 128
+
+
+def flatten(cmd, dstaddr, data):
+    '''Returns the (address, byte) pairs written by one message.'''
+    nbytes = int(messages.nbytes(cmd))
+    return [(dstaddr + i, data[i]) for i in range(nbytes)]
+
+
+@cocotb.test(timeout_time=200, timeout_unit="us")
+async def merge_backpressure_test(dut):
+    '''
+    Streams of posted writes are merged from IDW into ODW beats without
+    an output FIFO (bypass or DEPTH=0), with umi_out_ready toggling at
+    random. A merge that completes a beat while umi_out_ready is low must
+    hold the input, every byte must come out once and in order.
+    '''
+    bypass = int(dut.DEPTH.value) != 0
+
+    dut.umi_in_valid.value = 0
+    dut.umi_out_ready.value = 0
+    dut.bypass.value = int(bypass)
+    dut.chaosmode.value = 0
+    dut.vdd.value = 1
+    dut.vss.value = 0
+    dut.umi_in_nreset.value = 0
+    dut.umi_out_nreset.value = 0
+
+    Clock(dut.umi_in_clk, 1, unit="ns").start()
+    Clock(dut.umi_out_clk, 1, unit="ns").start()
+    await ClockCycles(dut.umi_in_clk, 5)
+    dut.umi_in_nreset.value = 1
+    dut.umi_out_nreset.value = 1
+    await Timer(1, unit="ns")
+
+    driver = SumiDriver(entity=dut, name="umi_in", clock=dut.umi_in_clk)
+    monitor = SumiMonitor(entity=dut, name="umi_out", clock=dut.umi_in_clk)
+    BitDriver(signal=dut.umi_out_ready, clk=dut.umi_in_clk).start(
+        generator=random_toggle_generator())
+
+    received = []
+    monitor.add_callback(received.append)
+
+    # contiguous streams, so that most writes can be merged and many of
+    # them complete an ODW beat part way through the input word
+    expected = []
+    count = 500
+    dstaddr = 0x1000
+    srcaddr = 0x2000
+    for _ in range(count):
+        size = random.randint(0, 2)
+        length = random.randint(0, (IDW // 8 >> size) - 1)
+        if random.random() < 0.1:
+            dstaddr = random.randint(0, 2**20) << 4
+            srcaddr = random.randint(0, 2**20) << 4
+        align = (1 << size) - 1
+        srcaddr += ((dstaddr + align) & ~align) - dstaddr
+        dstaddr = (dstaddr + align) & ~align
+        cmd = int(messages.encode(opcode=messages.REQ_POSTED, size=size, len=length,
+                                  eom=int(random.random() < 0.05)))
+        data = random.randbytes((length + 1) << size)
+        expected.extend(flatten(cmd, dstaddr, data))
+        driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=dstaddr, sa=srcaddr,
+                                      data=data))
+        dstaddr += len(data)
+        srcaddr += len(data)
+
+    def received_bytes():
+        return sum(int(messages.nbytes(int(beat.cmd))) for beat in received)
+
+    while received_bytes() < len(expected):
+        await ClockCycles(dut.umi_in_clk, 10)
+    await ClockCycles(dut.umi_in_clk, 10)
+
+    actual = []
+    for beat in received:
+        actual.extend(flatten(int(beat.cmd), int(beat.da), bytes(beat.data)))
+
+    assert len(actual) == len(expected)
+    for i, (got, exp) in enumerate(zip(actual, expected)):
+        assert got == exp, f"byte {i}: got 0x{got[1]:02x} at 0x{got[0]:x}, " \
+            f"expected 0x{exp[1]:02x} at 0x{exp[0]:x}"
+
+    # the writes were merged
+    assert len(received) < count
+
+
+class TbDesign(Design):
+
+    def __init__(self, depth):
+        super().__init__()
+
+        self.set_name(f"tb_umi_fifoflex_bypass{depth}")
+
+        self.set_dataroot("tb_umi_fifoflex_bypass", __file__)
+
+        with self.active_dataroot("tb_umi_fifoflex_bypass"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi_fifoflex")
+                self.set_param("IDW", str(IDW))
+                self.set_param("ODW", str(ODW))
+                self.set_param("DEPTH", str(depth))
+                self.add_file(Path(__file__).name, filetype="python")
+                self.add_depfileset(FifoFlex(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("depth", [0, 4])
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi_fifoflex_bypass(simulator, depth):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(depth),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
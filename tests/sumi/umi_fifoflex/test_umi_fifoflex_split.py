@@ -0,0 +1,139 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Timer
+
+from cocotb_bus.drivers import BitDriver
+from cocotbext.umi.sumi import SumiCmd, SumiTransaction
+from cocotbext.umi.drivers.sumi_driver import SumiDriver
+from cocotbext.umi.monitors.sumi_monitor import SumiMonitor
+
+from cocotbext.umi.utils.generators import random_toggle_generator
+
+from umi.sumi import messages
+from umi.sumi.umi_fifoflex.umi_fifoflex import FifoFlex
+
+
+IDW = 128
+ODW = 32
+
+
+def random_message(opcodes):
+    '''
+    Returns a (cmd, dstaddr, srcaddr, data) message fitting IDW, including
+    words wider than ODW, with addresses aligned to SIZE.
+    '''
+    size = random.randint(0, (IDW // 8).bit_length() - 1)
+    length = random.randint(0, (IDW // 8 >> size) - 1)
+    cmd = int(messages.encode(opcode=random.choice(opcodes), size=size, len=length,
+                              eom=random.randint(0, 1), qos=random.randint(0, 15),
+                              hostid=random.randint(0, 31)))
+    dstaddr = random.randint(0, 2**20) << size
+    srcaddr = random.randint(0, 2**20) << size
+    return cmd, dstaddr, srcaddr, random.randbytes((length + 1) << size)
+
+
+@cocotb.test(timeout_time=200, timeout_unit="us")
+async def split_test(dut):
+    '''
+    Checks every output beat of IDW to ODW conversions against
+    messages.split, for reads, non-posted and posted writes and
+    responses. Words wider than ODW are split into ODW words, the data
+    of every message must come through in full.
+    '''
+    boundary = bool(int(dut.SPLIT.value))
+    opcodes = [messages.REQ_READ, messages.REQ_WRITE, messages.REQ_POSTED,
+               messages.RESP_READ, messages.RESP_WRITE]
+
+    dut.umi_in_valid.value = 0
+    dut.umi_out_ready.value = 0
+    dut.bypass.value = 0
+    dut.chaosmode.value = 0
+    dut.vdd.value = 1
+    dut.vss.value = 0
+    dut.umi_in_nreset.value = 0
+    dut.umi_out_nreset.value = 0
+
+    Clock(dut.umi_in_clk, 1, unit="ns").start()
+    Clock(dut.umi_out_clk, 1, unit="ns").start()
+    await ClockCycles(dut.umi_in_clk, 5)
+    dut.umi_in_nreset.value = 1
+    dut.umi_out_nreset.value = 1
+    await Timer(1, unit="ns")
+
+    driver = SumiDriver(entity=dut, name="umi_in", clock=dut.umi_in_clk,
+                        valid_generator=random_toggle_generator())
+    monitor = SumiMonitor(entity=dut, name="umi_out", clock=dut.umi_in_clk)
+    BitDriver(signal=dut.umi_out_ready, clk=dut.umi_in_clk).start(
+        generator=random_toggle_generator())
+
+    received = []
+    monitor.add_callback(received.append)
+
+    expected = []
+    sent = []
+    for _ in range(500):
+        cmd, dstaddr, srcaddr, data = random_message(opcodes)
+        pieces = messages.split(cmd, dstaddr, srcaddr, data, dw=ODW, boundary=boundary)
+        expected.extend(pieces)
+        sent.append((cmd, data, len(pieces)))
+        driver.append(SumiTransaction(cmd=SumiCmd.from_int(cmd), da=dstaddr, sa=srcaddr,
+                                      data=data))
+
+    while len(received) < len(expected):
+        await ClockCycles(dut.umi_in_clk, 10)
+    await ClockCycles(dut.umi_in_clk, 10)
+
+    assert len(received) == len(expected)
+    for i, ((cmd, dstaddr, srcaddr, data), beat) in enumerate(zip(expected, received)):
+        assert int(beat.cmd) == cmd, f"beat {i}: cmd 0x{int(beat.cmd):08x} != 0x{cmd:08x}"
+        assert int(beat.da) == dstaddr, f"beat {i}: dstaddr"
+        assert int(beat.sa) == srcaddr, f"beat {i}: srcaddr"
+        if beat.data is not None:
+            assert beat.data == data, f"beat {i}: data"
+
+    # the beats of every message carrying data add up to all of its data
+    beats = iter(received)
+    for i, (cmd, data, count) in enumerate(sent):
+        pieces = [next(beats) for _ in range(count)]
+        if int(messages.opcode(cmd)) in (messages.REQ_WRITE, messages.REQ_POSTED,
+                                         messages.RESP_READ):
+            assert b''.join(bytes(beat.data) for beat in pieces) == data, f"message {i}: data"
+
+
+class TbDesign(Design):
+
+    def __init__(self, split):
+        super().__init__()
+
+        self.set_name(f"tb_umi_fifoflex_split{split}")
+
+        self.set_dataroot("tb_umi_fifoflex_split", __file__)
+
+        with self.active_dataroot("tb_umi_fifoflex_split"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi_fifoflex")
+                self.set_param("IDW", str(IDW))
+                self.set_param("ODW", str(ODW))
+                self.set_param("SPLIT", str(split))
+                self.add_file(Path(__file__).name, filetype="python")
+                self.add_depfileset(FifoFlex(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("split", [0, 1])
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi_fifoflex_split(simulator, split):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(split),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from siliconcompiler import Design
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, RisingEdge
+
+from umi.sumi import messages
+from umi.sumi.umi_monitor.umi_monitor import Monitor
+from umi.sumi.umi_monitor.trace import UmiTrace
+
+
+DW = 128  # umi_monitor default
+
+
+def records():
+    '''
+    The handshakes driven by trace_test, as (cmd, dstaddr, srcaddr, data,
+    idle cycles after the handshake). Deterministic so the trace can be
+    checked after the simulation has exited.
+    '''
+    opcodes = [messages.REQ_WRITE, messages.REQ_READ, messages.RESP_READ,
+               messages.REQ_POSTED, messages.RESP_WRITE]
+    result = []
+    for i in range(40):
+        cmd = int(messages.encode(opcode=opcodes[i % len(opcodes)], size=i % 4, len=i % 8))
+        dstaddr = 0x1000_0000_0000 + 0x40 * i
+        srcaddr = 0x2000_0000_0000 + 0x8 * i
+        data = bytes((i + k) % 256 for k in range(DW // 8))
+        result.append((cmd, dstaddr, srcaddr, data, i % 3))
+    return result
+
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def trace_test(dut):
+    '''Drives records() through the monitor, with a stalled beat in between.'''
+
+    dut.valid.value = 0
+    dut.ready.value = 0
+    dut.nreset.value = 0
+
+    Clock(dut.clk, 1, unit="ns").start()
+    await ClockCycles(dut.clk, 5)
+    dut.nreset.value = 1
+    await ClockCycles(dut.clk, 2)
+
+    for i, (cmd, dstaddr, srcaddr, data, idle) in enumerate(records()):
+        dut.valid.value = 1
+        dut.ready.value = 1
+        dut.cmd.value = cmd
+        dut.dstaddr.value = dstaddr
+        dut.srcaddr.value = srcaddr
+        dut.data.value = int.from_bytes(data, 'little')
+        await RisingEdge(dut.clk)
+        dut.valid.value = 0
+        if idle:
+            # valid without ready is not a handshake and must not be traced
+            dut.valid.value = i % 2
+            dut.ready.value = 0
+            await ClockCycles(dut.clk, idle)
+            dut.valid.value = 0
+
+    await ClockCycles(dut.clk, 10)
+
+
+class TbDesign(Design):
+
+    def __init__(self):
+        super().__init__()
+
+        self.set_name("tb_umi_monitor_trace")
+
+        self.set_dataroot("tb_umi_monitor_trace", __file__)
+
+        with self.active_dataroot("tb_umi_monitor_trace"):
+            with self.active_fileset("testbench.cocotb"):
+                self.set_topmodule("umi_monitor")
+                self.set_param("TRACE", "1")
+                self.add_define("SIMULATION")
+                self.add_file(Path(__file__).name, filetype="python")
+                self.add_depfileset(Monitor(), "rtl")
+
+
+@pytest.mark.cocotb
+@pytest.mark.parametrize("simulator", ["icarus", "verilator"])
+def test_umi_monitor_trace(simulator):
+    from run_cocotb_sim import load_cocotb_test
+    load_cocotb_test(
+        design=TbDesign(),
+        simulator=simulator,
+        trace=False,
+        seed=None
+    )
+
+    # the trace is written to the simulation working directory
+    meta = list(Path('build').rglob('umi_trace.meta'))
+    assert len(meta) == 1
+    trace = UmiTrace(meta[0].with_suffix(''))
+
+    expected = records()
+    assert (trace.cw, trace.aw, trace.dw) == (32, 64, DW)
+    assert trace.name == 'umi'
+    assert len(trace) == len(expected)
+
+    cmd, dstaddr, srcaddr, data, idle = zip(*expected)
+    rows = trace[:]
+    assert list(rows['cmd']) == list(cmd)
+    assert list(rows['dstaddr']) == list(dstaddr)
+    assert list(rows['srcaddr']) == list(srcaddr)
+    assert [bytes(d) for d in rows['data']] == list(data)
+
+    # one cycle per handshake plus the idle cycles that follow it
+    assert list(np.diff(rows['time'].astype(np.int64))) == [1 + n for n in idle[:-1]]
+
+    rows = trace.select(opcode=messages.REQ_READ)
+    assert list(rows) == [i for i, c in enumerate(cmd) if messages.opcode(c) == messages.REQ_READ]
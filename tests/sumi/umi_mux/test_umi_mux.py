@@ -9,6 +9,7 @@ from umi.sumi.umi_mux.umi_mux import Mux
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles, Timer
+from cocotb.utils import get_sim_time
 
 from cocotb_bus.drivers import BitDriver
 from cocotbext.umi.sumi import SumiCmd, SumiCmdType, SumiTransaction
@@ -126,6 +127,116 @@ async def mux_general_test(
         assert expected == actual
 
 
+async def ctrl_tail_latency(dut, umi_drivers, received, ctrl_done, ctrl_sa, n_ctrl=50):
+    '''
+    Sends n_ctrl latency sensitive (QOS=15) single beat requests, one at a
+    time, on the last input while bulk (QOS=0) traffic keeps all other
+    inputs busy. Waits for all traffic to drain (the bulk traffic must not
+    be starved) and returns the p99 control request latency in cycles.
+    '''
+    data_size = int(dut.DW.value)//8
+    aw = int(dut.AW.value)
+
+    def transaction(qos, sa):
+        return SumiTransaction(
+            cmd=SumiCmd.from_fields(
+                cmd_type=int(SumiCmdType.UMI_REQ_WRITE),
+                size=0,
+                len=data_size-1,
+                qos=qos
+            ),
+            addr_width=aw,
+            da=random.randint(0, (1 << aw) - 1),
+            sa=sa,
+            data=random.randbytes(data_size)
+        )
+
+    received.clear()
+    ctrl_done.clear()
+
+    # Bulk traffic keeps every other input busy for the whole test
+    n_bulk = 0
+    for umi_driver in umi_drivers[:-1]:
+        for _ in range(20 * n_ctrl):
+            umi_driver.append(transaction(qos=0, sa=random.randint(0, ctrl_sa - 1)))
+            n_bulk += 1
+
+    # One control request at a time
+    latency = []
+    for _ in range(n_ctrl):
+        await ClockCycles(dut.clk, random.randint(1, 10))
+        start = get_sim_time(unit="ns")
+        umi_drivers[-1].append(transaction(qos=15, sa=ctrl_sa))
+        while len(ctrl_done) <= len(latency):
+            await ClockCycles(dut.clk, 1)
+        latency.append(ctrl_done[-1] - start)
+
+    # Bulk traffic must still drain completely
+    while len(received) != n_bulk + n_ctrl:
+        await ClockCycles(dut.clk, 10)
+
+    latency.sort()
+    dut._log.info(f"arbmode={int(dut.arbmode.value)} control latency (cycles): "
+                  f"min={latency[0]} p99={latency[int(0.99 * (len(latency) - 1))]} "
+                  f"max={latency[-1]}")
+    return latency[int(0.99 * (len(latency) - 1))]
+
+
+@cocotb.test(timeout_time=100, timeout_unit="us")
+async def mux_qos_test(dut):
+    '''
+    Compares the tail latency of latency sensitive control requests
+    competing with bulk traffic under round robin (2) and QoS (3)
+    arbitration, QoS arbitration must lower it.
+    '''
+
+    umi_inputs = int(dut.umi_mux_i.N.value)
+    aw = int(dut.AW.value)
+
+    dut.clk.value = 0
+    dut.nreset.value = 0
+
+    dut.arbmode.value = 2
+    dut.arbmask.value = 0
+    dut.umi_out_ready.value = 1
+
+    umi_drivers = [
+        SumiDriver(entity=dut, name=f"umi_in{i}", clock=dut.clk)
+        for i in range(umi_inputs)
+    ]
+    umi_monitor = SumiMonitor(entity=dut, name="umi_out", clock=dut.clk)
+
+    # Reset sequence (active-low reset)
+    dut.nreset.value = 1
+    await Timer(1, unit="step")
+    dut.nreset.value = 0
+    await Timer(10, unit="ns")
+    dut.nreset.value = 1
+    await Timer(10, unit="ns")
+
+    Clock(dut.clk, 1, unit="ns").start()
+
+    ctrl_sa = (1 << aw) - 1
+    ctrl_done = []
+    received = []
+
+    def on_receive(trans):
+        received.append(trans)
+        if int(trans.sa) == ctrl_sa:
+            ctrl_done.append(get_sim_time(unit="ns"))
+
+    umi_monitor.add_callback(on_receive)
+
+    # Both arbitration modes on the same traffic pattern, one after the other
+    tail = {}
+    for arbmode in (2, 3):
+        dut.arbmode.value = arbmode
+        await ClockCycles(dut.clk, 1)
+        tail[arbmode] = await ctrl_tail_latency(dut, umi_drivers, received, ctrl_done, ctrl_sa)
+
+    assert tail[3] < tail[2]
+
+
 class TbDesign(Design):
 
     def __init__(self):
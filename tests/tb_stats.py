@@ -0,0 +1,26 @@
+import time
+from pathlib import Path
+
+
+def read_stats(path, field=0, count=0, fresh=False, timeout=60):
+    '''
+    Waits for the statistics a testbench writes to +stats=<path> (see
+    umi/sumi/include/umi_stats.vh) to report at least count in column
+    field and returns the last line as a list of integers, cycles first.
+
+    With fresh set, only a line written after the call is accepted, so
+    that counters can be sampled before and after a stretch of traffic.
+    '''
+    path = Path(path)
+    last = None
+    start = time.time()
+    while time.time() - start < timeout:
+        lines = path.read_text().splitlines() if path.exists() else []
+        if lines:
+            stats = [int(v) for v in lines[-1].split()]
+            if fresh and last is None:
+                last = stats[0]
+            elif (not fresh or stats[0] > last) and stats[field] >= count:
+                return stats
+        time.sleep(0.1)
+    raise TimeoutError(f'{path} did not report {count} in column {field}')
@@ -0,0 +1,31 @@
+from siliconcompiler import Design
+
+from build_cache import build_key
+
+
+class TB(Design):
+    def __init__(self, path, define=None):
+        super().__init__("TB")
+        self.set_dataroot('localroot', path)
+        with self.active_fileset('rtl'):
+            self.set_topmodule('testbench')
+            self.add_file('testbench.sv')
+            if define:
+                self.add_define(define)
+
+
+def test_build_key(tmp_path):
+    src = tmp_path / 'testbench.sv'
+    src.write_text('module testbench();\nendmodule\n')
+
+    key = build_key(TB(tmp_path), 'rtl', 'verilator', trace=False)
+
+    # Same inputs, same key
+    assert key == build_key(TB(tmp_path), 'rtl', 'verilator', trace=False)
+
+    # Build options, defines and file contents are all part of the key
+    assert key != build_key(TB(tmp_path), 'rtl', 'verilator', trace=True)
+    assert key != build_key(TB(tmp_path, define='SIMULATION'), 'rtl', 'verilator', trace=False)
+
+    src.write_text('module testbench();\nwire a;\nendmodule\n')
+    assert key != build_key(TB(tmp_path), 'rtl', 'verilator', trace=False)
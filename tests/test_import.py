@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+def _import_profile(stmt):
+    '''
+    Runs stmt in a fresh interpreter and returns the time it took in us
+    and the set of modules it loaded.
+    '''
+    script = (
+        "import json, sys, time\n"
+        "before = set(sys.modules)\n"
+        "start = time.perf_counter()\n"
+        f"{stmt}\n"
+        "elapsed = int(1e6 * (time.perf_counter() - start))\n"
+        "print(json.dumps([elapsed, sorted(set(sys.modules) - before)]))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", script],
+                          capture_output=True, text=True, check=True)
+
+    elapsed, modules = json.loads(proc.stdout)
+    return elapsed, set(modules)
+
+
+def test_import_umi_is_lazy():
+    elapsed, modules = _import_profile("import umi")
+
+    print(f"import umi: {elapsed} us")
+
+    for heavy in ("siliconcompiler", "lambdalib", "umi.common",
+                  "umi.sumi", "umi.lumi", "umi.adapters"):
+        assert heavy not in modules
+
+
+@pytest.mark.parametrize("stmt,loaded,not_loaded", [
+    ("from umi.sumi import Fifo",
+     ["umi.sumi.umi_fifo.umi_fifo"],
+     ["umi.lumi", "umi.adapters", "umi.sumi.umi_mux.umi_mux"]),
+    ("from umi.adapters import UMI2APB",
+     ["umi.adapters.umi2apb.umi2apb"],
+     ["umi.lumi", "umi.adapters.axi2umi.axi2umi"]),
+    ("from umi.lumi import LUMI",
+     ["umi.lumi.lumi", "umi.sumi.umi_crossbar.umi_crossbar"],
+     ["umi.adapters", "umi.sumi.umi_ram.umi_ram"])
+])
+def test_import_only_named(stmt, loaded, not_loaded):
+    elapsed, modules = _import_profile(stmt)
+
+    print(f"{stmt}: {elapsed} us")
+
+    for name in loaded:
+        assert name in modules
+    for name in not_loaded:
+        assert name not in modules
+
+
+def test_lazy_attributes():
+    import umi
+
+    assert "Fifo" in dir(umi.sumi)
+    assert umi.sumi.Fifo is umi.sumi.umi_fifo.umi_fifo.Fifo
+
+    with pytest.raises(AttributeError):
+        umi.sumi.NotADesign
@@ -0,0 +1,157 @@
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from umi.sumi import messages
+
+
+_VH = Path(messages.__file__).parent / 'include' / 'umi_messages.vh'
+
+
+def _localparams():
+    params = {}
+    for name, value in re.findall(r"localparam\s+UMI_(\w+)\s*=\s*([^;]+);", _VH.read_text()):
+        value = value.strip()
+        if "'h" in value:
+            value = int(value.split("'h")[1], 16)
+        params[name] = int(value)
+    return params
+
+
+def test_matches_verilog():
+    params = _localparams()
+
+    for name, (lsb, msb) in messages.FIELDS.items():
+        if lsb == msb:
+            assert params[f"{name.upper()}_BIT"] == lsb
+        else:
+            assert params[f"{name.upper()}_LSB"] == lsb
+            assert params[f"{name.upper()}_MSB"] == msb
+
+    for name, value in params.items():
+        if name.startswith("REQ_ATOMIC") and name != "REQ_ATOMIC":
+            assert getattr(messages, f"ATOMIC_{name[10:]}") == value
+        elif name.startswith(("REQ_", "RESP_")) or name in ("INVALID", "MAXSIZE", "MAXLEN"):
+            assert getattr(messages, name) == value
+
+
+def test_roundtrip(random_seed):
+    rng = np.random.default_rng(random_seed)
+    cmd = rng.integers(0, 2**32, size=10000, dtype=np.uint32)
+
+    fields = messages.decode(cmd)
+    assert np.array_equal(messages.encode(fields), cmd)
+
+    # compare against a straightforward per packet decode
+    for value, row in zip(cmd[:100], fields[:100]):
+        value = int(value)
+        assert row['opcode'] == value & 0x1f
+        assert row['size'] == (value >> 5) & 0x7
+        assert row['len'] == (value >> 8) & 0xff
+        assert row['qos'] == (value >> 16) & 0xf
+        assert row['eom'] == (value >> 22) & 0x1
+        assert row['hostid'] == value >> 27
+
+
+def test_derived():
+    cmd = messages.encode(opcode=[messages.REQ_READ, messages.RESP_WRITE,
+                                  messages.REQ_ATOMIC, messages.INVALID],
+                          size=[2, 3, 3, 0],
+                          len=[3, 0, messages.ATOMIC_SWAP, 0])
+
+    assert messages.nbytes(cmd).tolist() == [16, 8, 8, 1]
+    assert messages.is_request(cmd).tolist() == [True, False, True, False]
+    assert messages.is_response(cmd).tolist() == [False, True, False, False]
+    assert messages.atomic_type(cmd).tolist() == [-1, -1, messages.ATOMIC_SWAP, -1]
+
+
+def test_encode_unknown_field():
+    with pytest.raises(ValueError):
+        messages.encode(opcode=1, length=3)
+
+
+@pytest.mark.parametrize('boundary', [False, True])
+def test_split(random_seed, boundary):
+    rng = np.random.default_rng(random_seed)
+    dw = 64
+    bus = dw // 8
+
+    for _ in range(1000):
+        opcode = int(rng.choice(messages.SPLITTABLE))
+        size = int(rng.integers(0, 7))
+        length = int(rng.integers(0, 256))
+        eom = int(rng.integers(0, 2))
+        cmd = int(messages.encode(opcode=opcode, size=size, len=length, eom=eom,
+                                  qos=5, prot=1, hostid=3, user=2))
+        dstaddr = int(rng.integers(0, 2**20)) << size
+        srcaddr = int(rng.integers(0, 2**20)) << size
+        data = rng.integers(0, 256, size=(length + 1) << size, dtype=np.uint8).tobytes()
+
+        pieces = messages.split(cmd, dstaddr, srcaddr, data, dw=dw, boundary=boundary)
+        fields = messages.decode([piece[0] for piece in pieces])
+
+        # rule 2, with SIZE reduced to the bus width for wide words
+        out_size = min(size, bus.bit_length() - 1)
+        for name in ('opcode', 'qos', 'prot', 'hostid', 'user', 'eof', 'ex'):
+            assert (fields[name] == messages.decode(cmd)[name]).all()
+        assert (fields['size'] == out_size).all()
+
+        # rule 3, counted in bytes since SIZE may change
+        nbytes = [int(n) for n in messages.nbytes([piece[0] for piece in pieces])]
+        assert sum(nbytes) == (length + 1) << size
+        assert all(n <= bus for n in nbytes)
+
+        # rules 4, 5
+        assert pieces[0][1] == dstaddr and pieces[0][2] == srcaddr
+        for prev, piece, n in zip(pieces, pieces[1:], nbytes):
+            assert piece[1] == prev[1] + n
+            assert piece[2] == prev[2] + n
+            if boundary:
+                assert piece[1] % bus == 0
+
+        # rule 6
+        assert fields['eom'].tolist() == [0] * (len(pieces) - 1) + [eom]
+
+        assert b''.join(piece[3] for piece in pieces) == data
+
+
+def test_split_wide():
+    # 32 byte words on a 64 bit bus, two words become 8 bus words
+    cmd = messages.encode(opcode=messages.REQ_POSTED, size=5, len=1, eom=1)
+    pieces = messages.split(cmd, 0x100, 0x200, bytes(range(64)), dw=64)
+
+    assert len(pieces) == 8
+    assert [hex(piece[1]) for piece in pieces] == [hex(0x100 + 8 * i) for i in range(8)]
+    assert messages.decode([piece[0] for piece in pieces])['size'].tolist() == [3] * 8
+    assert messages.decode([piece[0] for piece in pieces])['len'].tolist() == [0] * 8
+    assert pieces[3][3] == bytes(range(24, 32))
+
+
+@pytest.mark.parametrize('opcode', [messages.REQ_READ, messages.REQ_WRITE, messages.RESP_READ])
+def test_split_wide_not_posted(opcode):
+    # every splittable command is sent as bus wide words, none is truncated
+    cmd = int(messages.encode(opcode=opcode, size=5, len=1, eom=1))
+    pieces = messages.split(cmd, 0x100, 0x200, bytes(range(64)), dw=64)
+
+    assert len(pieces) == 8
+    assert [hex(piece[2]) for piece in pieces] == [hex(0x200 + 8 * i) for i in range(8)]
+    assert messages.decode([piece[0] for piece in pieces])['opcode'].tolist() == [opcode] * 8
+    assert messages.decode([piece[0] for piece in pieces])['eom'].tolist() == [0] * 7 + [1]
+    assert b''.join(piece[3] for piece in pieces) == bytes(range(64))
+
+
+def test_split_atomic():
+    cmd = messages.encode(opcode=messages.REQ_ATOMIC, size=3, len=messages.ATOMIC_ADD)
+    assert messages.split(cmd, 0, 0, dw=64) == [(int(cmd), 0, 0, None)]
+    # wider than the bus, an atomic cannot be split
+    with pytest.raises(ValueError):
+        messages.split(cmd, 0, 0, dw=32)
+
+
+def test_split_exclusive():
+    cmd = messages.encode(opcode=messages.REQ_READ, size=2, len=3, ex=1)
+    assert messages.split(cmd, 0, 0, dw=128) == [(int(cmd), 0, 0, None)]
+    with pytest.raises(ValueError):
+        messages.split(cmd, 0, 0, dw=32)
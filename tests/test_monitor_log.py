@@ -0,0 +1,86 @@
+from umi.sumi import messages
+from umi.sumi.umi_monitor.log import Beat, Timeout, analyze, parse
+
+
+def _line(time, name, op, dst, src, data, cmd=None, stall=None):
+    line = f"{time:>8.2f}ns    {name:>20}    UMI_{op}: dst=0x{dst:016x} src=0x{src:016x} data=0x{data:064x}"
+    if cmd is not None:
+        line += f" cmd=0x{cmd:08x} stall={stall}"
+    return line + " (testbench.dut.mon)\n"
+
+
+def test_parse():
+    cmd = int(messages.encode(opcode=messages.REQ_WRITE, size=2, len=1, eom=1))
+    lines = [
+        "some unrelated simulator output\n",
+        _line(10, "host", "REQ_WRITE", 0x100, 0x2000, 0xdead, cmd=cmd, stall=3),
+        _line(11, "host", "REQ_READ", 0x100, 0x2000, 0),
+        _line(12, "host", "OPCODE=0x61", 0x100, 0x2000, 0),
+        "   13.00ns                 host WARNING: UMI_TIMEOUT: valid=1 ready=0 "
+        "dst=0x0 src=0x0 cmd=0x0 (100 cycles) (testbench.dut.mon)\n",
+    ]
+
+    items = list(parse(lines))
+    assert len(items) == 4
+
+    assert isinstance(items[0], Beat)
+    assert items[0].time == 10.0
+    assert items[0].name == "host"
+    assert items[0].opcode == messages.REQ_WRITE
+    assert items[0].dstaddr == 0x100
+    assert items[0].srcaddr == 0x2000
+    assert items[0].data == 0xdead
+    assert items[0].nbytes == 8
+    assert items[0].stall == 3
+    assert items[0].path == "testbench.dut.mon"
+
+    # no cmd in the line, reads carry no data
+    assert items[1].opcode == messages.REQ_READ
+    assert items[1].cmd is None
+    assert items[1].nbytes == 0
+
+    # unnamed opcodes (size != 0) are decoded from the opcode value
+    assert items[2].opcode == messages.REQ_READ
+
+    assert items[3] == Timeout(time=13.0, name="host", cycles=100)
+
+
+def test_analyze():
+    def cmd(opcode, eom=1):
+        return int(messages.encode(opcode=opcode, size=3, len=0, eom=eom))
+
+    lines = []
+    # 10 writes on consecutive cycles, each answered 20 cycles later
+    for i in range(10):
+        lines.append(_line(i, "req", "REQ_WRITE", 0x1000 + 8 * i, 0x50 + i, i,
+                           cmd=cmd(messages.REQ_WRITE), stall=1))
+    for i in range(10):
+        lines.append(_line(20 + i, "resp", "RESP_WRITE", 0x50 + i, 0x1000 + 8 * i, 0,
+                           cmd=cmd(messages.RESP_WRITE), stall=0))
+    # a read answered with two response beats
+    lines.append(_line(40, "req", "REQ_READ", 0x2000, 0x90, 0, cmd=cmd(messages.REQ_READ), stall=0))
+    lines.append(_line(45, "resp", "RESP_READ", 0x90, 0x2000, 1, cmd=cmd(messages.RESP_READ, eom=0),
+                       stall=0))
+    lines.append(_line(46, "resp", "RESP_READ", 0x98, 0x2008, 2, cmd=cmd(messages.RESP_READ), stall=0))
+
+    report = analyze(iter(lines))
+
+    req = report.ports["req"]
+    assert req.beats == 11
+    assert req.nbytes == 80
+    assert req.stall_cycles == 10
+    assert req.stalled_beats == 10
+
+    assert report.ports["resp"].nbytes == 16
+
+    writes = report.latency[messages.REQ_WRITE]
+    assert writes.count == 10
+    assert writes.min == writes.max == 20
+
+    reads = report.latency[messages.REQ_READ]
+    assert reads.count == 1
+    assert reads.max == 5
+
+    assert report.outstanding == 0
+    assert report.unmatched == 0
+    assert "REQ_WRITE" in report.format()
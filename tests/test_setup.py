@@ -15,3 +15,16 @@ def test_setup_lumi(name):
 @pytest.mark.parametrize("name", umi.adapters.__all__)
 def test_setup_adapters(name):
     assert getattr(umi.adapters, name)().check_filepaths()
+
+
+def test_design_registry():
+    from umi.common import get_design
+
+    assert get_design(umi.sumi.Mux) is get_design(umi.sumi.Mux)
+    assert get_design(umi.sumi.Mux) is not umi.sumi.Mux()
+
+    # dependencies are shared across the hierarchy
+    lumi = get_design(umi.lumi.LUMI)
+    ram = get_design(umi.sumi.RAM)
+    assert lumi.get_dep("umi_mux") is ram.get_dep("umi_mux")
+    assert lumi.get_dep("umi_mux") is get_design(umi.sumi.Mux)
@@ -0,0 +1,86 @@
+import numpy as np
+
+from umi.sumi import messages
+from umi.sumi.umi_monitor.trace import UmiTrace, write_trace
+
+
+def _random_trace(path, count, seed):
+    rng = np.random.default_rng(seed)
+    time = np.cumsum(rng.integers(1, 4, size=count, dtype=np.uint64))
+    cmd = messages.encode(opcode=rng.choice([messages.REQ_READ, messages.REQ_WRITE,
+                                             messages.RESP_READ, messages.RESP_WRITE],
+                                            size=count),
+                          size=rng.integers(0, 4, size=count),
+                          len=rng.integers(0, 8, size=count))
+    dstaddr = rng.integers(0, 2**40, size=count, dtype=np.uint64)
+    srcaddr = rng.integers(0, 2**40, size=count, dtype=np.uint64)
+    data = rng.integers(0, 256, size=(count, 32), dtype=np.uint8)
+    write_trace(path, time, cmd, dstaddr, srcaddr, data, dw=256, name='tb')
+    return time, cmd, dstaddr, srcaddr, data
+
+
+def test_trace_roundtrip(tmp_path, random_seed):
+    path = tmp_path / 'trace'
+    time, cmd, dstaddr, srcaddr, data = _random_trace(path, 5000, random_seed)
+
+    trace = UmiTrace(path)
+    assert len(trace) == 5000
+    assert trace.name == 'tb'
+    assert trace.dw == 256
+
+    records = trace[:]
+    assert np.array_equal(records['time'], time)
+    assert np.array_equal(records['cmd'], cmd)
+    assert np.array_equal(records['dstaddr'], dstaddr)
+    assert np.array_equal(records['srcaddr'], srcaddr)
+    assert np.array_equal(records['data'], data)
+
+    assert trace[7]['dstaddr'] == dstaddr[7]
+    assert np.array_equal(trace[[3, 1]]['cmd'], cmd[[3, 1]])
+
+
+def test_trace_select(tmp_path, random_seed):
+    path = tmp_path / 'trace'
+    time, cmd, dstaddr, _, _ = _random_trace(path, 5000, random_seed)
+
+    trace = UmiTrace(path)
+
+    start, stop = int(time[1000]), int(time[3000])
+    window = trace.window(start, stop)
+    assert np.array_equal(trace.time[window], time[(time >= start) & (time < stop)])
+
+    lo, hi = 2**38, 2**39
+    expected = np.flatnonzero((time >= start) & (time < stop) &
+                              (messages.opcode(cmd) == messages.REQ_WRITE) &
+                              (dstaddr >= lo) & (dstaddr < hi))
+    rows = trace.select(start=start, stop=stop, opcode=messages.REQ_WRITE, dstaddr=(lo, hi))
+    assert np.array_equal(rows, expected)
+
+    # second open uses the cached index
+    assert (tmp_path / 'trace.index.npz').exists()
+    rows = UmiTrace(path).select(opcode=[messages.REQ_READ, messages.RESP_READ])
+    assert np.array_equal(rows, np.flatnonzero(np.isin(messages.opcode(cmd),
+                                                       [messages.REQ_READ, messages.RESP_READ])))
+
+
+def test_trace_partial_record(tmp_path, random_seed):
+    path = tmp_path / 'trace'
+    _random_trace(path, 10, random_seed)
+
+    # a simulation still running may have written only part of a record
+    with open(f"{path}.time", "ab") as f:
+        f.write(b"\x01\x02")
+
+    assert len(UmiTrace(path)) == 10
+
+
+def test_trace_index_rewritten(tmp_path, random_seed):
+    path = tmp_path / 'trace'
+    _random_trace(path, 1000, random_seed)
+    UmiTrace(path).opcode_index()
+
+    # a new trace of the same length in the same place
+    _, cmd, _, _, _ = _random_trace(path, 1000, random_seed + 1)
+
+    rows = UmiTrace(path).select(opcode=messages.REQ_WRITE)
+    assert np.array_equal(rows, np.flatnonzero(messages.opcode(cmd) == messages.REQ_WRITE))
@@ -1,7 +1,4 @@
-from umi import sumi
-from umi import lumi
-from umi import adapters
-from umi.common import Standard
+from umi._lazy import lazy_exports
 
 
 try:
@@ -10,6 +7,14 @@ except ImportError:
     # This only exists in installations
     __version__ = None
 
+# Subpackages and designs are only imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Standard": ".common",
+    "sumi": None,
+    "lumi": None,
+    "adapters": None
+})
+
 __all__ = [
     "Standard",
     "sumi",
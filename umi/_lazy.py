@@ -0,0 +1,31 @@
+import importlib
+
+
+def lazy_exports(package: str, exports: dict):
+    '''
+    Build module level __getattr__/__dir__ hooks (PEP 562) for a package.
+
+    exports maps an attribute name to the relative module it lives in,
+    or to None when the attribute is itself a subpackage. Nothing is
+    imported until the attribute is first accessed, after which the
+    object is cached in the package namespace.
+    '''
+    module = importlib.import_module(package)
+
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        source = exports[name]
+        if source is None:
+            obj = importlib.import_module(f".{name}", package)
+        else:
+            obj = getattr(importlib.import_module(source, package), name)
+
+        setattr(module, name, obj)
+        return obj
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,4 @@
+# This file is automatically generated by setuptools_scm.
+# Do not edit it directly.
+
+__version__ = "0.1.dev1+g9b5c57248"
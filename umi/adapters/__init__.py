@@ -1,14 +1,23 @@
-# Design objects
-from .axil2umi.axil2umi import AXIL2UMI
-from .umi2axil.umi2axil import UMI2AXIL
-from .umi2apb.umi2apb import UMI2APB
-from .tl2umi.tl2umi import TL2UMI
-from .umi2tl.umi2tl import UMI2TL
-from .axi2umi.axi2umi import AXI2UMI
+from umi._lazy import lazy_exports
+
+
+# Design objects, only imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'AXIL2UMI': '.axil2umi.axil2umi',
+    'UMI2AXIL': '.umi2axil.umi2axil',
+    'UMI2APB': '.umi2apb.umi2apb',
+    'TL2UMI': '.tl2umi.tl2umi',
+    'UMI2TL': '.umi2tl.umi2tl',
+    'AXI2UMI': '.axi2umi.axi2umi',
+    'PacketMergeGreedy': '.packet_merge_greedy',
+    'AddressRemap': '.address_remap'
+})
 
 __all__ = ['AXIL2UMI',
            'TL2UMI',
            'UMI2APB',
            'UMI2AXIL',
            'UMI2TL',
-           'AXI2UMI']
+           'AXI2UMI',
+           'PacketMergeGreedy',
+           'AddressRemap']
@@ -13,9 +13,9 @@ class AXI2UMI(UMI):
             ],
             idirs=['rtl'],
             deps=[
-                Pack(),
-                Mux(),
-                Demux(),
+                Pack,
+                Mux,
+                Demux,
             ]
         )
 
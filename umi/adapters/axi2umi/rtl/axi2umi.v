@@ -34,11 +34,18 @@
  *   DW  - Data width in bits, must be <= 128
  *   AW  - Address width in bits (default 64)
  *   IDW - AXI ID width (default 8)
+ *   OUTSTANDING - Outstanding AXI bursts per direction, power of two
+ *                 (default 4)
+ *   COALESCE - Merge the narrow beats of INCR write bursts into one UMI
+ *              request per DW window (default 1), reads always map a burst
+ *              to a single UMI request with LEN=ARLEN
  *
  * Config Ports:
  *   hostaddr - UMI source address forwarded to both write and read sub-modules.
  *              The lower DW/8 bits are reserved per the UMI spec; the write
  *              path replaces those bits with the AXI write strobe value.
+ *              Both paths replace bits [TAG_LSB +: log2(OUTSTANDING)] with
+ *              a transaction tag that the UMI response returns in dstaddr.
  *              Typically static; if changed, must be synchronous to clk.
  *
  * Response Routing:
@@ -54,15 +61,18 @@ module axi2umi #(
   parameter CW  = 32,
   parameter DW  = 128,
   parameter AW  = 64,
-  parameter IDW = 8
+  parameter IDW = 8,
+  parameter OUTSTANDING = 4,
+  parameter COALESCE = 1
 )(
   input clk,
   input nreset,
 
   /* UMI source address for all requests.
    * The bottom DW/8 bits are replaced with the AXI write strobe on the
-   * write path (per UMI spec). Typically static if changed, must be
-   * synchronous to clk. */
+   * write path (per UMI spec), and bits [TAG_LSB +: log2(OUTSTANDING)]
+   * with the transaction tag on both paths. Typically static if changed,
+   * must be synchronous to clk. */
   input [AW-1:0] hostaddr,
 
   input [1:0] arbmode,
@@ -197,7 +207,9 @@ module axi2umi #(
     .CW  (CW),
     .DW  (DW),
     .AW  (AW),
-    .IDW (IDW)
+    .IDW (IDW),
+    .OUTSTANDING (OUTSTANDING),
+    .COALESCE (COALESCE)
   ) u_axiwr2umi (
     .clk              (clk),
     .nreset           (nreset),
@@ -250,7 +262,8 @@ module axi2umi #(
     .CW  (CW),
     .DW  (DW),
     .AW  (AW),
-    .IDW (IDW)
+    .IDW (IDW),
+    .OUTSTANDING (OUTSTANDING)
   ) u_axird2umi (
     .clk              (clk),
     .nreset           (nreset),
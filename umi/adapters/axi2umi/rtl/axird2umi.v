@@ -28,9 +28,12 @@
  *   DW  - Data width in bits (default 128)
  *   AW  - Address width in bits (default 64)
  *   IDW - AXI ID width (default 8)
+ *   OUTSTANDING - Outstanding AXI read bursts, power of two (default 4)
  *
  * Config Ports:
- *   hostaddr - UMI source address, used as-is for all read requests.
+ *   hostaddr - UMI source address for all read requests, with bits
+ *              [TAG_LSB +: log2(OUTSTANDING)] replaced by the transaction tag
+ *              and the bits below cleared, TAG_LSB = max(DW/8, 8 + log2(DW/8)).
  *              Typically static; if changed, must be synchronous to clk.
  *
  * Supported AXI4 Features:
@@ -41,6 +44,8 @@
  *   - ARPROT[1:0] mapped to UMI PROT field
  *   - ARQOS[3:0] mapped to UMI QOS field
  *   - AXI ID pass-through (ARID -> RID)
+ *   - Multiple outstanding read bursts with distinct ARIDs, read data of
+ *     different IDs may be interleaved
  *
  * Unsupported AXI4 Features:
  *   - ARBURST (burst type ignored; address incrementing is delegated to
@@ -48,18 +53,23 @@
  *   - ARLOCK (exclusive/locked access) - signal present but ignored
  *   - ARCACHE (memory attributes) - signal present but ignored
  *   - ARPROT[2] (instruction/data) - only ARPROT[1:0] used
- *   - Multiple outstanding read transactions (ar_id is overwritten on
- *     each new AR handshake)
+ *   - Multiple outstanding read bursts with the same ARID (a burst waits
+ *     for any earlier burst with its ARID to complete before being issued)
  *
  * Response Mapping:
  *   - RDATA driven by UMI response data
  *   - RRESP driven by UMI ERR field in the response command
  *   - RLAST driven by UMI EOM bit in the response command
- *   - RID held constant for all beats (latched from ARID on AR handshake)
+ *   - RID looked up from the transaction tag returned in the UMI response
+ *     dstaddr (the request srcaddr)
  *
  * Protocol Notes:
  *   - No FSM; AR-to-UMI-REQ and UMI-RESP-to-R paths are combinational
- *   - Single outstanding read transaction supported
+ *   - Each AR allocates an entry in a tracking table holding its ARID, the
+ *     entry index is sent as the tag in srcaddr[TAG_LSB +: log2(OUTSTANDING)]
+ *     and the entry is freed by the response beat with EOM set
+ *   - Serializing bursts per ARID keeps read data in order per ID without
+ *     buffering responses, whatever order the UMI network returns them in
  *   - EOM is always set on the request since the full burst is one UMI
  *     transaction
  *
@@ -69,12 +79,14 @@ module axird2umi #(
   parameter CW  = 32,
   parameter DW  = 128,
   parameter AW  = 64,
-  parameter IDW = 8
+  parameter IDW = 8,
+  parameter OUTSTANDING = 4
 )(
   input clk,
   input nreset,
 
-  /* UMI source address for read requests (used as-is, no strobe encoding).
+  /* UMI source address for read requests, bits [TAG_LSB +: log2(OUTSTANDING)]
+   * are replaced by the transaction tag and the bits below cleared.
    * Typically static; if changed, must be synchronous to clk. */
   input [AW-1:0] hostaddr,
 
@@ -126,32 +138,114 @@ module axird2umi #(
 
   `include "umi_messages.vh"
 
+  // Parameter validation
+  generate
+    if ((OUTSTANDING < 1) || (OUTSTANDING & (OUTSTANDING - 1))) begin : gen_outstanding_check
+      initial begin
+        $error("OUTSTANDING=%0d must be a power of two.", OUTSTANDING);
+      end
+    end
+  endgenerate
+
   localparam STRB_LOG2 = $clog2(DW/8);
 
+  /* Transaction tag, carried in srcaddr above both the DW/8 reserved bits
+   * and the byte offset of a 256 beat burst, so response addresses that
+   * advance across a burst never carry into it. */
+  localparam TW = (OUTSTANDING > 1) ? $clog2(OUTSTANDING) : 1;
+  localparam TAG_LSB = (DW/8 > 8 + STRB_LOG2) ? DW/8 : 8 + STRB_LOG2;
+  localparam [TW-1:0] TAG_MAX = OUTSTANDING - 1;
+  localparam [AW-1:0] TAG_MASK = {{(AW-TW){1'b0}}, TAG_MAX} << TAG_LSB;
+
+  integer i;
+
   //####################################
   // Registers
   //####################################
-  reg [IDW-1:0] ar_id;
+
+  // Transaction table, one entry per outstanding AXI read burst
+  reg [OUTSTANDING-1:0] tbl_valid;
+  reg [IDW-1:0]         tbl_id [0:OUTSTANDING-1];
+
+  reg req_stall;
+  reg [TW-1:0] stall_tag;
 
   //####################################
   // Wires
   //####################################
   wire ar_fire;
+  wire r_last_fire;
+
+  wire any_free;
+  reg [TW-1:0] free_tag;
+  wire [TW-1:0] req_tag;
+  reg id_busy;
+  wire [TW-1:0] resp_tag;
 
   //####################################
   // Helper signals
   //####################################
   assign ar_fire = s_axi_arvalid & s_axi_arready;
+  assign r_last_fire = uhost_resp_valid & uhost_resp_ready & uhost_resp_cmd[UMI_EOM_BIT];
+
+  assign resp_tag[TW-1:0] = uhost_resp_dstaddr[TAG_LSB+:TW] & TAG_MAX;
+
+  //####################################
+  // Transaction table
+  //####################################
+
+  assign any_free = ~&tbl_valid[OUTSTANDING-1:0];
+
+  // Lowest free entry
+  always @(*) begin
+    free_tag[TW-1:0] = {TW{1'b0}};
+    for (i = OUTSTANDING-1; i >= 0; i = i - 1)
+      if (~tbl_valid[i])
+        free_tag[TW-1:0] = i[TW-1:0];
+  end
+
+  /* Entries may be freed while a request is stalled, hold its tag so
+   * srcaddr stays stable until the handshake. */
+  always @(posedge clk or negedge nreset)
+    if (~nreset)
+      req_stall <= 1'b0;
+    else
+      req_stall <= uhost_req_valid & ~uhost_req_ready;
+
+  always @(posedge clk)
+    stall_tag[TW-1:0] <= req_tag[TW-1:0];
+
+  assign req_tag[TW-1:0] = req_stall ? stall_tag[TW-1:0] : free_tag[TW-1:0];
+
+  // A burst with this ARID is still in flight
+  always @(*) begin
+    id_busy = 1'b0;
+    for (i = 0; i < OUTSTANDING; i = i + 1)
+      if (tbl_valid[i] & (tbl_id[i] == s_axi_arid))
+        id_busy = 1'b1;
+  end
+
+  always @(posedge clk or negedge nreset)
+    if (~nreset)
+      tbl_valid[OUTSTANDING-1:0] <= {OUTSTANDING{1'b0}};
+    else
+      for (i = 0; i < OUTSTANDING; i = i + 1)
+        if (ar_fire & (req_tag == i))
+          tbl_valid[i] <= 1'b1;
+        else if (r_last_fire & (resp_tag == i))
+          tbl_valid[i] <= 1'b0;
 
   always @(posedge clk)
-    ar_id <= (ar_fire) ? s_axi_arid : ar_id;
+    for (i = 0; i < OUTSTANDING; i = i + 1)
+      if (ar_fire & (req_tag == i))
+        tbl_id[i] <= s_axi_arid[IDW-1:0];
 
   //####################################
   // Data path
   //####################################
 
-  assign uhost_req_valid = s_axi_arvalid;
-  assign s_axi_arready = uhost_req_ready;
+  assign uhost_req_valid = s_axi_arvalid & any_free & ~id_busy;
+  assign s_axi_arready = uhost_req_ready & any_free & ~id_busy;
 
   umi_pack #(
     .CW(CW)
@@ -175,14 +269,15 @@ module axird2umi #(
   );
 
   assign uhost_req_dstaddr = {s_axi_araddr[AW-1:STRB_LOG2], {STRB_LOG2{1'b0}}};
-  assign uhost_req_srcaddr = hostaddr;
+  assign uhost_req_srcaddr = ({hostaddr[AW-1:TAG_LSB], {TAG_LSB{1'b0}}} & ~TAG_MASK) |
+                             ({{(AW-TW){1'b0}}, req_tag[TW-1:0]} << TAG_LSB);
   assign uhost_req_data = {DW{1'b0}};
 
   // Connect UMI Response to AXI4 Read Data Channel
   assign s_axi_rvalid         = uhost_resp_valid;
   assign uhost_resp_ready     = s_axi_rready;
 
-  assign s_axi_rid[IDW-1:0]   = ar_id[IDW-1:0];
+  assign s_axi_rid[IDW-1:0]   = tbl_id[resp_tag];
   assign s_axi_rdata[DW-1:0]  = uhost_resp_data[DW-1:0];
   assign s_axi_rresp[1:0]     = uhost_resp_cmd[UMI_USER_MSB:UMI_USER_LSB];
   assign s_axi_rlast          = uhost_resp_cmd[UMI_EOM_BIT];
@@ -18,18 +18,26 @@
  * Documentation:
  *
  * This module converts AXI4 Full write transactions to UMI write requests.
- * Each AXI write beat is converted to a UMI REQ_WRITE transaction, with
- * a UMI RESP_WRITE expected for each beat before proceeding to the next.
+ * AXI write beats are converted to UMI REQ_WRITE transactions, with the
+ * narrow beats of an INCR burst that fall in the same DW aligned window
+ * coalesced into a single transaction (COALESCE=1). Up to
+ * OUTSTANDING AXI write bursts may be awaiting their UMI RESP_WRITEs at
+ * any time, so request throughput is not bounded by the UMI round trip.
  *
  * Parameters:
  *   CW  - UMI command width (default 32)
  *   DW  - Data width in bits, must be <= 128 (16 byte strobe fits in SA[15:0])
  *   AW  - Address width in bits (default 64)
  *   IDW - AXI ID width (default 8)
+ *   OUTSTANDING - Outstanding AXI write bursts, power of two (default 4)
+ *   COALESCE - Merge contiguous INCR beats within a DW window (default 1),
+ *              0 issues one UMI request per beat
  *
  * Config Ports:
  *   hostaddr - UMI source address base. The bottom DW/8 bits are replaced
- *              with the raw AXI write strobe value per UMI spec recommendation.
+ *              with the raw AXI write strobe value per UMI spec recommendation,
+ *              and bits [TAG_LSB +: log2(OUTSTANDING)] with the transaction
+ *              tag, TAG_LSB = max(DW/8, 8 + log2(DW/8)).
  *              Typically static; if changed, must be synchronous to clk.
  *
  * Supported AXI4 Features:
@@ -44,13 +52,13 @@
  *   - AWPROT[1:0] mapped to UMI PROT field
  *   - AWQOS[3:0] mapped to UMI QOS field
  *   - AXI ID pass-through (AWID -> BID)
+ *   - Out-of-order write completion across AXI IDs, in order per AXI ID
  *
  * Unsupported AXI4 Features:
  *   - WRAP burst type (will behave as FIXED)
  *   - AWLOCK (exclusive/locked access) - signal present but ignored
  *   - AWCACHE (memory attributes) - signal present but ignored
  *   - AWPROT[2] (instruction/data) - only AWPROT[1:0] used
- *   - Out-of-order transaction completion
  *   - Write interleaving (s_axi_wid is ignored, transactions are in-order)
  *   - Non-contiguous write strobes (strobes must be contiguous)
  *
@@ -60,18 +68,33 @@
  *   - Errors are latched across burst beats; last error latched is reported.
  *
  * Protocol Notes:
- *   - One UMI request per AXI write beat (not per burst)
- *   - Module waits for UMI response before accepting next beat
- *   - Single outstanding AXI transaction supported (no pipelining)
+ *   - With COALESCE=1 the beats of an INCR burst are accumulated in a DW
+ *     wide buffer and issued as one UMI request when the burst reaches the
+ *     end of a DW window or its last beat, so a burst of narrow beats costs
+ *     one UMI header per DW bytes rather than one per beat. A beat whose
+ *     strobe does not continue the buffered bytes (sparse strobes) first
+ *     flushes the buffer as a request of its own. Full width beats always
+ *     end a window and are forwarded as before.
+ *   - FIXED bursts and COALESCE=0 issue one UMI request per AXI beat
+ *   - Write beats are forwarded without waiting for UMI responses. Each AXI
+ *     burst owns an entry in a tracking table and its UMI requests carry the
+ *     entry index (tag) in srcaddr[TAG_LSB +: log2(OUTSTANDING)], which returns
+ *     in the response dstaddr. An entry completes once its last beat has
+ *     been forwarded and all of its UMI responses have arrived, in any order.
+ *   - Completed entries are returned on B oldest first, an entry waiting for
+ *     any older entry with the same AXI ID, so BID ordering per ID holds.
+ *   - AW is accepted while a table entry is free and the previous burst's
+ *     W beats are done (at most one burst forwarding data at a time)
  *   - UMI cmd.size is always 0; transfer size encoded in cmd.len only
  *     (valid since AXI4 max data width of 128 bytes fits in UMI len field)
  *   - Write beats with all-zero strobe are accepted and consumed without
- *     generating a UMI transaction (no request or response for that beat)
+ *     generating a UMI transaction of their own
  *   - WLAST is not used for flow control; burst completion is determined
  *     solely by counting beats against AWLEN
  *   - For non-LSB-aligned strobes, dstaddr is offset by the index of the
  *     first active strobe byte and data is right-shifted accordingly
- *   - UMI srcaddr lower DW/8 bits carry the raw AXI write strobe value
+ *   - UMI srcaddr lower DW/8 bits carry the raw (coalesced) AXI write
+ *     strobe value
  *   - EOM is always asserted because empty (all-zero strobe) beats can
  *     appear at any position, making the true last data beat unpredictable
  *
@@ -81,14 +104,17 @@ module axiwr2umi #(
   parameter CW  = 32,
   parameter DW  = 128,
   parameter AW  = 64,
-  parameter IDW = 8
+  parameter IDW = 8,
+  parameter OUTSTANDING = 4,
+  parameter COALESCE = 1
 )(
   input clk,
   input nreset,
 
   /* UMI source address base.
    * Note: The bottom DW/8 bits of hostaddr are ignored per UMI spec.
-   * Those bits carry the raw AXI write strobe value instead.
+   * Those bits carry the raw AXI write strobe value instead, and bits
+   * [TAG_LSB +: log2(OUTSTANDING)] the transaction tag.
    * Typically static if changed, must be synchronous to clk. */
   input [AW-1:0] hostaddr,
 
@@ -153,16 +179,22 @@ module axiwr2umi #(
         $error("DW=%0d exceeds maximum of 128 bits. Strobe width would exceed 16 bits.", DW);
       end
     end
+    if ((OUTSTANDING < 1) || (OUTSTANDING & (OUTSTANDING - 1))) begin : gen_outstanding_check
+      initial begin
+        $error("OUTSTANDING=%0d must be a power of two.", OUTSTANDING);
+      end
+    end
   endgenerate
 
   localparam STRB_LOG2 = $clog2(DW/8);
 
-  localparam SW = 2;
-  localparam [SW-1:0]
-    IDLE            = 'd0,
-    UMI_WRITE       = 'd1,
-    WAIT_UMI_RESP   = 'd2,
-    SEND_B_RESP     = 'd3;
+  /* Transaction tag, carried in srcaddr above both the DW/8 reserved bits
+   * and the byte offset of a 256 beat burst, so response addresses that
+   * advance across a burst never carry into it. */
+  localparam TW = (OUTSTANDING > 1) ? $clog2(OUTSTANDING) : 1;
+  localparam TAG_LSB = (DW/8 > 8 + STRB_LOG2) ? DW/8 : 8 + STRB_LOG2;
+  localparam [TW-1:0] TAG_MAX = OUTSTANDING - 1;
+  localparam [AW-1:0] TAG_MASK = {{(AW-TW){1'b0}}, TAG_MAX} << TAG_LSB;
 
   // AXI4 burst types
   localparam [1:0]
@@ -170,13 +202,18 @@ module axiwr2umi #(
     AXI_BURST_INCR  = 2'b01,
     AXI_BURST_WRAP  = 2'b10;
 
-  integer i;
+  integer i, j;
 
   //####################################
   // Registers
   //####################################
-  reg [SW-1:0] state;
-  reg [AW-1:0] dst_addr;
+  reg wr_active;
+  reg [TW-1:0] wr_tag;
+  reg [AW-1:0] beat_addr;
+
+  // Coalescing buffer, byte lanes as on the AXI write data channel
+  reg [DW/8-1:0] buf_strb;
+  reg [DW-1:0]   buf_data;
 
   reg [1:0] umi_cmd_prot;
   reg [3:0] umi_cmd_qos;
@@ -187,13 +224,22 @@ module axiwr2umi #(
   reg [2:0] aw_size;
   reg [1:0] aw_burst;
 
-  reg [1:0] bresp_err;
+  // Transaction table, one entry per outstanding AXI write burst
+  reg [OUTSTANDING-1:0] tbl_valid;
+  reg [OUTSTANDING-1:0] tbl_issued;
+  reg [IDW-1:0]         tbl_id [0:OUTSTANDING-1];
+  reg [1:0]             tbl_err [0:OUTSTANDING-1];
+  reg [8:0]             tbl_pending [0:OUTSTANDING-1];
+  // tbl_older[j][i] is set when entry j was allocated before entry i
+  reg [OUTSTANDING-1:0] tbl_older [0:OUTSTANDING-1];
+
+  reg b_valid;
+  reg [IDW-1:0] b_id;
+  reg [1:0] b_resp;
 
   //####################################
   // Wires
   //####################################
-  reg [SW-1:0] next_state;
-
   wire aw_fire;
   wire w_fire;
   wire b_resp_fire;
@@ -204,16 +250,34 @@ module axiwr2umi #(
   wire empty_wr_beat;
 
   wire [AW-1:0] bytes_per_beat;
+  wire [AW-1:0] beat_mask;
+  wire window_end;
+  wire beat_close;
+  wire beat_split;
+
+  reg [DW-1:0]    w_byte_mask;
+  wire [DW/8-1:0] req_strb;
+  wire [DW-1:0]   req_data;
+  wire            req_empty;
 
   reg [STRB_LOG2:0]     w_strb_sum;
   wire [7:0]            umi_cmd_len;
 
-  wire no_axi_beats_left;
+  wire last_axi_beat;
+
+  wire any_free;
+  reg [TW-1:0] free_tag;
+  wire [TW-1:0] resp_tag;
+  reg [OUTSTANDING-1:0] tbl_eligible;
+  reg tbl_oldest;
+  reg [TW-1:0] pick_tag;
+  wire b_load;
 
   wire [1:0] umi_resp_cmd_err;
   wire [4:0] umi_resp_cmd_opcode;
 
   wire [DW/8-1:0] right_most_strb_bit;
+  wire [DW/8-1:0] right_most_wstrb_bit;
   reg [STRB_LOG2:0] right_most_strb_bit_index;
 
   //####################################
@@ -248,11 +312,11 @@ module axiwr2umi #(
   always @(posedge clk)
     aw_burst[1:0] <= aw_fire ? s_axi_awburst[1:0] : aw_burst[1:0];
 
-  // Figure out transaction length from AXI strobe
+  // Figure out transaction length from the request strobe
   always @(*) begin
     w_strb_sum = 0;
     for (i = 0; i < DW/8; i = i + 1)
-      w_strb_sum = w_strb_sum + {{(STRB_LOG2-1){1'b0}}, s_axi_wstrb[i]};
+      w_strb_sum = w_strb_sum + {{(STRB_LOG2-1){1'b0}}, req_strb[i]};
   end
 
   /* UMI does not support byte strobes, so non-LSB-aligned strobes are handled
@@ -260,7 +324,8 @@ module axiwr2umi #(
    * and right-shifting wdata to remove the inactive low bytes. */
 
   // Use n & (~n + 1) bit hack to isolate rightmost active strobe bit
-  assign right_most_strb_bit[DW/8-1:0] = (s_axi_wstrb[DW/8-1:0] & (~s_axi_wstrb[DW/8-1:0] + 1'b1));
+  assign right_most_strb_bit[DW/8-1:0] = (req_strb[DW/8-1:0] & (~req_strb[DW/8-1:0] + 1'b1));
+  assign right_most_wstrb_bit[DW/8-1:0] = (s_axi_wstrb[DW/8-1:0] & (~s_axi_wstrb[DW/8-1:0] + 1'b1));
   // Find index of rightmost active strobe bit using priority encoder
   always @(*) begin
     right_most_strb_bit_index[STRB_LOG2:0] = 0;
@@ -278,24 +343,71 @@ module axiwr2umi #(
     else if (w_fire)
       axi_beats_left[8:0] <= axi_beats_left[8:0] - 1'b1;
 
-  assign no_axi_beats_left = (axi_beats_left[8:0] == 9'b0);
+  assign last_axi_beat = (axi_beats_left[8:0] == 9'd1);
 
-  // Load destination address when AW fires, increment when UMI req fires (INCR only)
+  /* Track the AXI address of the current beat (INCR only), beats after
+   * the first are aligned to the transfer size. The DW aligned window of
+   * this address plus the strobe lanes give the UMI destination. */
   assign bytes_per_beat[AW-1:0] = {{(AW-8){1'b0}}, (8'd1 << aw_size[2:0])};
+  assign beat_mask[AW-1:0] = bytes_per_beat[AW-1:0] - 1'b1;
   always @(posedge clk)
     if (aw_fire)
-      dst_addr[AW-1:0] <= {s_axi_awaddr[AW-1:STRB_LOG2], {STRB_LOG2{1'b0}}};
+      beat_addr[AW-1:0] <= s_axi_awaddr[AW-1:0];
     else if (w_fire && (aw_burst == AXI_BURST_INCR))
-      dst_addr[AW-1:0] <= dst_addr[AW-1:0] + bytes_per_beat[AW-1:0];
+      beat_addr[AW-1:0] <= (beat_addr[AW-1:0] & ~beat_mask[AW-1:0]) + bytes_per_beat[AW-1:0];
+
+  //####################################
+  // Beat coalescing
+  //####################################
+
+  // The current beat covers the top byte lane of its DW window
+  assign window_end = &(beat_addr[STRB_LOG2-1:0] | beat_mask[STRB_LOG2-1:0]);
+
+  // The buffer is issued along with the current beat
+  assign beat_close = (COALESCE == 0) |
+                      (aw_burst != AXI_BURST_INCR) |
+                      last_axi_beat |
+                      window_end;
+
+  /* A beat that does not continue the buffered bytes (gap or overlap)
+   * flushes the buffer as a request of its own before being accepted. */
+  assign beat_split = (|buf_strb[DW/8-1:0]) & ~empty_wr_beat &
+                      ~(~|(buf_strb[DW/8-1:0] & s_axi_wstrb[DW/8-1:0]) &
+                        |({buf_strb[DW/8-2:0], 1'b0} & right_most_wstrb_bit[DW/8-1:0]));
+
+  always @(*)
+    for (i = 0; i < DW/8; i = i + 1)
+      w_byte_mask[i*8+:8] = {8{s_axi_wstrb[i]}};
+
+  assign req_strb[DW/8-1:0] = beat_split ? buf_strb[DW/8-1:0] :
+                              buf_strb[DW/8-1:0] | s_axi_wstrb[DW/8-1:0];
+  assign req_data[DW-1:0] = beat_split ? buf_data[DW-1:0] :
+                            buf_data[DW-1:0] | (s_axi_wdata[DW-1:0] & w_byte_mask[DW-1:0]);
+  assign req_empty = (req_strb == {DW/8{1'b0}});
+
+  always @(posedge clk or negedge nreset)
+    if (~nreset)
+      buf_strb[DW/8-1:0] <= {DW/8{1'b0}};
+    else if (umi_req_fire | (w_fire & beat_close))
+      buf_strb[DW/8-1:0] <= {DW/8{1'b0}};
+    else if (w_fire)
+      buf_strb[DW/8-1:0] <= req_strb[DW/8-1:0];
+
+  always @(posedge clk)
+    if (umi_req_fire | (w_fire & beat_close))
+      buf_data[DW-1:0] <= {DW{1'b0}};
+    else if (w_fire)
+      buf_data[DW-1:0] <= req_data[DW-1:0];
 
   //####################################
   // Data path
   //####################################
 
-  /* Handshake only occurs on UMI req channel in UMI_WRITE
-   * state when AXI write interface has data (according to strobe) */
-  assign uhost_req_valid = (state == UMI_WRITE) & (~no_axi_beats_left) & s_axi_wvalid & ~empty_wr_beat;
-  assign s_axi_wready    = (state == UMI_WRITE) & (~no_axi_beats_left) & (uhost_req_ready | empty_wr_beat);
+  /* Handshake only occurs on UMI req channel while a burst is active,
+   * the AXI write interface has data and the beat closes the buffer
+   * (or splits it off). */
+  assign uhost_req_valid = wr_active & s_axi_wvalid & (beat_split | (beat_close & ~req_empty));
+  assign s_axi_wready    = wr_active & ~beat_split & (~beat_close | req_empty | uhost_req_ready);
 
   umi_pack #(
     .CW   (CW)
@@ -323,76 +435,143 @@ module axiwr2umi #(
     .packet_cmd         (uhost_req_cmd)
   );
 
-  assign uhost_req_srcaddr[AW-1:0] = {hostaddr[AW-1:DW/8], s_axi_wstrb[DW/8-1:0]};
+  assign uhost_req_srcaddr[AW-1:0] = ({hostaddr[AW-1:DW/8], req_strb[DW/8-1:0]} & ~TAG_MASK) |
+                                     ({{(AW-TW){1'b0}}, wr_tag[TW-1:0]} << TAG_LSB);
   // Offset destination address to the first active strobe byte
-  assign uhost_req_dstaddr[AW-1:0] = dst_addr[AW-1:0] + {{(AW-STRB_LOG2-1){1'b0}}, right_most_strb_bit_index[STRB_LOG2:0]};
+  assign uhost_req_dstaddr[AW-1:0] = {beat_addr[AW-1:STRB_LOG2], {STRB_LOG2{1'b0}}} +
+                                     {{(AW-STRB_LOG2-1){1'b0}}, right_most_strb_bit_index[STRB_LOG2:0]};
 
   /* Right-shift data to align the first active strobe byte to bit 0
-   * uhost_req_data = s_axis_wdata >> (right_most_strb_bit_index * 8) */
-  assign uhost_req_data[DW-1:0] = s_axi_wdata[DW-1:0] >> {right_most_strb_bit_index[STRB_LOG2:0], 3'b000};
+   * uhost_req_data = req_data >> (right_most_strb_bit_index * 8) */
+  assign uhost_req_data[DW-1:0] = req_data[DW-1:0] >> {right_most_strb_bit_index[STRB_LOG2:0], 3'b000};
 
-  assign uhost_resp_ready = (state == WAIT_UMI_RESP);
+  // Responses are always accepted, the table absorbs them
+  assign uhost_resp_ready = 1'b1;
 
-  // Extract error code from UMI response command
+  // Extract error code and tag from UMI response
   assign umi_resp_cmd_err[1:0] = uhost_resp_cmd[UMI_USER_MSB:UMI_USER_LSB];
   assign umi_resp_cmd_opcode[4:0] = uhost_resp_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB];
+  assign resp_tag[TW-1:0] = uhost_resp_dstaddr[TAG_LSB+:TW] & TAG_MAX;
+
+  //####################################
+  // AW/W control
+  //####################################
+
+  /* A new burst may be accepted in the cycle the active burst
+   * forwards its last beat, as long as a table entry is free. */
+  assign s_axi_awready = any_free & (~wr_active | (w_fire & last_axi_beat));
+
+  always @(posedge clk or negedge nreset)
+    if (~nreset)
+      wr_active <= 1'b0;
+    else if (aw_fire)
+      wr_active <= 1'b1;
+    else if (w_fire & last_axi_beat)
+      wr_active <= 1'b0;
 
-  // Latch error across burst - clear on new transaction
   always @(posedge clk)
-    if (aw_fire)
-      // Clear error on new transaction
-      bresp_err[1:0] <= 2'b00;
-    else if (umi_resp_fire)
-      if (umi_resp_cmd_opcode != UMI_RESP_WRITE)
-        // The response should only be UMI_RESP_WRITE, else slave error
-        bresp_err[1:0] <= 2'b10;
-      else if (umi_resp_cmd_err != 2'b00)
-        // Capture error
-        bresp_err[1:0] <= umi_resp_cmd_err;
-
-  assign s_axi_bresp[1:0] = bresp_err[1:0];
+    wr_tag[TW-1:0] <= aw_fire ? free_tag[TW-1:0] : wr_tag[TW-1:0];
 
   //####################################
-  // FSM logic
+  // Transaction table
   //####################################
 
-  assign s_axi_awready = (state == IDLE);
-  assign s_axi_bvalid = (state == SEND_B_RESP);
+  assign any_free = ~&tbl_valid[OUTSTANDING-1:0];
 
-  always @(*)
-    case (state)
-      /* IDLE: Wait for AXI write address valid. Capture AW channel fields
-       *(address, burst type, ID, prot, qos) on aw_fire, then move to UMI_WRITE. */
-      IDLE:
-        next_state = s_axi_awvalid ? UMI_WRITE : IDLE;
+  // Lowest free entry
+  always @(*) begin
+    free_tag[TW-1:0] = {TW{1'b0}};
+    for (i = OUTSTANDING-1; i >= 0; i = i - 1)
+      if (~tbl_valid[i])
+        free_tag[TW-1:0] = i[TW-1:0];
+  end
 
-      // UMI_WRITE: Forward AXI write data beat as UMI REQ_WRITE then wait for response.
-      UMI_WRITE:
-        if (no_axi_beats_left)
-          next_state = SEND_B_RESP;
-        else
-          next_state = umi_req_fire ? WAIT_UMI_RESP : UMI_WRITE;
+  always @(posedge clk or negedge nreset)
+    if (~nreset)
+      tbl_valid[OUTSTANDING-1:0] <= {OUTSTANDING{1'b0}};
+    else
+      for (i = 0; i < OUTSTANDING; i = i + 1)
+        if (aw_fire & (free_tag == i))
+          tbl_valid[i] <= 1'b1;
+        else if (b_load & (pick_tag == i))
+          tbl_valid[i] <= 1'b0;
 
-      // WAIT_UMI_RESP: Wait for UMI RESP_WRITE.
-      WAIT_UMI_RESP:
-        next_state = umi_resp_fire ? UMI_WRITE : WAIT_UMI_RESP;
+  always @(posedge clk)
+    for (i = 0; i < OUTSTANDING; i = i + 1)
+      if (aw_fire & (free_tag == i))
+        begin
+          // New burst, younger than every valid entry
+          tbl_id[i]      <= s_axi_awid[IDW-1:0];
+          tbl_issued[i]  <= 1'b0;
+          tbl_pending[i] <= 9'd0;
+          tbl_err[i]     <= 2'b00;
+          tbl_older[i]   <= {OUTSTANDING{1'b0}};
+        end
+      else
+        begin
+          if (w_fire & last_axi_beat & (wr_tag == i))
+            tbl_issued[i] <= 1'b1;
+          // Count UMI requests awaiting a response
+          tbl_pending[i] <= tbl_pending[i] +
+                            {8'd0, umi_req_fire & (wr_tag == i)} -
+                            {8'd0, umi_resp_fire & (resp_tag == i)};
+          if (umi_resp_fire & (resp_tag == i))
+            if (umi_resp_cmd_opcode != UMI_RESP_WRITE)
+              // The response should only be UMI_RESP_WRITE, else slave error
+              tbl_err[i] <= 2'b10;
+            else if (umi_resp_cmd_err != 2'b00)
+              // Capture error, the last error latched is reported
+              tbl_err[i] <= umi_resp_cmd_err;
+          if (aw_fire)
+            tbl_older[i][free_tag] <= tbl_valid[i];
+        end
+
+  /* An entry is eligible for B once complete and no older entry
+   * with the same AXI ID is still in the table. */
+  always @(*)
+    for (i = 0; i < OUTSTANDING; i = i + 1) begin
+      tbl_eligible[i] = tbl_valid[i] & tbl_issued[i] & (tbl_pending[i] == 9'd0);
+      for (j = 0; j < OUTSTANDING; j = j + 1)
+        if (tbl_valid[j] & tbl_older[j][i] & (tbl_id[j] == tbl_id[i]))
+          tbl_eligible[i] = 1'b0;
+    end
 
-      /* SEND_B_RESP: Assert bvalid with accumulated error status. Wait for
-       * bready handshake, then return to IDLE for next transaction. */
-      SEND_B_RESP:
-        next_state = b_resp_fire ? IDLE : SEND_B_RESP;
+  // Oldest eligible entry
+  always @(*) begin
+    pick_tag[TW-1:0] = {TW{1'b0}};
+    for (i = 0; i < OUTSTANDING; i = i + 1) begin
+      tbl_oldest = tbl_eligible[i];
+      for (j = 0; j < OUTSTANDING; j = j + 1)
+        if (tbl_eligible[j] & tbl_older[j][i])
+          tbl_oldest = 1'b0;
+      if (tbl_oldest)
+        pick_tag[TW-1:0] = i[TW-1:0];
+    end
+  end
 
-      default:
-        next_state = IDLE;
+  //####################################
+  // B channel
+  //####################################
 
-    endcase
+  assign b_load = (~b_valid | s_axi_bready) & |tbl_eligible[OUTSTANDING-1:0];
 
   always @(posedge clk or negedge nreset)
     if (~nreset)
-      state <= IDLE;
-    else
-      state <= next_state;
+      b_valid <= 1'b0;
+    else if (b_load)
+      b_valid <= 1'b1;
+    else if (b_resp_fire)
+      b_valid <= 1'b0;
+
+  always @(posedge clk)
+    if (b_load)
+      begin
+        b_id[IDW-1:0] <= tbl_id[pick_tag];
+        b_resp[1:0]   <= tbl_err[pick_tag];
+      end
 
-  assign s_axi_bid[IDW-1:0] = aw_id[IDW-1:0];
+  assign s_axi_bvalid = b_valid;
+  assign s_axi_bid[IDW-1:0] = b_id[IDW-1:0];
+  assign s_axi_bresp[1:0] = b_resp[1:0];
 
 endmodule
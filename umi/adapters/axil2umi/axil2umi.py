@@ -9,9 +9,9 @@ class AXIL2UMI(UMI):
         super().__init__('axil2umi',
                          files=['rtl/axil2umi.v'],
                          idirs=['rtl'],
-                         deps=[Drsync(),
-                               Pack(),
-                               Unpack()])
+                         deps=[Drsync,
+                               Pack,
+                               Unpack])
 
 
 if __name__ == "__main__":
@@ -17,6 +17,14 @@
  *
  * Documentation:
  * - AXI4-Lite to UMI converter
+ * - Write (AW/W) and read (AR) channels are accepted independently, each
+ *   with up to OUTSTANDING transactions awaiting their UMI response
+ * - Write and read requests take turns on the UMI request port
+ * - Each request carries its slot in a per channel response table as a tag
+ *   in srcaddr[log2(DW/8) +: log2(OUTSTANDING)]. UMI responses are routed
+ *   by opcode and tag into the table, split responses are reassembled, and
+ *   the B and R channels are served from the table in request order, so
+ *   requests to different devices may complete in any order
  *
  ******************************************************************************/
 
@@ -26,7 +34,8 @@ module axil2umi #(
     parameter CW    = 32,   // command width
     parameter AW    = 64,   // address width
     parameter DW    = 64,   // umi packet width
-    parameter IDW   = 16    // chip ID width
+    parameter IDW   = 16,   // chip ID width
+    parameter OUTSTANDING = 4   // outstanding transactions per channel
 )
 (
     input               clk,
@@ -80,6 +89,16 @@ module axil2umi #(
     localparam DWLOG    = $clog2(DW/8);
     localparam CTRWIDTH = DWLOG + 1;    // width for strobe popcount (0..DW/8)
 
+    // Response table tag, in srcaddr above the byte offset of a response
+    localparam TW = (OUTSTANDING > 1) ? $clog2(OUTSTANDING) : 1;
+
+    generate
+        if (DWLOG + TW > 24) begin : g_tag_check
+            initial
+                $error("OUTSTANDING=%0d does not fit the srcaddr tag for DW=%0d", OUTSTANDING, DW);
+        end
+    endgenerate
+
     // Additional UMI signals
     wire [4:0]      umi_req_cmd_opcode;
     wire [7:0]      umi_req_cmd_len;
@@ -94,25 +113,28 @@ module axil2umi #(
         .out     (reset_done)
     );
 
-    reg                 write_in_flight;
-    reg                 read_in_flight;
+    // Outstanding transactions
+    localparam OW = $clog2(OUTSTANDING+1);
+
+    reg  [OW-1:0]       wr_count;
+    reg  [OW-1:0]       rd_count;
+    wire                wr_req_fire;
+    wire                rd_req_fire;
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset)
-            write_in_flight <= 1'b0;
-        else if (axi_awvalid & axi_awready)
-            write_in_flight <= 1'b1;
-        else if (axi_bvalid & axi_bready)
-            write_in_flight <= 1'b0;
+            wr_count <= 'b0;
+        else
+            wr_count <= wr_count + {{(OW-1){1'b0}}, (axi_awvalid & axi_awready)} -
+                        {{(OW-1){1'b0}}, (axi_bvalid & axi_bready)};
     end
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset)
-            read_in_flight <= 1'b0;
-        else if (axi_arvalid & axi_arready)
-            read_in_flight <= 1'b1;
-        else if (axi_rvalid & axi_rready)
-            read_in_flight <= 1'b0;
+            rd_count <= 'b0;
+        else
+            rd_count <= rd_count + {{(OW-1){1'b0}}, (axi_arvalid & axi_arready)} -
+                        {{(OW-1){1'b0}}, (axi_rvalid & axi_rready)};
     end
 
     // Write Address
@@ -136,7 +158,7 @@ module axil2umi #(
             axi_awvalid_r   <= 1'b0;
         else if (axi_awvalid & axi_awready)
             axi_awvalid_r   <= 1'b1;
-        else if (uhost_req_valid & uhost_req_ready & (umi_req_cmd_opcode == UMI_REQ_WRITE))
+        else if (wr_req_fire)
             axi_awvalid_r   <= 1'b0;
     end
 
@@ -164,7 +186,9 @@ module axil2umi #(
         end
     end
 
-    assign axi_awready = !(write_in_flight | read_in_flight) & reset_done;
+    assign axi_awready = (~axi_awvalid_r | wr_req_fire) &
+                         (wr_count < OUTSTANDING) &
+                         reset_done;
 
     // Write data
     reg  [DW-1:0]       axi_wdata_r;
@@ -193,11 +217,11 @@ module axil2umi #(
             axi_wvalid_r    <= 1'b0;
         else if (axi_wvalid & axi_wready)
             axi_wvalid_r    <= 1'b1;
-        else if (uhost_req_valid & uhost_req_ready & (umi_req_cmd_opcode == UMI_REQ_WRITE))
+        else if (wr_req_fire)
             axi_wvalid_r    <= 1'b0;
     end
 
-    assign axi_wready  = axi_awvalid_r & !axi_wvalid_r & reset_done;
+    assign axi_wready  = (~axi_wvalid_r | wr_req_fire) & reset_done;
 
     // Read address
     reg  [AW-1:0]   axi_araddr_r;
@@ -220,21 +244,56 @@ module axil2umi #(
             axi_arvalid_r   <= 1'b0;
         else if (axi_arvalid & axi_arready)
             axi_arvalid_r   <= 1'b1;
-        else if (uhost_req_valid & uhost_req_ready & (umi_req_cmd_opcode == UMI_REQ_READ))
+        else if (rd_req_fire)
             axi_arvalid_r   <= 1'b0;
     end
 
-    assign axi_arready = !(write_in_flight | read_in_flight) & reset_done;
+    assign axi_arready = (~axi_arvalid_r | rd_req_fire) &
+                         (rd_count < OUTSTANDING) &
+                         reset_done;
+
+    // UMI request arbitration, writes and reads take turns and the
+    // selection is held while the UMI request is stalled
+    wire                wr_req_valid;
+    wire                rd_req_valid;
+    wire                req_sel_write;
+    reg                 req_hold;
+    reg                 req_hold_write;
+    reg                 req_last_write;
+
+    assign wr_req_valid = axi_awvalid_r & axi_wvalid_r;
+    assign rd_req_valid = axi_arvalid_r;
+
+    assign req_sel_write = req_hold ?
+                           req_hold_write :
+                           (wr_req_valid & (~rd_req_valid | ~req_last_write));
+
+    assign wr_req_fire = uhost_req_valid & uhost_req_ready & req_sel_write;
+    assign rd_req_fire = uhost_req_valid & uhost_req_ready & ~req_sel_write;
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            req_hold        <= 1'b0;
+            req_hold_write  <= 1'b0;
+            req_last_write  <= 1'b0;
+        end
+        else begin
+            req_hold        <= uhost_req_valid & ~uhost_req_ready;
+            req_hold_write  <= req_sel_write;
+            if (uhost_req_valid & uhost_req_ready)
+                req_last_write <= req_sel_write;
+        end
+    end
 
     // UMI request
 
-    assign umi_req_cmd_opcode = write_in_flight ?
+    assign umi_req_cmd_opcode = req_sel_write ?
                                 UMI_REQ_WRITE :
                                 UMI_REQ_READ;
-    assign umi_req_cmd_len    = write_in_flight ?
+    assign umi_req_cmd_len    = req_sel_write ?
                                 {{(8-CTRWIDTH){1'b0}}, axi_wstrb_ctr_r} - 8'd1 :
                                 ((DW/8)-1);
-    assign umi_req_cmd_prot   = write_in_flight ?
+    assign umi_req_cmd_prot   = req_sel_write ?
                                 axi_awprot_r[1:0] :
                                 axi_arprot_r[1:0];
 
@@ -260,14 +319,20 @@ module axil2umi #(
 
     wire [23:0] chip_address = {{(24-IDW){1'b0}}, chipid};
 
-    assign uhost_req_dstaddr = write_in_flight ?
-                               (axi_awaddr_r + axi_addr_offset) :
+    reg  [TW-1:0]   wr_tail;
+    reg  [TW-1:0]   rd_tail;
+    wire [TW-1:0]   req_tag;
+
+    assign req_tag = req_sel_write ? wr_tail : rd_tail;
+
+    assign uhost_req_dstaddr = req_sel_write ?
+                               ({axi_awaddr_r[AW-1:DWLOG], {DWLOG{1'b0}}} + axi_addr_offset) :
                                axi_araddr_r;
-    assign uhost_req_srcaddr = {chip_address, local_routing, 24'b0};
+    assign uhost_req_srcaddr = {chip_address, local_routing,
+                                {{(24-TW){1'b0}}, req_tag} << DWLOG};
     assign uhost_req_data    = axi_wdata_r;
-    assign uhost_req_valid   = write_in_flight ?
-                               (axi_awvalid_r & axi_wvalid_r & reset_done) :
-                               (axi_arvalid_r & reset_done);
+    assign uhost_req_valid   = (req_sel_write ? wr_req_valid : rd_req_valid) &
+                               reset_done;
 
     // UMI response
     wire [4:0]  umi_resp_cmd_opcode;
@@ -298,23 +363,96 @@ module axil2umi #(
         .cmd_hostid         ()
     );
 
-    assign uhost_resp_ready = write_in_flight ?
-                              (axi_bready & reset_done) :
-                              (axi_rready & reset_done);
+    // Response tables, an entry is reserved for every request in flight so
+    // responses are always accepted. Responses of other types are dropped.
+    wire                wr_resp_fire;
+    wire                rd_resp_fire;
+    wire [TW-1:0]       resp_tag;
+    wire [DWLOG-1:0]    resp_offset;
+
+    reg  [TW-1:0]           wr_head;
+    reg  [TW-1:0]           rd_head;
+    reg  [OUTSTANDING-1:0]  wr_done;
+    reg  [OUTSTANDING-1:0]  rd_done;
+    reg  [1:0]              wr_err  [0:OUTSTANDING-1];
+    reg  [1:0]              rd_err  [0:OUTSTANDING-1];
+    reg  [DW-1:0]           rd_data [0:OUTSTANDING-1];
+
+    assign uhost_resp_ready = reset_done;
+
+    assign wr_resp_fire = uhost_resp_valid & uhost_resp_ready &
+                          (umi_resp_cmd_opcode == UMI_RESP_WRITE);
+    assign rd_resp_fire = uhost_resp_valid & uhost_resp_ready &
+                          (umi_resp_cmd_opcode == UMI_RESP_READ);
+
+    assign resp_tag    = uhost_resp_dstaddr[DWLOG+:TW];
+    assign resp_offset = uhost_resp_dstaddr[DWLOG-1:0];
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            wr_tail <= 'b0;
+            wr_head <= 'b0;
+            rd_tail <= 'b0;
+            rd_head <= 'b0;
+        end
+        else begin
+            if (wr_req_fire)
+                wr_tail <= (wr_tail == OUTSTANDING - 1) ? 'b0 : wr_tail + 1'b1;
+            if (axi_bvalid & axi_bready)
+                wr_head <= (wr_head == OUTSTANDING - 1) ? 'b0 : wr_head + 1'b1;
+            if (rd_req_fire)
+                rd_tail <= (rd_tail == OUTSTANDING - 1) ? 'b0 : rd_tail + 1'b1;
+            if (axi_rvalid & axi_rready)
+                rd_head <= (rd_head == OUTSTANDING - 1) ? 'b0 : rd_head + 1'b1;
+        end
+    end
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            wr_done <= 'b0;
+            rd_done <= 'b0;
+        end
+        else begin
+            for (i = 0; i < OUTSTANDING; i = i + 1) begin
+                if (wr_resp_fire & umi_resp_cmd_eom & (resp_tag == i))
+                    wr_done[i] <= 1'b1;
+                else if (axi_bvalid & axi_bready & (wr_head == i))
+                    wr_done[i] <= 1'b0;
+                if (rd_resp_fire & umi_resp_cmd_eom & (resp_tag == i))
+                    rd_done[i] <= 1'b1;
+                else if (axi_rvalid & axi_rready & (rd_head == i))
+                    rd_done[i] <= 1'b0;
+            end
+        end
+    end
+
+    // A response may come back in several pieces, the data of each piece
+    // goes to its byte offset and any error is kept
+    always @(posedge clk) begin
+        for (i = 0; i < OUTSTANDING; i = i + 1) begin
+            if (wr_req_fire & (wr_tail == i))
+                wr_err[i] <= 2'b00;
+            else if (wr_resp_fire & (resp_tag == i) & (wr_err[i] == 2'b00))
+                wr_err[i] <= umi_resp_cmd_err;
+            if (rd_req_fire & (rd_tail == i)) begin
+                rd_err[i]  <= 2'b00;
+                rd_data[i] <= {DW{1'b0}};
+            end
+            else if (rd_resp_fire & (resp_tag == i)) begin
+                if (rd_err[i] == 2'b00)
+                    rd_err[i] <= umi_resp_cmd_err;
+                rd_data[i] <= rd_data[i] | (uhost_resp_data << ({{3{1'b0}}, resp_offset} << 3));
+            end
+        end
+    end
 
     // Read response
-    assign axi_rdata  = uhost_resp_data;
-    assign axi_rresp  = umi_resp_cmd_err;
-    assign axi_rvalid = read_in_flight &
-                        uhost_resp_valid &
-                        (umi_resp_cmd_opcode == UMI_RESP_READ) &
-                        reset_done;
+    assign axi_rdata  = rd_data[rd_head];
+    assign axi_rresp  = rd_err[rd_head];
+    assign axi_rvalid = rd_done[rd_head];
 
     // Write response
-    assign axi_bresp  = umi_resp_cmd_err;
-    assign axi_bvalid = write_in_flight &
-                        uhost_resp_valid &
-                        (umi_resp_cmd_opcode == UMI_RESP_WRITE) &
-                        reset_done;
+    assign axi_bresp  = wr_err[wr_head];
+    assign axi_bvalid = wr_done[wr_head];
 
 endmodule
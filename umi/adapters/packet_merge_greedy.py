@@ -0,0 +1,18 @@
+from umi.common import UMI
+from umi.sumi import Decode
+from umi.sumi import Pack
+from umi.sumi import Unpack
+
+
+class PacketMergeGreedy(UMI):
+    def __init__(self):
+        super().__init__('umi_packet_merge_greedy',
+                         files=['rtl/umi_packet_merge_greedy.v'],
+                         deps=[Decode,
+                               Pack,
+                               Unpack])
+
+
+if __name__ == "__main__":
+    d = PacketMergeGreedy()
+    d.write_fileset(f"{d.name}.f", fileset="rtl")
@@ -25,24 +25,49 @@
  * can also infer that the addresses within a clink/umi connected device is
  * 40 bits wide i.e. a memory space of 1 TiB.
 
- * Limitation:
- * NMAPS parameterization is incomplete
- * Currently NMAPS < 8 will fail and NMAPS > 8 will not have the desired effect
- * beyond 8 remappings.
+ * The ID remap compares the ID bits against all NMAPS old_row_col_address
+ * entries in parallel, the lowest matching entry wins.
+ *
+ * On top of the fixed remap and offset window the module holds a table of
+ * NREGIONS runtime programmable regions. Each region has a base, a mask and
+ * an offset register, a dstaddr with (dstaddr & mask) == base is translated
+ * to dstaddr + offset. All regions are compared in parallel, the lowest
+ * enabled matching region wins and its offset is selected with an AND-OR
+ * mux ahead of a single adder, so the decode stays single cycle.
+ *
+ * Priority: chipid passthrough, region table, offset window, ID remap.
+ *
+ * The table is programmed through a single-port register interface that
+ * matches the register side of umi_regif (with RW=AW). Registers are AW
+ * bits wide, region i occupies four consecutive registers:
+ *
+ * | Register   | Byte address      | Description                 |
+ * |------------|-------------------|-----------------------------|
+ * | BASE[i]    | (4*i+0) * AW/8    | region base address         |
+ * | MASK[i]    | (4*i+1) * AW/8    | dstaddr bits compared       |
+ * | OFFSET[i]  | (4*i+2) * AW/8    | added to matching dstaddr   |
+ * | CTRL[i]    | (4*i+3) * AW/8    | bit 0: region enable        |
+ *
+ * Regions are disabled after reset.
  *
  ******************************************************************************/
 
 `default_nettype wire
 
 module umi_address_remap #(
-    parameter CW    = 32,   // command width
-    parameter AW    = 64,   // address width
-    parameter DW    = 128,  // data width
-    parameter IDW   = 16,   // id width
-    parameter IDSB  = 40,   // id start bit - bit 40 in 64 bit address space
-    parameter NMAPS = 8     // number of remaps
+    parameter CW       = 32,   // command width
+    parameter AW       = 64,   // address width
+    parameter DW       = 128,  // data width
+    parameter IDW      = 16,   // id width
+    parameter IDSB     = 40,   // id start bit - bit 40 in 64 bit address space
+    parameter NMAPS    = 8,    // number of remaps
+    parameter NREGIONS = 8,    // number of programmable regions
+    parameter RAW      = 16    // register address width
 )
 (
+    input                   clk,
+    input                   nreset,
+
     input  [IDW-1:0]        chipid,
 
     input  [IDW*NMAPS-1:0]  old_row_col_address,
@@ -52,6 +77,13 @@ module umi_address_remap #(
     input  [AW-1:0]         set_dstaddress_high,
     input  [AW-1:0]         set_dstaddress_offset,
 
+    // region table register interface
+    input                   reg_write,
+    input                   reg_read,
+    input  [RAW-1:0]        reg_addr,
+    input  [AW-1:0]         reg_wdata,
+    output [AW-1:0]         reg_rdata,
+
     input                   umi_in_valid,
     input  [CW-1:0]         umi_in_cmd,
     input  [AW-1:0]         umi_in_dstaddr,
@@ -67,35 +99,38 @@ module umi_address_remap #(
     input                   umi_out_ready
 );
 
+    localparam RB = $clog2(AW/8);                           // register byte offset bits
+    localparam EW = (NREGIONS > 1) ? $clog2(NREGIONS) : 1;  // region index width
+
     // Address remapping
-    wire [IDW-1:0]  old_row_col_address_unpack [0:NMAPS-1];
-    wire [IDW-1:0]  new_row_col_address_unpack [0:NMAPS-1];
+    wire [IDW-1:0]   dstaddr_id;
+    wire [NMAPS-1:0] map_hit;
+    wire [NMAPS-1:0] map_sel;
+    reg  [IDW-1:0]   map_new;
+
+    assign dstaddr_id = umi_in_dstaddr[(IDSB+IDW-1):IDSB];
 
     genvar i;
     generate
-        for (i = 0; i < NMAPS; i = i + 1) begin
-            assign old_row_col_address_unpack[i] = old_row_col_address[(IDW*(i+1))-1 : (IDW*i)];
-            assign new_row_col_address_unpack[i] = new_row_col_address[(IDW*(i+1))-1 : (IDW*i)];
+        for (i = 0; i < NMAPS; i = i + 1) begin : g_map
+            assign map_hit[i] = dstaddr_id == old_row_col_address[(IDW*(i+1))-1 : (IDW*i)];
         end
     endgenerate
 
-    reg  [IDW-1:0]  dstaddr_upper;
+    // lowest matching entry wins
+    assign map_sel = map_hit & ~(map_hit - 1'b1);
 
+    integer j;
     always @(*) begin
-        // FIXME: Parameterize this
-        case (umi_in_dstaddr[(IDSB+IDW-1):IDSB])
-            old_row_col_address_unpack[0] : dstaddr_upper = new_row_col_address_unpack[0];
-            old_row_col_address_unpack[1] : dstaddr_upper = new_row_col_address_unpack[1];
-            old_row_col_address_unpack[2] : dstaddr_upper = new_row_col_address_unpack[2];
-            old_row_col_address_unpack[3] : dstaddr_upper = new_row_col_address_unpack[3];
-            old_row_col_address_unpack[4] : dstaddr_upper = new_row_col_address_unpack[4];
-            old_row_col_address_unpack[5] : dstaddr_upper = new_row_col_address_unpack[5];
-            old_row_col_address_unpack[6] : dstaddr_upper = new_row_col_address_unpack[6];
-            old_row_col_address_unpack[7] : dstaddr_upper = new_row_col_address_unpack[7];
-            default                       : dstaddr_upper = umi_in_dstaddr[(IDSB+IDW-1):IDSB];
-        endcase
+        map_new = {IDW{1'b0}};
+        for (j = 0; j < NMAPS; j = j + 1)
+            map_new = map_new | ({IDW{map_sel[j]}} & new_row_col_address[(IDW*j)+:IDW]);
     end
 
+    wire [IDW-1:0]  dstaddr_upper;
+
+    assign dstaddr_upper = (|map_hit) ? map_new : dstaddr_id;
+
     wire [AW-1:0]   dstaddr_with_remap;
     generate
         if ((IDSB+IDW) < AW) begin : REMAP_ADDR_WITH_MSB
@@ -116,10 +151,76 @@ module umi_address_remap #(
                                (umi_in_dstaddr <= set_dstaddress_high);
     assign dstaddr_with_offset = umi_in_dstaddr + set_dstaddress_offset;
 
+    // Region table
+    reg  [AW-1:0]       region_base   [0:NREGIONS-1];
+    reg  [AW-1:0]       region_mask   [0:NREGIONS-1];
+    reg  [AW-1:0]       region_offset [0:NREGIONS-1];
+    reg  [NREGIONS-1:0] region_en;
+
+    wire [EW-1:0]       reg_entry;
+    wire [1:0]          reg_field;
+    wire                reg_hit;
+
+    assign reg_entry = reg_addr[RB+2+:EW];
+    assign reg_field = reg_addr[RB+:2];
+    assign reg_hit   = (reg_addr >> (RB+2)) < NREGIONS;
+
+    always @(posedge clk or negedge nreset)
+        if (~nreset)
+            region_en <= {NREGIONS{1'b0}};
+        else if (reg_write & reg_hit & (reg_field == 2'd3))
+            region_en[reg_entry] <= reg_wdata[0];
+
+    always @(posedge clk)
+        if (reg_write & reg_hit)
+            case (reg_field)
+                2'd0    : region_base[reg_entry]   <= reg_wdata;
+                2'd1    : region_mask[reg_entry]   <= reg_wdata;
+                2'd2    : region_offset[reg_entry] <= reg_wdata;
+                default : ;
+            endcase
+
+    reg  [AW-1:0]       reg_rdata_mux;
+
+    always @(*)
+        case (reg_field)
+            2'd0    : reg_rdata_mux = region_base[reg_entry];
+            2'd1    : reg_rdata_mux = region_mask[reg_entry];
+            2'd2    : reg_rdata_mux = region_offset[reg_entry];
+            default : reg_rdata_mux = {{(AW-1){1'b0}}, region_en[reg_entry]};
+        endcase
+
+    assign reg_rdata = (reg_read & reg_hit) ? reg_rdata_mux : {AW{1'b0}};
+
+    wire [NREGIONS-1:0] region_hit;
+    wire [NREGIONS-1:0] region_sel;
+    reg  [AW-1:0]       region_add;
+    wire [AW-1:0]       dstaddr_with_region;
+
+    generate
+        for (i = 0; i < NREGIONS; i = i + 1) begin : g_region
+            assign region_hit[i] = region_en[i] &
+                                   ((umi_in_dstaddr & region_mask[i]) == region_base[i]);
+        end
+    endgenerate
+
+    // lowest matching region wins
+    assign region_sel = region_hit & ~(region_hit - 1'b1);
+
+    always @(*) begin
+        region_add = {AW{1'b0}};
+        for (j = 0; j < NREGIONS; j = j + 1)
+            region_add = region_add | ({AW{region_sel[j]}} & region_offset[j]);
+    end
+
+    assign dstaddr_with_region = umi_in_dstaddr + region_add;
+
     assign umi_out_valid    = umi_in_valid;
     assign umi_out_cmd      = umi_in_cmd;
-    assign umi_out_dstaddr  = (umi_in_dstaddr[(IDSB+IDW-1):IDSB] == chipid) ?
+    assign umi_out_dstaddr  = (dstaddr_id == chipid) ?
                               umi_in_dstaddr :
+                              (|region_hit) ?
+                              dstaddr_with_region :
                               (dstaddr_offset_en ?
                               dstaddr_with_offset :
                               dstaddr_with_remap);
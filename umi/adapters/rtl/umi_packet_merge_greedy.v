@@ -17,6 +17,17 @@
  *
  * Documentation:
  * - Greedy packet merge logic
+ * - LOOKAHEAD = 1 merges each packet with the one before it when it
+ *   continues it (same fields, contiguous dstaddr/srcaddr) and fits in ODW.
+ * - LOOKAHEAD > 1 keeps up to LOOKAHEAD packets open in merge slots, one
+ *   per destination stream, so that interleaved streams still coalesce
+ *   into ODW packets. A slot is sent out when it is full, at EOM, when it
+ *   has waited TIMEOUT cycles or when its space is needed. Slots are sent
+ *   out in the order they were opened. A packet only merges into the
+ *   youngest slot of its HOSTID, so packets of one host never overtake
+ *   each other (README 3.1), and a packet overlapping the bytes of
+ *   another slot waits until that slot is out, so accesses to the same
+ *   address stay in order. Packets of different hosts may be reordered.
  *
  ******************************************************************************/
 
@@ -26,7 +37,9 @@ module umi_packet_merge_greedy #(
     parameter CW    = 32,   // command width
     parameter AW    = 64,   // address width
     parameter IDW   = 64,   // input data width
-    parameter ODW   = 2*IDW // output data width (requirement: >= 2x input data width)
+    parameter ODW   = 2*IDW,    // output data width (requirement: >= 2x input data width)
+    parameter LOOKAHEAD = 1,    // merge slots, 1 merges consecutive packets only
+    parameter TIMEOUT   = 16    // cycles a slot waits for packets (LOOKAHEAD > 1)
 )
 (
     input               clk,
@@ -47,6 +60,8 @@ module umi_packet_merge_greedy #(
     input               umi_out_ready
 );
 
+    `include "umi_messages.vh"
+
     reg [1:0]   reset_done;
 
     always @(posedge clk or negedge nreset) begin
@@ -98,6 +113,7 @@ module umi_packet_merge_greedy #(
         .cmd_hostid         (umi_in_cmd_hostid)
     );
 
+    wire umi_in_opcode_check;
     wire umi_in_cmd_read;
     wire umi_in_cmd_write;
     wire umi_in_cmd_write_posted;
@@ -144,275 +160,460 @@ module umi_packet_merge_greedy #(
         .cmd_atomic_swap    ()
     );
 
-    reg                     umi_in_valid_r;
-    wire                    umi_in_ready_r;
-    wire                    umi_in_cmd_commit_r;
+    assign umi_in_opcode_check = umi_in_cmd_read |
+                                 umi_in_cmd_write |
+                                 umi_in_cmd_write_posted |
+                                 umi_in_cmd_rdma |
+                                 umi_in_cmd_read_resp |
+                                 umi_in_cmd_write_resp;
 
-    reg [15:0]              byte_counter;
-    localparam [$clog2(ODW/8):0]    ODW_BYTES = ODW[3+$clog2(ODW/8):3];
-    localparam                      ADDR_PAD_BYTES = AW - 1 - $clog2(ODW/8);
+    generate
+    if (LOOKAHEAD > 1) begin : g_lookahead
+
+        localparam SW = $clog2(LOOKAHEAD+1);
+        localparam TW = $clog2(TIMEOUT+1);
+        localparam [15:0] ODW_BYTES = ODW/8;
+
+        // Fields that have to match to merge (all but LEN and EOM)
+        localparam [CW-1:0] CMD_MATCH = {{(CW-UMI_EOM_BIT-1){1'b1}}, 1'b0,
+                                         {(UMI_EOM_BIT-UMI_LEN_MSB-1){1'b1}},
+                                         {(UMI_LEN_MSB-UMI_LEN_LSB+1){1'b0}},
+                                         {UMI_LEN_LSB{1'b1}}};
+
+        // Merge slots, slot 0 holds the oldest packet and is the next one out
+        reg  [LOOKAHEAD-1:0]    slot_valid;
+        reg  [LOOKAHEAD-1:0]    slot_closed;
+        reg  [SW-1:0]           slot_count;
+        reg  [CW-1:0]           slot_cmd     [0:LOOKAHEAD-1];
+        reg  [AW-1:0]           slot_dstaddr [0:LOOKAHEAD-1];
+        reg  [AW-1:0]           slot_srcaddr [0:LOOKAHEAD-1];
+        reg  [AW-1:0]           slot_dstnext [0:LOOKAHEAD-1];
+        reg  [AW-1:0]           slot_srcnext [0:LOOKAHEAD-1];
+        reg  [15:0]             slot_bytes   [0:LOOKAHEAD-1];
+        reg  [ODW-1:0]          slot_data    [0:LOOKAHEAD-1];
+        reg  [TW-1:0]           slot_age     [0:LOOKAHEAD-1];
+
+        wire [8:0]              in_len_plus_one;
+        wire [15:0]             in_bytes;
+        wire [ODW-1:0]          in_data;
+        wire                    in_mergeable;
+        wire                    in_eom;
+
+        reg  [LOOKAHEAD-1:0]    hit;
+        reg  [LOOKAHEAD-1:0]    younger;
+        reg  [LOOKAHEAD-1:0]    conflict;
+        reg  [LOOKAHEAD-1:0]    merge;
+        reg  [LOOKAHEAD-1:0]    close;
+
+        wire                    pop;
+        wire [SW-1:0]           alloc_pos;
+        wire                    alloc_ok;
+        wire                    merge_ok;
+        wire                    do_alloc;
+        wire                    do_merge;
+        wire                    stall;
+
+        integer                 i;
+        integer                 j;
+        integer                 k;
+
+        assign in_len_plus_one = umi_in_cmd_len + 1;
+        assign in_bytes = {7'b0, in_len_plus_one} << umi_in_cmd_size;
+        assign in_data  = {{(ODW-IDW){1'b0}}, umi_in_data} & ((1 << (in_bytes*8)) - 1);
+        assign in_eom   = umi_in_cmd_eom;
+
+        assign in_mergeable = umi_in_opcode_check & ~umi_in_cmd_ex;
+
+        // A packet merges into the open slot it continues, as long as no
+        // younger slot holds a packet of the same host, which would then be
+        // overtaken. A packet that overlaps another slot waits until the
+        // older slots are sent out.
+        always @(*) begin
+            for (i = 0; i < LOOKAHEAD; i = i + 1) begin
+                younger[i] = 1'b0;
+                for (j = i + 1; j < LOOKAHEAD; j = j + 1)
+                    if (slot_valid[j] &
+                        (slot_cmd[j][UMI_HOSTID_MSB:UMI_HOSTID_LSB] == umi_in_cmd_hostid))
+                        younger[i] = 1'b1;
+                hit[i] = slot_valid[i] & ~slot_closed[i] & in_mergeable & ~younger[i] &
+                         ~|((slot_cmd[i] ^ umi_in_cmd) & CMD_MATCH) &
+                         (umi_in_dstaddr == slot_dstnext[i]) &
+                         (umi_in_srcaddr == slot_srcnext[i]) &
+                         ((slot_bytes[i] + in_bytes) <= ODW_BYTES);
+                conflict[i] = slot_valid[i] &
+                              (~in_mergeable |
+                               ((umi_in_dstaddr < slot_dstnext[i]) &
+                                (slot_dstaddr[i] < (umi_in_dstaddr + in_bytes))));
+            end
+        end
 
-    assign umi_in_cmd_commit_r = umi_in_ready_r & umi_in_valid_r;
-    assign umi_in_ready = reset_done[1] & (~umi_in_valid_r | umi_in_ready_r);
-    assign umi_in_ready_r = umi_out_cmd_commit |
-                            (umi_in_mergeable_r & ((byte_counter + umi_in_bytes_r) <= ODW_BYTES)) |
-                            (byte_counter == 0);
+        assign pop       = slot_valid[0] & slot_closed[0] & umi_out_ready;
+        assign alloc_pos = slot_count - pop;
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            umi_in_valid_r <= 1'b0;
-        end
-        else begin
-            if (umi_in_cmd_commit)
-                umi_in_valid_r <= 1'b1;
-            else if (umi_in_cmd_commit_r)
-                umi_in_valid_r <= 1'b0;
-        end
-    end
+        assign merge_ok = |hit & ~|conflict;
+        assign alloc_ok = ~|hit & ~|conflict & (alloc_pos < LOOKAHEAD);
 
-    reg  [4:0]              umi_in_cmd_opcode_r;
-    reg  [2:0]              umi_in_cmd_size_r;
-    reg  [7:0]              umi_in_cmd_len_r;
-    reg  [7:0]              umi_in_cmd_atype_r;
-    reg  [3:0]              umi_in_cmd_qos_r;
-    reg  [1:0]              umi_in_cmd_prot_r;
-    reg                     umi_in_cmd_eom_r;
-    reg                     umi_in_cmd_eof_r;
-    reg                     umi_in_cmd_ex_r;
-    reg  [1:0]              umi_in_cmd_user_r;
-    reg  [23:0]             umi_in_cmd_user_extended_r;
-    reg  [1:0]              umi_in_cmd_err_r;
-    reg  [4:0]              umi_in_cmd_hostid_r;
-
-    reg [AW-1:0]            umi_in_dstaddr_r;
-    reg [AW-1:0]            umi_in_srcaddr_r;
+        assign umi_in_ready = reset_done[1] & (merge_ok | alloc_ok);
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            umi_in_cmd_opcode_r         <= 'b0;
-            umi_in_cmd_size_r           <= 'b0;
-            umi_in_cmd_len_r            <= 'b0;
-            umi_in_cmd_atype_r          <= 'b0;
-            umi_in_cmd_qos_r            <= 'b0;
-            umi_in_cmd_prot_r           <= 'b0;
-            umi_in_cmd_eom_r            <= 'b0;
-            umi_in_cmd_eof_r            <= 'b0;
-            umi_in_cmd_ex_r             <= 'b0;
-            umi_in_cmd_user_r           <= 'b0;
-            umi_in_cmd_user_extended_r  <= 'b0;
-            umi_in_cmd_err_r            <= 'b0;
-            umi_in_cmd_hostid_r         <= 'b0;
-            umi_in_dstaddr_r            <= 'b0;
-            umi_in_srcaddr_r            <= 'b0;
-        end
-        else if (umi_in_cmd_commit) begin
-            umi_in_cmd_opcode_r         <= umi_in_cmd_opcode;
-            umi_in_cmd_size_r           <= umi_in_cmd_size;
-            umi_in_cmd_len_r            <= umi_in_cmd_len;
-            umi_in_cmd_atype_r          <= umi_in_cmd_atype;
-            umi_in_cmd_qos_r            <= umi_in_cmd_qos;
-            umi_in_cmd_prot_r           <= umi_in_cmd_prot;
-            umi_in_cmd_eom_r            <= umi_in_cmd_eom;
-            umi_in_cmd_eof_r            <= umi_in_cmd_eof;
-            umi_in_cmd_ex_r             <= umi_in_cmd_ex;
-            umi_in_cmd_user_r           <= umi_in_cmd_user;
-            umi_in_cmd_user_extended_r  <= umi_in_cmd_user_extended;
-            umi_in_cmd_err_r            <= umi_in_cmd_err;
-            umi_in_cmd_hostid_r         <= umi_in_cmd_hostid;
-            umi_in_dstaddr_r            <= umi_in_dstaddr;
-            umi_in_srcaddr_r            <= umi_in_srcaddr;
+        assign do_merge = umi_in_cmd_commit & merge_ok;
+        assign do_alloc = umi_in_cmd_commit & alloc_ok;
+        assign stall    = umi_in_valid & ~umi_in_ready & reset_done[1];
+
+        always @(*) begin
+            merge = 'b0;
+            for (i = LOOKAHEAD-1; i >= 0; i = i - 1)
+                if (hit[i]) begin
+                    merge = 'b0;
+                    merge[i] = do_merge;
+                end
         end
-    end
 
-    reg [IDW-1:0]           umi_in_data_r;
+        // Slots are closed (sent out in order) when full, at EOM, when
+        // they time out or to make room for a waiting packet
+        always @(*) begin
+            for (i = 0; i < LOOKAHEAD; i = i + 1)
+                close[i] = (slot_age[i] >= (TIMEOUT - 1)) |
+                           (stall & |conflict) |
+                           (stall & ~|conflict & (i == 0)) |
+                           (merge[i] & (in_eom | ((slot_bytes[i] + in_bytes) == ODW_BYTES)));
+        end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset)
-            umi_in_data_r <= 'b0;
-        else if (umi_in_cmd_commit)
-            umi_in_data_r <= umi_in_data;
-    end
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
+                slot_valid  <= 'b0;
+                slot_closed <= 'b0;
+                slot_count  <= 'b0;
+            end
+            else begin
+                for (i = 0; i < LOOKAHEAD; i = i + 1) begin
+                    k = i + pop;
+                    if (do_alloc & (i == alloc_pos)) begin
+                        slot_valid[i]  <= 1'b1;
+                        slot_closed[i] <= in_eom | ~in_mergeable | (in_bytes >= ODW_BYTES);
+                    end
+                    else if (k < LOOKAHEAD) begin
+                        slot_valid[i]  <= slot_valid[k];
+                        slot_closed[i] <= slot_valid[k] & (slot_closed[k] | close[k]);
+                    end
+                    else begin
+                        slot_valid[i]  <= 1'b0;
+                        slot_closed[i] <= 1'b0;
+                    end
+                end
+                slot_count <= alloc_pos + {{(SW-1){1'b0}}, do_alloc};
+            end
+        end
 
-    wire                    umi_in_opcode_check;
-    wire                    umi_in_field_match;
-    wire                    umi_in_mergeable;
-    wire [15:0]             umi_in_bytes;
-    reg                     umi_in_mergeable_r;
-    reg  [15:0]             umi_in_bytes_r;
+        always @(posedge clk) begin
+            for (i = 0; i < LOOKAHEAD; i = i + 1) begin
+                k = i + pop;
+                if (do_alloc & (i == alloc_pos)) begin
+                    slot_cmd[i]     <= umi_in_cmd;
+                    slot_dstaddr[i] <= umi_in_dstaddr;
+                    slot_srcaddr[i] <= umi_in_srcaddr;
+                    slot_dstnext[i] <= umi_in_dstaddr + in_bytes;
+                    slot_srcnext[i] <= umi_in_srcaddr + in_bytes;
+                    slot_bytes[i]   <= in_bytes;
+                    slot_data[i]    <= in_data;
+                    slot_age[i]     <= 'b0;
+                end
+                else if (k < LOOKAHEAD) begin
+                    slot_cmd[i]     <= merge[k] ? umi_in_cmd : slot_cmd[k];
+                    slot_dstaddr[i] <= slot_dstaddr[k];
+                    slot_srcaddr[i] <= slot_srcaddr[k];
+                    slot_dstnext[i] <= slot_dstnext[k] + (merge[k] ? in_bytes : 16'd0);
+                    slot_srcnext[i] <= slot_srcnext[k] + (merge[k] ? in_bytes : 16'd0);
+                    slot_bytes[i]   <= slot_bytes[k] + (merge[k] ? in_bytes : 16'd0);
+                    slot_data[i]    <= merge[k] ? (slot_data[k] | (in_data << (slot_bytes[k]*8))) :
+                                                  slot_data[k];
+                    slot_age[i]     <= (slot_age[k] == TIMEOUT[TW-1:0]) ? slot_age[k] :
+                                                                          slot_age[k] + 1'b1;
+                end
+            end
+        end
 
-    reg [AW-1:0]            umi_in_dstaddr_nx;
-    reg [AW-1:0]            umi_in_srcaddr_nx;
+        wire [15:0]             umi_out_cmd_len_m;
 
-    assign umi_in_opcode_check = umi_in_cmd_read |
-                                 umi_in_cmd_write |
-                                 umi_in_cmd_write_posted |
-                                 umi_in_cmd_rdma |
-                                 umi_in_cmd_read_resp |
-                                 umi_in_cmd_write_resp;
+        assign umi_out_cmd_len_m = (slot_bytes[0] >> slot_cmd[0][UMI_SIZE_MSB:UMI_SIZE_LSB]) - 1;
 
-    assign umi_in_field_match = (umi_in_cmd_opcode == umi_in_cmd_opcode_r) &
-                                (umi_in_cmd_size   == umi_in_cmd_size_r  ) &
-                                (umi_in_cmd_qos    == umi_in_cmd_qos_r   ) &
-                                (umi_in_cmd_prot   == umi_in_cmd_prot_r  ) &
-                                (umi_in_cmd_eof    == umi_in_cmd_eof_r   ) &
-                                (umi_in_cmd_user   == umi_in_cmd_user_r  ) &
-                                (umi_in_cmd_err    == umi_in_cmd_err_r   ) &
-                                (umi_in_cmd_hostid == umi_in_cmd_hostid_r) &
-                                (umi_in_dstaddr    == umi_in_dstaddr_nx  ) &
-                                (umi_in_srcaddr    == umi_in_srcaddr_nx  ) &
-                                ~umi_in_cmd_ex;
-
-    assign umi_in_mergeable = umi_in_cmd_commit &
-                              umi_in_opcode_check &
-                              umi_in_field_match;
-
-    wire [8:0]  umi_in_cmd_len_plus_one = umi_in_cmd_len + 1;
-    assign umi_in_bytes = {7'b0, umi_in_cmd_len_plus_one} << umi_in_cmd_size;
+        // The LEN field of an atomic holds the atomic type, atomics are
+        // never merged and keep their command
+        assign umi_out_valid   = slot_valid[0] & slot_closed[0];
+        assign umi_out_cmd     = (slot_cmd[0][UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_ATOMIC) ?
+                                 slot_cmd[0] :
+                                 {slot_cmd[0][CW-1:UMI_LEN_MSB+1],
+                                  umi_out_cmd_len_m[7:0],
+                                  slot_cmd[0][UMI_LEN_LSB-1:0]};
+        assign umi_out_dstaddr = slot_dstaddr[0];
+        assign umi_out_srcaddr = slot_srcaddr[0];
+        assign umi_out_data    = slot_data[0];
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset)
-            umi_in_mergeable_r <= 1'b0;
-        else if (umi_in_cmd_commit)
-            umi_in_mergeable_r <= umi_in_mergeable;
-        else if (umi_in_cmd_commit_r)
-            umi_in_mergeable_r <= 1'b0;
     end
+    else begin : g_greedy
+        reg                     umi_in_valid_r;
+        wire                    umi_in_ready_r;
+        wire                    umi_in_cmd_commit_r;
+
+        reg [15:0]              byte_counter;
+        reg                     umi_in_mergeable_r;
+        reg  [15:0]             umi_in_bytes_r;
+        localparam [$clog2(ODW/8):0]    ODW_BYTES = ODW[3+$clog2(ODW/8):3];
+        localparam                      ADDR_PAD_BYTES = AW - 1 - $clog2(ODW/8);
+
+        assign umi_in_cmd_commit_r = umi_in_ready_r & umi_in_valid_r;
+        assign umi_in_ready = reset_done[1] & (~umi_in_valid_r | umi_in_ready_r);
+        assign umi_in_ready_r = umi_out_cmd_commit |
+                                (umi_in_mergeable_r & ((byte_counter + umi_in_bytes_r) <= ODW_BYTES)) |
+                                (byte_counter == 0);
+
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
+                umi_in_valid_r <= 1'b0;
+            end
+            else begin
+                if (umi_in_cmd_commit)
+                    umi_in_valid_r <= 1'b1;
+                else if (umi_in_cmd_commit_r)
+                    umi_in_valid_r <= 1'b0;
+            end
+        end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset)
-            umi_in_bytes_r <= 'b0;
-        else if (umi_in_cmd_commit)
-            umi_in_bytes_r <= umi_in_bytes;
-    end
+        reg  [4:0]              umi_in_cmd_opcode_r;
+        reg  [2:0]              umi_in_cmd_size_r;
+        reg  [7:0]              umi_in_cmd_len_r;
+        reg  [7:0]              umi_in_cmd_atype_r;
+        reg  [3:0]              umi_in_cmd_qos_r;
+        reg  [1:0]              umi_in_cmd_prot_r;
+        reg                     umi_in_cmd_eom_r;
+        reg                     umi_in_cmd_eof_r;
+        reg                     umi_in_cmd_ex_r;
+        reg  [1:0]              umi_in_cmd_user_r;
+        reg  [23:0]             umi_in_cmd_user_extended_r;
+        reg  [1:0]              umi_in_cmd_err_r;
+        reg  [4:0]              umi_in_cmd_hostid_r;
+
+        reg [AW-1:0]            umi_in_dstaddr_r;
+        reg [AW-1:0]            umi_in_srcaddr_r;
+
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
+                umi_in_cmd_opcode_r         <= 'b0;
+                umi_in_cmd_size_r           <= 'b0;
+                umi_in_cmd_len_r            <= 'b0;
+                umi_in_cmd_atype_r          <= 'b0;
+                umi_in_cmd_qos_r            <= 'b0;
+                umi_in_cmd_prot_r           <= 'b0;
+                umi_in_cmd_eom_r            <= 'b0;
+                umi_in_cmd_eof_r            <= 'b0;
+                umi_in_cmd_ex_r             <= 'b0;
+                umi_in_cmd_user_r           <= 'b0;
+                umi_in_cmd_user_extended_r  <= 'b0;
+                umi_in_cmd_err_r            <= 'b0;
+                umi_in_cmd_hostid_r         <= 'b0;
+                umi_in_dstaddr_r            <= 'b0;
+                umi_in_srcaddr_r            <= 'b0;
+            end
+            else if (umi_in_cmd_commit) begin
+                umi_in_cmd_opcode_r         <= umi_in_cmd_opcode;
+                umi_in_cmd_size_r           <= umi_in_cmd_size;
+                umi_in_cmd_len_r            <= umi_in_cmd_len;
+                umi_in_cmd_atype_r          <= umi_in_cmd_atype;
+                umi_in_cmd_qos_r            <= umi_in_cmd_qos;
+                umi_in_cmd_prot_r           <= umi_in_cmd_prot;
+                umi_in_cmd_eom_r            <= umi_in_cmd_eom;
+                umi_in_cmd_eof_r            <= umi_in_cmd_eof;
+                umi_in_cmd_ex_r             <= umi_in_cmd_ex;
+                umi_in_cmd_user_r           <= umi_in_cmd_user;
+                umi_in_cmd_user_extended_r  <= umi_in_cmd_user_extended;
+                umi_in_cmd_err_r            <= umi_in_cmd_err;
+                umi_in_cmd_hostid_r         <= umi_in_cmd_hostid;
+                umi_in_dstaddr_r            <= umi_in_dstaddr;
+                umi_in_srcaddr_r            <= umi_in_srcaddr;
+            end
+        end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            umi_in_dstaddr_nx <= 'b0;
-            umi_in_srcaddr_nx <= 'b0;
+        reg [IDW-1:0]           umi_in_data_r;
+
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset)
+                umi_in_data_r <= 'b0;
+            else if (umi_in_cmd_commit)
+                umi_in_data_r <= umi_in_data;
         end
-        else if (umi_in_cmd_commit) begin
-            umi_in_dstaddr_nx <= umi_in_dstaddr + umi_in_bytes;
-            umi_in_srcaddr_nx <= umi_in_srcaddr + umi_in_bytes;
+
+        wire                    umi_in_field_match;
+        wire                    umi_in_mergeable;
+        wire [15:0]             umi_in_bytes;
+
+        reg [AW-1:0]            umi_in_dstaddr_nx;
+        reg [AW-1:0]            umi_in_srcaddr_nx;
+
+        assign umi_in_field_match = (umi_in_cmd_opcode == umi_in_cmd_opcode_r) &
+                                    (umi_in_cmd_size   == umi_in_cmd_size_r  ) &
+                                    (umi_in_cmd_qos    == umi_in_cmd_qos_r   ) &
+                                    (umi_in_cmd_prot   == umi_in_cmd_prot_r  ) &
+                                    (umi_in_cmd_eof    == umi_in_cmd_eof_r   ) &
+                                    (umi_in_cmd_user   == umi_in_cmd_user_r  ) &
+                                    (umi_in_cmd_err    == umi_in_cmd_err_r   ) &
+                                    (umi_in_cmd_hostid == umi_in_cmd_hostid_r) &
+                                    (umi_in_dstaddr    == umi_in_dstaddr_nx  ) &
+                                    (umi_in_srcaddr    == umi_in_srcaddr_nx  ) &
+                                    ~umi_in_cmd_ex;
+
+        assign umi_in_mergeable = umi_in_cmd_commit &
+                                  umi_in_opcode_check &
+                                  umi_in_field_match;
+
+        wire [8:0]  umi_in_cmd_len_plus_one = umi_in_cmd_len + 1;
+        assign umi_in_bytes = {7'b0, umi_in_cmd_len_plus_one} << umi_in_cmd_size;
+
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset)
+                umi_in_mergeable_r <= 1'b0;
+            else if (umi_in_cmd_commit)
+                umi_in_mergeable_r <= umi_in_mergeable;
+            else if (umi_in_cmd_commit_r)
+                umi_in_mergeable_r <= 1'b0;
         end
-    end
 
-    reg  [4:0]              umi_out_cmd_opcode_r;
-    reg  [2:0]              umi_out_cmd_size_r;
-    reg  [7:0]              umi_out_cmd_atype_r;
-    reg  [3:0]              umi_out_cmd_qos_r;
-    reg  [1:0]              umi_out_cmd_prot_r;
-    reg                     umi_out_cmd_eom_r;
-    reg                     umi_out_cmd_eof_r;
-    reg                     umi_out_cmd_ex_r;
-    reg  [1:0]              umi_out_cmd_user_r;
-    reg  [23:0]             umi_out_cmd_user_extended_r;
-    reg  [1:0]              umi_out_cmd_err_r;
-    reg  [4:0]              umi_out_cmd_hostid_r;
-    reg  [AW-1:0]           umi_out_dstaddr_r;
-    reg  [AW-1:0]           umi_out_srcaddr_r;
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset)
+                umi_in_bytes_r <= 'b0;
+            else if (umi_in_cmd_commit)
+                umi_in_bytes_r <= umi_in_bytes;
+        end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            umi_out_cmd_opcode_r        <= 'b0;
-            umi_out_cmd_size_r          <= 'b0;
-            umi_out_cmd_atype_r         <= 'b0;
-            umi_out_cmd_qos_r           <= 'b0;
-            umi_out_cmd_prot_r          <= 'b0;
-            umi_out_cmd_eom_r           <= 'b0;
-            umi_out_cmd_eof_r           <= 'b0;
-            umi_out_cmd_ex_r            <= 'b0;
-            umi_out_cmd_user_r          <= 'b0;
-            umi_out_cmd_user_extended_r <= 'b0;
-            umi_out_cmd_err_r           <= 'b0;
-            umi_out_cmd_hostid_r        <= 'b0;
-            umi_out_dstaddr_r           <= 'b0;
-            umi_out_srcaddr_r           <= 'b0;
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
+                umi_in_dstaddr_nx <= 'b0;
+                umi_in_srcaddr_nx <= 'b0;
+            end
+            else if (umi_in_cmd_commit) begin
+                umi_in_dstaddr_nx <= umi_in_dstaddr + umi_in_bytes;
+                umi_in_srcaddr_nx <= umi_in_srcaddr + umi_in_bytes;
+            end
         end
-        else if (umi_in_cmd_commit_r) begin
-            umi_out_cmd_opcode_r        <= umi_in_cmd_opcode_r;
-            umi_out_cmd_size_r          <= umi_in_cmd_size_r;
-            umi_out_cmd_atype_r         <= umi_in_cmd_atype_r;
-            umi_out_cmd_qos_r           <= umi_in_cmd_qos_r;
-            umi_out_cmd_prot_r          <= umi_in_cmd_prot_r;
-            umi_out_cmd_eom_r           <= umi_in_cmd_eom_r;
-            umi_out_cmd_eof_r           <= umi_in_cmd_eof_r;
-            umi_out_cmd_ex_r            <= umi_in_cmd_ex_r;
-            umi_out_cmd_user_r          <= umi_in_cmd_user_r;
-            umi_out_cmd_user_extended_r <= umi_in_cmd_user_extended_r;
-            umi_out_cmd_err_r           <= umi_in_cmd_err_r;
-            umi_out_cmd_hostid_r        <= umi_in_cmd_hostid_r;
-
-            if ((byte_counter == 0) | umi_out_cmd_commit) begin
-                umi_out_dstaddr_r       <= umi_in_dstaddr_r;
-                umi_out_srcaddr_r       <= umi_in_srcaddr_r;
+
+        reg  [4:0]              umi_out_cmd_opcode_r;
+        reg  [2:0]              umi_out_cmd_size_r;
+        reg  [7:0]              umi_out_cmd_atype_r;
+        reg  [3:0]              umi_out_cmd_qos_r;
+        reg  [1:0]              umi_out_cmd_prot_r;
+        reg                     umi_out_cmd_eom_r;
+        reg                     umi_out_cmd_eof_r;
+        reg                     umi_out_cmd_ex_r;
+        reg  [1:0]              umi_out_cmd_user_r;
+        reg  [23:0]             umi_out_cmd_user_extended_r;
+        reg  [1:0]              umi_out_cmd_err_r;
+        reg  [4:0]              umi_out_cmd_hostid_r;
+        reg  [AW-1:0]           umi_out_dstaddr_r;
+        reg  [AW-1:0]           umi_out_srcaddr_r;
+
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
+                umi_out_cmd_opcode_r        <= 'b0;
+                umi_out_cmd_size_r          <= 'b0;
+                umi_out_cmd_atype_r         <= 'b0;
+                umi_out_cmd_qos_r           <= 'b0;
+                umi_out_cmd_prot_r          <= 'b0;
+                umi_out_cmd_eom_r           <= 'b0;
+                umi_out_cmd_eof_r           <= 'b0;
+                umi_out_cmd_ex_r            <= 'b0;
+                umi_out_cmd_user_r          <= 'b0;
+                umi_out_cmd_user_extended_r <= 'b0;
+                umi_out_cmd_err_r           <= 'b0;
+                umi_out_cmd_hostid_r        <= 'b0;
+                umi_out_dstaddr_r           <= 'b0;
+                umi_out_srcaddr_r           <= 'b0;
+            end
+            else if (umi_in_cmd_commit_r) begin
+                umi_out_cmd_opcode_r        <= umi_in_cmd_opcode_r;
+                umi_out_cmd_size_r          <= umi_in_cmd_size_r;
+                umi_out_cmd_atype_r         <= umi_in_cmd_atype_r;
+                umi_out_cmd_qos_r           <= umi_in_cmd_qos_r;
+                umi_out_cmd_prot_r          <= umi_in_cmd_prot_r;
+                umi_out_cmd_eom_r           <= umi_in_cmd_eom_r;
+                umi_out_cmd_eof_r           <= umi_in_cmd_eof_r;
+                umi_out_cmd_ex_r            <= umi_in_cmd_ex_r;
+                umi_out_cmd_user_r          <= umi_in_cmd_user_r;
+                umi_out_cmd_user_extended_r <= umi_in_cmd_user_extended_r;
+                umi_out_cmd_err_r           <= umi_in_cmd_err_r;
+                umi_out_cmd_hostid_r        <= umi_in_cmd_hostid_r;
+
+                if ((byte_counter == 0) | umi_out_cmd_commit) begin
+                    umi_out_dstaddr_r       <= umi_in_dstaddr_r;
+                    umi_out_srcaddr_r       <= umi_in_srcaddr_r;
+                end
             end
         end
-    end
 
-    assign umi_out_dstaddr  = umi_out_dstaddr_r;
-    assign umi_out_srcaddr  = umi_out_srcaddr_r;
-    assign umi_out_valid = ((~umi_in_mergeable_r | umi_out_cmd_eom_r) & |byte_counter) |
-                           ((byte_counter + umi_in_bytes_r) > ODW_BYTES);
+        assign umi_out_dstaddr  = umi_out_dstaddr_r;
+        assign umi_out_srcaddr  = umi_out_srcaddr_r;
+        assign umi_out_valid = ((~umi_in_mergeable_r | umi_out_cmd_eom_r) & |byte_counter) |
+                               ((byte_counter + umi_in_bytes_r) > ODW_BYTES);
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            byte_counter <= 'b0;
-        end
-        else begin
-            if (umi_in_cmd_commit_r & umi_out_cmd_commit)
-                byte_counter <= umi_in_bytes_r;
-            else if (umi_in_cmd_commit_r)
-                byte_counter <= byte_counter + umi_in_bytes_r;
-            else if (umi_out_cmd_commit)
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
                 byte_counter <= 'b0;
+            end
+            else begin
+                if (umi_in_cmd_commit_r & umi_out_cmd_commit)
+                    byte_counter <= umi_in_bytes_r;
+                else if (umi_in_cmd_commit_r)
+                    byte_counter <= byte_counter + umi_in_bytes_r;
+                else if (umi_out_cmd_commit)
+                    byte_counter <= 'b0;
+            end
         end
-    end
 
-    wire [ODW-1:0]  umi_in_data_masked;
-    reg  [ODW-1:0]  umi_out_data_r;
+        wire [ODW-1:0]  umi_in_data_masked;
+        reg  [ODW-1:0]  umi_out_data_r;
 
-    assign umi_in_data_masked = {{(ODW-IDW){1'b0}},umi_in_data_r} & ((1 << (umi_in_bytes_r*8))-1);
+        assign umi_in_data_masked = {{(ODW-IDW){1'b0}},umi_in_data_r} & ((1 << (umi_in_bytes_r*8))-1);
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            umi_out_data_r <= 'b0;
-        end
-        else begin
-            if (umi_out_cmd_commit & umi_in_cmd_commit_r)
-                umi_out_data_r <= umi_in_data_masked;
-            else if (umi_in_cmd_commit_r)
-                umi_out_data_r <= umi_out_data_r | (umi_in_data_masked << (byte_counter*8));
-            else if (umi_out_cmd_commit)
+        always @(posedge clk or negedge nreset) begin
+            if (~nreset) begin
                 umi_out_data_r <= 'b0;
+            end
+            else begin
+                if (umi_out_cmd_commit & umi_in_cmd_commit_r)
+                    umi_out_data_r <= umi_in_data_masked;
+                else if (umi_in_cmd_commit_r)
+                    umi_out_data_r <= umi_out_data_r | (umi_in_data_masked << (byte_counter*8));
+                else if (umi_out_cmd_commit)
+                    umi_out_data_r <= 'b0;
+            end
         end
-    end
-
-    wire [15:0]             umi_out_cmd_len_m;
 
-    assign umi_out_cmd_len_m = (byte_counter >> umi_out_cmd_size_r) - 1;
+        wire [15:0]             umi_out_cmd_len_m;
+
+        assign umi_out_cmd_len_m = (byte_counter >> umi_out_cmd_size_r) - 1;
+
+        umi_pack #(
+            .CW                 (CW)
+        ) umi_pack_i (
+            // Command inputs
+            .cmd_opcode         (umi_out_cmd_opcode_r),
+            .cmd_size           (umi_out_cmd_size_r),
+            .cmd_len            (umi_out_cmd_len_m[7:0]),
+            .cmd_atype          (umi_out_cmd_atype_r),
+            .cmd_qos            (umi_out_cmd_qos_r),
+            .cmd_prot           (umi_out_cmd_prot_r),
+            .cmd_eom            (umi_out_cmd_eom_r),
+            .cmd_eof            (umi_out_cmd_eof_r),
+            .cmd_ex             (umi_out_cmd_ex_r),
+            .cmd_user           (umi_out_cmd_user_r),
+            .cmd_user_extended  (umi_out_cmd_user_extended_r),
+            .cmd_err            (umi_out_cmd_err_r),
+            .cmd_hostid         (umi_out_cmd_hostid_r),
+
+            // Output packet
+            .packet_cmd         (umi_out_cmd)
+        );
+
+        assign umi_out_data = umi_out_data_r;
 
-    umi_pack #(
-        .CW                 (CW)
-    ) umi_pack_i (
-        // Command inputs
-        .cmd_opcode         (umi_out_cmd_opcode_r),
-        .cmd_size           (umi_out_cmd_size_r),
-        .cmd_len            (umi_out_cmd_len_m[7:0]),
-        .cmd_atype          (umi_out_cmd_atype_r),
-        .cmd_qos            (umi_out_cmd_qos_r),
-        .cmd_prot           (umi_out_cmd_prot_r),
-        .cmd_eom            (umi_out_cmd_eom_r),
-        .cmd_eof            (umi_out_cmd_eof_r),
-        .cmd_ex             (umi_out_cmd_ex_r),
-        .cmd_user           (umi_out_cmd_user_r),
-        .cmd_user_extended  (umi_out_cmd_user_extended_r),
-        .cmd_err            (umi_out_cmd_err_r),
-        .cmd_hostid         (umi_out_cmd_hostid_r),
-
-        // Output packet
-        .packet_cmd         (umi_out_cmd)
-    );
-
-    assign umi_out_data = umi_out_data_r;
+    end
+    endgenerate
 
 endmodule
@@ -102,20 +102,14 @@ module tb_tl2umi_np #(
     wire [DW-1:0]   uhost_resp_data;
     wire            uhost_resp_ready;
 
-    tl2umi_np #(
+    tl2umi #(
         .CW         (CW),
         .AW         (AW),
         .DW         (DW)
     ) dut (
         .clk                (clk),
         .nreset             (nreset),
-
-
-        // FIXME: The bottom 4 bits of chipid are kept 4'b0001.
-        // This hack is to ensure that the memory agent responds on its UMI(0,0)
-        // This needs to be fixed either by using a correct address map or
-        // enabling all 4 ports. Priority is low.
-        .chipid             (16'hAE51),
+        .srcaddr            (64'h0000_AE51_0000_0000),
 
         .tl_a_ready         (tl_a_ready),
         .tl_a_valid         (tl_a_valid),
@@ -239,6 +233,7 @@ module tb_tl2umi_np #(
     reg  [2:0]      tl_random_opcode;
     reg  [2:0]      tl_random_size;
     reg  [6:0]      tl_random_address;
+    reg  [4:0]      tl_random_source;
     reg  [7:0]      tl_byte_counter;
     reg             tl_a_ready_for_random;
     wire [3:0]      tl_arth_logic_alignment;
@@ -256,6 +251,14 @@ module tb_tl2umi_np #(
         tl_random_address <= $random % 128;
     end
 
+    // A new source for every request, as many as allowed are in flight
+    always @(posedge clk) begin
+        if (~nreset)
+            tl_random_source <= 5'd0;
+        else if (tl_a_valid & tl_a_ready)
+            tl_random_source <= tl_random_source + 5'd1;
+    end
+
     always @(posedge clk) begin
         if (~nreset) begin
             tl_a_ready_for_random <= 1'b1;
@@ -279,7 +282,7 @@ module tb_tl2umi_np #(
                         tl_a_valid <= 1'b1;
                         tl_a_param <= 3'b0;
                         tl_a_size <= tl_random_size;
-                        tl_a_source <= $random % 32;
+                        tl_a_source <= tl_random_source;
                         if (tl_random_size < 'd3)
                             tl_a_address <= {tl_random_address, tl_arth_logic_alignment[2:0]};
                         else
@@ -290,7 +293,7 @@ module tb_tl2umi_np #(
                         tl_a_param <= 3'b0;
                         tl_a_size <= 6;
                         tl_byte_counter <= 1 << 6;
-                        tl_a_source <= $random % 32;
+                        tl_a_source <= tl_random_source;
                         if (tl_random_size < 'd3)
                             tl_a_address <= {tl_random_address, tl_arth_logic_alignment[2:0]};
                         else
@@ -308,7 +311,7 @@ module tb_tl2umi_np #(
                         tl_a_valid <= 1'b1;
                         tl_a_param <= $random % 5;
                         tl_a_size <= tl_random_size[1:0];
-                        tl_a_source <= $random % 32;
+                        tl_a_source <= tl_random_source;
                         tl_a_address <= {tl_random_address, tl_arth_logic_alignment[2:0]};
                         if (tl_random_size[1:0] == 3)
                             tl_a_mask <= 8'd255;
@@ -323,7 +326,7 @@ module tb_tl2umi_np #(
                         tl_a_valid <= 1'b1;
                         tl_a_param <= $random % 4;
                         tl_a_size <= tl_random_size[1:0];
-                        tl_a_source <= $random % 32;
+                        tl_a_source <= tl_random_source;
                         tl_a_address <= {tl_random_address, tl_arth_logic_alignment[2:0]};
                         if (tl_random_size[1:0] == 3)
                             tl_a_mask <= 8'd255;
@@ -338,7 +341,7 @@ module tb_tl2umi_np #(
                         tl_a_valid <= 1'b1;
                         tl_a_param <= 3'b0;
                         tl_a_size <= tl_random_size;
-                        tl_a_source <= $random % 32;
+                        tl_a_source <= tl_random_source;
                         if (tl_random_size < 'd3)
                             tl_a_address <= {tl_random_address, tl_arth_logic_alignment[2:0]};
                         else
@@ -10,6 +10,9 @@ from siliconcompiler.package import path as sc_path
 from umi import sumi
 
 
+IDW = 128  # Must match testbench
+
+
 def main():
 
     extra_args = {
@@ -53,16 +56,20 @@ def main():
     while (n_sent < dut.args.n):
         print(f"Transaction {n_sent}:")
         addr = random.randrange(511)
-        length = random.choice([1, 2, 4, 8])
+        length = random.choice([1, 2, 4, 8, 16, 32, 64, 128])
 
         # FIXME: Align address. Limitation of umi2tl converter. Will be fixed in the next release
-        addr = addr & (0xFFFFFFF8 | (8-length))
+        if length > 8:
+            # Aligned bursts are sent as a single TileLink transaction
+            addr = addr & ~(length - 1)
+        else:
+            addr = addr & (0xFFFFFFF8 | (8-length))
 
         data8 = np.random.randint(0, 255, size=length, dtype=np.uint8)
         print(f"umi writing {length} bytes:: data: {data8} to addr: 0x{addr:08x}")
-        umi.write(addr, data8, srcaddr=0x0000110000000000)
+        umi.write(addr, data8, srcaddr=0x0000110000000000, max_bytes=IDW//8)
         print(f"umi reading {length} bytes:: from addr 0x{addr:08x}")
-        val8 = umi.read(addr, length, np.uint8, srcaddr=0x0000110000000000)
+        val8 = umi.read(addr, length, np.uint8, srcaddr=0x0000110000000000, max_bytes=length)
         print(f"umi Read: {val8}")
         if not (val8 == data8).all():
             print(f"ERROR core read from addr 0x{addr:08x} expected {data8} actual {val8}")
@@ -73,7 +73,7 @@ module testbench #(
     wire [IDW-1:0]  umi_dut2tx_data;
     wire            umi_dut2tx_ready;
 
-    umi2tl_np #(
+    umi2tl #(
         .CW         (CW),
         .AW         (AW),
         .IDW        (IDW),
@@ -24,6 +24,14 @@ module testbench #(
     localparam IDSB     = 40;
     localparam NMAPS    = 8;
 
+    // Reset control
+    reg [15:0]  nreset_vec = 16'h0000;
+    wire        nreset;
+
+    assign nreset = nreset_vec[15];
+
+    always @(posedge clk) nreset_vec <= {nreset_vec[14:0], 1'b1};
+
     genvar i;
     wire [IDW*NMAPS-1:0]  old_row_col_address;
     wire [IDW*NMAPS-1:0]  new_row_col_address;
@@ -58,6 +66,9 @@ module testbench #(
         .IDSB       (IDSB),
         .NMAPS      (NMAPS)
     ) dut (
+        .clk                    (clk),
+        .nreset                 (nreset),
+
         .chipid                 (16'h0004),
 
         .old_row_col_address    (old_row_col_address),
@@ -67,6 +78,13 @@ module testbench #(
         .set_dstaddress_high    (64'h0000_06FF_FFFF_FFFF),
         .set_dstaddress_offset  (64'hFFFF_FFFF_FFFF_FF80),
 
+        // region table unused, regions stay disabled
+        .reg_write              (1'b0),
+        .reg_read               (1'b0),
+        .reg_addr               (16'h0000),
+        .reg_wdata              (64'h0000_0000_0000_0000),
+        .reg_rdata              (),
+
         .umi_in_valid           (umi_stim2dut_valid),
         .umi_in_cmd             (umi_stim2dut_cmd),
         .umi_in_dstaddr         (umi_stim2dut_dstaddr),
@@ -17,6 +17,12 @@
  *
  * Documentation:
  * -TL-UH to UMI converter
+ * -A Get is sent as one UMI read of (1 << tl_a_size) bytes, a Put burst as
+ *  one UMI write per beat with EOM set on the last beat. The AccessAck is
+ *  returned on the write response carrying EOM.
+ * -Requests are not held until their response returns, up to OUTSTANDING
+ *  TileLink sources are in flight. A new request is stalled while its
+ *  source is still waiting for its response.
  *
  * The umi_srcaddr for requests uses User Defined Bits as follows:
  * [63:16] : umi source address bits [63:16]
@@ -33,7 +39,8 @@
 module tl2umi #(
     parameter CW = 32, // umi command width
     parameter AW = 64, // umi address width
-    parameter DW = 64  // umi packet width
+    parameter DW = 64, // umi packet width
+    parameter OUTSTANDING = 8  // TileLink sources in flight (<= 32)
 )
 (
     input             clk,
@@ -241,24 +248,14 @@ module tl2umi #(
 
     reg [2:0]   resp_state;
 
-    reg         get_ack_req;
-    reg         get_ack_resp;
-
-    reg         put_ack_req;
-    reg         put_ack_resp;
-    reg [7:0]   put_bytes_req;
-    reg [7:0]   put_bytes_resp;
     reg         dataag_out_resp_ready_assert;
-    wire [7:0]  dataag_out_resp_bytes;
 
     localparam RESP_IDLE    = 3'd0;
     localparam RESP_RD_BRST = 3'd1;
     localparam RESP_RD_LAST = 3'd2;
-    localparam RESP_WR_BRST = 3'd3;
-    localparam RESP_WR_LAST = 3'd4;
+    localparam RESP_WR_LAST = 3'd3;
 
     assign dataag_out_resp_ready = reset_done[1] & tl_d_ready & dataag_out_resp_ready_assert;
-    assign dataag_out_resp_bytes = (1 << dataag_out_resp_cmd_size)*(dataag_out_resp_cmd_len + 1);
 
     wire [4:0] dataag_out_resp_source = dataag_out_resp_dstaddr[4:0];
     wire [2:0] dataag_out_resp_size = dataag_out_resp_dstaddr[10:8];
@@ -273,9 +270,6 @@ module tl2umi #(
             tl_d_size <= 3'b0;
             tl_d_source <= 5'b0;
             tl_d_data <= 64'b0;
-            put_ack_resp <= 1'b0;
-            put_bytes_resp <= 8'b0;
-            get_ack_resp <= 1'b0;
         end
         else begin
             case (resp_state)
@@ -287,9 +281,6 @@ module tl2umi #(
                 tl_d_size <= 3'b0;
                 tl_d_source <= 5'b0;
                 tl_d_data <= 64'b0;
-                put_ack_resp <= 1'b0;
-                put_bytes_resp <= 8'b0;
-                get_ack_resp <= 1'b0;
                 if (dataag_out_resp_ready & dataag_out_resp_valid) begin
                     if (dataag_out_resp_cmd_read_resp) begin
                         if (dataag_out_resp_cmd_eom == 1'b1) begin
@@ -307,21 +298,20 @@ module tl2umi #(
                         tl_d_data <= dataag_out_resp_data << (dataag_out_ml_tx_first_one*8);
                     end
                     else if (dataag_out_resp_cmd_write_resp) begin
-                        if (dataag_out_resp_bytes == put_bytes_req) begin
+                        if (dataag_out_resp_cmd_eom == 1'b1) begin
                             resp_state <= RESP_WR_LAST;
                             dataag_out_resp_ready_assert <= 1'b0;
                             tl_d_valid <= 1'b1;
                         end
                         else begin
                             // Discard all UMI Write Responses except the last one
-                            resp_state <= RESP_WR_BRST;
+                            resp_state <= RESP_IDLE;
                             dataag_out_resp_ready_assert <= 1'b1;
                             tl_d_valid <= 1'b0;
                         end
                         tl_d_opcode <= `TL_OP_AccessAck;
                         tl_d_size <= dataag_out_resp_size;
                         tl_d_source <= dataag_out_resp_source;
-                        put_bytes_resp <= dataag_out_resp_bytes;
                     end
                     else begin
                         // Not supported response type. Ignore and stay in idle.
@@ -332,9 +322,6 @@ module tl2umi #(
                         tl_d_size <= 3'b0;
                         tl_d_source <= 5'b0;
                         tl_d_data <= 64'b0;
-                        put_ack_resp <= 1'b0;
-                        put_bytes_resp <= 8'b0;
-                        get_ack_resp <= 1'b0;
                     `ifndef SYNTHESIS
                         $display("Unsupported response on UMI side %d", dataag_out_resp_cmd_opcode);
                     `endif
@@ -367,26 +354,6 @@ module tl2umi #(
                     resp_state <= RESP_IDLE;
                     dataag_out_resp_ready_assert <= 1'b1;
                     tl_d_valid <= 1'b0;
-                    get_ack_resp <= 1'b1;
-                end
-            end
-            RESP_WR_BRST: begin
-                if (put_bytes_resp == put_bytes_req) begin
-                    resp_state <= RESP_WR_LAST;
-                    dataag_out_resp_ready_assert <= 1'b0;
-                    tl_d_valid <= 1'b1;
-                end
-                else begin
-                    // Discard all UMI Write Responses except the last one
-                    resp_state <= RESP_WR_BRST;
-                    dataag_out_resp_ready_assert <= 1'b1;
-                    tl_d_valid <= 1'b0;
-                end
-                tl_d_opcode <= `TL_OP_AccessAck;
-                tl_d_size <= dataag_out_resp_size;
-                tl_d_source <= dataag_out_resp_source;
-                if (dataag_out_resp_ready & dataag_out_resp_valid) begin
-                    put_bytes_resp <= put_bytes_resp + dataag_out_resp_bytes;
                 end
             end
             RESP_WR_LAST: begin
@@ -394,8 +361,6 @@ module tl2umi #(
                     resp_state <= RESP_IDLE;
                     dataag_out_resp_ready_assert <= 1'b1;
                     tl_d_valid <= 1'b0;
-                    put_bytes_resp <= 8'b0;
-                    put_ack_resp <= 1'b1;
                 end
             end
             default: begin
@@ -407,9 +372,6 @@ module tl2umi #(
                 tl_d_size <= 3'b0;
                 tl_d_source <= 5'b0;
                 tl_d_data <= 64'b0;
-                put_ack_resp <= 1'b0;
-                put_bytes_resp <= 8'b0;
-                get_ack_resp <= 1'b0;
             `ifndef SYNTHESIS
                 $display("Entered Invalid State in Response State Machine");
             `endif
@@ -539,12 +501,45 @@ module tl2umi #(
 
     localparam REQ_IDLE     = 3'd0;
     localparam REQ_GET_LAST = 3'd1;
-    localparam REQ_GET_ACK  = 3'd2;
-    localparam REQ_PUT_BRST = 3'd3;
-    localparam REQ_PUT_LAST = 3'd4;
-    localparam REQ_PUT_ACK  = 3'd5;
+    localparam REQ_PUT_BRST = 3'd2;
+    localparam REQ_PUT_LAST = 3'd3;
+
+    // TileLink sources waiting for their response
+    reg  [31:0] source_busy;
+    reg  [5:0]  source_count;
+    wire        source_free;
+    wire        source_alloc;
+    wire        source_release;
+
+    // A new request needs a free slot, beats of a Put burst do not
+    assign source_free = (req_state != REQ_IDLE) |
+                         (~source_busy[tl_a_source] & (source_count < OUTSTANDING));
 
-    assign tl_a_ready = reset_done[1] & uhost_req_packet_ready & tl_a_ready_assert;
+    assign tl_a_ready = reset_done[1] & uhost_req_packet_ready & tl_a_ready_assert & source_free;
+
+    assign source_alloc = tl_a_valid & tl_a_ready & (req_state == REQ_IDLE) &
+                          ((tl_a_opcode == `TL_OP_Get) |
+                           (tl_a_opcode == `TL_OP_PutFullData) |
+                           (tl_a_opcode == `TL_OP_PutPartialData) |
+                           (tl_a_opcode == `TL_OP_ArithmeticData) |
+                           (tl_a_opcode == `TL_OP_LogicalData));
+
+    assign source_release = tl_d_valid & tl_d_ready &
+                            ((resp_state == RESP_RD_LAST) | (resp_state == RESP_WR_LAST));
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            source_busy <= 32'b0;
+            source_count <= 6'b0;
+        end
+        else begin
+            if (source_release)
+                source_busy[tl_d_source] <= 1'b0;
+            if (source_alloc)
+                source_busy[tl_a_source] <= 1'b1;
+            source_count <= source_count + {5'b0, source_alloc} - {5'b0, source_release};
+        end
+    end
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
@@ -560,8 +555,6 @@ module tl2umi #(
             uhost_req_packet_data <= 'b0;
             uhost_req_packet_valid_r <= 1'b0;
             ml_tx_non_zero_mask_r <= 1'b0;
-            put_ack_req <= 1'b0;
-            put_bytes_req <= 8'b0;
         end
         else begin
             case (req_state)
@@ -578,7 +571,6 @@ module tl2umi #(
                 uhost_req_packet_data <= 'b0;
                 uhost_req_packet_valid_r <= 1'b0;
                 ml_tx_non_zero_mask_r <= 1'b0;
-                put_bytes_req <= 8'b0;
                 if (tl_a_valid & tl_a_ready) begin
                     case (tl_a_opcode)
                     `TL_OP_Get: begin
@@ -592,7 +584,6 @@ module tl2umi #(
                         uhost_req_packet_srcaddr <= local_address;
                         uhost_req_packet_valid_r <= 1'b1;
                         ml_tx_non_zero_mask_r <= ml_tx_non_zero_mask;
-                        get_ack_req <= 1'b1;
                     end
                     `TL_OP_PutFullData, `TL_OP_PutPartialData: begin
                         if (tl_a_size > 3'd3) begin
@@ -614,7 +605,6 @@ module tl2umi #(
                         uhost_req_packet_valid_r <= 1'b1;
                         ml_tx_non_zero_mask_r <= ml_tx_non_zero_mask;
                         uhost_req_packet_data[63:0] <= ml_tx_data;
-                        put_bytes_req <= ml_tx_len + 1;
                     end
                     `TL_OP_ArithmeticData, `TL_OP_LogicalData: begin
                         req_state <= REQ_GET_LAST;
@@ -664,7 +654,6 @@ module tl2umi #(
                         uhost_req_packet_data <= 'b0;
                         uhost_req_packet_valid_r <= 1'b0;
                         ml_tx_non_zero_mask_r <= 1'b0;
-                        put_bytes_req <= 8'b0;
                     `ifndef SYNTHESIS
                         $display("Unsupported request on TL side %d", tl_a_opcode);
                     `endif
@@ -674,19 +663,13 @@ module tl2umi #(
             end
             REQ_GET_LAST: begin
                 if (uhost_req_packet_ready) begin
-                    req_state <= REQ_GET_ACK;
+                    req_state <= REQ_IDLE;
+                    tl_a_ready_assert <= 1'b1;
                     uhost_req_packet_cmd_eom <= 1'b0;
                     uhost_req_packet_valid_r <= 1'b0;
                     ml_tx_non_zero_mask_r <= 1'b0;
                 end
             end
-            REQ_GET_ACK: begin
-                if (get_ack_resp) begin
-                    req_state <= REQ_IDLE;
-                    tl_a_ready_assert <= 1'b1;
-                    get_ack_req <= 1'b0;
-                end
-            end
             REQ_PUT_BRST: begin
                 tl_a_ready_assert <= 1'b1;
                 uhost_req_packet_cmd_opcode <= UMI_REQ_WRITE;
@@ -698,7 +681,6 @@ module tl2umi #(
                     uhost_req_packet_cmd_len <= ml_tx_len;
                     ml_tx_non_zero_mask_r <= ml_tx_non_zero_mask;
                     req_put_byte_counter <= req_put_byte_counter - 8'd8;
-                    put_bytes_req <= put_bytes_req + ml_tx_len + 1;
                     if (req_put_byte_counter == 8'd8) begin
                         req_state <= REQ_PUT_LAST;
                         tl_a_ready_assert <= 1'b0;
@@ -715,19 +697,11 @@ module tl2umi #(
             end
             REQ_PUT_LAST: begin
                 if (uhost_req_packet_ready) begin
-                    req_state <= REQ_PUT_ACK;
+                    req_state <= REQ_IDLE;
+                    tl_a_ready_assert <= 1'b1;
                     uhost_req_packet_cmd_eom <= 1'b0;
                     uhost_req_packet_valid_r <= 1'b0;
                     ml_tx_non_zero_mask_r <= 1'b0;
-                    put_ack_req <= 1'b1;
-                end
-            end
-            REQ_PUT_ACK: begin
-                if (put_ack_resp) begin
-                    req_state <= REQ_IDLE;
-                    tl_a_ready_assert <= 1'b1;
-                    put_ack_req <= 1'b0;
-                    put_bytes_req <= 8'b0;
                 end
             end
             default: begin
@@ -744,8 +718,6 @@ module tl2umi #(
                 uhost_req_packet_data <= 'b0;
                 uhost_req_packet_valid_r <= 1'b0;
                 ml_tx_non_zero_mask_r <= 1'b0;
-                put_ack_req <= 1'b0;
-                put_bytes_req <= 8'b0;
             `ifndef SYNTHESIS
                 $display("Entered Invalid State in Request State Machine");
             `endif
@@ -11,10 +11,10 @@ class TL2UMI(UMI):
                          files=['rtl/tl2umi.v',
                                 'rtl/umi_data_aggregator.v'],
                          idirs=['rtl'],
-                         deps=[TileLink(),
-                               FifoFlex(),
-                               Unpack(),
-                               Pack()])
+                         deps=[TileLink,
+                               FifoFlex,
+                               Unpack,
+                               Pack])
 
 
 if __name__ == "__main__":
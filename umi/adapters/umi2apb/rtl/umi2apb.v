@@ -21,16 +21,26 @@
  * the module with a different clock domain, use the umi_fifo module.
  *
  * The module translates a SUMI request into a APB requester interface.
- * Read data is returned as SUMI response packets. Requests can occur
- * at a maximum rate of one transaction every two cycles!
+ * Read data is returned as SUMI response packets. With PIPELINE=0
+ * requests can occur at a maximum rate of one transaction every two
+ * cycles (three for requests with a response)!
+ *
+ * With PIPELINE=1 the next request is held in a skid buffer and the
+ * response is registered, so the next APB SETUP phase overlaps the
+ * current response and transfers run back to back at the APB limit of
+ * one transfer every two cycles. Requests are split into as many
+ * RW-aligned APB transfers as their bytes span, with PSTRB marking the
+ * bytes written. Atomic requests are answered with a device error
+ * response instead of being dropped.
  *
  * This module can also check if the incoming access is within the designated
  * address range by setting the GRPOFFSET, GRPAW, and GRPID parameter.
  * The address range [GRPOFFSET+:GRPAW] is checked against GRPID for a match.
  * To disable the check, set the GRPAW to 0.
  *
- * Only RW-aligned read/writes <= RW are supported.
- * SUMI Atomics are not supported. Atomic requests will be dropped silently.
+ * With PIPELINE=0 only RW-aligned read/writes <= RW are supported.
+ * SUMI Atomics are not supported. With PIPELINE=0 atomic requests will be
+ * dropped silently.
  * SUMI RDMA is not supported. RDMA requests will be dropped silently.
  *
  ******************************************************************************/
@@ -42,7 +52,8 @@ module umi2apb #(parameter AW = 64,        // UMI address width
                  parameter RAW = 64,       // APB address width
                  parameter GRPOFFSET = 24, // group address offset
                  parameter GRPAW = 0,      // group address width
-                 parameter GRPID = 0       // group ID
+                 parameter GRPID = 0,      // group ID
+                 parameter PIPELINE = 0    // 1 = back to back APB transfers
                  )
    (// module operates on apb clk domain
     input             apb_nreset,  // apb asycn nreset
@@ -75,35 +86,10 @@ module umi2apb #(parameter AW = 64,        // UMI address width
 
   `include "umi_messages.vh"
 
-  //####################################
-  // Registers
-  //####################################
-  reg [CW-1:0]    udev_req_cmd_r;
-  reg [AW-1:0]    udev_req_dstaddr_r;
-  reg [AW-1:0]    udev_req_srcaddr_r;
-  reg [RW-1:0]    udev_req_data_r;
-
-  reg [1:0]       pslverr_r;
-  reg [RW-1:0]    prdata_r;
-
-  //####################################
-  // Wires
-  //####################################
-  wire            incoming_req;
   wire            group_match;
 
-  wire [CW-1:0]   cmd_packet;
-  wire [4:0]      cmd_opcode;
-  wire            cmd_write;
-  wire            cmd_posted;
-  wire [1:0]      cmd_prot;
-
-  wire            apb_bus_fire;
-  wire            capture_resp;
-  wire            op_read_resp;
-
   //############################
-  //# UMI Request
+  //# Group Address Check
   //############################
 
   generate
@@ -113,75 +99,341 @@ module umi2apb #(parameter AW = 64,        // UMI address width
       assign group_match = 1'b1;
   endgenerate
 
-  assign incoming_req = udev_req_valid & udev_req_ready & group_match;
+  generate
+    if (PIPELINE == 0) begin : g_serial
+      //####################################
+      // Registers
+      //####################################
+      reg [CW-1:0]    udev_req_cmd_r;
+      reg [AW-1:0]    udev_req_dstaddr_r;
+      reg [AW-1:0]    udev_req_srcaddr_r;
+      reg [RW-1:0]    udev_req_data_r;
 
-  always @(posedge apb_pclk)
-    if (incoming_req) begin
-      udev_req_cmd_r     <= udev_req_cmd;
-      udev_req_dstaddr_r <= udev_req_dstaddr;
-      udev_req_srcaddr_r <= udev_req_srcaddr;
-      udev_req_data_r    <= udev_req_data[RW-1:0];
-    end
+      reg [1:0]       pslverr_r;
+      reg [RW-1:0]    prdata_r;
 
-  assign cmd_packet = incoming_req ? udev_req_cmd : udev_req_cmd_r;
-  assign cmd_opcode = cmd_packet[UMI_OPCODE_MSB:UMI_OPCODE_LSB];
-  assign cmd_prot   = cmd_packet[UMI_PROT_MSB:UMI_PROT_LSB];
+      //####################################
+      // Wires
+      //####################################
+      wire            incoming_req;
 
-  assign cmd_write  = cmd_opcode==UMI_REQ_WRITE;
-  assign cmd_posted = cmd_opcode==UMI_REQ_POSTED;
+      wire [CW-1:0]   cmd_packet;
+      wire [4:0]      cmd_opcode;
+      wire            cmd_write;
+      wire            cmd_posted;
+      wire [1:0]      cmd_prot;
 
-  //############################
-  //# APB Mapping
-  //############################
+      wire            apb_bus_fire;
+      wire            capture_resp;
+      wire            op_read_resp;
 
-  assign apb_psel    = incoming_req | apb_penable;
-  assign apb_pwrite  = cmd_write | cmd_posted;
-  assign apb_pprot   = {1'b0, cmd_prot[1:0]};
-  assign apb_pstrb   = {(RW/8){1'b1}}; // TODO: Support strobe
+      //############################
+      //# UMI Request
+      //############################
 
-  assign apb_paddr   = incoming_req ? udev_req_dstaddr[RAW-1:0] : udev_req_dstaddr_r[RAW-1:0];
-  assign apb_pwdata  = incoming_req ? udev_req_data[RW-1:0] : udev_req_data_r[RW-1:0];
+      assign incoming_req = udev_req_valid & udev_req_ready & group_match;
 
-  always @(posedge apb_pclk or negedge apb_nreset)
-    if (~apb_nreset)
-      apb_penable <= 1'b0;
-    else if (incoming_req)
-      apb_penable <= 1'b1;
-    else if (apb_pready)
-      apb_penable <= 1'b0;
+      always @(posedge apb_pclk)
+        if (incoming_req) begin
+          udev_req_cmd_r     <= udev_req_cmd;
+          udev_req_dstaddr_r <= udev_req_dstaddr;
+          udev_req_srcaddr_r <= udev_req_srcaddr;
+          udev_req_data_r    <= udev_req_data[RW-1:0];
+        end
 
-  assign udev_req_ready = ~apb_penable & ~udev_resp_valid;
+      assign cmd_packet = incoming_req ? udev_req_cmd : udev_req_cmd_r;
+      assign cmd_opcode = cmd_packet[UMI_OPCODE_MSB:UMI_OPCODE_LSB];
+      assign cmd_prot   = cmd_packet[UMI_PROT_MSB:UMI_PROT_LSB];
 
-  //############################
-  //# UMI Response
-  //############################
+      assign cmd_write  = cmd_opcode==UMI_REQ_WRITE;
+      assign cmd_posted = cmd_opcode==UMI_REQ_POSTED;
+
+      //############################
+      //# APB Mapping
+      //############################
+
+      assign apb_psel    = incoming_req | apb_penable;
+      assign apb_pwrite  = cmd_write | cmd_posted;
+      assign apb_pprot   = {1'b0, cmd_prot[1:0]};
+      assign apb_pstrb   = {(RW/8){1'b1}}; // TODO: Support strobe
+
+      assign apb_paddr   = incoming_req ? udev_req_dstaddr[RAW-1:0] : udev_req_dstaddr_r[RAW-1:0];
+      assign apb_pwdata  = incoming_req ? udev_req_data[RW-1:0] : udev_req_data_r[RW-1:0];
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          apb_penable <= 1'b0;
+        else if (incoming_req)
+          apb_penable <= 1'b1;
+        else if (apb_pready)
+          apb_penable <= 1'b0;
+
+      assign udev_req_ready = ~apb_penable & ~udev_resp_valid;
 
-  assign apb_bus_fire = apb_psel & apb_penable & apb_pready;
-  assign capture_resp = apb_bus_fire & ~cmd_posted;
-
-  always @(posedge apb_pclk or negedge apb_nreset)
-    if (~apb_nreset)
-      udev_resp_valid <= 1'b0;
-    else if (capture_resp)
-      udev_resp_valid <= 1'b1;
-    else if (udev_resp_ready)
-      udev_resp_valid <= 1'b0;
-
-  always @(posedge apb_pclk)
-    if (capture_resp) begin
-      prdata_r <= apb_prdata;
-      pslverr_r <= {apb_pslverr, 1'b0};
+      //############################
+      //# UMI Response
+      //############################
+
+      assign apb_bus_fire = apb_psel & apb_penable & apb_pready;
+      assign capture_resp = apb_bus_fire & ~cmd_posted;
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          udev_resp_valid <= 1'b0;
+        else if (capture_resp)
+          udev_resp_valid <= 1'b1;
+        else if (udev_resp_ready)
+          udev_resp_valid <= 1'b0;
+
+      always @(posedge apb_pclk)
+        if (capture_resp) begin
+          prdata_r <= apb_prdata;
+          pslverr_r <= {apb_pslverr, 1'b0};
+        end
+
+      assign op_read_resp = (udev_req_cmd_r[UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_READ);
+
+      assign udev_resp_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB] = op_read_resp ? UMI_RESP_READ : UMI_RESP_WRITE;
+      assign udev_resp_cmd[UMI_EX_BIT:UMI_SIZE_LSB]       = udev_req_cmd_r[UMI_EX_BIT:UMI_SIZE_LSB];
+      assign udev_resp_cmd[UMI_USER_MSB:UMI_USER_LSB]     = pslverr_r[1:0];
+      assign udev_resp_cmd[UMI_HOSTID_MSB:UMI_HOSTID_LSB] = udev_req_cmd_r[UMI_HOSTID_MSB:UMI_HOSTID_LSB];
+
+      assign udev_resp_dstaddr[AW-1:0] = udev_req_srcaddr_r[AW-1:0];
+      assign udev_resp_srcaddr[AW-1:0] = udev_req_dstaddr_r[AW-1:0];
+      assign udev_resp_data[DW-1:0]    = {{(DW-RW){1'b0}}, prdata_r[RW-1:0]};
     end
+    else begin : g_pipeline
+      //####################################
+      // Parameters
+      //####################################
+      localparam RB    = RW/8;                         // bytes per APB word
+      localparam RBLOG = (RB > 1) ? $clog2(RB) : 1;
+      localparam NW    = (DW/8 + 2*RB - 2) / RB;       // max APB words per request
+      localparam WW    = (NW > 1) ? $clog2(NW) : 1;
+
+      //####################################
+      // Registers
+      //####################################
+      // skid buffer
+      reg             skid_valid;
+      reg [CW-1:0]    skid_cmd;
+      reg [AW-1:0]    skid_dstaddr;
+      reg [AW-1:0]    skid_srcaddr;
+      reg [DW-1:0]    skid_data;
+
+      // active request
+      reg             act_valid;
+      reg [CW-1:0]    act_cmd;
+      reg [AW-1:0]    act_dstaddr;
+      reg [AW-1:0]    act_srcaddr;
+      reg [RBLOG-1:0] act_offset;
+      reg [RAW-1:0]   act_paddr;
+      reg [NW*RW-1:0] act_wdata;
+      reg [NW*RB-1:0] act_wstrb;
+      reg [NW*RW-1:0] act_rdata;
+      reg [WW-1:0]    act_word;
+      reg [WW-1:0]    act_last;
+      reg             act_err;
+
+      // response
+      reg [CW-1:0]    resp_cmd_r;
+      reg [AW-1:0]    resp_dstaddr_r;
+      reg [AW-1:0]    resp_srcaddr_r;
+      reg [DW-1:0]    resp_data_r;
+
+      //####################################
+      // Wires
+      //####################################
+      wire            incoming_req;
+      wire            src_valid;
+      wire [CW-1:0]   src_cmd;
+      wire [AW-1:0]   src_dstaddr;
+      wire [AW-1:0]   src_srcaddr;
+      wire [DW-1:0]   src_data;
+      wire [RBLOG-1:0] src_offset;
+      wire [15:0]     src_bytes;
+      wire [15:0]     src_end;
+      reg  [NW*RB-1:0] src_strb;
+
+      wire [4:0]      act_opcode;
+      wire            act_read;
+      wire            act_write;
+      wire            act_posted;
+      wire            act_atomic;
+      wire            act_apb;
+      wire            act_resp;
+      wire            act_free;
+      wire            act_done;
+      wire            act_load;
+      wire            act_last_word;
+
+      wire            resp_free;
+      wire            apb_setup_ok;
+      wire            apb_bus_fire;
+      wire            capture_resp;
+      wire            resp_err;
+      reg  [NW*RW-1:0] rdata_next;
+
+      integer         i;
 
-  assign op_read_resp = (udev_req_cmd_r[UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_READ);
+      //############################
+      //# UMI Request
+      //############################
 
-  assign udev_resp_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB] = op_read_resp ? UMI_RESP_READ : UMI_RESP_WRITE;
-  assign udev_resp_cmd[UMI_EX_BIT:UMI_SIZE_LSB]       = udev_req_cmd_r[UMI_EX_BIT:UMI_SIZE_LSB];
-  assign udev_resp_cmd[UMI_USER_MSB:UMI_USER_LSB]     = pslverr_r[1:0];
-  assign udev_resp_cmd[UMI_HOSTID_MSB:UMI_HOSTID_LSB] = udev_req_cmd_r[UMI_HOSTID_MSB:UMI_HOSTID_LSB];
+      assign incoming_req = udev_req_valid & udev_req_ready & group_match;
 
-  assign udev_resp_dstaddr[AW-1:0] = udev_req_srcaddr_r[AW-1:0];
-  assign udev_resp_srcaddr[AW-1:0] = udev_req_dstaddr_r[AW-1:0];
-  assign udev_resp_data[DW-1:0]    = {{(DW-RW){1'b0}}, prdata_r[RW-1:0]};
+      assign udev_req_ready = ~skid_valid;
+
+      // requests wait in the skid buffer while the active one is busy
+      assign src_valid   = skid_valid | incoming_req;
+      assign src_cmd     = skid_valid ? skid_cmd : udev_req_cmd;
+      assign src_dstaddr = skid_valid ? skid_dstaddr : udev_req_dstaddr;
+      assign src_srcaddr = skid_valid ? skid_srcaddr : udev_req_srcaddr;
+      assign src_data    = skid_valid ? skid_data : udev_req_data;
+
+      assign act_load = act_free & src_valid;
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          skid_valid <= 1'b0;
+        else if (skid_valid)
+          skid_valid <= ~act_free;
+        else
+          skid_valid <= incoming_req & ~act_free;
+
+      always @(posedge apb_pclk)
+        if (incoming_req & ~act_free) begin
+          skid_cmd     <= udev_req_cmd;
+          skid_dstaddr <= udev_req_dstaddr;
+          skid_srcaddr <= udev_req_srcaddr;
+          skid_data    <= udev_req_data;
+        end
+
+      //############################
+      //# Word Split
+      //############################
+
+      assign src_offset = src_dstaddr[RBLOG-1:0] & (RB-1);
+      assign src_bytes  = {7'b0, src_cmd[UMI_LEN_MSB:UMI_LEN_LSB] + 9'd1} <<
+                          src_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB];
+      assign src_end    = {{(16-RBLOG){1'b0}}, src_offset} + src_bytes - 16'd1;
+
+      always @(*)
+        for (i = 0; i < NW*RB; i = i + 1)
+          src_strb[i] = (i >= src_offset) & (i <= src_end);
+
+      //############################
+      //# Active Request
+      //############################
+
+      assign act_opcode = act_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB];
+      assign act_read   = act_opcode==UMI_REQ_READ;
+      assign act_write  = act_opcode==UMI_REQ_WRITE;
+      assign act_posted = act_opcode==UMI_REQ_POSTED;
+      assign act_atomic = act_opcode==UMI_REQ_ATOMIC;
+      assign act_apb    = act_read | act_write | act_posted;
+      assign act_resp   = act_read | act_write | act_atomic;
+
+      assign act_last_word = act_word == act_last;
+
+      // response register is empty or drains this cycle
+      assign resp_free = ~udev_resp_valid | udev_resp_ready;
+
+      assign act_done = act_valid & (act_apb ? (apb_bus_fire & act_last_word) :
+                                               (~act_resp | resp_free));
+      assign act_free = ~act_valid | act_done;
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          act_valid <= 1'b0;
+        else if (act_load)
+          act_valid <= 1'b1;
+        else if (act_done)
+          act_valid <= 1'b0;
+
+      always @(posedge apb_pclk)
+        if (act_load) begin
+          act_cmd     <= src_cmd;
+          act_dstaddr <= src_dstaddr;
+          act_srcaddr <= src_srcaddr;
+          act_offset  <= src_offset;
+          act_paddr   <= src_dstaddr[RAW-1:0] & ~(RB-1);
+          act_wdata   <= {{(NW*RW-DW){1'b0}}, src_data} << (src_offset*8);
+          act_wstrb   <= src_strb;
+          act_word    <= 'b0;
+          act_last    <= src_end / RB;
+          act_err     <= 1'b0;
+        end
+        else if (apb_bus_fire) begin
+          act_paddr   <= act_paddr + RB;
+          act_wdata   <= act_wdata >> RW;
+          act_wstrb   <= act_wstrb >> RB;
+          act_rdata   <= rdata_next;
+          act_word    <= act_word + 1'b1;
+          act_err     <= act_err | apb_pslverr;
+        end
+
+      //############################
+      //# APB Mapping
+      //############################
+
+      // the last transfer of a request with a response only starts when
+      // the response register is free by the time it completes
+      assign apb_setup_ok = apb_penable | ~act_resp | ~act_last_word | resp_free;
+
+      assign apb_psel    = act_valid & act_apb & apb_setup_ok;
+      assign apb_pwrite  = act_write | act_posted;
+      assign apb_pprot   = {1'b0, act_cmd[UMI_PROT_MSB:UMI_PROT_LSB]};
+      assign apb_pstrb   = apb_pwrite ? act_wstrb[RB-1:0] : {RB{1'b0}};
+      assign apb_paddr   = act_paddr;
+      assign apb_pwdata  = act_wdata[RW-1:0];
+
+      assign apb_bus_fire = apb_psel & apb_penable & apb_pready;
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          apb_penable <= 1'b0;
+        else if (apb_bus_fire)
+          apb_penable <= 1'b0;
+        else if (apb_psel)
+          apb_penable <= 1'b1;
+
+      //############################
+      //# UMI Response
+      //############################
+
+      always @(*) begin
+        rdata_next = act_rdata;
+        rdata_next[act_word*RW+:RW] = apb_prdata;
+      end
+
+      assign capture_resp = act_done & act_resp;
+      assign resp_err     = act_atomic | act_err | (apb_bus_fire & apb_pslverr);
+
+      always @(posedge apb_pclk or negedge apb_nreset)
+        if (~apb_nreset)
+          udev_resp_valid <= 1'b0;
+        else if (capture_resp)
+          udev_resp_valid <= 1'b1;
+        else if (udev_resp_ready)
+          udev_resp_valid <= 1'b0;
+
+      always @(posedge apb_pclk)
+        if (capture_resp) begin
+          resp_cmd_r[UMI_OPCODE_MSB:UMI_OPCODE_LSB] <= act_write ? UMI_RESP_WRITE : UMI_RESP_READ;
+          resp_cmd_r[UMI_EX_BIT:UMI_SIZE_LSB]       <= act_cmd[UMI_EX_BIT:UMI_SIZE_LSB];
+          resp_cmd_r[UMI_USER_MSB:UMI_USER_LSB]     <= {resp_err, 1'b0};
+          resp_cmd_r[UMI_HOSTID_MSB:UMI_HOSTID_LSB] <= act_cmd[UMI_HOSTID_MSB:UMI_HOSTID_LSB];
+          resp_dstaddr_r <= act_srcaddr;
+          resp_srcaddr_r <= act_dstaddr;
+          resp_data_r    <= act_read ? rdata_next >> (act_offset*8) : {DW{1'b0}};
+        end
+
+      assign udev_resp_cmd[CW-1:0]     = resp_cmd_r[CW-1:0];
+      assign udev_resp_dstaddr[AW-1:0] = resp_dstaddr_r[AW-1:0];
+      assign udev_resp_srcaddr[AW-1:0] = resp_srcaddr_r[AW-1:0];
+      assign udev_resp_data[DW-1:0]    = resp_data_r[DW-1:0];
+    end
+  endgenerate
 
 endmodule
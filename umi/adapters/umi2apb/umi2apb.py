@@ -8,8 +8,8 @@ class UMI2APB(UMI):
         super().__init__('umi2apb',
                          files=['rtl/umi2apb.v'],
                          idirs=['rtl'],
-                         deps=[Unpack(),
-                               Pack()])
+                         deps=[Unpack,
+                               Pack])
 
 
 if __name__ == "__main__":
@@ -17,6 +17,16 @@
  *
  * Documentation:
  * - UMI to AXI4-Lite converter
+ * - Requests are split to DW and issued on the AXI write (AW/W) and read
+ *   (AR) channels independently, with up to OUTSTANDING requests awaiting
+ *   their AXI response
+ * - Outstanding requests are held in an in-order queue, the queue head is
+ *   matched against the next B (writes) or R (reads) response, so UMI
+ *   responses are returned in request order
+ * - A read (write) is held back while a write (read) to the same DW word
+ *   is outstanding, so the AXI channels cannot reorder accesses to it
+ * - B responses to posted writes are consumed without a UMI response
+ * - Requests other than read, write and posted write are dropped
  *
  ******************************************************************************/
 
@@ -25,7 +35,8 @@
 module umi2axil #(
     parameter CW    = 32,   // command width
     parameter AW    = 64,   // address width
-    parameter DW    = 64    // umi packet width
+    parameter DW    = 64,   // umi packet width
+    parameter OUTSTANDING = 4   // outstanding AXI requests
 )
 (
     input               clk,
@@ -160,14 +171,7 @@ module umi2axil #(
         .cmd_hostid         ()
     );
 
-    // UMI request (post split) buffering
-    reg  [CW-1:0]       ff_out_req_cmd_r;
-    reg  [AW-1:0]       ff_out_req_dstaddr_r;
-    reg  [AW-1:0]       ff_out_req_srcaddr_r;
-    reg  [DW-1:0]       ff_out_req_data_shifted_r;
-    reg  [(DW/8)-1:0]   ff_out_req_data_strb_r;
-    reg  [DWLOG-1:0]    req_data_shift_r;
-
+    // Request write strobe and data alignment
     wire [DWLOG-1:0]    req_data_shift;
     wire [8:0]          ff_out_req_cmd_len_plus_one;
     wire [15:0]         req_data_bytes;
@@ -184,39 +188,134 @@ module umi2axil #(
         assign ff_out_req_data_strb_unshifted[i] = (i < req_data_bytes) ? 1'b1 : 1'b0;
     end
 
+    // Outstanding request queue, in UMI request order
+    localparam QW = (OUTSTANDING > 1) ? $clog2(OUTSTANDING) : 1;
+
+    reg  [CW-1:0]       q_cmd       [0:OUTSTANDING-1];
+    reg  [AW-1:0]       q_dstaddr   [0:OUTSTANDING-1];
+    reg  [AW-1:0]       q_srcaddr   [0:OUTSTANDING-1];
+    reg  [DWLOG-1:0]    q_shift     [0:OUTSTANDING-1];
+    reg  [OUTSTANDING-1:0]  q_valid;
+    reg  [QW-1:0]       q_wr_ptr;
+    reg  [QW-1:0]       q_rd_ptr;
+    reg  [QW:0]         q_count;
+
+    wire                q_push;
+    wire                q_pop;
+    wire                q_full;
+    wire                q_empty;
+
+    wire                req_write;
+    wire                req_read;
+    wire                req_fire;
+
+    assign req_write = (ff_out_req_cmd_opcode == UMI_REQ_WRITE) |
+                       (ff_out_req_cmd_opcode == UMI_REQ_POSTED);
+    assign req_read  = (ff_out_req_cmd_opcode == UMI_REQ_READ);
+    assign req_fire  = ff_out_req_valid & ff_out_req_ready;
+
+    assign q_push  = req_fire & (req_write | req_read);
+    assign q_full  = (q_count == OUTSTANDING);
+    assign q_empty = (q_count == 0);
+
+    // Read/write hazard against the outstanding requests
+    reg                 req_hazard;
+    integer             k;
+
+    always @(*) begin
+        req_hazard = 1'b0;
+        for (k = 0; k < OUTSTANDING; k = k + 1) begin
+            if (q_valid[k] &
+                (q_dstaddr[k][AW-1:DWLOG] == ff_out_req_dstaddr[AW-1:DWLOG]) &
+                ((q_cmd[k][UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_READ) != req_read))
+                req_hazard = 1'b1;
+        end
+    end
+
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
-            ff_out_req_cmd_r            <= 'b0;
-            ff_out_req_dstaddr_r        <= 'b0;
-            ff_out_req_srcaddr_r        <= 'b0;
-            ff_out_req_data_shifted_r   <= 'b0;
-            ff_out_req_data_strb_r      <= 'b0;
-            req_data_shift_r            <= 'b0;
+            q_wr_ptr    <= 'b0;
+            q_rd_ptr    <= 'b0;
+            q_count     <= 'b0;
+            q_valid     <= 'b0;
         end
-        else if (ff_out_req_valid & ff_out_req_ready) begin
-            ff_out_req_cmd_r            <= ff_out_req_cmd;
-            ff_out_req_dstaddr_r        <= ff_out_req_dstaddr;
-            ff_out_req_srcaddr_r        <= ff_out_req_srcaddr;
-            ff_out_req_data_shifted_r   <= ff_out_req_data << (req_data_shift << 3);
-            ff_out_req_data_strb_r      <= ff_out_req_data_strb_unshifted << req_data_shift;
-            req_data_shift_r            <= req_data_shift;
+        else begin
+            if (q_push)
+                q_valid[q_wr_ptr] <= 1'b1;
+            if (q_pop)
+                q_valid[q_rd_ptr] <= 1'b0;
+            if (q_push)
+                q_wr_ptr <= (q_wr_ptr == OUTSTANDING - 1) ? 'b0 : q_wr_ptr + 1'b1;
+            if (q_pop)
+                q_rd_ptr <= (q_rd_ptr == OUTSTANDING - 1) ? 'b0 : q_rd_ptr + 1'b1;
+            q_count <= q_count + {{QW{1'b0}}, q_push} - {{QW{1'b0}}, q_pop};
         end
     end
 
-    wire                axi_write_en;
-    wire                axi_read_en;
+    always @(posedge clk) begin
+        if (q_push) begin
+            q_cmd[q_wr_ptr]     <= ff_out_req_cmd;
+            q_dstaddr[q_wr_ptr] <= ff_out_req_dstaddr;
+            q_srcaddr[q_wr_ptr] <= ff_out_req_srcaddr;
+            q_shift[q_wr_ptr]   <= req_data_shift;
+        end
+    end
+
+    // AXI channel registers, one request each
+    reg  [AW-1:0]       axi_awaddr_r;
+    reg  [2:0]          axi_awprot_r;
     reg                 axi_awvalid_r;
+    reg  [DW-1:0]       axi_wdata_r;
+    reg  [(DW/8)-1:0]   axi_wstrb_r;
     reg                 axi_wvalid_r;
+    reg  [AW-1:0]       axi_araddr_r;
+    reg  [2:0]          axi_arprot_r;
     reg                 axi_arvalid_r;
 
-    assign axi_write_en = ff_out_req_valid &
-                          ff_out_req_ready &
-                          ((ff_out_req_cmd_opcode == UMI_REQ_WRITE) |
-                          (ff_out_req_cmd_opcode == UMI_REQ_POSTED));
+    wire                axi_write_en;
+    wire                axi_read_en;
+    wire                aw_free;
+    wire                w_free;
+    wire                ar_free;
 
-    assign axi_read_en  = ff_out_req_valid &
-                          ff_out_req_ready &
-                          (ff_out_req_cmd_opcode == UMI_REQ_READ);
+    assign axi_write_en = req_fire & req_write;
+    assign axi_read_en  = req_fire & req_read;
+
+    // A channel register is free when empty or handing off this cycle
+    assign aw_free = ~axi_awvalid_r | (axi_awvalid & axi_awready);
+    assign w_free  = ~axi_wvalid_r | (axi_wvalid & axi_wready);
+    assign ar_free = ~axi_arvalid_r | (axi_arvalid & axi_arready);
+
+    assign ff_out_req_ready = reset_done &
+                              (~(req_write | req_read) |
+                               (~q_full & ~req_hazard &
+                                (req_write ? (aw_free & w_free) : ar_free)));
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            axi_awaddr_r    <= 'b0;
+            axi_awprot_r    <= 'b0;
+            axi_wdata_r     <= 'b0;
+            axi_wstrb_r     <= 'b0;
+        end
+        else if (axi_write_en) begin
+            axi_awaddr_r    <= ff_out_req_dstaddr;
+            axi_awprot_r    <= {1'b0, ff_out_req_cmd[UMI_PROT_MSB:UMI_PROT_LSB]};
+            axi_wdata_r     <= ff_out_req_data << (req_data_shift << 3);
+            axi_wstrb_r     <= ff_out_req_data_strb_unshifted << req_data_shift;
+        end
+    end
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            axi_araddr_r    <= 'b0;
+            axi_arprot_r    <= 'b0;
+        end
+        else if (axi_read_en) begin
+            axi_araddr_r    <= ff_out_req_dstaddr;
+            axi_arprot_r    <= {1'b0, ff_out_req_cmd[UMI_PROT_MSB:UMI_PROT_LSB]};
+        end
+    end
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset)
@@ -245,120 +344,110 @@ module umi2axil #(
             axi_arvalid_r <= 1'b0;
     end
 
-    wire [4:0]  ff_out_req_cmd_opcode_r;
-    wire [2:0]  ff_out_req_cmd_size_r;
-    wire [7:0]  ff_out_req_cmd_len_r;
-    wire [7:0]  ff_out_req_cmd_atype_r;
-    wire [3:0]  ff_out_req_cmd_qos_r;
-    wire [1:0]  ff_out_req_cmd_prot_r;
-    wire        ff_out_req_cmd_eom_r;
-    wire        ff_out_req_cmd_eof_r;
-    wire        ff_out_req_cmd_ex_r;
-    wire [1:0]  ff_out_req_cmd_user_r;
-    wire [23:0] ff_out_req_cmd_user_extended_r;
-    wire [1:0]  ff_out_req_cmd_err_r;
-    wire [4:0]  ff_out_req_cmd_hostid_r;
-
-    umi_unpack #(
-        .CW     (CW)
-    ) umi2axilite_ff_req_r_unpack (
-        // Input CMD
-        .packet_cmd         (ff_out_req_cmd_r),
-
-        // Output Fields
-        .cmd_opcode         (ff_out_req_cmd_opcode_r),
-        .cmd_size           (ff_out_req_cmd_size_r),
-        .cmd_len            (ff_out_req_cmd_len_r),
-        .cmd_atype          (ff_out_req_cmd_atype_r),
-        .cmd_qos            (ff_out_req_cmd_qos_r),
-        .cmd_prot           (ff_out_req_cmd_prot_r),
-        .cmd_eom            (ff_out_req_cmd_eom_r),
-        .cmd_eof            (ff_out_req_cmd_eof_r),
-        .cmd_ex             (ff_out_req_cmd_ex_r),
-        .cmd_user           (ff_out_req_cmd_user_r),
-        .cmd_user_extended  (ff_out_req_cmd_user_extended_r),
-        .cmd_err            (ff_out_req_cmd_err_r),
-        .cmd_hostid         (ff_out_req_cmd_hostid_r)
-    );
-
     // AXI write address bus
-    assign axi_awaddr   = ff_out_req_dstaddr_r;
-    assign axi_awprot   = {1'b0, ff_out_req_cmd_prot_r};
+    assign axi_awaddr   = axi_awaddr_r;
+    assign axi_awprot   = axi_awprot_r;
     assign axi_awvalid  = axi_awvalid_r & reset_done;
 
     // AXI write data bus
-    assign axi_wdata    = ff_out_req_data_shifted_r;
-    assign axi_wstrb    = ff_out_req_data_strb_r;
+    assign axi_wdata    = axi_wdata_r;
+    assign axi_wstrb    = axi_wstrb_r;
     assign axi_wvalid   = axi_wvalid_r & reset_done;
 
     // AXI read address bus
-    assign axi_araddr   = ff_out_req_dstaddr_r;
-    assign axi_arprot   = {1'b0, ff_out_req_cmd_prot_r};
+    assign axi_araddr   = axi_araddr_r;
+    assign axi_arprot   = axi_arprot_r;
     assign axi_arvalid  = axi_arvalid_r & reset_done;
 
-    // One request at a time
-    reg                 umi_req_in_flight;
-    wire                umi_req_done;
+    // Oldest outstanding request, matched against the next B or R
+    wire [CW-1:0]   q_head_cmd;
+    wire [4:0]      q_head_cmd_opcode;
+    wire [2:0]      q_head_cmd_size;
+    wire [7:0]      q_head_cmd_len;
+    wire [7:0]      q_head_cmd_atype;
+    wire [3:0]      q_head_cmd_qos;
+    wire [1:0]      q_head_cmd_prot;
+    wire            q_head_cmd_eom;
+    wire            q_head_cmd_eof;
+    wire            q_head_cmd_ex;
+    wire [1:0]      q_head_cmd_user;
+    wire [23:0]     q_head_cmd_user_extended;
+    wire [1:0]      q_head_cmd_err;
+    wire [4:0]      q_head_cmd_hostid;
+
+    wire            q_head_write;
+    wire            q_head_posted;
+    wire            q_head_read;
+
+    assign q_head_cmd = q_cmd[q_rd_ptr];
 
-    assign umi_req_done = (ff_out_req_cmd_opcode_r == UMI_REQ_POSTED) ?
-                          (axi_bvalid & axi_bready) :
-                          (udev_resp_valid & udev_resp_ready);
+    umi_unpack #(
+        .CW     (CW)
+    ) umi2axilite_q_head_unpack (
+        // Input CMD
+        .packet_cmd         (q_head_cmd),
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset)
-            umi_req_in_flight <= 1'b0;
-        else if (ff_out_req_valid & ff_out_req_ready)
-            umi_req_in_flight <= 1'b1;
-        else if (umi_req_done)
-            umi_req_in_flight <= 1'b0;
-    end
+        // Output Fields
+        .cmd_opcode         (q_head_cmd_opcode),
+        .cmd_size           (q_head_cmd_size),
+        .cmd_len            (q_head_cmd_len),
+        .cmd_atype          (q_head_cmd_atype),
+        .cmd_qos            (q_head_cmd_qos),
+        .cmd_prot           (q_head_cmd_prot),
+        .cmd_eom            (q_head_cmd_eom),
+        .cmd_eof            (q_head_cmd_eof),
+        .cmd_ex             (q_head_cmd_ex),
+        .cmd_user           (q_head_cmd_user),
+        .cmd_user_extended  (q_head_cmd_user_extended),
+        .cmd_err            (q_head_cmd_err),
+        .cmd_hostid         (q_head_cmd_hostid)
+    );
+
+    assign q_head_write  = ~q_empty & (q_head_cmd_opcode == UMI_REQ_WRITE);
+    assign q_head_posted = ~q_empty & (q_head_cmd_opcode == UMI_REQ_POSTED);
+    assign q_head_read   = ~q_empty & (q_head_cmd_opcode == UMI_REQ_READ);
 
-    assign ff_out_req_ready = !umi_req_in_flight & reset_done;
+    assign q_pop = (axi_bvalid & axi_bready) | (axi_rvalid & axi_rready);
 
     // AXI response
     wire [4:0]  udev_resp_cmd_opcode;
     wire [1:0]  udev_resp_cmd_err;
 
-    assign udev_resp_cmd_opcode = (ff_out_req_cmd_opcode_r == UMI_REQ_WRITE) ?
-                                  UMI_RESP_WRITE : UMI_RESP_READ;
+    assign udev_resp_cmd_opcode = q_head_write ? UMI_RESP_WRITE : UMI_RESP_READ;
 
-    assign udev_resp_cmd_err = (ff_out_req_cmd_opcode_r == UMI_REQ_WRITE) ?
-                               axi_bresp : axi_rresp;
+    assign udev_resp_cmd_err = q_head_write ? axi_bresp : axi_rresp;
 
     umi_pack #(
         .CW                 (CW)
     ) umi_req_pack (
         .cmd_opcode         (udev_resp_cmd_opcode),
-        .cmd_size           (ff_out_req_cmd_size_r),
-        .cmd_len            (ff_out_req_cmd_len_r),
-        .cmd_atype          (ff_out_req_cmd_atype_r),
-        .cmd_prot           (ff_out_req_cmd_prot_r),
-        .cmd_qos            (ff_out_req_cmd_qos_r),
-        .cmd_eom            (ff_out_req_cmd_eom_r),
-        .cmd_eof            (ff_out_req_cmd_eof_r),
-        .cmd_user           (ff_out_req_cmd_user_r),
+        .cmd_size           (q_head_cmd_size),
+        .cmd_len            (q_head_cmd_len),
+        .cmd_atype          (q_head_cmd_atype),
+        .cmd_prot           (q_head_cmd_prot),
+        .cmd_qos            (q_head_cmd_qos),
+        .cmd_eom            (q_head_cmd_eom),
+        .cmd_eof            (q_head_cmd_eof),
+        .cmd_user           (q_head_cmd_user),
         .cmd_err            (udev_resp_cmd_err),
-        .cmd_ex             (ff_out_req_cmd_ex_r),
-        .cmd_hostid         (ff_out_req_cmd_hostid_r),
-        .cmd_user_extended  (ff_out_req_cmd_user_extended_r),
+        .cmd_ex             (q_head_cmd_ex),
+        .cmd_hostid         (q_head_cmd_hostid),
+        .cmd_user_extended  (q_head_cmd_user_extended),
 
         .packet_cmd         (udev_resp_cmd)
     );
 
-    assign udev_resp_dstaddr = ff_out_req_srcaddr_r;
-    assign udev_resp_srcaddr = ff_out_req_dstaddr_r;
-    assign udev_resp_data = axi_rdata >> (req_data_shift_r << 3);
-    assign udev_resp_valid = (ff_out_req_cmd_opcode_r == UMI_REQ_WRITE) ?
-                             axi_bvalid : axi_rvalid;
+    assign udev_resp_dstaddr = q_srcaddr[q_rd_ptr];
+    assign udev_resp_srcaddr = q_dstaddr[q_rd_ptr];
+    assign udev_resp_data = axi_rdata >> (q_shift[q_rd_ptr] << 3);
+    assign udev_resp_valid = (q_head_write & axi_bvalid) |
+                             (q_head_read & axi_rvalid);
 
     // AXI write response ready
     // Discard response in case of posted writes
-    assign axi_bready = udev_resp_ready &
-                        ((ff_out_req_cmd_opcode_r == UMI_REQ_WRITE) |
-                        (ff_out_req_cmd_opcode_r == UMI_REQ_POSTED));
+    assign axi_bready = q_head_posted | (q_head_write & udev_resp_ready);
 
     // AXI read response ready
-    assign axi_rready = udev_resp_ready &
-                        (ff_out_req_cmd_opcode_r == UMI_REQ_READ);
+    assign axi_rready = q_head_read & udev_resp_ready;
 
 endmodule
@@ -10,10 +10,10 @@ class UMI2AXIL(UMI):
         super().__init__('umi2axil',
                          files=['rtl/umi2axil.v'],
                          idirs=['rtl'],
-                         deps=[Drsync(),
-                               FifoFlex(),
-                               Unpack(),
-                               Pack()])
+                         deps=[Drsync,
+                               FifoFlex,
+                               Unpack,
+                               Pack])
 
 
 if __name__ == "__main__":
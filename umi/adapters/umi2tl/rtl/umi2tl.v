@@ -17,6 +17,19 @@
  *
  * Documentation:
  * - TileLink TL-UH converter
+ * - Read and write requests of 16 to 128 bytes that are a power of two
+ *   and aligned to their size (SIZE <= 3) are sent as one TileLink burst,
+ *   writes when all their data fits in one IDW packet. Read bursts return
+ *   one UMI response per ODW beat with EOM on the last beat.
+ * - Other requests are split into ODW words (umi_fifoflex) and sent as
+ *   single beat TileLink transactions.
+ * - Up to OUTSTANDING transactions are in flight, each with its own
+ *   TileLink source. The source indexes a table holding the request
+ *   header used to build the response.
+ * - Sources are allocated and retired in issue order. D channel beats are
+ *   stored in a per source response buffer and UMI responses are returned
+ *   from the oldest source, so they leave in request order whatever order
+ *   the TileLink slave answers in (requests of one HOSTID stay in order).
  *
  ******************************************************************************/
 
@@ -27,7 +40,8 @@ module umi2tl #(
     parameter CW    = 32,   // UMI command width
     parameter AW    = 64,   // UMI address width
     parameter IDW   = 128,  // UMI data width (NOTE: only this case tested)
-    parameter ODW   = 64    // TileLink data width
+    parameter ODW   = 64,   // TileLink data width
+    parameter OUTSTANDING = 8   // TileLink sources in flight (<= 16)
 )
 (
     input  wire             clk,
@@ -83,7 +97,55 @@ module umi2tl #(
             reset_done <= {reset_done[0], 1'b1};
     end
 
-    // Split incoming command into ODW sizes
+    // Requests sent as a single TileLink burst
+    wire [4:0]      burst_req_cmd_opcode;
+    wire [2:0]      burst_req_cmd_size;
+    wire [7:0]      burst_req_cmd_len;
+    wire [8:0]      burst_req_cmd_len_plus_one;
+    wire [15:0]     burst_req_bytes;
+    reg  [2:0]      burst_tl_a_size;
+    reg  [3:0]      burst_beats;
+    reg             burst_size_ok;
+    wire            burst_aligned;
+    wire            burst_req;
+    wire            burst_valid;
+    wire            burst_ready;
+    wire            fifoflex_in_ready;
+
+    assign burst_req_cmd_opcode = udev_req_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB];
+    assign burst_req_cmd_size   = udev_req_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB];
+    assign burst_req_cmd_len    = udev_req_cmd[UMI_LEN_MSB:UMI_LEN_LSB];
+    assign burst_req_cmd_len_plus_one = burst_req_cmd_len + 1;
+    assign burst_req_bytes = {7'b0, burst_req_cmd_len_plus_one} << burst_req_cmd_size;
+
+    always @(*) begin
+        burst_size_ok = 1'b1;
+        case (burst_req_bytes)
+            16'd16:  begin burst_tl_a_size = 3'd4; burst_beats = 4'd1;  end
+            16'd32:  begin burst_tl_a_size = 3'd5; burst_beats = 4'd3;  end
+            16'd64:  begin burst_tl_a_size = 3'd6; burst_beats = 4'd7;  end
+            16'd128: begin burst_tl_a_size = 3'd7; burst_beats = 4'd15; end
+            default: begin
+                burst_size_ok = 1'b0;
+                burst_tl_a_size = 3'd0;
+                burst_beats = 4'd0;
+            end
+        endcase
+    end
+
+    assign burst_aligned = ~|(udev_req_dstaddr[6:0] & (burst_req_bytes[6:0] - 7'd1));
+
+    assign burst_req = burst_size_ok & burst_aligned &
+                       (burst_req_cmd_size <= 3'd3) &
+                       ((burst_req_cmd_opcode == UMI_REQ_READ) |
+                        (((burst_req_cmd_opcode == UMI_REQ_WRITE) |
+                          (burst_req_cmd_opcode == UMI_REQ_POSTED)) &
+                         (burst_req_bytes <= IDW/8)));
+
+    assign burst_valid    = udev_req_valid & burst_req;
+    assign udev_req_ready = burst_req ? burst_ready : fifoflex_in_ready;
+
+    // Split other commands into ODW sizes
     // FIXME: It is assumed that incoming transactions are powers of 2
     // Hence, if a transaction is unaligned, it means transaction is smaller
     // than ODW bits. This needs to be fixed.
@@ -110,12 +172,12 @@ module umi2tl #(
         // Input
         .umi_in_clk     (clk),
         .umi_in_nreset  (nreset),
-        .umi_in_valid   (udev_req_valid),
+        .umi_in_valid   (udev_req_valid & ~burst_req),
         .umi_in_cmd     (udev_req_cmd),
         .umi_in_dstaddr (udev_req_dstaddr),
         .umi_in_srcaddr (udev_req_srcaddr),
         .umi_in_data    (udev_req_data),
-        .umi_in_ready   (udev_req_ready),
+        .umi_in_ready   (fifoflex_in_ready),
 
         // Output
         .umi_out_clk    (clk),
@@ -195,7 +257,7 @@ module umi2tl #(
         end
         else if (req_bytes == 1)  begin
             masked_shift = fifoflex_out_req_dstaddr[2:0];
-            masked_tl_a_size = 3'd1;
+            masked_tl_a_size = 3'd0;
             masked_tl_a_mask = 8'd1;
         end
         else begin
@@ -205,6 +267,65 @@ module umi2tl #(
         end
     end
 
+    // TileLink opcode and param of the request (single beat or burst)
+    wire [4:0]      a_cmd_opcode;
+    wire [7:0]      a_cmd_atype;
+    reg  [2:0]      a_opcode;
+    reg  [2:0]      a_param;
+
+    // the fifoflex output has priority over a new burst
+    assign a_cmd_opcode = ~fifoflex_out_req_valid ? burst_req_cmd_opcode : fifoflex_out_req_cmd_opcode;
+    assign a_cmd_atype  = ~fifoflex_out_req_valid ? 8'b0 : fifoflex_out_req_cmd_atype;
+
+    always @(*) begin
+        a_opcode = `TL_OP_Get;
+        a_param  = 3'b0;
+        case (a_cmd_opcode)
+            UMI_REQ_READ:   a_opcode = `TL_OP_Get;
+            UMI_REQ_WRITE:  a_opcode = `TL_OP_PutFullData;
+            UMI_REQ_POSTED: a_opcode = `TL_OP_PutFullData;
+            UMI_REQ_ATOMIC: begin
+                if ((a_cmd_atype == UMI_REQ_ATOMICADD)  |
+                    (a_cmd_atype == UMI_REQ_ATOMICMAX)  |
+                    (a_cmd_atype == UMI_REQ_ATOMICMIN)  |
+                    (a_cmd_atype == UMI_REQ_ATOMICMAXU) |
+                    (a_cmd_atype == UMI_REQ_ATOMICMINU)) begin
+                    a_opcode = `TL_OP_ArithmeticData;
+                end
+                else begin
+                    a_opcode = `TL_OP_LogicalData;
+                end
+                case (a_cmd_atype)
+                    UMI_REQ_ATOMICADD:  a_param = `TL_PA_ADD;
+                    UMI_REQ_ATOMICAND:  a_param = `TL_PL_AND;
+                    UMI_REQ_ATOMICOR:   a_param = `TL_PL_OR;
+                    UMI_REQ_ATOMICXOR:  a_param = `TL_PL_XOR;
+                    UMI_REQ_ATOMICMAX:  a_param = `TL_PA_MAX;
+                    UMI_REQ_ATOMICMIN:  a_param = `TL_PA_MIN;
+                    UMI_REQ_ATOMICMAXU: a_param = `TL_PA_MAXU;
+                    UMI_REQ_ATOMICMINU: a_param = `TL_PA_MINU;
+                    UMI_REQ_ATOMICSWAP: a_param = `TL_PL_SWAP;
+                    default:            a_param = 3'b0;
+                endcase
+            end
+            default: a_opcode = `TL_OP_Get;
+        endcase
+    end
+
+    // Source table, one entry per TileLink source in flight, allocated
+    // in issue order
+    reg  [OUTSTANDING-1:0]  tbl_valid;
+    reg  [CW-1:0]           tbl_cmd     [0:OUTSTANDING-1];
+    reg  [AW-1:0]           tbl_dstaddr [0:OUTSTANDING-1];
+    reg  [AW-1:0]           tbl_srcaddr [0:OUTSTANDING-1];
+    reg  [2:0]              tbl_shift   [0:OUTSTANDING-1];
+    reg                     tbl_burst   [0:OUTSTANDING-1];
+    reg  [3:0]              tbl_beats   [0:OUTSTANDING-1];
+
+    reg  [3:0]              free_source;
+    wire                    any_free;
+
+    // TileLink A channel, bursts send their beats back to back
     reg             tl_a_valid_r;
     reg  [2:0]      tl_a_opcode_r;
     reg  [2:0]      tl_a_param_r;
@@ -212,7 +333,15 @@ module umi2tl #(
     reg  [3:0]      tl_a_source_r;
     reg  [55:0]     tl_a_address_r;
     reg  [7:0]      tl_a_mask_r;
-    reg  [ODW-1:0]  tl_a_data_r;
+    reg  [IDW-1:0]  tl_a_data_r;
+    reg  [3:0]      tl_a_beats_r;
+
+    wire            tl_a_fire;
+    wire            tl_a_last;
+    wire            a_free;
+    wire            a_load;
+    wire            a_load_burst;
+    wire            a_load_single;
 
     assign tl_a_valid = tl_a_valid_r;
     assign tl_a_opcode = tl_a_opcode_r;
@@ -221,18 +350,40 @@ module umi2tl #(
     assign tl_a_source = tl_a_source_r;
     assign tl_a_address = tl_a_address_r;
     assign tl_a_mask = tl_a_mask_r;
-    assign tl_a_data = tl_a_data_r;
+    assign tl_a_data = tl_a_data_r[ODW-1:0];
     assign tl_a_corrupt = 1'b0;
 
+    assign tl_a_fire = tl_a_ready & tl_a_valid;
+    assign tl_a_last = (tl_a_beats_r == 4'd0);
+
+    assign a_free = reset_done[1] & any_free & (~tl_a_valid_r | (tl_a_fire & tl_a_last));
+
+    // Bursts bypass the fifoflex, only when it has nothing left to send
+    assign burst_ready = a_free & ~fifoflex_out_req_valid;
+    assign fifoflex_out_req_ready = a_free;
+
+    assign a_load_burst  = burst_valid & burst_ready;
+    assign a_load_single = fifoflex_out_req_valid & fifoflex_out_req_ready;
+    assign a_load        = a_load_burst | a_load_single;
+
+    assign any_free = ~tbl_valid[free_source];
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset)
+            free_source <= 'b0;
+        else if (a_load)
+            free_source <= (free_source == OUTSTANDING-1) ? 4'd0 : free_source + 4'd1;
+    end
+
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
             tl_a_valid_r <= 1'b0;
         end
         else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
+            if (a_load) begin
                 tl_a_valid_r <= 1'b1;
             end
-            else if (tl_a_ready & tl_a_valid) begin
+            else if (tl_a_fire & tl_a_last) begin
                 tl_a_valid_r <= 1'b0;
             end
         end
@@ -240,142 +391,147 @@ module umi2tl #(
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
+            tl_a_opcode_r  <= 'b0;
+            tl_a_param_r   <= 'b0;
             tl_a_size_r    <= 'b0;
             tl_a_source_r  <= 'b0;
             tl_a_address_r <= 'b0;
             tl_a_mask_r    <= 'b0;
             tl_a_data_r    <= 'b0;
+            tl_a_beats_r   <= 'b0;
         end
         else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
+            if (a_load_burst) begin
+                tl_a_opcode_r  <= a_opcode;
+                tl_a_param_r   <= a_param;
+                tl_a_size_r    <= burst_tl_a_size;
+                tl_a_source_r  <= free_source;
+                tl_a_address_r <= udev_req_dstaddr[55:0];
+                tl_a_mask_r    <= 8'd255;
+                tl_a_data_r    <= udev_req_data;
+                // a Get is a single A beat whatever its size
+                tl_a_beats_r   <= (burst_req_cmd_opcode == UMI_REQ_READ) ? 4'd0 : burst_beats;
+            end
+            else if (a_load_single) begin
+                tl_a_opcode_r  <= a_opcode;
+                tl_a_param_r   <= a_param;
                 tl_a_size_r    <= masked_tl_a_size;
-                tl_a_source_r  <= 'b0;
+                tl_a_source_r  <= free_source;
                 tl_a_address_r <= {fifoflex_out_req_dstaddr[55:3], 3'd0};
                 tl_a_mask_r    <= masked_tl_a_mask << masked_shift;
-                tl_a_data_r    <= fifoflex_out_req_data << (masked_shift*8);
+                tl_a_data_r    <= {{(IDW-ODW){1'b0}}, fifoflex_out_req_data << (masked_shift*8)};
+                tl_a_beats_r   <= 4'd0;
+            end
+            else if (tl_a_fire & ~tl_a_last) begin
+                tl_a_data_r    <= tl_a_data_r >> ODW;
+                tl_a_beats_r   <= tl_a_beats_r - 4'd1;
             end
         end
     end
 
+    `ifndef SYNTHESIS
+    always @(posedge clk)
+        if (a_load_single & (fifoflex_out_req_cmd_opcode != UMI_REQ_READ) &
+            (fifoflex_out_req_cmd_opcode != UMI_REQ_WRITE) &
+            (fifoflex_out_req_cmd_opcode != UMI_REQ_POSTED) &
+            (fifoflex_out_req_cmd_opcode != UMI_REQ_ATOMIC))
+            $display("[UMI2TL]: Unsupported UMI Request");
+    `endif
+
+    // Save metadata to use with the response
+    wire            tl_d_fire;
+    wire            tl_d_last;
+    reg  [3:0]      d_beat;
+    reg  [3:0]      head_source;
+    reg  [3:0]      out_beat;
+    wire            out_fire;
+    wire            out_last;
+
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
-            tl_a_opcode_r <= 'b0;
+            tbl_valid <= 'b0;
         end
         else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
-                case (fifoflex_out_req_cmd_opcode)
-                    UMI_REQ_READ:   tl_a_opcode_r <= `TL_OP_Get;
-                    UMI_REQ_WRITE:  tl_a_opcode_r <= `TL_OP_PutFullData;
-                    // UMI_REQ_POSTED: tl_a_opcode_r <= `TL_OP_PutFullData;
-                    UMI_REQ_ATOMIC: begin
-                        if ((fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICADD)  |
-                            (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICMAX)  |
-                            (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICMIN)  |
-                            (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICMAXU) |
-                            (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICMINU)) begin
-                            tl_a_opcode_r <= `TL_OP_ArithmeticData;
-                        end
-                        else if ((fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICAND) |
-                                 (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICOR)  |
-                                 (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICXOR) |
-                                 (fifoflex_out_req_cmd_atype == UMI_REQ_ATOMICSWAP)) begin
-                            tl_a_opcode_r <= `TL_OP_LogicalData;
-                        end
-                    end
-                `ifndef SYNTHESIS
-                    default: begin
-                        $display("[UMI2TL]: Unsupported UMI Request");
-                    end
-                `endif
-                endcase
-            end
+            if (a_load)
+                tbl_valid[free_source] <= 1'b1;
+            if (out_fire & out_last)
+                tbl_valid[head_source] <= 1'b0;
         end
     end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            tl_a_param_r <= 'b0;
+    always @(posedge clk) begin
+        if (a_load_burst) begin
+            tbl_cmd[free_source]     <= udev_req_cmd;
+            tbl_dstaddr[free_source] <= udev_req_dstaddr;
+            tbl_srcaddr[free_source] <= udev_req_srcaddr;
+            tbl_shift[free_source]   <= 3'b0;
+            tbl_burst[free_source]   <= 1'b1;
+            tbl_beats[free_source]   <= burst_beats;
         end
-        else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
-                if (fifoflex_out_req_cmd_opcode == UMI_REQ_ATOMIC) begin
-                    case (fifoflex_out_req_cmd_atype)
-                        UMI_REQ_ATOMICADD:  tl_a_param_r <= `TL_PA_ADD;
-                        UMI_REQ_ATOMICAND:  tl_a_param_r <= `TL_PL_AND;
-                        UMI_REQ_ATOMICOR:   tl_a_param_r <= `TL_PL_OR;
-                        UMI_REQ_ATOMICXOR:  tl_a_param_r <= `TL_PL_XOR;
-                        UMI_REQ_ATOMICMAX:  tl_a_param_r <= `TL_PA_MAX;
-                        UMI_REQ_ATOMICMIN:  tl_a_param_r <= `TL_PA_MIN;
-                        UMI_REQ_ATOMICMAXU: tl_a_param_r <= `TL_PA_MAXU;
-                        UMI_REQ_ATOMICMINU: tl_a_param_r <= `TL_PA_MINU;
-                        UMI_REQ_ATOMICSWAP: tl_a_param_r <= `TL_PL_SWAP;
-                    `ifndef SYNTHESIS
-                        default: begin
-                            $display("[UMI2TL]: Unsupported UMI Atomic");
-                        end
-                    `endif
-                    endcase
-                end
-                else begin
-                    tl_a_param_r    <= 'b0;
-                end
-            end
+        else if (a_load_single) begin
+            tbl_cmd[free_source]     <= fifoflex_out_req_cmd;
+            tbl_dstaddr[free_source] <= fifoflex_out_req_dstaddr;
+            tbl_srcaddr[free_source] <= fifoflex_out_req_srcaddr;
+            tbl_shift[free_source]   <= masked_shift;
+            tbl_burst[free_source]   <= 1'b0;
+            tbl_beats[free_source]   <= 4'd0;
         end
     end
 
-    // Extend tl_d_data to IDW width for shift operations
-    wire [IDW-1:0]          tl_d_data_ext;
-    generate
-        if (IDW > ODW) begin : gen_tl_d_pad
-            assign tl_d_data_ext[IDW-1:0] = {{(IDW-ODW){1'b0}}, tl_d_data[ODW-1:0]};
-        end else begin : gen_tl_d_trunc
-            assign tl_d_data_ext[IDW-1:0] = tl_d_data[IDW-1:0];
+    // Response buffer, room for the beats of a 128 byte burst per source.
+    // Beats are written as they arrive and read back from the oldest source.
+    localparam MAXBEATS = 16;
+
+    reg  [ODW-1:0]          rob_data    [0:OUTSTANDING*MAXBEATS-1];
+    reg  [4:0]              rob_count   [0:OUTSTANDING-1];
+    reg                     rob_read    [0:OUTSTANDING-1];
+    wire [ODW-1:0]          out_data;
+    wire                    out_valid;
+    wire                    out_ready;
+
+    always @(posedge clk) begin
+        if (a_load)
+            rob_count[free_source] <= 5'd0;
+        if (tl_d_fire) begin
+            rob_data[tl_d_source*MAXBEATS + d_beat] <= tl_d_data;
+            rob_count[tl_d_source] <= rob_count[tl_d_source] + 5'd1;
+            rob_read[tl_d_source]  <= (tl_d_opcode == `TL_OP_AccessAckData);
         end
-    endgenerate
-
-    // Save metadata to use with response
-    reg  [CW-1:0]           fifoflex_out_req_cmd_r;
-    reg  [AW-1:0]           fifoflex_out_req_dstaddr_r;
-    reg  [AW-1:0]           fifoflex_out_req_srcaddr_r;
-    reg  [2:0]              masked_shift_r;
-
-    reg                     tl_transaction_in_flight;
-    reg                     tl_transaction_done;
+    end
 
-    assign fifoflex_out_req_ready = reset_done[1] & ~tl_transaction_in_flight;
+    assign out_data  = rob_data[head_source*MAXBEATS + out_beat];
+    assign out_valid = tbl_valid[head_source] & ({1'b0, out_beat} < rob_count[head_source]);
+    assign out_last  = ~rob_read[head_source] | (out_beat == tbl_beats[head_source]);
+    assign out_fire  = out_valid & out_ready;
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
-            fifoflex_out_req_cmd_r     <= 'b0;
-            fifoflex_out_req_dstaddr_r <= 'b0;
-            fifoflex_out_req_srcaddr_r <= 'b0;
-            masked_shift_r             <= 'b0;
+            head_source <= 'b0;
+            out_beat    <= 'b0;
         end
-        else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
-                fifoflex_out_req_cmd_r     <= fifoflex_out_req_cmd;
-                fifoflex_out_req_dstaddr_r <= fifoflex_out_req_dstaddr;
-                fifoflex_out_req_srcaddr_r <= fifoflex_out_req_srcaddr;
-                masked_shift_r             <= masked_shift;
+        else if (out_fire) begin
+            if (out_last) begin
+                head_source <= (head_source == OUTSTANDING-1) ? 4'd0 : head_source + 4'd1;
+                out_beat    <= 4'd0;
+            end
+            else begin
+                out_beat    <= out_beat + 4'd1;
             end
         end
     end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            tl_transaction_in_flight <= 1'b0;
-        end
-        else begin
-            if (fifoflex_out_req_ready & fifoflex_out_req_valid) begin
-                tl_transaction_in_flight <= 1'b1;
-            end
-            else if (tl_transaction_done) begin
-                tl_transaction_in_flight <= 1'b0;
-            end
+    // Extend the response data to IDW width for shift operations
+    wire [IDW-1:0]          out_data_ext;
+    generate
+        if (IDW > ODW) begin : gen_tl_d_pad
+            assign out_data_ext[IDW-1:0] = {{(IDW-ODW){1'b0}}, out_data[ODW-1:0]};
+        end else begin : gen_tl_d_trunc
+            assign out_data_ext[IDW-1:0] = out_data[IDW-1:0];
         end
-    end
+    endgenerate
 
-    // Unpack request command to forward to response`
+    // Unpack request command to forward to response
+    wire [CW-1:0]   req2resp_cmd;
     wire [4:0]      req2resp_cmd_opcode;
     wire [2:0]      req2resp_cmd_size;
     wire [7:0]      req2resp_cmd_len;
@@ -390,22 +546,21 @@ module umi2tl #(
     wire [1:0]      req2resp_cmd_err;
     wire [4:0]      req2resp_cmd_hostid;
 
-    reg             udev_resp_valid_r;
-    reg  [4:0]      udev_resp_cmd_opcode_r;
-    reg  [AW-1:0]   udev_resp_dstaddr_r;
-    reg  [AW-1:0]   udev_resp_srcaddr_r;
-    reg  [IDW-1:0]  udev_resp_data_r;
+    wire            req2resp_burst;
+    wire [4:0]      resp_cmd_opcode;
+    wire [7:0]      resp_cmd_len;
+    wire            resp_cmd_eom;
+    wire [CW-1:0]   resp_cmd;
+    wire [AW-1:0]   resp_offset;
 
-    assign udev_resp_valid = udev_resp_valid_r;
-    assign udev_resp_dstaddr = udev_resp_dstaddr_r;
-    assign udev_resp_srcaddr = udev_resp_srcaddr_r;
-    assign udev_resp_data = udev_resp_data_r;
+    assign req2resp_cmd   = tbl_cmd[head_source];
+    assign req2resp_burst = tbl_burst[head_source];
 
     umi_unpack #(
         .CW     (CW)
     ) umi2tl_req2resp_unpack (
         // Input CMD
-        .packet_cmd         (fifoflex_out_req_cmd_r),
+        .packet_cmd         (req2resp_cmd),
 
         // Output Fields
         .cmd_opcode         (req2resp_cmd_opcode),
@@ -423,16 +578,26 @@ module umi2tl #(
         .cmd_hostid         (req2resp_cmd_hostid)
     );
 
+    // Read bursts return one ODW response per beat, EOM on the last one
+    assign tl_d_last = (tl_d_opcode != `TL_OP_AccessAckData) |
+                       (d_beat == tbl_beats[tl_d_source]);
+
+    assign resp_cmd_opcode = rob_read[head_source] ? UMI_RESP_READ : UMI_RESP_WRITE;
+    assign resp_cmd_len    = (req2resp_burst & rob_read[head_source]) ?
+                             ((8'd8 >> req2resp_cmd_size) - 8'd1) : req2resp_cmd_len;
+    assign resp_cmd_eom    = req2resp_cmd_eom & out_last;
+    assign resp_offset     = {{(AW-7){1'b0}}, out_beat, 3'b0};
+
     umi_pack #(
         .CW                 (CW)
     ) umi2tl_req2resp_pack (
-        .cmd_opcode         (udev_resp_cmd_opcode_r),
+        .cmd_opcode         (resp_cmd_opcode),
         .cmd_size           (req2resp_cmd_size),
-        .cmd_len            (req2resp_cmd_len),
+        .cmd_len            (resp_cmd_len),
         .cmd_atype          (req2resp_cmd_atype),
         .cmd_qos            (req2resp_cmd_qos),
         .cmd_prot           (req2resp_cmd_prot),
-        .cmd_eom            (req2resp_cmd_eom),
+        .cmd_eom            (resp_cmd_eom),
         .cmd_eof            (req2resp_cmd_eof),
         .cmd_ex             (req2resp_cmd_ex),
         .cmd_user           (req2resp_cmd_user),
@@ -440,18 +605,43 @@ module umi2tl #(
         .cmd_err            (req2resp_cmd_err),
         .cmd_hostid         (req2resp_cmd_hostid),
 
-        .packet_cmd         (udev_resp_cmd)
+        .packet_cmd         (resp_cmd)
     );
 
-    assign tl_d_ready = reset_done[1] &
-                        (~udev_resp_valid | udev_resp_ready);
+    reg             udev_resp_valid_r;
+    reg  [CW-1:0]   udev_resp_cmd_r;
+    reg  [AW-1:0]   udev_resp_dstaddr_r;
+    reg  [AW-1:0]   udev_resp_srcaddr_r;
+    reg  [IDW-1:0]  udev_resp_data_r;
+
+    assign udev_resp_valid = udev_resp_valid_r;
+    assign udev_resp_cmd = udev_resp_cmd_r;
+    assign udev_resp_dstaddr = udev_resp_dstaddr_r;
+    assign udev_resp_srcaddr = udev_resp_srcaddr_r;
+    assign udev_resp_data = udev_resp_data_r;
+
+    // Every source in flight owns its buffer space, D is never stalled
+    assign tl_d_ready = reset_done[1];
+
+    assign out_ready = ~udev_resp_valid | udev_resp_ready;
+
+    assign tl_d_fire = tl_d_ready & tl_d_valid;
+
+    always @(posedge clk or negedge nreset) begin
+        if (~nreset) begin
+            d_beat <= 'b0;
+        end
+        else if (tl_d_fire) begin
+            d_beat <= tl_d_last ? 4'd0 : d_beat + 4'd1;
+        end
+    end
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
             udev_resp_valid_r <= 1'b0;
         end
         else begin
-            if (tl_d_ready & tl_d_valid & (req2resp_cmd_opcode != UMI_REQ_POSTED)) begin
+            if (out_fire & (req2resp_cmd_opcode != UMI_REQ_POSTED)) begin
                 udev_resp_valid_r <= 1'b1;
             end
             else if (udev_resp_ready & udev_resp_valid) begin
@@ -462,49 +652,25 @@ module umi2tl #(
 
     always @(posedge clk or negedge nreset) begin
         if (~nreset) begin
+            udev_resp_cmd_r     <= 'b0;
             udev_resp_dstaddr_r <= 'b0;
             udev_resp_srcaddr_r <= 'b0;
+            udev_resp_data_r    <= 'b0;
         end
-        else if (tl_d_ready & tl_d_valid) begin
-                udev_resp_dstaddr_r <= fifoflex_out_req_srcaddr_r;
-                udev_resp_srcaddr_r <= fifoflex_out_req_dstaddr_r;
-        end
-    end
-
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            udev_resp_data_r <= 'b0;
-        end
-        else if (tl_d_ready & tl_d_valid) begin
-            udev_resp_data_r <= tl_d_data_ext >> (masked_shift_r*8);
-        end
-    end
-
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            udev_resp_cmd_opcode_r <= 'b0;
-        end
-        else if (tl_d_ready & tl_d_valid) begin
-            case (tl_d_opcode)
-                `TL_OP_AccessAck:       udev_resp_cmd_opcode_r <= UMI_RESP_WRITE;
-                `TL_OP_AccessAckData:   udev_resp_cmd_opcode_r <= UMI_RESP_READ;
-            `ifndef SYNTHESIS
-                default: begin
-                    $display("[UMI2TL]: Unsupported TileLink Response");
-                end
-            `endif
-            endcase
+        else if (out_fire) begin
+            udev_resp_cmd_r     <= resp_cmd;
+            udev_resp_dstaddr_r <= tbl_srcaddr[head_source] + resp_offset;
+            udev_resp_srcaddr_r <= tbl_dstaddr[head_source] + resp_offset;
+            udev_resp_data_r    <= out_data_ext >> (tbl_shift[head_source]*8);
         end
     end
 
-    always @(posedge clk or negedge nreset) begin
-        if (~nreset) begin
-            tl_transaction_done <= 1'b0;
-        end
-        else begin
-            tl_transaction_done <= udev_resp_ready & udev_resp_valid;
-        end
-    end
+    `ifndef SYNTHESIS
+    always @(posedge clk)
+        if (tl_d_fire & (tl_d_opcode != `TL_OP_AccessAck) &
+            (tl_d_opcode != `TL_OP_AccessAckData))
+            $display("[UMI2TL]: Unsupported TileLink Response");
+    `endif
 
 endmodule
 
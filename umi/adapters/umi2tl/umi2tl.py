@@ -10,10 +10,10 @@ class UMI2TL(UMI):
         super().__init__('umi2tl',
                          files=['rtl/umi2tl.v'],
                          idirs=['rtl'],
-                         deps=[TileLink(),
-                               FifoFlex(),
-                               Pack(),
-                               Unpack()])
+                         deps=[TileLink,
+                               FifoFlex,
+                               Pack,
+                               Unpack])
 
 
 if __name__ == "__main__":
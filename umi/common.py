@@ -1,26 +1,45 @@
+import functools
 import inspect
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Type, Union
 from siliconcompiler import Design
 
 
+##################################################
+# Design registry
+##################################################
+@functools.lru_cache(maxsize=None)
+def get_design(cls: Type[Design], *args, **kwargs) -> Design:
+    '''
+    Returns the process-wide shared instance of cls built with the given
+    constructor arguments, creating it on first use.
+
+    Shared instances are referenced by every design that depends on them
+    and must be treated as read-only, create a new object with cls() when
+    a design needs to be modified.
+    '''
+    return cls(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _design_root(cls: type) -> Path:
+    return Path(inspect.getfile(cls)).resolve().parent
+
+
 class UMI(Design):
     def __init__(self,
                  name: str,
                  files: List[str] = None,
                  idirs: List[str] = None,
-                 deps: List[Design] = None,
+                 deps: List[Union[Design, Type[Design]]] = None,
                  defines: List[str] = None,
                  undefines: List[str] = None,
                  params: List[Tuple] = None):
 
         super().__init__(name)
 
-        # move this
-        cls = self.__class__
-        module = inspect.getmodule(cls)
-        localpath = Path(inspect.getfile(module)).resolve().parent
-        globalpath = Path(__file__).resolve().parent
+        localpath = _design_root(self.__class__)
+        globalpath = _design_root(UMI)
 
         # Taking care of Nones
         if idirs is None:
@@ -46,6 +65,9 @@ class UMI(Design):
             for item in idirs:
                 self.add_idir(item)
             for item in deps:
+                # Classes are resolved to their shared registry instance
+                if isinstance(item, type):
+                    item = get_design(item)
                 self.add_depfileset(item)
             for item in defines:
                 self.add_define(item)
@@ -1,3 +1,9 @@
-from .lumi import LUMI
+from umi._lazy import lazy_exports
+
+
+# Design objects, only imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'LUMI': '.lumi'
+})
 
 __all__ = ['LUMI']
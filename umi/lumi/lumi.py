@@ -12,6 +12,7 @@ class LUMI(UMI):
     def __init__(self):
         super().__init__('lumi',
                          files=['rtl/lumi.v',
+                                'rtl/lumi_bond.v',
                                 'rtl/lumi_crossbar.v',
                                 'rtl/lumi_regs.v',
                                 'rtl/lumi_tx.v',
@@ -19,13 +20,13 @@ class LUMI(UMI):
                                 'rtl/lumi_rx.v',
                                 'rtl/lumi_rx_ready.v'],
                          idirs=['rtl'],
-                         deps=[Mux(),
-                               FifoFlex(),
-                               Crossbar(),
-                               Regif(),
-                               Asyncfifo(),
-                               Rsync(),
-                               Dsync()])
+                         deps=[Mux,
+                               FifoFlex,
+                               Crossbar,
+                               Regif,
+                               Asyncfifo,
+                               Rsync,
+                               Dsync])
 
 
 if __name__ == "__main__":
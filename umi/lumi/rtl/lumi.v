@@ -137,16 +137,23 @@ module lumi
    wire                 cb2regs_valid;
    wire [15:0]          csr_rxcrdt_req_init;
    wire [15:0]          csr_rxcrdt_resp_init;
+   wire                 csr_rxcutthru;
    wire                 csr_rxen;
+   wire                 csr_rxhdrcomp;
    wire [7:0]           csr_rxiowidth;
+   wire                 csr_txcrdt_adapt;
    wire                 csr_txcrdt_en;
    wire [15:0]          csr_txcrdt_intrvl;
+   wire [31:0]          csr_txcrdt_msgs;
    wire [31:0]          csr_req_txcrdt_stall_cycles;
    wire [31:0]          csr_resp_txcrdt_stall_cycles;
    wire [31:0]          csr_req_txcrdt_active_cycles;
    wire [31:0]          csr_resp_txcrdt_active_cycles;
    wire                 csr_txen;
+   wire                 csr_txhdrcomp;
    wire [7:0]           csr_txiowidth;
+   wire [31:0]          csr_txlink_bytes;
+   wire [31:0]          csr_txpayload_bytes;
    wire [CW-1:0]        fifo2cb_cmd;
    wire [RW-1:0]        fifo2cb_data;
    wire [AW-1:0]        fifo2cb_dstaddr;
@@ -165,6 +172,7 @@ module lumi
    wire [1:0]           rmt_crdt_init;
    wire [15:0]          rmt_crdt_req;
    wire [15:0]          rmt_crdt_resp;
+   wire                 rmt_hdrcomp;
    // End of automatics
 
    //##########################
@@ -206,8 +214,12 @@ module lumi
              .csr_arbmode                   (),                      // Templated
              .csr_txen                      (csr_txen),
              .csr_txcrdt_en                 (csr_txcrdt_en),
+             .csr_txcrdt_adapt              (csr_txcrdt_adapt),
+             .csr_txhdrcomp                 (csr_txhdrcomp),
              .csr_txiowidth                 (csr_txiowidth[7:0]),
              .csr_rxen                      (csr_rxen),
+             .csr_rxhdrcomp                 (csr_rxhdrcomp),
+             .csr_rxcutthru                 (csr_rxcutthru),
              .csr_rxiowidth                 (csr_rxiowidth[7:0]),
              .csr_txcrdt_intrvl             (csr_txcrdt_intrvl[15:0]),
              .csr_rxcrdt_req_init           (csr_rxcrdt_req_init[15:0]),
@@ -228,7 +240,10 @@ module lumi
              .csr_req_txcrdt_stall_cycles   (csr_req_txcrdt_stall_cycles),
              .csr_resp_txcrdt_stall_cycles  (csr_resp_txcrdt_stall_cycles),
              .csr_req_txcrdt_active_cycles  (csr_req_txcrdt_active_cycles),
-             .csr_resp_txcrdt_active_cycles (csr_resp_txcrdt_active_cycles));
+             .csr_resp_txcrdt_active_cycles (csr_resp_txcrdt_active_cycles),
+             .csr_txlink_bytes              (csr_txlink_bytes[31:0]),
+             .csr_txpayload_bytes           (csr_txpayload_bytes[31:0]),
+             .csr_txcrdt_msgs               (csr_txcrdt_msgs[31:0]));
 
    //###########################
    // Register Crossbar
@@ -431,11 +446,14 @@ module lumi
            .rmt_crdt_resp       (rmt_crdt_resp[15:0]),
            .loc_crdt_init       (loc_crdt_init[1:0]),
            .rmt_crdt_init       (rmt_crdt_init[1:0]),
+           .rmt_hdrcomp         (rmt_hdrcomp),
            // Inputs
            .clk                 (clk),
            .nreset              (nreset),
            .csr_en              (csr_rxen),              // Templated
            .csr_crdt_en         (csr_txcrdt_en),         // Templated
+           .csr_hdrcomp         (csr_rxhdrcomp),         // Templated
+           .csr_cutthru         (csr_rxcutthru),         // Templated
            .csr_iowidth         (csr_rxiowidth[7:0]),    // Templated
            .vss                 (vss),
            .vdd                 (vdd),
@@ -454,7 +472,9 @@ module lumi
 
    /*lumi_tx  AUTO_TEMPLATE (
     .csr_tx\(.*\)        (csr_tx\1),
+    .csr_crdt_\(.*\)_init (csr_rxcrdt_\1_init[]),
     .csr_\(.*\)          (csr_@"(substring vl-cell-name 5 7)"\1[]),
+    .loc_hdrcomp         (csr_rxhdrcomp),
     .io\(.*\)            (@"(substring vl-cell-name 5 7)"\1[]),
     .umi_resp_in_\(.*\)  (uhost_resp_\1[]),
     .umi_req_in_\(.*\)   (udev_req_\1[]),
@@ -476,11 +496,16 @@ module lumi
            .csr_resp_crdt_stall_cycles  (csr_resp_txcrdt_stall_cycles), // Templated
            .csr_req_crdt_active_cycles  (csr_req_txcrdt_active_cycles), // Templated
            .csr_resp_crdt_active_cycles (csr_resp_txcrdt_active_cycles), // Templated
+           .csr_link_bytes              (csr_txlink_bytes[31:0]), // Templated
+           .csr_payload_bytes           (csr_txpayload_bytes[31:0]), // Templated
+           .csr_crdt_msgs               (csr_txcrdt_msgs[31:0]), // Templated
            // Inputs
            .clk                         (clk),
            .nreset                      (nreset),
            .csr_en                      (csr_txen),              // Templated
            .csr_crdt_en                 (csr_txcrdt_en),         // Templated
+           .csr_crdt_adapt              (csr_txcrdt_adapt),      // Templated
+           .csr_hdrcomp                 (csr_txhdrcomp),         // Templated
            .csr_iowidth                 (csr_txiowidth[7:0]),    // Templated
            .vss                         (vss),
            .vdd                         (vdd),
@@ -497,12 +522,16 @@ module lumi
            .ioclk                       (txclk),                 // Templated
            .ionreset                    (txnreset),              // Templated
            .csr_crdt_intrvl             (csr_txcrdt_intrvl[15:0]), // Templated
+           .csr_crdt_req_init           (csr_rxcrdt_req_init[15:0]), // Templated
+           .csr_crdt_resp_init          (csr_rxcrdt_resp_init[15:0]), // Templated
            .rmt_crdt_req                (rmt_crdt_req[15:0]),
            .rmt_crdt_resp               (rmt_crdt_resp[15:0]),
            .loc_crdt_req                (loc_crdt_req[15:0]),
            .loc_crdt_resp               (loc_crdt_resp[15:0]),
            .loc_crdt_init               (loc_crdt_init[1:0]),
-           .rmt_crdt_init               (rmt_crdt_init[1:0]));
+           .rmt_crdt_init               (rmt_crdt_init[1:0]),
+           .loc_hdrcomp                 (csr_rxhdrcomp),         // Templated
+           .rmt_hdrcomp                 (rmt_hdrcomp));
 
 endmodule // clink
 // Local Variables:
@@ -0,0 +1,335 @@
+/*******************************************************************************
+ * Copyright 2023 Zero ASIC Corporation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *
+ * ----
+ *
+ * Documentation:
+ * - Bonds NLANE lumi lanes into one link with a single set of SUMI ports
+ * - Outgoing UMI messages (up to and including the beat with EOM set) are
+ *   striped round robin across the lanes, separately for requests and
+ *   responses. The receiver collects them from the lanes in the same
+ *   order, so both sides of the link see the same transaction order as
+ *   a single lumi link (including per source ordering) without sequence
+ *   numbers on the wire.
+ * - Every lane is a complete lumi with its own credits, registers and phy
+ *   interface. A message waits for the credits of its own lane, the
+ *   other lanes keep draining in the meantime.
+ * - Lane i uses register group GRPID+i, the sideband and phy sideband
+ *   ports are per lane.
+ * - Both sides of the link must come out of reset together, lanes cannot
+ *   be added or removed at run time.
+ *
+ ******************************************************************************/
+
+module lumi_bond
+  #(parameter NLANE = 2,                                   // number of lumi lanes
+    // for development
+    parameter DW = 128,                                    // umi packet width
+    parameter CW = 32,                                     // umi packet width
+    parameter AW = 64,                                     // address width
+    parameter RW = 64,                                     // register width
+    parameter IDW = 16,                                    // chipid width
+    parameter IOW = 64,                                    // phy IO width (per lane)
+    // end development
+    parameter TARGET = "DEFAULT",                          // compiler target
+    parameter IDOFFSET = 40,                               // chip ID address offset
+    parameter GRPOFFSET = 24,                              // group address offset
+    parameter GRPAW = 8,                                   // group address width
+    parameter GRPID = 0,                                   // group ID of lane 0
+    parameter ASYNCFIFODEPTH = 8,                          // depth of async fifo
+    parameter RXFIFOW = 8,                                 // width of Rx fifo (in bits) - cannot be smaller than IOW!!!
+    parameter NFIFO = IOW/RXFIFOW,                         // number of parallel fifo's
+    parameter CRDTDEPTH = 1+((DW+AW+AW+CW)/RXFIFOW)/NFIFO  // total fifo depth, eq is minimum
+    )
+   (// host/device selector
+    input                  devicemode,      // 1=device, 0=host
+    // UMI host port
+    output                 uhost_req_valid,
+    output [CW-1:0]        uhost_req_cmd,
+    output [AW-1:0]        uhost_req_dstaddr,
+    output [AW-1:0]        uhost_req_srcaddr,
+    output [DW-1:0]        uhost_req_data,
+    input                  uhost_req_ready,
+    input                  uhost_resp_valid,
+    input [CW-1:0]         uhost_resp_cmd,
+    input [AW-1:0]         uhost_resp_dstaddr,
+    input [AW-1:0]         uhost_resp_srcaddr,
+    input [DW-1:0]         uhost_resp_data,
+    output                 uhost_resp_ready,
+    // UMI device port
+    input                  udev_req_valid,
+    input [CW-1:0]         udev_req_cmd,
+    input [AW-1:0]         udev_req_dstaddr,
+    input [AW-1:0]         udev_req_srcaddr,
+    input [DW-1:0]         udev_req_data,
+    output                 udev_req_ready,
+    output                 udev_resp_valid,
+    output [CW-1:0]        udev_resp_cmd,
+    output [AW-1:0]        udev_resp_dstaddr,
+    output [AW-1:0]        udev_resp_srcaddr,
+    output [DW-1:0]        udev_resp_data,
+    input                  udev_resp_ready,
+    // LinkHost sideband interface - register access (per lane)
+    input [NLANE-1:0]      sb_in_valid,
+    input [NLANE*CW-1:0]   sb_in_cmd,
+    input [NLANE*AW-1:0]   sb_in_dstaddr,
+    input [NLANE*AW-1:0]   sb_in_srcaddr,
+    input [NLANE*RW-1:0]   sb_in_data,
+    output [NLANE-1:0]     sb_in_ready,
+    output [NLANE-1:0]     sb_out_valid,
+    output [NLANE*CW-1:0]  sb_out_cmd,
+    output [NLANE*AW-1:0]  sb_out_dstaddr,
+    output [NLANE*AW-1:0]  sb_out_srcaddr,
+    output [NLANE*RW-1:0]  sb_out_data,
+    input [NLANE-1:0]      sb_out_ready,
+    // phy sideband interface (per lane)
+    input                  phy_clk,
+    input                  phy_nreset,
+    input [NLANE-1:0]      phy_in_valid,
+    input [NLANE*CW-1:0]   phy_in_cmd,
+    input [NLANE*AW-1:0]   phy_in_dstaddr,
+    input [NLANE*AW-1:0]   phy_in_srcaddr,
+    input [NLANE*RW-1:0]   phy_in_data,
+    output [NLANE-1:0]     phy_in_ready,
+    output [NLANE-1:0]     phy_out_valid,
+    output [NLANE*CW-1:0]  phy_out_cmd,
+    output [NLANE*AW-1:0]  phy_out_dstaddr,
+    output [NLANE*AW-1:0]  phy_out_srcaddr,
+    output [NLANE*RW-1:0]  phy_out_data,
+    input [NLANE-1:0]      phy_out_ready,
+    // phy data interface (LUMI, per lane)
+    input [NLANE*IOW-1:0]  phy_rxdata,
+    input [NLANE-1:0]      phy_rxvld,
+    input [NLANE-1:0]      rxclk,
+    input [NLANE-1:0]      rxnreset,
+    output [NLANE*IOW-1:0] phy_txdata,
+    output [NLANE-1:0]     phy_txvld,
+    input [NLANE-1:0]      txclk,
+    input [NLANE-1:0]      txnreset,
+    // phy control interface
+    input [NLANE-1:0]      phy_linkactive,
+    input [7:0]            phy_iow,
+    // Host control interface
+    input                  nreset,          // host driven reset
+    input                  clk,             // host driven clock
+    input                  deviceready,
+    output                 host_linkactive, // all lanes are locked/ready
+    // supplies
+    input                  vss,             // common ground
+    input                  vdd              // core supply
+    );
+
+`include "umi_messages.vh"
+
+   localparam LW = (NLANE > 1) ? $clog2(NLANE) : 1;
+
+   // lane side UMI ports
+   wire [NLANE-1:0]     lane_uhost_req_valid;
+   wire [NLANE*CW-1:0]  lane_uhost_req_cmd;
+   wire [NLANE*AW-1:0]  lane_uhost_req_dstaddr;
+   wire [NLANE*AW-1:0]  lane_uhost_req_srcaddr;
+   wire [NLANE*DW-1:0]  lane_uhost_req_data;
+   wire [NLANE-1:0]     lane_uhost_req_ready;
+   wire [NLANE-1:0]     lane_uhost_resp_valid;
+   wire [NLANE-1:0]     lane_uhost_resp_ready;
+   wire [NLANE-1:0]     lane_udev_req_valid;
+   wire [NLANE-1:0]     lane_udev_req_ready;
+   wire [NLANE-1:0]     lane_udev_resp_valid;
+   wire [NLANE*CW-1:0]  lane_udev_resp_cmd;
+   wire [NLANE*AW-1:0]  lane_udev_resp_dstaddr;
+   wire [NLANE*AW-1:0]  lane_udev_resp_srcaddr;
+   wire [NLANE*DW-1:0]  lane_udev_resp_data;
+   wire [NLANE-1:0]     lane_udev_resp_ready;
+   wire [NLANE-1:0]     lane_host_linkactive;
+
+   // current lane of each channel
+   reg [LW-1:0]         req_tx_lane;
+   reg [LW-1:0]         resp_tx_lane;
+   reg [LW-1:0]         req_rx_lane;
+   reg [LW-1:0]         resp_rx_lane;
+
+   wire                 req_tx_last;
+   wire                 resp_tx_last;
+   wire                 req_rx_last;
+   wire                 resp_rx_last;
+
+   genvar               i;
+
+   //########################################
+   // Striping (outgoing)
+   //########################################
+
+   // Every lane sees the outgoing packet, only the current one gets valid.
+   // The lane moves on after the last beat of the message.
+   assign udev_req_ready = lane_udev_req_ready[req_tx_lane];
+   assign uhost_resp_ready = lane_uhost_resp_ready[resp_tx_lane];
+
+   assign req_tx_last  = udev_req_valid & udev_req_ready & udev_req_cmd[UMI_EOM_BIT];
+   assign resp_tx_last = uhost_resp_valid & uhost_resp_ready & uhost_resp_cmd[UMI_EOM_BIT];
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          req_tx_lane  <= 'b0;
+          resp_tx_lane <= 'b0;
+       end
+     else
+       begin
+          if (req_tx_last)
+            req_tx_lane <= (req_tx_lane == NLANE-1) ? 'b0 : req_tx_lane + 1'b1;
+          if (resp_tx_last)
+            resp_tx_lane <= (resp_tx_lane == NLANE-1) ? 'b0 : resp_tx_lane + 1'b1;
+       end
+
+   //########################################
+   // Reordering (incoming)
+   //########################################
+
+   // Messages are taken from the lanes in the order they were striped,
+   // a lane that is ahead of the others holds its packet (and eventually
+   // its credits) until its turn comes.
+   assign uhost_req_valid   = lane_uhost_req_valid[req_rx_lane];
+   assign uhost_req_cmd     = lane_uhost_req_cmd[req_rx_lane*CW+:CW];
+   assign uhost_req_dstaddr = lane_uhost_req_dstaddr[req_rx_lane*AW+:AW];
+   assign uhost_req_srcaddr = lane_uhost_req_srcaddr[req_rx_lane*AW+:AW];
+   assign uhost_req_data    = lane_uhost_req_data[req_rx_lane*DW+:DW];
+
+   assign udev_resp_valid   = lane_udev_resp_valid[resp_rx_lane];
+   assign udev_resp_cmd     = lane_udev_resp_cmd[resp_rx_lane*CW+:CW];
+   assign udev_resp_dstaddr = lane_udev_resp_dstaddr[resp_rx_lane*AW+:AW];
+   assign udev_resp_srcaddr = lane_udev_resp_srcaddr[resp_rx_lane*AW+:AW];
+   assign udev_resp_data    = lane_udev_resp_data[resp_rx_lane*DW+:DW];
+
+   assign req_rx_last  = uhost_req_valid & uhost_req_ready & uhost_req_cmd[UMI_EOM_BIT];
+   assign resp_rx_last = udev_resp_valid & udev_resp_ready & udev_resp_cmd[UMI_EOM_BIT];
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          req_rx_lane  <= 'b0;
+          resp_rx_lane <= 'b0;
+       end
+     else
+       begin
+          if (req_rx_last)
+            req_rx_lane <= (req_rx_lane == NLANE-1) ? 'b0 : req_rx_lane + 1'b1;
+          if (resp_rx_last)
+            resp_rx_lane <= (resp_rx_lane == NLANE-1) ? 'b0 : resp_rx_lane + 1'b1;
+       end
+
+   assign host_linkactive = &lane_host_linkactive;
+
+   //########################################
+   // Lanes
+   //########################################
+
+   for (i = 0; i < NLANE; i = i + 1)
+     begin : ilane
+
+        assign lane_udev_req_valid[i]   = udev_req_valid & (req_tx_lane == i);
+        assign lane_uhost_resp_valid[i] = uhost_resp_valid & (resp_tx_lane == i);
+        assign lane_uhost_req_ready[i]  = uhost_req_ready & (req_rx_lane == i);
+        assign lane_udev_resp_ready[i]  = udev_resp_ready & (resp_rx_lane == i);
+
+        lumi #(.DW(DW),
+               .CW(CW),
+               .AW(AW),
+               .RW(RW),
+               .IDW(IDW),
+               .IOW(IOW),
+               .TARGET(TARGET),
+               .IDOFFSET(IDOFFSET),
+               .GRPOFFSET(GRPOFFSET),
+               .GRPAW(GRPAW),
+               .GRPID(GRPID+i),
+               .ASYNCFIFODEPTH(ASYNCFIFODEPTH),
+               .RXFIFOW(RXFIFOW),
+               .NFIFO(NFIFO),
+               .CRDTDEPTH(CRDTDEPTH))
+        lumi_i(// Outputs
+               .uhost_req_valid   (lane_uhost_req_valid[i]),
+               .uhost_req_cmd     (lane_uhost_req_cmd[i*CW+:CW]),
+               .uhost_req_dstaddr (lane_uhost_req_dstaddr[i*AW+:AW]),
+               .uhost_req_srcaddr (lane_uhost_req_srcaddr[i*AW+:AW]),
+               .uhost_req_data    (lane_uhost_req_data[i*DW+:DW]),
+               .uhost_resp_ready  (lane_uhost_resp_ready[i]),
+               .udev_req_ready    (lane_udev_req_ready[i]),
+               .udev_resp_valid   (lane_udev_resp_valid[i]),
+               .udev_resp_cmd     (lane_udev_resp_cmd[i*CW+:CW]),
+               .udev_resp_dstaddr (lane_udev_resp_dstaddr[i*AW+:AW]),
+               .udev_resp_srcaddr (lane_udev_resp_srcaddr[i*AW+:AW]),
+               .udev_resp_data    (lane_udev_resp_data[i*DW+:DW]),
+               .sb_in_ready       (sb_in_ready[i]),
+               .sb_out_valid      (sb_out_valid[i]),
+               .sb_out_cmd        (sb_out_cmd[i*CW+:CW]),
+               .sb_out_dstaddr    (sb_out_dstaddr[i*AW+:AW]),
+               .sb_out_srcaddr    (sb_out_srcaddr[i*AW+:AW]),
+               .sb_out_data       (sb_out_data[i*RW+:RW]),
+               .phy_in_ready      (phy_in_ready[i]),
+               .phy_out_valid     (phy_out_valid[i]),
+               .phy_out_cmd       (phy_out_cmd[i*CW+:CW]),
+               .phy_out_dstaddr   (phy_out_dstaddr[i*AW+:AW]),
+               .phy_out_srcaddr   (phy_out_srcaddr[i*AW+:AW]),
+               .phy_out_data      (phy_out_data[i*RW+:RW]),
+               .phy_txdata        (phy_txdata[i*IOW+:IOW]),
+               .phy_txvld         (phy_txvld[i]),
+               .host_linkactive   (lane_host_linkactive[i]),
+               // Inputs
+               .devicemode        (devicemode),
+               .uhost_req_ready   (lane_uhost_req_ready[i]),
+               .uhost_resp_valid  (lane_uhost_resp_valid[i]),
+               .uhost_resp_cmd    (uhost_resp_cmd[CW-1:0]),
+               .uhost_resp_dstaddr(uhost_resp_dstaddr[AW-1:0]),
+               .uhost_resp_srcaddr(uhost_resp_srcaddr[AW-1:0]),
+               .uhost_resp_data   (uhost_resp_data[DW-1:0]),
+               .udev_req_valid    (lane_udev_req_valid[i]),
+               .udev_req_cmd      (udev_req_cmd[CW-1:0]),
+               .udev_req_dstaddr  (udev_req_dstaddr[AW-1:0]),
+               .udev_req_srcaddr  (udev_req_srcaddr[AW-1:0]),
+               .udev_req_data     (udev_req_data[DW-1:0]),
+               .udev_resp_ready   (lane_udev_resp_ready[i]),
+               .sb_in_valid       (sb_in_valid[i]),
+               .sb_in_cmd         (sb_in_cmd[i*CW+:CW]),
+               .sb_in_dstaddr     (sb_in_dstaddr[i*AW+:AW]),
+               .sb_in_srcaddr     (sb_in_srcaddr[i*AW+:AW]),
+               .sb_in_data        (sb_in_data[i*RW+:RW]),
+               .sb_out_ready      (sb_out_ready[i]),
+               .phy_clk           (phy_clk),
+               .phy_nreset        (phy_nreset),
+               .phy_in_valid      (phy_in_valid[i]),
+               .phy_in_cmd        (phy_in_cmd[i*CW+:CW]),
+               .phy_in_dstaddr    (phy_in_dstaddr[i*AW+:AW]),
+               .phy_in_srcaddr    (phy_in_srcaddr[i*AW+:AW]),
+               .phy_in_data       (phy_in_data[i*RW+:RW]),
+               .phy_out_ready     (phy_out_ready[i]),
+               .phy_rxdata        (phy_rxdata[i*IOW+:IOW]),
+               .phy_rxvld         (phy_rxvld[i]),
+               .rxclk             (rxclk[i]),
+               .rxnreset          (rxnreset[i]),
+               .txclk             (txclk[i]),
+               .txnreset          (txnreset[i]),
+               .phy_linkactive    (phy_linkactive[i]),
+               .phy_iow           (phy_iow[7:0]),
+               .nreset            (nreset),
+               .clk               (clk),
+               .deviceready       (deviceready),
+               .vss               (vss),
+               .vdd               (vdd));
+     end
+
+endmodule // lumi_bond
+// Local Variables:
+// verilog-library-directories:("." "../../umi/rtl" )
+// End:
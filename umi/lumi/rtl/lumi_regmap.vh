@@ -31,3 +31,6 @@ localparam LUMI_REQCRDTSTALLCYC   = 8'h30; // Cycle count of outstanding request
 localparam LUMI_RESPCRDTSTALLCYC  = 8'h34; // Cycle count of outstanding response transaction and credits are not available
 localparam LUMI_REQCRDTACTIVECYC  = 8'h38; // Cycle count of outstanding request transaction and credits are available
 localparam LUMI_RESPCRDTACTIVECYC = 8'h3C; // Cycle count of outstanding response transaction and credits are available
+localparam LUMI_TXLINKBYTES       = 8'h40; // Bytes transmitted for UMI packets (header and data)
+localparam LUMI_TXPAYLOADBYTES    = 8'h44; // UMI data payload bytes transmitted
+localparam LUMI_TXCRDTMSGS        = 8'h48; // Credit update messages transmitted
@@ -66,9 +66,13 @@ module lumi_regs
     // tx link controls
     output          csr_txen,
     output          csr_txcrdt_en,
+    output          csr_txcrdt_adapt, // adaptive credit updates
+    output          csr_txhdrcomp, // compress headers when remote accepts
     output [7:0]    csr_txiowidth, // pad bus width
     // rx link controls
     output          csr_rxen,
+    output          csr_rxhdrcomp, // accept compressed headers
+    output          csr_rxcutthru, // forward packets before they are complete
     output [7:0]    csr_rxiowidth, // pad bus width
     // credit management
     output [15:0]   csr_txcrdt_intrvl,
@@ -80,7 +84,11 @@ module lumi_regs
     input [31:0]    csr_req_txcrdt_stall_cycles,
     input [31:0]    csr_resp_txcrdt_stall_cycles,
     input [31:0]    csr_req_txcrdt_active_cycles,
-    input [31:0]    csr_resp_txcrdt_active_cycles
+    input [31:0]    csr_resp_txcrdt_active_cycles,
+    // link efficiency counters
+    input [31:0]    csr_txlink_bytes,
+    input [31:0]    csr_txpayload_bytes,
+    input [31:0]    csr_txcrdt_msgs
     );
 
 `include "lumi_regmap.vh"
@@ -184,14 +192,16 @@ module lumi_regs
      else if (linkactive_rise)
        txmode_reg[RW-1:0] <= {{(RW-24){1'b0}}, // Unused
                               phy_iow[7:0],    // IOW
-                              8'h00,           // Unused
-                              4'b0001,         // 3 unused, credit enable
+                              8'h00,           // 7 unused, header compression
+                              4'b0001,         // 2 unused, adaptive credits, credit enable
                               4'b0001};        // 3 unused, tx enable
      else if(write_txmode)
        txmode_reg[RW-1:0] <= reg_wdata[RW-1:0];
 
    assign csr_txen           = linkactive & txmode_reg[0]; // tx enable
    assign csr_txcrdt_en      = txmode_reg[4];   // Enable sending credit updates
+   assign csr_txcrdt_adapt   = txmode_reg[5];   // Adaptive credit updates
+   assign csr_txhdrcomp      = txmode_reg[8];   // Enable header compression
    assign csr_txiowidth[7:0] = txmode_reg[23:16];
    // 00000000 = 1 bytes
    // 00000001 = 2 bytes
@@ -210,12 +220,15 @@ module lumi_regs
      else if (linkactive_rise)
        rxmode_reg[RW-1:0] <= {{(RW-24){1'b0}}, // Unused
                               phy_iow[7:0],    // IOW
-                              12'h000,         // Unused
+                              8'h00,           // 6 unused, cut-through, header compression
+                              4'h0,            // Unused
                               4'b0001};        // 3 unused, rx enable
      else if(write_rxmode)
        rxmode_reg[RW-1:0] <= reg_wdata[RW-1:0];
 
    assign csr_rxen           = linkactive & rxmode_reg[0]; // rx enable
+   assign csr_rxhdrcomp      = rxmode_reg[8];   // Advertise header compression
+   assign csr_rxcutthru      = rxmode_reg[9];   // Cut-through receive path
    assign csr_rxiowidth[7:0] = rxmode_reg[23:16];
    // 00000000 = 1 bytes
    // 00000001 = 2 bytes
@@ -312,6 +325,9 @@ module lumi_regs
        LUMI_RESPCRDTSTALLCYC[7:2] : reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_resp_txcrdt_stall_cycles[31:0]};
        LUMI_REQCRDTACTIVECYC[7:2] : reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_req_txcrdt_active_cycles[31:0]};
        LUMI_RESPCRDTACTIVECYC[7:2]: reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_resp_txcrdt_active_cycles[31:0]};
+       LUMI_TXLINKBYTES[7:2]      : reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_txlink_bytes[31:0]};
+       LUMI_TXPAYLOADBYTES[7:2]   : reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_txpayload_bytes[31:0]};
+       LUMI_TXCRDTMSGS[7:2]       : reg_rdata[RW-1:0] = {{RW-32{1'b0}},csr_txcrdt_msgs[31:0]};
        default:                     reg_rdata[RW-1:0] = 'b0;
      endcase
 
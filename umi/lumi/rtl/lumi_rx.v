@@ -18,6 +18,9 @@
  * Documentation:
  * - LUMI Receiver
  * - Converts PHY side interface to SUMI (cmd, addr, data)
+ * - Expands compressed headers (see lumi_tx) when csr_hdrcomp is set
+ * - Optional cut-through (csr_cutthru), forwarding data packets as partial
+ *   UMI transactions while the rest of the packet is still arriving
  *
  ******************************************************************************/
 
@@ -38,6 +41,8 @@ module lumi_rx
     input             nreset,             // async active low reset
     input             csr_en,             // 1=enable outputs
     input             csr_crdt_en,        // 1=enable credits
+    input             csr_hdrcomp,        // 1=accept compressed headers
+    input             csr_cutthru,        // 1=forward packets before they are complete
     input [7:0]       csr_iowidth,        // pad bus width
     input             vss,                // common ground
     input             vdd,                // core supply
@@ -68,9 +73,17 @@ module lumi_rx
     output reg [15:0] rmt_crdt_req,       // Credit value from remote side (for Tx)
     output reg [15:0] rmt_crdt_resp,      // Credit value from remote side (for Tx)
     output reg [1:0]  loc_crdt_init,
-    output reg [1:0]  rmt_crdt_init
+    output reg [1:0]  rmt_crdt_init,
+    output reg        rmt_hdrcomp         // remote rx accepts compressed headers
     );
 
+   // header compression dstaddr encoding
+   localparam HC_DST_FULL = 3'd0; // full dstaddr
+   localparam HC_DST_D16  = 3'd1; // 16b delta from the predicted dstaddr
+   localparam HC_DST_D32  = 3'd2; // 32b delta from the predicted dstaddr
+   localparam HC_DST_SEQ  = 3'd3; // predicted dstaddr (previous dstaddr + bytes)
+   localparam HC_DST_SAME = 3'd4; // previous dstaddr
+
    localparam LOGFIFOWIDTH = $clog2(RXFIFOW/8);
    localparam LOGNFIFO = $clog2(NFIFO);
 
@@ -84,14 +97,17 @@ module lumi_rx
    reg [$clog2((DW+AW+AW+CW))-1:0]  rxbytes_keep;
    reg [$clog2((DW+AW+AW+CW))-1:0]  req_hdr_bytes;
    reg [$clog2((DW+AW+AW+CW))-1:0]  resp_hdr_bytes;
-   wire [$clog2((DW+AW+AW+CW))-1:0] req_bytes_to_receive;
-   wire [$clog2((DW+AW+AW+CW))-1:0] resp_bytes_to_receive;
+   wire [$clog2((DW+AW+AW+CW))-1:0] rx_hdr_size;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_nxt_hdr_size;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_nxt_hdr_size;
    reg                              rxvalid;
    reg                              rxfec;
    reg [(DW+AW+AW+CW)-1:0]          req_shiftreg;
    reg [(DW+AW+AW+CW)-1:0]          resp_shiftreg;
    wire [(DW+AW+AW+CW)-1:0]         req_shiftreg_in;
    wire [(DW+AW+AW+CW)-1:0]         resp_shiftreg_in;
+   wire [(DW+AW+AW+CW)-1:0]         req_shiftreg_next;
+   wire [(DW+AW+AW+CW)-1:0]         resp_shiftreg_next;
    reg [CW-1:0]                     lnk_shiftreg;
    reg [CW-1:0]                     lnk_rxdata_mask;
    reg [1:0]                        lnk_sop;
@@ -151,27 +167,109 @@ module lumi_rx
    wire [(DW+AW+AW+CW)-1:0]         req_writemask;
    wire [(DW+AW+AW+CW)-1:0]         resp_writemask;
    reg [IOW-1:0]                    rxdata;
-   reg [7:0]                        rxdata_d;
+   reg [15:0]                       rxhdr_d;
 
    wire                             rx_cmd_only;
    wire                             rx_no_data;
    wire                             req_cmd_only;
    wire                             resp_cmd_only;
-   wire [1:0]                       fifo_cmd_only;
+   wire                             req_nxt_cmd_only;
+   wire                             resp_nxt_cmd_only;
    wire                             req_no_data;
    wire                             resp_no_data;
+   wire                             req_nxt_no_data;
+   wire                             resp_nxt_no_data;
    wire [11:0]                      rxcmd_lenp1;
    wire [11:0]                      rxcmd_bytes;
    wire [11:0]                      req_cmd_lenp1;
    wire [11:0]                      resp_cmd_lenp1;
    wire [11:0]                      req_cmd_bytes;
    wire [11:0]                      resp_cmd_bytes;
+   wire [11:0]                      req_nxt_cmd_lenp1;
+   wire [11:0]                      resp_nxt_cmd_lenp1;
+   wire [11:0]                      req_nxt_cmd_bytes;
+   wire [11:0]                      resp_nxt_cmd_bytes;
    wire [1:0]                       credit_req_in;
+   wire [7:0]                       lnk_crdt_msg;
 
-   wire [15:0]                      rxhdr;
+   wire [23:0]                      rxhdr;
    wire                             rxhdr_sample;
+   wire                             rxtype_sample;
 
    wire                             csr_en_sync;
+   wire                             csr_hdrcomp_sync;
+
+   // header compression
+   wire                             rx_hc;
+   wire [$clog2((DW+AW+AW+CW))-1:0] rx_hc_dst_bytes;
+   wire                             req_nxt_hc;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_nxt_hc_dst_bytes;
+   wire                             resp_nxt_hc;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_nxt_hc_dst_bytes;
+   wire                             req_hc;
+   wire [7:0]                       req_hc_fmt;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_hc_dst_bytes;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_hc_dst_offset;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_hc_src_offset;
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_hc_hdr_bytes;
+   wire [(DW+AW+AW+CW)-1:0]         req_hc_dst_field;
+   wire [(DW+AW+AW+CW)-1:0]         req_hc_src_field;
+   wire [(DW+AW+AW+CW)-1:0]         req_hc_data_field;
+   wire [AW-1:0]                    req_hc_pred_dstaddr;
+   reg [AW-1:0]                     req_hc_dstaddr_out;
+   wire [CW-1:0]                    req_hc_cmd;
+   reg [15:0]                       req_hc_cmdhi;
+   reg [AW-1:0]                     req_hc_dstaddr;
+   reg [AW-1:0]                     req_hc_srcaddr;
+   reg [11:0]                       req_hc_bytes;
+   wire                             resp_hc;
+   wire [7:0]                       resp_hc_fmt;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_hc_dst_bytes;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_hc_dst_offset;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_hc_src_offset;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_hc_hdr_bytes;
+   wire [(DW+AW+AW+CW)-1:0]         resp_hc_dst_field;
+   wire [(DW+AW+AW+CW)-1:0]         resp_hc_src_field;
+   wire [(DW+AW+AW+CW)-1:0]         resp_hc_data_field;
+   wire [AW-1:0]                    resp_hc_pred_dstaddr;
+   reg [AW-1:0]                     resp_hc_dstaddr_out;
+   wire [CW-1:0]                    resp_hc_cmd;
+   reg [15:0]                       resp_hc_cmdhi;
+   reg [AW-1:0]                     resp_hc_dstaddr;
+   reg [AW-1:0]                     resp_hc_srcaddr;
+   reg [11:0]                       resp_hc_bytes;
+
+   // cut-through
+   wire [$clog2((DW+AW+AW+CW))-1:0] req_rxsum;
+   wire                             req_ct_ok;
+   wire [11:0]                      req_ct_avail;
+   wire [11:0]                      req_ct_words;
+   wire [11:0]                      req_ct_rest;
+   wire                             req_ct_emit;
+   reg                              req_ct_valid;
+   reg [11:0]                       req_ct_sent;
+   reg [11:0]                       req_out_off;
+   reg [7:0]                        req_out_len;
+   reg                              req_out_split;
+   wire [CW-1:0]                    req_base_cmd;
+   wire [AW-1:0]                    req_base_dstaddr;
+   wire [AW-1:0]                    req_base_srcaddr;
+   wire [DW-1:0]                    req_base_data;
+   wire [$clog2((DW+AW+AW+CW))-1:0] resp_rxsum;
+   wire                             resp_ct_ok;
+   wire [11:0]                      resp_ct_avail;
+   wire [11:0]                      resp_ct_words;
+   wire [11:0]                      resp_ct_rest;
+   wire                             resp_ct_emit;
+   reg                              resp_ct_valid;
+   reg [11:0]                       resp_ct_sent;
+   reg [11:0]                       resp_out_off;
+   reg [7:0]                        resp_out_len;
+   reg                              resp_out_split;
+   wire [CW-1:0]                    resp_base_cmd;
+   wire [AW-1:0]                    resp_base_dstaddr;
+   wire [AW-1:0]                    resp_base_srcaddr;
+   wire [DW-1:0]                    resp_base_data;
 
    /*AUTOWIRE*/
    // Beginning of automatic wires (for undeclared instantiated-module outputs)
@@ -196,7 +294,19 @@ module lumi_rx
    wire                 req_cmd_write;
    wire                 req_cmd_write_posted;
    wire                 req_cmd_write_resp;
-   wire                 req_fifo_cmd_invalid;
+   wire                 req_nxt_cmd_error;
+   wire                 req_nxt_cmd_future0;
+   wire                 req_nxt_cmd_invalid;
+   wire [7:0]           req_nxt_cmd_len;
+   wire                 req_nxt_cmd_link;
+   wire                 req_nxt_cmd_link_resp;
+   wire                 req_nxt_cmd_rdma;
+   wire                 req_nxt_cmd_read;
+   wire                 req_nxt_cmd_read_resp;
+   wire [2:0]           req_nxt_cmd_size;
+   wire                 req_nxt_cmd_user0;
+   wire                 req_nxt_cmd_write_posted;
+   wire                 req_nxt_cmd_write_resp;
    wire                 resp_cmd_error;
    wire                 resp_cmd_future0;
    wire                 resp_cmd_future0_resp;
@@ -217,7 +327,19 @@ module lumi_rx
    wire                 resp_cmd_write;
    wire                 resp_cmd_write_posted;
    wire                 resp_cmd_write_resp;
-   wire                 resp_fifo_cmd_invalid;
+   wire                 resp_nxt_cmd_error;
+   wire                 resp_nxt_cmd_future0;
+   wire                 resp_nxt_cmd_invalid;
+   wire [7:0]           resp_nxt_cmd_len;
+   wire                 resp_nxt_cmd_link;
+   wire                 resp_nxt_cmd_link_resp;
+   wire                 resp_nxt_cmd_rdma;
+   wire                 resp_nxt_cmd_read;
+   wire                 resp_nxt_cmd_read_resp;
+   wire [2:0]           resp_nxt_cmd_size;
+   wire                 resp_nxt_cmd_user0;
+   wire                 resp_nxt_cmd_write_posted;
+   wire                 resp_nxt_cmd_write_resp;
    wire                 rxcmd_error;
    wire                 rxcmd_future0;
    wire                 rxcmd_future0_resp;
@@ -268,12 +390,13 @@ module lumi_rx
    always @ (posedge ioclk)
      rxdata[IOW-1:0] <= phy_rxdata[IOW-1:0];
 
+   // header bytes received in earlier cycles (narrow interfaces)
    always @ (posedge ioclk or negedge ionreset)
      if (~ionreset)
-       rxdata_d[7:0] <= 'h0;
+       rxhdr_d[15:0] <= 'h0;
      else
-       if (rxvalid)
-         rxdata_d[7:0] <= rxdata[7:0];
+       if (rxvalid & (sopptr < 'h2))
+         rxhdr_d[15:0] <= rxhdr[15:0];
 
    //########################################
    //# Input data tracking
@@ -282,10 +405,13 @@ module lumi_rx
    // Input data is now separate before and after the input fifo
    // As a result need to understand data size and track (to generate SOP)
 
-   // Handle 1B i/f width
-   assign rxhdr[15:0] = (sopptr == 'h0) & (csr_iowidth == 8'h0) ? {8'h0,rxdata[7:0]}       : // dummy width of 4B
-                        (sopptr == 'h1) & (csr_iowidth == 8'h0) ? {rxdata[7:0],rxdata_d[7:0]} :
-                        rxdata[15:0];
+   // Handle 1B/2B i/f width - the first 3 bytes are needed for the packet size
+   // (2 bytes for uncompressed headers). Until all of them have been received
+   // the bytes above the ones received are stale, this is safe since the
+   // minimum packet size is 3B.
+   assign rxhdr[23:0] = (sopptr == 'h0) ? rxdata[23:0]                 :
+                        (sopptr == 'h1) ? {rxdata[15:0],rxhdr_d[7:0]}  :
+                                          {rxdata[7:0],rxhdr_d[15:0]};
 
    /*umi_unpack AUTO_TEMPLATE(
     .cmd_len    (rxcmd_len[]),
@@ -369,16 +495,30 @@ module lumi_rx
 
    assign full_hdr_size = (CW+AW+AW)/8;
 
+   // Compressed header: cmd[15:0], format byte, cmd[31:16], dstaddr field, srcaddr
+   assign rx_hc = csr_hdrcomp_sync & rxhdr[4];
+
+   assign rx_hc_dst_bytes = (rxhdr[19:17] == HC_DST_FULL) ? AW/8 :
+                            (rxhdr[19:17] == HC_DST_D16)  ? 'd2  :
+                            (rxhdr[19:17] == HC_DST_D32)  ? 'd4  :
+                                                            'd0;
+
+   assign rx_hdr_size = rx_hc ?
+                        'd3 + {rxhdr[16],1'b0} + rx_hc_dst_bytes + (rxhdr[20] ? AW/8 : 0) :
+                        full_hdr_size;
+
    always @(*)
      case ({rx_cmd_only,rx_no_data})
        2'b10: rxbytes_raw = (CW)/8;
-       2'b01: rxbytes_raw = (CW+AW+AW)/8;
-       default: rxbytes_raw = full_hdr_size + rxcmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
+       2'b01: rxbytes_raw = rx_hdr_size;
+       default: rxbytes_raw = rx_hdr_size + rxcmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
      endcase
 
-   // support for 1B IOW (#bytes unknown in first cycle)
-   assign rxhdr_sample = (sopptr == 'h0) |
-                         (sopptr == 'h1) & (csr_iowidth == 8'h0);
+   // support for 1B/2B IOW (#bytes unknown in first cycles)
+   assign rxhdr_sample = (sopptr < 'h3);
+
+   assign rxtype_sample = (sopptr == 'h0) |
+                          (sopptr == 'h1) & (csr_iowidth == 8'h0);
 
    always @ (posedge ioclk or negedge ionreset)
      if (~ionreset)
@@ -422,12 +562,12 @@ module lumi_rx
      if (~ionreset)
        rxtype_next[2:0] <= 3'b000;
      else
-       if (rxhdr_sample & rxvalid)
+       if (rxtype_sample & rxvalid)
          rxtype_next[2:0] <= {rxcmd_link,
                               rxcmd_response & ~rxcmd_link & ~(|loc_crdt_init),
                               rxcmd_request  & ~rxcmd_link & ~(|loc_crdt_init)};
 
-   assign rxtype = rxhdr_sample & rxvalid ?
+   assign rxtype = rxtype_sample & rxvalid ?
                    {rxcmd_link,
                     rxcmd_response & ~rxcmd_link & ~(|loc_crdt_init),
                     rxcmd_request  & ~rxcmd_link & ~(|loc_crdt_init)} :
@@ -465,6 +605,10 @@ module lumi_rx
                           .in  (csr_en),
                           .out (csr_en_sync));
 
+   la_dsync csr_hdrcomp_sync_i(.clk (ioclk),
+                               .in  (csr_hdrcomp),
+                               .out (csr_hdrcomp_sync));
+
    //########################################
    // Input fifo alignment
    //########################################
@@ -686,11 +830,14 @@ module lumi_rx
    //########################################
    //# Incoming credit update
    //########################################
+   // bit 3 of the message advertises header compression support
+   assign lnk_crdt_msg[7:0] = lnk_cmd_user[7:0] & 8'hF7;
+
    assign credit_req_in[0] = lnk_fifo_rd &
-                             ((lnk_cmd_user[7:0] == 8'h01) | (lnk_cmd_user[7:0] == 8'h02));
+                             ((lnk_crdt_msg[7:0] == 8'h01) | (lnk_crdt_msg[7:0] == 8'h02));
 
    assign credit_req_in[1] = lnk_fifo_rd &
-                             ((lnk_cmd_user[7:0] == 8'h11) | (lnk_cmd_user[7:0] == 8'h12));
+                             ((lnk_crdt_msg[7:0] == 8'h11) | (lnk_crdt_msg[7:0] == 8'h12));
 
    always @(posedge clk or negedge nreset)
      if (~nreset)
@@ -736,12 +883,21 @@ module lumi_rx
             loc_crdt_init[0] <= 1'b0;
           if (credit_req_in[1]) // init or update
             loc_crdt_init[1] <= 1'b0;
-          if (credit_req_in[0] & (lnk_cmd_user[7:0] == 8'h02)) // update only
+          if (credit_req_in[0] & (lnk_crdt_msg[7:0] == 8'h02)) // update only
             rmt_crdt_init[0] <= 1'b0;
-          if (credit_req_in[1] & (lnk_cmd_user[7:0] == 8'h12)) // update only
+          if (credit_req_in[1] & (lnk_crdt_msg[7:0] == 8'h12)) // update only
             rmt_crdt_init[1] <= 1'b0;
        end
 
+   // Remote header compression support, refreshed by every credit message
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       rmt_hdrcomp <= 1'b0;
+     else if (~csr_en)
+       rmt_hdrcomp <= 1'b0;
+     else if (|credit_req_in[1:0])
+       rmt_hdrcomp <= lnk_cmd_user[3];
+
    //########################################
    // Everything from this point on is duplicated
    // for request and response in order to prever deadlocks
@@ -794,88 +950,131 @@ module lumi_rx
                    .ctrl             ('d0),
                    .status           ());
 
-   // link commands will be consumed before the sync fifo so that they are not blocked
-   /*umi_decode AUTO_TEMPLATE(
-    .command       (sync_fifo_dout[CW-1:0]),
-    .cmd_invalid   (req_fifo_cmd_invalid[]),
-    .cmd_.*        (),
+   //########################################
+   // Packet size
+   //########################################
+   // The packet size is decoded from the shift register including the bytes
+   // received this cycle. Bytes that have not been received yet are stale
+   // but the size is only used once the header is complete, the minimum
+   // packet size (3B) being larger than what can be received before.
+
+   /*umi_unpack AUTO_TEMPLATE(
+    .cmd_len           (@"(substring vl-cell-name 11)"_cmd_len[]),
+    .cmd_size          (@"(substring vl-cell-name 11)"_cmd_size[]),
+    .cmd.*             (),
+    .packet_cmd        (@"(substring vl-cell-name 11 -4)"_shiftreg_next[CW-1:0]),
     );*/
-   umi_decode #(.CW(CW))
-   decode_req (/*AUTOINST*/
-               // Outputs
-               .cmd_invalid     (req_fifo_cmd_invalid),  // Templated
-               .cmd_request     (),                      // Templated
-               .cmd_response    (),                      // Templated
-               .cmd_read        (),                      // Templated
-               .cmd_write       (),                      // Templated
-               .cmd_write_posted(),                      // Templated
-               .cmd_rdma        (),                      // Templated
-               .cmd_atomic      (),                      // Templated
-               .cmd_user0       (),                      // Templated
-               .cmd_future0     (),                      // Templated
-               .cmd_error       (),                      // Templated
-               .cmd_link        (),                      // Templated
-               .cmd_read_resp   (),                      // Templated
-               .cmd_write_resp  (),                      // Templated
-               .cmd_user0_resp  (),                      // Templated
-               .cmd_user1_resp  (),                      // Templated
-               .cmd_future0_resp(),                      // Templated
-               .cmd_future1_resp(),                      // Templated
-               .cmd_link_resp   (),                      // Templated
-               .cmd_atomic_add  (),                      // Templated
-               .cmd_atomic_and  (),                      // Templated
-               .cmd_atomic_or   (),                      // Templated
-               .cmd_atomic_xor  (),                      // Templated
-               .cmd_atomic_max  (),                      // Templated
-               .cmd_atomic_min  (),                      // Templated
-               .cmd_atomic_maxu (),                      // Templated
-               .cmd_atomic_minu (),                      // Templated
-               .cmd_atomic_swap (),                      // Templated
-               // Inputs
-               .command         (sync_fifo_dout[CW-1:0])); // Templated
 
-   assign fifo_cmd_only[0]  = req_fifo_cmd_invalid;
+   umi_unpack #(.CW(CW))
+   umi_unpack_req_nxt(/*AUTOINST*/
+                      // Outputs
+                      .cmd_opcode        (),                         // Templated
+                      .cmd_size          (req_nxt_cmd_size[2:0]),    // Templated
+                      .cmd_len           (req_nxt_cmd_len[7:0]),     // Templated
+                      .cmd_atype         (),                         // Templated
+                      .cmd_qos           (),                         // Templated
+                      .cmd_prot          (),                         // Templated
+                      .cmd_eom           (),                         // Templated
+                      .cmd_eof           (),                         // Templated
+                      .cmd_ex            (),                         // Templated
+                      .cmd_user          (),                         // Templated
+                      .cmd_user_extended (),                         // Templated
+                      .cmd_err           (),                         // Templated
+                      .cmd_hostid        (),                         // Templated
+                      // Inputs
+                      .packet_cmd        (req_shiftreg_next[CW-1:0])); // Templated
+
+   umi_unpack #(.CW(CW))
+   umi_unpack_resp_nxt(/*AUTOINST*/
+                       // Outputs
+                       .cmd_opcode        (),                         // Templated
+                       .cmd_size          (resp_nxt_cmd_size[2:0]),   // Templated
+                       .cmd_len           (resp_nxt_cmd_len[7:0]),    // Templated
+                       .cmd_atype         (),                         // Templated
+                       .cmd_qos           (),                         // Templated
+                       .cmd_prot          (),                         // Templated
+                       .cmd_eom           (),                         // Templated
+                       .cmd_eof           (),                         // Templated
+                       .cmd_ex            (),                         // Templated
+                       .cmd_user          (),                         // Templated
+                       .cmd_user_extended (),                         // Templated
+                       .cmd_err           (),                         // Templated
+                       .cmd_hostid        (),                         // Templated
+                       // Inputs
+                       .packet_cmd        (resp_shiftreg_next[CW-1:0])); // Templated
 
    /*umi_decode AUTO_TEMPLATE(
-    .command       (sync_fifo_dout[IOW+CW-1:IOW]),
-    .cmd_invalid   (resp_fifo_cmd_invalid[]),
-    .cmd_.*        (),
+    .command      (@"(substring vl-cell-name 11 -4)"_shiftreg_next[CW-1:0]),
+    .cmd_atomic.* (),
+    .cmd_\(.*\)   (@"(substring vl-cell-name 11)"_cmd_\1[]),
     );*/
    umi_decode #(.CW(CW))
-   decode_resp (/*AUTOINST*/
-                // Outputs
-                .cmd_invalid    (resp_fifo_cmd_invalid), // Templated
-                .cmd_request    (),                      // Templated
-                .cmd_response   (),                      // Templated
-                .cmd_read       (),                      // Templated
-                .cmd_write      (),                      // Templated
-                .cmd_write_posted(),                     // Templated
-                .cmd_rdma       (),                      // Templated
-                .cmd_atomic     (),                      // Templated
-                .cmd_user0      (),                      // Templated
-                .cmd_future0    (),                      // Templated
-                .cmd_error      (),                      // Templated
-                .cmd_link       (),                      // Templated
-                .cmd_read_resp  (),                      // Templated
-                .cmd_write_resp (),                      // Templated
-                .cmd_user0_resp (),                      // Templated
-                .cmd_user1_resp (),                      // Templated
-                .cmd_future0_resp(),                     // Templated
-                .cmd_future1_resp(),                     // Templated
-                .cmd_link_resp  (),                      // Templated
-                .cmd_atomic_add (),                      // Templated
-                .cmd_atomic_and (),                      // Templated
-                .cmd_atomic_or  (),                      // Templated
-                .cmd_atomic_xor (),                      // Templated
-                .cmd_atomic_max (),                      // Templated
-                .cmd_atomic_min (),                      // Templated
-                .cmd_atomic_maxu(),                      // Templated
-                .cmd_atomic_minu(),                      // Templated
-                .cmd_atomic_swap(),                      // Templated
-                // Inputs
-                .command        (sync_fifo_dout[IOW+CW-1:IOW])); // Templated
-
-   assign fifo_cmd_only[1]  = resp_fifo_cmd_invalid;
+   umi_decode_req_nxt(/*AUTOINST*/
+                      // Outputs
+                      .cmd_invalid      (req_nxt_cmd_invalid),      // Templated
+                      .cmd_request      (),                         // Templated
+                      .cmd_response     (),                         // Templated
+                      .cmd_read         (req_nxt_cmd_read),         // Templated
+                      .cmd_write        (),                         // Templated
+                      .cmd_write_posted (req_nxt_cmd_write_posted), // Templated
+                      .cmd_rdma         (req_nxt_cmd_rdma),         // Templated
+                      .cmd_atomic       (),                         // Templated
+                      .cmd_user0        (req_nxt_cmd_user0),        // Templated
+                      .cmd_future0      (req_nxt_cmd_future0),      // Templated
+                      .cmd_error        (req_nxt_cmd_error),        // Templated
+                      .cmd_link         (req_nxt_cmd_link),         // Templated
+                      .cmd_read_resp    (req_nxt_cmd_read_resp),    // Templated
+                      .cmd_write_resp   (req_nxt_cmd_write_resp),   // Templated
+                      .cmd_user0_resp   (),                         // Templated
+                      .cmd_user1_resp   (),                         // Templated
+                      .cmd_future0_resp (),                         // Templated
+                      .cmd_future1_resp (),                         // Templated
+                      .cmd_link_resp    (req_nxt_cmd_link_resp),    // Templated
+                      .cmd_atomic_add   (),                         // Templated
+                      .cmd_atomic_and   (),                         // Templated
+                      .cmd_atomic_or    (),                         // Templated
+                      .cmd_atomic_xor   (),                         // Templated
+                      .cmd_atomic_max   (),                         // Templated
+                      .cmd_atomic_min   (),                         // Templated
+                      .cmd_atomic_maxu  (),                         // Templated
+                      .cmd_atomic_minu  (),                         // Templated
+                      .cmd_atomic_swap  (),                         // Templated
+                      // Inputs
+                      .command          (req_shiftreg_next[CW-1:0])); // Templated
+
+   umi_decode #(.CW(CW))
+   umi_decode_resp_nxt(/*AUTOINST*/
+                       // Outputs
+                       .cmd_invalid      (resp_nxt_cmd_invalid),     // Templated
+                       .cmd_request      (),                         // Templated
+                       .cmd_response     (),                         // Templated
+                       .cmd_read         (resp_nxt_cmd_read),        // Templated
+                       .cmd_write        (),                         // Templated
+                       .cmd_write_posted (resp_nxt_cmd_write_posted), // Templated
+                       .cmd_rdma         (resp_nxt_cmd_rdma),        // Templated
+                       .cmd_atomic       (),                         // Templated
+                       .cmd_user0        (resp_nxt_cmd_user0),       // Templated
+                       .cmd_future0      (resp_nxt_cmd_future0),     // Templated
+                       .cmd_error        (resp_nxt_cmd_error),       // Templated
+                       .cmd_link         (resp_nxt_cmd_link),        // Templated
+                       .cmd_read_resp    (resp_nxt_cmd_read_resp),   // Templated
+                       .cmd_write_resp   (resp_nxt_cmd_write_resp),  // Templated
+                       .cmd_user0_resp   (),                         // Templated
+                       .cmd_user1_resp   (),                         // Templated
+                       .cmd_future0_resp (),                         // Templated
+                       .cmd_future1_resp (),                         // Templated
+                       .cmd_link_resp    (resp_nxt_cmd_link_resp),   // Templated
+                       .cmd_atomic_add   (),                         // Templated
+                       .cmd_atomic_and   (),                         // Templated
+                       .cmd_atomic_or    (),                         // Templated
+                       .cmd_atomic_xor   (),                         // Templated
+                       .cmd_atomic_max   (),                         // Templated
+                       .cmd_atomic_min   (),                         // Templated
+                       .cmd_atomic_maxu  (),                         // Templated
+                       .cmd_atomic_minu  (),                         // Templated
+                       .cmd_atomic_swap  (),                         // Templated
+                       // Inputs
+                       .command          (resp_shiftreg_next[CW-1:0])); // Templated
 
    //########################################
    // UMI bandwidth optimization - only what is needed is sent
@@ -1019,18 +1218,39 @@ module lumi_rx
    assign req_cmd_lenp1[11:0] = {4'h0,req_cmd_len[7:0]} + 1'b1;
    assign req_cmd_bytes[11:0] = req_cmd_lenp1[11:0] << req_cmd_size[2:0];
 
+   // Size of the packet being received
+   assign req_nxt_cmd_only  = req_nxt_cmd_invalid    |
+                              req_nxt_cmd_link       |
+                              req_nxt_cmd_link_resp  ;
+   assign req_nxt_no_data   = req_nxt_cmd_read       |
+                              req_nxt_cmd_rdma       |
+                              req_nxt_cmd_error      |
+                              req_nxt_cmd_write_resp |
+                              req_nxt_cmd_user0      |
+                              req_nxt_cmd_future0    ;
+
+   assign req_nxt_cmd_lenp1[11:0] = {4'h0,req_nxt_cmd_len[7:0]} + 1'b1;
+   assign req_nxt_cmd_bytes[11:0] = req_nxt_cmd_lenp1[11:0] << req_nxt_cmd_size[2:0];
+
+   assign req_nxt_hc = csr_hdrcomp & req_shiftreg_next[4];
+
+   assign req_nxt_hc_dst_bytes = (req_shiftreg_next[19:17] == HC_DST_FULL) ? AW/8 :
+                                 (req_shiftreg_next[19:17] == HC_DST_D16)  ? 'd2  :
+                                 (req_shiftreg_next[19:17] == HC_DST_D32)  ? 'd4  :
+                                                                             'd0;
+
+   assign req_nxt_hdr_size = req_nxt_hc ?
+                             'd3 + {req_shiftreg_next[16],1'b0} + req_nxt_hc_dst_bytes +
+                             (req_shiftreg_next[20] ? AW/8 : 0) :
+                             full_hdr_size;
+
    always @(*)
-     case ({req_cmd_only,req_no_data})
+     case ({req_nxt_cmd_only,req_nxt_no_data})
        2'b10: req_hdr_bytes = (CW)/8;
-       2'b01: req_hdr_bytes = (CW+AW+AW)/8;
-       default: req_hdr_bytes = full_hdr_size + req_cmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
+       2'b01: req_hdr_bytes = req_nxt_hdr_size;
+       default: req_hdr_bytes = req_nxt_hdr_size + req_nxt_cmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
      endcase
 
-   // Before we get 2B of the header we do not know the size
-   assign req_bytes_to_receive = (req_rxptr == 1) & (byterate == 1) ?
-                                 (CW)/8 :
-                                 req_hdr_bytes;
-
    // Valid register holds one bit per byte to transfer
    always @ (posedge clk or negedge nreset)
      if (~nreset)
@@ -1039,11 +1259,10 @@ module lumi_rx
        req_rxptr <= req_rxptr_next;
 
    // Count by the number of bytes per cycle transferred
-   // When reaching the end of the header need to re-align to the remaining bytes
-   // Special case - need to check that the fifo data is cmd_only and then hold rxptr
-
-   assign req_rxptr_next = ((|req_rxptr) & ((req_rxptr + byterate) >= req_bytes_to_receive) |
-                            ~(|req_rxptr) & fifo_cmd_only[0] & (byterate >= CW/8)) ?
+   // When reaching the end of the packet need to re-align to the next one
+   // The size is only valid once the first 3B (minimum packet size) are in
+   assign req_rxptr_next = ((req_rxptr + byterate) >= 'd3) &
+                           ((req_rxptr + byterate) >= req_hdr_bytes) ?
                            0 :
                            req_rxptr + byterate;
 
@@ -1054,10 +1273,61 @@ module lumi_rx
        req_transfer <= 'b0;
      else
        if (~req_transfer | umi_req_out_ready)
-         req_transfer <= ((|req_rxptr) |
-                          ~(|req_rxptr) & fifo_cmd_only[0] & (byterate >= CW/8)) &
-                         sync_fifo_rd[0] &
-                         (~|req_rxptr_next);
+         req_transfer <= sync_fifo_rd[0] & (~|req_rxptr_next);
+
+   //########################################
+   //# Cut-through
+   //########################################
+   // A posted write or read response is forwarded as soon as its header
+   // and at least one data word are in. Each partial transaction carries
+   // the words received so far with EOM cleared, the transaction completing
+   // the packet carries the rest and the original EOM. Writes expecting a
+   // response are not split as every part would get its own response.
+   // Compressed, atomic and exclusive packets are always stored and forwarded.
+
+   assign req_rxsum = req_rxptr + byterate;
+
+   assign req_ct_ok = csr_cutthru &
+                      (req_nxt_cmd_write_posted | req_nxt_cmd_read_resp) &
+                      ~req_nxt_hc & ~req_shiftreg_next[24] &
+                      (req_rxsum > full_hdr_size);
+
+   assign req_ct_avail[11:0] = {{(12-$clog2(DW+AW+AW+CW)){1'b0}}, req_rxsum - full_hdr_size} -
+                               req_ct_sent[11:0];
+   assign req_ct_words[11:0] = req_ct_avail[11:0] >> req_nxt_cmd_size[2:0];
+
+   // words left once the packet completes
+   assign req_ct_rest[11:0] = (req_nxt_cmd_bytes[11:0] - req_ct_sent[11:0]) >> req_nxt_cmd_size[2:0];
+
+   assign req_ct_emit = req_ct_ok & (|req_rxptr_next) & (|req_ct_words[11:0]);
+
+   always @ (posedge clk or negedge nreset)
+     if (~nreset)
+       req_ct_valid <= 1'b0;
+     else
+       if (~req_ct_valid | umi_req_out_ready)
+         req_ct_valid <= sync_fifo_rd[0] & req_ct_emit;
+
+   // Offset and length of the transaction presented at the output
+   always @ (posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          req_ct_sent[11:0]  <= 'b0;
+          req_out_off[11:0]  <= 'b0;
+          req_out_len[7:0]   <= 'b0;
+          req_out_split      <= 1'b0;
+       end
+     else if (sync_fifo_rd[0] & (req_ct_emit | ~|req_rxptr_next))
+       begin
+          req_out_off[11:0]  <= req_ct_sent[11:0];
+          req_out_split      <= req_ct_emit | (|req_ct_sent[11:0]);
+          req_out_len[7:0]   <= req_ct_emit ?
+                                req_ct_words[7:0] - 1'b1 :
+                                req_ct_rest[7:0] - 1'b1;
+          req_ct_sent[11:0]  <= req_ct_emit ?
+                                req_ct_sent[11:0] + (req_ct_words[11:0] << req_nxt_cmd_size[2:0]) :
+                                'b0;
+       end
 
    //########################################
    //# DATA SHIFT REGISTER
@@ -1075,10 +1345,12 @@ module lumi_rx
 
    // non traditional shift register to handle multi modes
    // Need to stall the pipeline, including the shiftreg, when output is stalled
+   assign req_shiftreg_next[(DW+AW+AW+CW)-1:0] = (req_shiftreg_in[(DW+AW+AW+CW)-1:0] << (req_datashift<<3)) & req_writemask[(DW+AW+AW+CW)-1:0] |
+                                                 (req_shiftreg[(DW+AW+AW+CW)-1:0] & ~req_writemask[(DW+AW+AW+CW)-1:0]);
+
    always @ (posedge clk)
      if (sync_fifo_rd[0])
-       req_shiftreg[(DW+AW+AW+CW)-1:0] <= (req_shiftreg_in[(DW+AW+AW+CW)-1:0] << (req_datashift<<3)) & req_writemask[(DW+AW+AW+CW)-1:0] |
-                                          (req_shiftreg[(DW+AW+AW+CW)-1:0] & ~req_writemask[(DW+AW+AW+CW)-1:0]);
+       req_shiftreg[(DW+AW+AW+CW)-1:0] <= req_shiftreg_next[(DW+AW+AW+CW)-1:0];
 
    //########################################
    // Response pipe
@@ -1097,18 +1369,39 @@ module lumi_rx
    assign resp_cmd_lenp1[11:0] = {4'h0,resp_cmd_len[7:0]} + 1'b1;
    assign resp_cmd_bytes[11:0] = resp_cmd_lenp1[11:0] << resp_cmd_size[2:0];
 
+   // Size of the packet being received
+   assign resp_nxt_cmd_only  = resp_nxt_cmd_invalid    |
+                               resp_nxt_cmd_link       |
+                               resp_nxt_cmd_link_resp  ;
+   assign resp_nxt_no_data   = resp_nxt_cmd_read       |
+                               resp_nxt_cmd_rdma       |
+                               resp_nxt_cmd_error      |
+                               resp_nxt_cmd_write_resp |
+                               resp_nxt_cmd_user0      |
+                               resp_nxt_cmd_future0    ;
+
+   assign resp_nxt_cmd_lenp1[11:0] = {4'h0,resp_nxt_cmd_len[7:0]} + 1'b1;
+   assign resp_nxt_cmd_bytes[11:0] = resp_nxt_cmd_lenp1[11:0] << resp_nxt_cmd_size[2:0];
+
+   assign resp_nxt_hc = csr_hdrcomp & resp_shiftreg_next[4];
+
+   assign resp_nxt_hc_dst_bytes = (resp_shiftreg_next[19:17] == HC_DST_FULL) ? AW/8 :
+                                  (resp_shiftreg_next[19:17] == HC_DST_D16)  ? 'd2  :
+                                  (resp_shiftreg_next[19:17] == HC_DST_D32)  ? 'd4  :
+                                                                               'd0;
+
+   assign resp_nxt_hdr_size = resp_nxt_hc ?
+                              'd3 + {resp_shiftreg_next[16],1'b0} + resp_nxt_hc_dst_bytes +
+                              (resp_shiftreg_next[20] ? AW/8 : 0) :
+                              full_hdr_size;
+
    always @(*)
-     case ({resp_cmd_only,resp_no_data})
+     case ({resp_nxt_cmd_only,resp_nxt_no_data})
        2'b10: resp_hdr_bytes = (CW)/8;
-       2'b01: resp_hdr_bytes = (CW+AW+AW)/8;
-       default: resp_hdr_bytes = full_hdr_size + resp_cmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
+       2'b01: resp_hdr_bytes = resp_nxt_hdr_size;
+       default: resp_hdr_bytes = resp_nxt_hdr_size + resp_nxt_cmd_bytes[$clog2(DW+AW+AW+CW)-1:0];
      endcase
 
-   // Before we get 2B of the header we do not know the size
-   assign resp_bytes_to_receive = (resp_rxptr == 0) & (byterate == 1) ?
-                                  (CW)/8 :
-                                  resp_hdr_bytes;
-
    // Valid register holds one bit per byte to transfer
    always @ (posedge clk or negedge nreset)
      if (~nreset)
@@ -1117,11 +1410,10 @@ module lumi_rx
        resp_rxptr <= resp_rxptr_next;
 
    // Count by the number of bytes per cycle transferred
-   // When reaching the end of the header need to re-align to the remaining bytes
-   // Special case - need to check that the fifo data is cmd_only and then hold rxptr
-
-   assign resp_rxptr_next = ((|resp_rxptr) & ((resp_rxptr + byterate) >= resp_bytes_to_receive) |
-                             ~(|resp_rxptr) & fifo_cmd_only[1] & (byterate >= CW/8)) ?
+   // When reaching the end of the packet need to re-align to the next one
+   // The size is only valid once the first 3B (minimum packet size) are in
+   assign resp_rxptr_next = ((resp_rxptr + byterate) >= 'd3) &
+                            ((resp_rxptr + byterate) >= resp_hdr_bytes) ?
                             0 :
                             resp_rxptr + byterate;
 
@@ -1132,10 +1424,61 @@ module lumi_rx
        resp_transfer <= 'b0;
      else
        if (~resp_transfer | umi_resp_out_ready)
-         resp_transfer <= ((|resp_rxptr) |
-                           ~(|resp_rxptr) & fifo_cmd_only[1] & (byterate >= CW/8)) &
-                          sync_fifo_rd[1] &
-                          (~|resp_rxptr_next);
+         resp_transfer <= sync_fifo_rd[1] & (~|resp_rxptr_next);
+
+   //########################################
+   //# Cut-through
+   //########################################
+   // A posted write or read response is forwarded as soon as its header
+   // and at least one data word are in. Each partial transaction carries
+   // the words received so far with EOM cleared, the transaction completing
+   // the packet carries the rest and the original EOM. Writes expecting a
+   // response are not split as every part would get its own response.
+   // Compressed, atomic and exclusive packets are always stored and forwarded.
+
+   assign resp_rxsum = resp_rxptr + byterate;
+
+   assign resp_ct_ok = csr_cutthru &
+                       (resp_nxt_cmd_write_posted | resp_nxt_cmd_read_resp) &
+                       ~resp_nxt_hc & ~resp_shiftreg_next[24] &
+                       (resp_rxsum > full_hdr_size);
+
+   assign resp_ct_avail[11:0] = {{(12-$clog2(DW+AW+AW+CW)){1'b0}}, resp_rxsum - full_hdr_size} -
+                                resp_ct_sent[11:0];
+   assign resp_ct_words[11:0] = resp_ct_avail[11:0] >> resp_nxt_cmd_size[2:0];
+
+   // words left once the packet completes
+   assign resp_ct_rest[11:0] = (resp_nxt_cmd_bytes[11:0] - resp_ct_sent[11:0]) >> resp_nxt_cmd_size[2:0];
+
+   assign resp_ct_emit = resp_ct_ok & (|resp_rxptr_next) & (|resp_ct_words[11:0]);
+
+   always @ (posedge clk or negedge nreset)
+     if (~nreset)
+       resp_ct_valid <= 1'b0;
+     else
+       if (~resp_ct_valid | umi_resp_out_ready)
+         resp_ct_valid <= sync_fifo_rd[1] & resp_ct_emit;
+
+   // Offset and length of the transaction presented at the output
+   always @ (posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          resp_ct_sent[11:0]  <= 'b0;
+          resp_out_off[11:0]  <= 'b0;
+          resp_out_len[7:0]   <= 'b0;
+          resp_out_split      <= 1'b0;
+       end
+     else if (sync_fifo_rd[1] & (resp_ct_emit | ~|resp_rxptr_next))
+       begin
+          resp_out_off[11:0]  <= resp_ct_sent[11:0];
+          resp_out_split      <= resp_ct_emit | (|resp_ct_sent[11:0]);
+          resp_out_len[7:0]   <= resp_ct_emit ?
+                                 resp_ct_words[7:0] - 1'b1 :
+                                 resp_ct_rest[7:0] - 1'b1;
+          resp_ct_sent[11:0]  <= resp_ct_emit ?
+                                 resp_ct_sent[11:0] + (resp_ct_words[11:0] << resp_nxt_cmd_size[2:0]) :
+                                 'b0;
+       end
 
    //########################################
    //# DATA SHIFT REGISTER
@@ -1153,46 +1496,190 @@ module lumi_rx
 
    // non traditional shift register to handle multi modes
    // Need to stall the pipeline, including the shiftreg, when output is stalled
+   assign resp_shiftreg_next[(DW+AW+AW+CW)-1:0] = (resp_shiftreg_in[(DW+AW+AW+CW)-1:0] << (resp_datashift<<3)) & resp_writemask[(DW+AW+AW+CW)-1:0] |
+                                                  (resp_shiftreg[(DW+AW+AW+CW)-1:0] & ~resp_writemask[(DW+AW+AW+CW)-1:0]);
+
    always @ (posedge clk)
      if (sync_fifo_rd[1])
-       resp_shiftreg[(DW+AW+AW+CW)-1:0] <= (resp_shiftreg_in[(DW+AW+AW+CW)-1:0] << (resp_datashift<<3)) & resp_writemask[(DW+AW+AW+CW)-1:0] |
-                                           (resp_shiftreg[(DW+AW+AW+CW)-1:0] & ~resp_writemask[(DW+AW+AW+CW)-1:0]);
+       resp_shiftreg[(DW+AW+AW+CW)-1:0] <= resp_shiftreg_next[(DW+AW+AW+CW)-1:0];
+
+   //########################################
+   //# header expansion - request
+   //########################################
+
+   assign req_hc     = csr_hdrcomp & req_shiftreg[4] & ~req_cmd_only;
+   assign req_hc_fmt = req_shiftreg[23:16];
+
+   assign req_hc_dst_bytes = (req_hc_fmt[3:1] == HC_DST_FULL) ? AW/8 :
+                             (req_hc_fmt[3:1] == HC_DST_D16)  ? 'd2  :
+                             (req_hc_fmt[3:1] == HC_DST_D32)  ? 'd4  :
+                                                                'd0;
+
+   assign req_hc_dst_offset = 'd3 + {req_hc_fmt[0],1'b0};
+   assign req_hc_src_offset = req_hc_dst_offset + req_hc_dst_bytes;
+   assign req_hc_hdr_bytes  = req_hc_src_offset + (req_hc_fmt[4] ? AW/8 : 0);
+
+   assign req_hc_dst_field[(DW+AW+AW+CW)-1:0]  = req_shiftreg >> (req_hc_dst_offset<<3);
+   assign req_hc_src_field[(DW+AW+AW+CW)-1:0]  = req_shiftreg >> (req_hc_src_offset<<3);
+   assign req_hc_data_field[(DW+AW+AW+CW)-1:0] = req_shiftreg >> (req_hc_hdr_bytes<<3);
+
+   assign req_hc_pred_dstaddr[AW-1:0] = req_hc_dstaddr[AW-1:0] + {{(AW-12){1'b0}},req_hc_bytes[11:0]};
+
+   always @(*)
+     case (req_hc_fmt[3:1])
+       HC_DST_FULL: req_hc_dstaddr_out[AW-1:0] = req_hc_dst_field[AW-1:0];
+       HC_DST_D16:  req_hc_dstaddr_out[AW-1:0] = req_hc_pred_dstaddr[AW-1:0] +
+                                                 {{(AW-16){req_hc_dst_field[15]}},req_hc_dst_field[15:0]};
+       HC_DST_D32:  req_hc_dstaddr_out[AW-1:0] = req_hc_pred_dstaddr[AW-1:0] +
+                                                 {{(AW-32){req_hc_dst_field[31]}},req_hc_dst_field[31:0]};
+       HC_DST_SEQ:  req_hc_dstaddr_out[AW-1:0] = req_hc_pred_dstaddr[AW-1:0];
+       default:     req_hc_dstaddr_out[AW-1:0] = req_hc_dstaddr[AW-1:0];
+     endcase
+
+   assign req_hc_cmd[CW-1:0] = {(req_hc_fmt[0] ? req_shiftreg[24+:16] : req_hc_cmdhi[15:0]),
+                                req_shiftreg[15:5],
+                                1'b0,
+                                req_shiftreg[3:0]};
+
+   // State tracks the last packet delivered, compressed or not
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          req_hc_cmdhi[15:0]     <= 'b0;
+          req_hc_dstaddr[AW-1:0] <= 'b0;
+          req_hc_srcaddr[AW-1:0] <= 'b0;
+          req_hc_bytes[11:0]     <= 'b0;
+       end
+     else if (umi_req_out_valid & umi_req_out_ready & ~req_cmd_only & ~req_ct_valid)
+       begin
+          req_hc_cmdhi[15:0]     <= req_base_cmd[31:16];
+          req_hc_dstaddr[AW-1:0] <= req_base_dstaddr[AW-1:0];
+          req_hc_srcaddr[AW-1:0] <= req_base_srcaddr[AW-1:0];
+          req_hc_bytes[11:0]     <= req_cmd_bytes[11:0];
+       end
 
    //########################################
    //# output stage - request
    //########################################
 
-   assign umi_req_out_cmd[CW-1:0] = req_shiftreg[CW-1:0];
+   assign req_base_cmd[CW-1:0] = req_hc ? req_hc_cmd[CW-1:0] : req_shiftreg[CW-1:0];
+
+   assign req_base_dstaddr[AW-1:0] = req_cmd_only ? {AW{1'b0}}                 :
+                                     req_hc       ? req_hc_dstaddr_out[AW-1:0] :
+                                     req_shiftreg[CW+:AW];
 
-   assign umi_req_out_dstaddr[AW-1:0] = req_cmd_only ? {AW{1'b0}} :
-                                        req_shiftreg[CW+:AW];
+   assign req_base_srcaddr[AW-1:0] = req_cmd_only              ? {AW{1'b0}}               :
+                                     req_hc & req_hc_fmt[4]    ? req_hc_src_field[AW-1:0] :
+                                     req_hc                    ? req_hc_srcaddr[AW-1:0]   :
+                                     req_shiftreg[(CW+AW)+:AW];
 
-   assign umi_req_out_srcaddr[AW-1:0] = req_cmd_only ? {AW{1'b0}} :
-                                        req_shiftreg[(CW+AW)+:AW];
+   assign req_base_data[DW-1:0] = (req_cmd_only | req_no_data)  ? {DW{1'b0}}                :
+                                  req_hc                        ? req_hc_data_field[DW-1:0] :
+                                  req_shiftreg[(CW+AW+AW)+:DW];
 
-   assign umi_req_out_data[DW-1:0] = (req_cmd_only | req_no_data) ? {DW{1'b0}}              :
-                                     req_shiftreg[(CW+AW+AW)+:DW];
+   // split packets (cut-through) carry their own length, EOM and offset
+   assign umi_req_out_cmd[CW-1:0] = ~req_out_split ? req_base_cmd[CW-1:0] :
+                                    {req_base_cmd[CW-1:23],
+                                     req_base_cmd[22] & ~req_ct_valid,
+                                     req_base_cmd[21:16],
+                                     req_out_len[7:0],
+                                     req_base_cmd[7:0]};
+
+   assign umi_req_out_dstaddr[AW-1:0] = req_base_dstaddr[AW-1:0] + {{(AW-12){1'b0}},req_out_off[11:0]};
+   assign umi_req_out_srcaddr[AW-1:0] = req_base_srcaddr[AW-1:0] + {{(AW-12){1'b0}},req_out_off[11:0]};
+   assign umi_req_out_data[DW-1:0]    = req_base_data[DW-1:0] >> (req_out_off[11:0]<<3);
 
    // link commands are not passed on to the umi port
-   assign umi_req_out_valid =  req_transfer & ~(req_cmd_link | req_cmd_link_resp);
+   assign umi_req_out_valid =  (req_transfer | req_ct_valid) & ~(req_cmd_link | req_cmd_link_resp);
+
+   //########################################
+   //# header expansion - response
+   //########################################
+
+   assign resp_hc     = csr_hdrcomp & resp_shiftreg[4] & ~resp_cmd_only;
+   assign resp_hc_fmt = resp_shiftreg[23:16];
+
+   assign resp_hc_dst_bytes = (resp_hc_fmt[3:1] == HC_DST_FULL) ? AW/8 :
+                              (resp_hc_fmt[3:1] == HC_DST_D16)  ? 'd2  :
+                              (resp_hc_fmt[3:1] == HC_DST_D32)  ? 'd4  :
+                                                                  'd0;
+
+   assign resp_hc_dst_offset = 'd3 + {resp_hc_fmt[0],1'b0};
+   assign resp_hc_src_offset = resp_hc_dst_offset + resp_hc_dst_bytes;
+   assign resp_hc_hdr_bytes  = resp_hc_src_offset + (resp_hc_fmt[4] ? AW/8 : 0);
+
+   assign resp_hc_dst_field[(DW+AW+AW+CW)-1:0]  = resp_shiftreg >> (resp_hc_dst_offset<<3);
+   assign resp_hc_src_field[(DW+AW+AW+CW)-1:0]  = resp_shiftreg >> (resp_hc_src_offset<<3);
+   assign resp_hc_data_field[(DW+AW+AW+CW)-1:0] = resp_shiftreg >> (resp_hc_hdr_bytes<<3);
+
+   assign resp_hc_pred_dstaddr[AW-1:0] = resp_hc_dstaddr[AW-1:0] + {{(AW-12){1'b0}},resp_hc_bytes[11:0]};
+
+   always @(*)
+     case (resp_hc_fmt[3:1])
+       HC_DST_FULL: resp_hc_dstaddr_out[AW-1:0] = resp_hc_dst_field[AW-1:0];
+       HC_DST_D16:  resp_hc_dstaddr_out[AW-1:0] = resp_hc_pred_dstaddr[AW-1:0] +
+                                                  {{(AW-16){resp_hc_dst_field[15]}},resp_hc_dst_field[15:0]};
+       HC_DST_D32:  resp_hc_dstaddr_out[AW-1:0] = resp_hc_pred_dstaddr[AW-1:0] +
+                                                  {{(AW-32){resp_hc_dst_field[31]}},resp_hc_dst_field[31:0]};
+       HC_DST_SEQ:  resp_hc_dstaddr_out[AW-1:0] = resp_hc_pred_dstaddr[AW-1:0];
+       default:     resp_hc_dstaddr_out[AW-1:0] = resp_hc_dstaddr[AW-1:0];
+     endcase
+
+   assign resp_hc_cmd[CW-1:0] = {(resp_hc_fmt[0] ? resp_shiftreg[24+:16] : resp_hc_cmdhi[15:0]),
+                                 resp_shiftreg[15:5],
+                                 1'b0,
+                                 resp_shiftreg[3:0]};
+
+   // State tracks the last packet delivered, compressed or not
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          resp_hc_cmdhi[15:0]     <= 'b0;
+          resp_hc_dstaddr[AW-1:0] <= 'b0;
+          resp_hc_srcaddr[AW-1:0] <= 'b0;
+          resp_hc_bytes[11:0]     <= 'b0;
+       end
+     else if (umi_resp_out_valid & umi_resp_out_ready & ~resp_cmd_only & ~resp_ct_valid)
+       begin
+          resp_hc_cmdhi[15:0]     <= resp_base_cmd[31:16];
+          resp_hc_dstaddr[AW-1:0] <= resp_base_dstaddr[AW-1:0];
+          resp_hc_srcaddr[AW-1:0] <= resp_base_srcaddr[AW-1:0];
+          resp_hc_bytes[11:0]     <= resp_cmd_bytes[11:0];
+       end
 
    //########################################
    //# output stage - response
    //########################################
 
-   assign umi_resp_out_cmd[CW-1:0] = resp_shiftreg[CW-1:0];
+   assign resp_base_cmd[CW-1:0] = resp_hc ? resp_hc_cmd[CW-1:0] : resp_shiftreg[CW-1:0];
+
+   assign resp_base_dstaddr[AW-1:0] = resp_cmd_only ? {AW{1'b0}}                  :
+                                      resp_hc       ? resp_hc_dstaddr_out[AW-1:0] :
+                                      resp_shiftreg[CW+:AW];
+
+   assign resp_base_srcaddr[AW-1:0] = resp_cmd_only              ? {AW{1'b0}}                :
+                                      resp_hc & resp_hc_fmt[4]   ? resp_hc_src_field[AW-1:0] :
+                                      resp_hc                    ? resp_hc_srcaddr[AW-1:0]   :
+                                      resp_shiftreg[(CW+AW)+:AW];
 
-   assign umi_resp_out_dstaddr[AW-1:0] = resp_cmd_only ? {AW{1'b0}} :
-                                         resp_shiftreg[CW+:AW];
+   assign resp_base_data[DW-1:0] = (resp_cmd_only | resp_no_data) ? {DW{1'b0}}                 :
+                                   resp_hc                        ? resp_hc_data_field[DW-1:0] :
+                                   resp_shiftreg[(CW+AW+AW)+:DW];
 
-   assign umi_resp_out_srcaddr[AW-1:0] = resp_cmd_only ? {AW{1'b0}} :
-                                         resp_shiftreg[(CW+AW)+:AW];
+   // split packets (cut-through) carry their own length, EOM and offset
+   assign umi_resp_out_cmd[CW-1:0] = ~resp_out_split ? resp_base_cmd[CW-1:0] :
+                                     {resp_base_cmd[CW-1:23],
+                                      resp_base_cmd[22] & ~resp_ct_valid,
+                                      resp_base_cmd[21:16],
+                                      resp_out_len[7:0],
+                                      resp_base_cmd[7:0]};
 
-   assign umi_resp_out_data[DW-1:0] = (resp_cmd_only | resp_no_data) ? {DW{1'b0}}              :
-                                      resp_shiftreg[(CW+AW+AW)+:DW];
+   assign umi_resp_out_dstaddr[AW-1:0] = resp_base_dstaddr[AW-1:0] + {{(AW-12){1'b0}},resp_out_off[11:0]};
+   assign umi_resp_out_srcaddr[AW-1:0] = resp_base_srcaddr[AW-1:0] + {{(AW-12){1'b0}},resp_out_off[11:0]};
+   assign umi_resp_out_data[DW-1:0]    = resp_base_data[DW-1:0] >> (resp_out_off[11:0]<<3);
 
    // link commands are not passed on to the umi port
-   assign umi_resp_out_valid =  resp_transfer & ~(resp_cmd_link | resp_cmd_link_resp);
+   assign umi_resp_out_valid =  (resp_transfer | resp_ct_valid) & ~(resp_cmd_link | resp_cmd_link_resp);
 
 endmodule
 // Local Variables:
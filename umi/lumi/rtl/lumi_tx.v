@@ -17,6 +17,10 @@
  *
  * Documentation:
  * - LUMI Transmit module
+ * - Optional header compression (csr_hdrcomp), only used once the remote
+ *   rx advertises support through its credit messages (rmt_hdrcomp)
+ * - Optional adaptive credit updates (csr_crdt_adapt), sending only changed
+ *   credits and returning them sooner when the rx fifo drains
  *
  ******************************************************************************/
 
@@ -33,6 +37,8 @@ module lumi_tx
     input             nreset,      // clk synced async active low reset
     input             csr_en,      // 1=enable outputs
     input             csr_crdt_en, // 1=enable sending updates
+    input             csr_crdt_adapt, // 1=adaptive credit updates
+    input             csr_hdrcomp, // 1=enable header compression
     input [7:0]       csr_iowidth, // bus width
     input             vss,         // common ground
     input             vdd,         // core supply
@@ -62,16 +68,34 @@ module lumi_tx
     output reg [31:0] csr_resp_crdt_stall_cycles,
     output reg [31:0] csr_req_crdt_active_cycles,
     output reg [31:0] csr_resp_crdt_active_cycles,
+    // byte counters for umi packets sent on the link (header and data)
+    // and for the umi data payload carried by them
+    output reg [31:0] csr_link_bytes,
+    output reg [31:0] csr_payload_bytes,
+    // number of credit update messages sent
+    output reg [31:0] csr_crdt_msgs,
     // Credit interface
     input [15:0]      csr_crdt_intrvl,
+    input [15:0]      csr_crdt_req_init,  // local rx credit window (request)
+    input [15:0]      csr_crdt_resp_init, // local rx credit window (response)
     input [15:0]      rmt_crdt_req,
     input [15:0]      rmt_crdt_resp,
     input [15:0]      loc_crdt_req,
     input [15:0]      loc_crdt_resp,
     input [1:0]       loc_crdt_init,
-    input [1:0]       rmt_crdt_init
+    input [1:0]       rmt_crdt_init,
+    // Header compression
+    input             loc_hdrcomp, // local rx accepts compressed headers
+    input             rmt_hdrcomp  // remote rx accepts compressed headers
     );
 
+   // header compression dstaddr encoding
+   localparam HC_DST_FULL = 3'd0; // full dstaddr
+   localparam HC_DST_D16  = 3'd1; // 16b delta from the predicted dstaddr
+   localparam HC_DST_D32  = 3'd2; // 32b delta from the predicted dstaddr
+   localparam HC_DST_SEQ  = 3'd3; // predicted dstaddr (previous dstaddr + bytes)
+   localparam HC_DST_SAME = 3'd4; // previous dstaddr
+
    // local state
    reg [(DW+AW+AW+CW)-1:0]   shiftreg;
    reg [(DW+AW+AW+CW)-1:0]   shiftreg_odd;
@@ -139,6 +163,53 @@ module lumi_tx
    wire [15:0]                    resp_crdt_avail;
    reg [15:0]                     crdt_updt_cntr;
    reg [1:0]                      crdt_updt_send;
+   wire                           crdt_updt_load;
+   reg [15:0]                     crdt_sent_req;
+   reg [15:0]                     crdt_sent_resp;
+   reg [1:0]                      crdt_sent_vld;
+   reg                            crdt_sent_hdrcomp;
+   wire [15:0]                    crdt_unsent_req;
+   wire [15:0]                    crdt_unsent_resp;
+   wire [1:0]                     crdt_pend;
+   wire [1:0]                     crdt_urgent;
+
+   // header compression state, per channel (request/response)
+   reg [1:0]                      hc_valid;
+   reg [15:0]                     req_hc_cmdhi;
+   reg [15:0]                     resp_hc_cmdhi;
+   reg [AW-1:0]                   req_hc_dstaddr;
+   reg [AW-1:0]                   resp_hc_dstaddr;
+   reg [AW-1:0]                   req_hc_srcaddr;
+   reg [AW-1:0]                   resp_hc_srcaddr;
+   reg [11:0]                     req_hc_bytes;
+   reg [11:0]                     resp_hc_bytes;
+
+   wire                           out_cmd_only;
+   wire                           out_no_data;
+   wire                           out_error;
+   wire [11:0]                    out_bytes;
+   wire                           hc_en;
+   wire                           hc_resp;
+   wire                           hc_update;
+   wire                           hc_compress;
+   wire [15:0]                    hc_prev_cmdhi;
+   wire [AW-1:0]                  hc_prev_dstaddr;
+   wire [AW-1:0]                  hc_prev_srcaddr;
+   wire [11:0]                    hc_prev_bytes;
+   wire [AW-1:0]                  hc_pred_dstaddr;
+   wire [AW-1:0]                  hc_delta;
+   wire                           hc_cmdhi_send;
+   wire                           hc_srcaddr_send;
+   reg [2:0]                      hc_dst_mode;
+   reg [$clog2(DW+AW+AW+CW)-1:0]  hc_dst_bytes;
+   wire [$clog2(DW+AW+AW+CW)-1:0] hc_dst_offset;
+   wire [$clog2(DW+AW+AW+CW)-1:0] hc_src_offset;
+   wire [$clog2(DW+AW+AW+CW)-1:0] hc_hdr_bytes;
+   wire [11:0]                    hc_packet_bytes;
+   wire [AW-1:0]                  hc_dst_field;
+   wire [7:0]                     hc_fmt;
+   wire [CW+AW+AW-1:0]            hc_hdr;
+   wire [DW+AW+AW+CW-1:0]         hc_packet;
 
    /*AUTOWIRE*/
    // Beginning of automatic wires (for undeclared instantiated-module outputs)
@@ -239,34 +310,109 @@ module lumi_tx
        csr_resp_crdt_active_cycles[31:0] <= csr_resp_crdt_active_cycles[31:0] +
                                             {31'h0, umi_resp_in_ready};
 
+   // Link efficiency - bytes sent for umi packets vs. their data payload
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       csr_link_bytes[31:0] <= 'b0;
+     else if (phy_fifo_wr & phy_txrdy & ~shift_reg_type[2])
+       csr_link_bytes[31:0] <= csr_link_bytes[31:0] +
+                               {{(32-$clog2(DW+AW+AW+CW)){1'b0}}, byterate[$clog2(DW+AW+AW+CW)-1:0]};
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       csr_payload_bytes[31:0] <= 'b0;
+     else if (hc_update & ~out_no_data)
+       csr_payload_bytes[31:0] <= csr_payload_bytes[31:0] + {20'h0, out_bytes[11:0]};
+
    //########################################
    //# Credit message generation for the remote side
    //########################################
    // credit counters are stored in the rxphy block and sent periodically
+   // In adaptive mode (csr_crdt_adapt) updates are only sent for a channel
+   // whose credits (or header compression support) changed since its last
+   // update. Once a quarter of the local rx credit window is waiting to be
+   // returned the update is sent after a quarter of the interval instead.
+
+   assign crdt_unsent_req[15:0]  = loc_crdt_req[15:0]  - crdt_sent_req[15:0];
+   assign crdt_unsent_resp[15:0] = loc_crdt_resp[15:0] - crdt_sent_resp[15:0];
+
+   // init messages are repeated until the remote side answers
+   assign crdt_pend[0] = loc_crdt_init[0] | ~crdt_sent_vld[0] | (|crdt_unsent_req[15:0]) |
+                         (loc_hdrcomp ^ crdt_sent_hdrcomp);
+   assign crdt_pend[1] = loc_crdt_init[1] | ~crdt_sent_vld[1] | (|crdt_unsent_resp[15:0]) |
+                         (loc_hdrcomp ^ crdt_sent_hdrcomp);
+
+   assign crdt_urgent[0] = crdt_sent_vld[0] & (|crdt_unsent_req[15:0]) &
+                           (crdt_unsent_req[15:0] >= {2'b00, csr_crdt_req_init[15:2]}) &
+                           (crdt_updt_cntr[15:0] >= {2'b00, csr_crdt_intrvl[15:2]});
+   assign crdt_urgent[1] = crdt_sent_vld[1] & (|crdt_unsent_resp[15:0]) &
+                           (crdt_unsent_resp[15:0] >= {2'b00, csr_crdt_resp_init[15:2]}) &
+                           (crdt_updt_cntr[15:0] >= {2'b00, csr_crdt_intrvl[15:2]});
+
+   assign crdt_updt_load = csr_crdt_en & csr_crdt_adapt & ~(|crdt_updt_send) &
+                           ((|crdt_urgent[1:0]) |
+                            ((crdt_updt_cntr == csr_crdt_intrvl) & (|crdt_pend[1:0])));
 
    always @(posedge clk or negedge nreset)
      if (~nreset)
        crdt_updt_cntr <= 'h0;
      else
        if (csr_crdt_en)
-         crdt_updt_cntr <= (crdt_updt_cntr == csr_crdt_intrvl) ?
+         crdt_updt_cntr <= (crdt_updt_cntr == csr_crdt_intrvl) | crdt_updt_load ?
                            'h0:
                            crdt_updt_cntr + 1;
 
    // Credit update send:
-   // - set when counter reaches 0
-   // - clear when both updates are sent
+   // - set when counter reaches 0 (adaptive: resp first if pending)
+   // - clear when both updates are sent (adaptive: req only if pending)
    always @(posedge clk or negedge nreset)
      if (~nreset)
        crdt_updt_send <= 2'b00;
      else
-       if (csr_crdt_en & (crdt_updt_cntr == csr_crdt_intrvl))
+       if (csr_crdt_en & ~csr_crdt_adapt & (crdt_updt_cntr == csr_crdt_intrvl))
          crdt_updt_send <= 2'b01;
+       else if (crdt_updt_load)
+         crdt_updt_send <= crdt_pend[1] ? 2'b01 : 2'b10;
        else
          crdt_updt_send <= (|crdt_updt_send) & sample_packet ?
-                           (crdt_updt_send << 1) :
+                           {crdt_updt_send[0] & (~csr_crdt_adapt | crdt_pend[0]), 1'b0} :
                            crdt_updt_send;
 
+   // Last credit values sent to the remote side
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          crdt_sent_req[15:0]  <= 'h0;
+          crdt_sent_resp[15:0] <= 'h0;
+          crdt_sent_vld[1:0]   <= 2'b00;
+          crdt_sent_hdrcomp    <= 1'b0;
+       end
+     else if (~csr_crdt_en)
+       crdt_sent_vld[1:0] <= 2'b00;
+     else if ((|crdt_updt_send) & sample_packet)
+       begin
+          crdt_sent_hdrcomp <= loc_hdrcomp;
+          if (crdt_updt_send[1])
+            begin
+               crdt_sent_req[15:0] <= loc_crdt_req[15:0];
+               crdt_sent_vld[0]    <= ~loc_crdt_init[0];
+            end
+          else
+            begin
+               crdt_sent_resp[15:0] <= loc_crdt_resp[15:0];
+               crdt_sent_vld[1]     <= ~loc_crdt_init[1];
+            end
+       end
+     else
+       crdt_sent_vld[1:0] <= crdt_sent_vld[1:0] & ~loc_crdt_init[1:0];
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       csr_crdt_msgs[31:0] <= 'b0;
+     else if ((|crdt_updt_send) & sample_packet)
+       csr_crdt_msgs[31:0] <= csr_crdt_msgs[31:0] + 32'h1;
+
    //########################################
    //# UMI Transmit Arbiter
    //########################################
@@ -312,9 +458,10 @@ module lumi_tx
    // Muxing the umi_mux output with sending credit updates
    // Change the order to send resp credits first so in case both are pending
    // response will get credits first
+   // Bit 3 of the message advertises that the local rx accepts compressed headers
    wire [3:0] req_crdt_msg, resp_crdt_msg;
-   assign req_crdt_msg  = loc_crdt_init[0] ? 4'h1 : 4'h2;
-   assign resp_crdt_msg = loc_crdt_init[1] ? 4'h1 : 4'h2;
+   assign req_crdt_msg  = {loc_hdrcomp, loc_crdt_init[0] ? 3'h1 : 3'h2};
+   assign resp_crdt_msg = {loc_hdrcomp, loc_crdt_init[1] ? 3'h1 : 3'h2};
 
    assign umi_muxed_cmd = crdt_updt_send[1] ?
                           {loc_crdt_req[15:0],4'h0,req_crdt_msg[3:0],8'h2F}  :
@@ -529,7 +676,9 @@ module lumi_tx
                     .command            (umi_resp_in_cmd[CW-1:0])); // Templated
 
    // Second step - push all to the right, this is only needed when you skip a field
-   assign shiftreg_in_new = {umi_out_data,umi_out_srcaddr,umi_out_dstaddr,umi_muxed_cmd};
+   assign shiftreg_in_new = hc_compress ?
+                            hc_packet :
+                            {umi_out_data,umi_out_srcaddr,umi_out_dstaddr,umi_muxed_cmd};
 
    // Third step - only send the required number of bits
    // TODO - do not send SA for responses
@@ -593,10 +742,150 @@ module lumi_tx
 
    assign valid_start_value = lumi_txrdy & (|crdt_updt_send)      ?
                               {{CW/8{1'b1}},{(DW+AW+AW)/8{1'b0}}} :
+                              hc_compress                         ?
+                              ~({(DW+AW+AW+CW)/8{1'b1}} >> hc_packet_bytes[11:0]) :
                               lumi_txrdy & umi_resp_in_gated      ?
                               valid_start_value_resp              :
                               valid_start_value_req;
 
+   //########################################
+   //# Header compression
+   //########################################
+   // A compressed packet sets the reserved opcode bit (cmd[4]) and is sent as:
+   // - cmd[15:0]
+   // - format byte: [0]   cmd[31:16] present
+   //                [3:1] dstaddr encoding (HC_DST_*)
+   //                [4]   srcaddr present
+   // - cmd[31:16], dstaddr field and srcaddr, when present
+   // - data
+   // Fields are predicted from the previous packet of the same channel
+   // (request/response). Both sides update their state on every packet
+   // that is not cmd only, compressed or not. The first packet after
+   // enabling is always sent uncompressed to synchronize the remote rx.
+
+   assign hc_en = csr_hdrcomp & rmt_hdrcomp;
+
+   assign out_cmd_only = umi_resp_in_gated ? resp_cmd_only  : req_cmd_only;
+   assign out_no_data  = umi_resp_in_gated ? resp_no_data   : req_no_data;
+   assign out_error    = umi_resp_in_gated ? resp_cmd_error : req_cmd_error;
+   assign out_bytes    = umi_resp_in_gated ? cmd_resp_bytes : cmd_req_bytes;
+
+   // channel follows the remote rx request/response split
+   assign hc_resp   = ~umi_out_cmd[0];
+   assign hc_update = sample_packet & ~(|crdt_updt_send) & ~out_cmd_only;
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       hc_valid[1:0] <= 2'b00;
+     else if (~csr_en | ~hc_en)
+       hc_valid[1:0] <= 2'b00;
+     else if (hc_update)
+       hc_valid[1:0] <= hc_valid[1:0] | {hc_resp, ~hc_resp};
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          req_hc_cmdhi[15:0]     <= 'b0;
+          req_hc_dstaddr[AW-1:0] <= 'b0;
+          req_hc_srcaddr[AW-1:0] <= 'b0;
+          req_hc_bytes[11:0]     <= 'b0;
+       end
+     else if (hc_update & ~hc_resp)
+       begin
+          req_hc_cmdhi[15:0]     <= umi_out_cmd[31:16];
+          req_hc_dstaddr[AW-1:0] <= umi_out_dstaddr[AW-1:0];
+          req_hc_srcaddr[AW-1:0] <= umi_out_srcaddr[AW-1:0];
+          req_hc_bytes[11:0]     <= out_bytes[11:0];
+       end
+
+   always @(posedge clk or negedge nreset)
+     if (~nreset)
+       begin
+          resp_hc_cmdhi[15:0]     <= 'b0;
+          resp_hc_dstaddr[AW-1:0] <= 'b0;
+          resp_hc_srcaddr[AW-1:0] <= 'b0;
+          resp_hc_bytes[11:0]     <= 'b0;
+       end
+     else if (hc_update & hc_resp)
+       begin
+          resp_hc_cmdhi[15:0]     <= umi_out_cmd[31:16];
+          resp_hc_dstaddr[AW-1:0] <= umi_out_dstaddr[AW-1:0];
+          resp_hc_srcaddr[AW-1:0] <= umi_out_srcaddr[AW-1:0];
+          resp_hc_bytes[11:0]     <= out_bytes[11:0];
+       end
+
+   assign hc_prev_cmdhi[15:0]     = hc_resp ? resp_hc_cmdhi[15:0]     : req_hc_cmdhi[15:0];
+   assign hc_prev_dstaddr[AW-1:0] = hc_resp ? resp_hc_dstaddr[AW-1:0] : req_hc_dstaddr[AW-1:0];
+   assign hc_prev_srcaddr[AW-1:0] = hc_resp ? resp_hc_srcaddr[AW-1:0] : req_hc_srcaddr[AW-1:0];
+   assign hc_prev_bytes[11:0]     = hc_resp ? resp_hc_bytes[11:0]     : req_hc_bytes[11:0];
+
+   assign hc_pred_dstaddr[AW-1:0] = hc_prev_dstaddr[AW-1:0] + {{(AW-12){1'b0}},hc_prev_bytes[11:0]};
+   assign hc_delta[AW-1:0]        = umi_out_dstaddr[AW-1:0] - hc_pred_dstaddr[AW-1:0];
+
+   assign hc_cmdhi_send   = umi_out_cmd[31:16] != hc_prev_cmdhi[15:0];
+   assign hc_srcaddr_send = umi_out_srcaddr[AW-1:0] != hc_prev_srcaddr[AW-1:0];
+
+   always @(*)
+     if (umi_out_dstaddr[AW-1:0] == hc_pred_dstaddr[AW-1:0])
+       begin
+          hc_dst_mode[2:0] = HC_DST_SEQ;
+          hc_dst_bytes     = 'd0;
+       end
+     else if (umi_out_dstaddr[AW-1:0] == hc_prev_dstaddr[AW-1:0])
+       begin
+          hc_dst_mode[2:0] = HC_DST_SAME;
+          hc_dst_bytes     = 'd0;
+       end
+     else if ((&hc_delta[AW-1:15]) | ~(|hc_delta[AW-1:15]))
+       begin
+          hc_dst_mode[2:0] = HC_DST_D16;
+          hc_dst_bytes     = 'd2;
+       end
+     else if ((&hc_delta[AW-1:31]) | ~(|hc_delta[AW-1:31]))
+       begin
+          hc_dst_mode[2:0] = HC_DST_D32;
+          hc_dst_bytes     = 'd4;
+       end
+     else
+       begin
+          hc_dst_mode[2:0] = HC_DST_FULL;
+          hc_dst_bytes     = AW/8;
+       end
+
+   assign hc_dst_field[AW-1:0] = (hc_dst_mode[2:0] == HC_DST_FULL) ?
+                                 umi_out_dstaddr[AW-1:0] :
+                                 hc_delta[AW-1:0];
+
+   assign hc_fmt[7:0] = {3'b000, hc_srcaddr_send, hc_dst_mode[2:0], hc_cmdhi_send};
+
+   assign hc_dst_offset = 'd3 + {hc_cmdhi_send, 1'b0};
+   assign hc_src_offset = hc_dst_offset + hc_dst_bytes;
+   assign hc_hdr_bytes  = hc_src_offset + (hc_srcaddr_send ? AW/8 : 0);
+
+   assign hc_hdr[CW+AW+AW-1:0] =
+     {{(CW+AW+AW-24){1'b0}}, hc_fmt[7:0], umi_out_cmd[15:5], 1'b1, umi_out_cmd[3:0]} |
+     (({{(CW+AW+AW-16){1'b0}}, umi_out_cmd[31:16]} << 24) & {(CW+AW+AW){hc_cmdhi_send}}) |
+     (({{(CW+AW){1'b0}}, hc_dst_field[AW-1:0]} & ~({(CW+AW+AW){1'b1}} << (hc_dst_bytes<<3))) <<
+      (hc_dst_offset<<3)) |
+     (({{(CW+AW){1'b0}}, umi_out_srcaddr[AW-1:0]} & {(CW+AW+AW){hc_srcaddr_send}}) <<
+      (hc_src_offset<<3));
+
+   assign hc_packet[DW+AW+AW+CW-1:0] = ({{(AW+AW+CW){1'b0}}, umi_out_data[DW-1:0]} << (hc_hdr_bytes<<3)) |
+                                       {{DW{1'b0}}, hc_hdr[CW+AW+AW-1:0]};
+
+   assign hc_packet_bytes[11:0] = {{(12-$clog2(DW+AW+AW+CW)){1'b0}}, hc_hdr_bytes} +
+                                  (out_no_data ? 12'h0 : out_bytes[11:0]);
+
+   // only compress when it saves bytes, never compress link/error messages
+   assign hc_compress = ~(|crdt_updt_send) &
+                        hc_en &
+                        (hc_resp ? hc_valid[1] : hc_valid[0]) &
+                        ~out_cmd_only &
+                        ~out_error &
+                        ~umi_out_cmd[4] &
+                        (out_no_data | (out_bytes[11:0] <= DW/8)) &
+                        (hc_hdr_bytes < (CW+AW+AW)/8);
+
    // TX is done as lsb first
    // adding indication to the packet type in the shift register for crdt management
    always @ (posedge clk or negedge nreset)
@@ -13,6 +13,21 @@
  * See the License for the specific language governing permissions and
  * limitations under the License.
  *
+ * ----
+ *
+ * Documentation:
+ * - NLANE lumi lanes are bonded on each side of the link (lumi_bond),
+ *   sideband requests are sent to the lane owning their register group,
+ *   0x70+i for lane i of the host and 0x60+i for lane i of the device,
+ *   and the responses of all lanes are merged back
+ * - +stats=<file> periodically writes end-to-end statistics to file:
+ *   "<cycles> <req> <req first> <req last> <resp> <resp first> <resp last>
+ *   <write bytes> <busy cycles>", the number of UMI requests (host to
+ *   memory) and responses (memory to host) that crossed the link and the
+ *   sum of their latencies in cycles, up to the first beat and up to the
+ *   beat with EOM set on the far side, followed by the write payload bytes
+ *   that crossed the link and the cycles with a request in flight
+ *
  ******************************************************************************/
 
 `default_nettype none
@@ -29,25 +44,28 @@ module testbench (
    parameter integer TCW = 8;
    parameter integer IOW = 128;
    parameter integer NUMI = 2;
+   parameter integer NLANE = 1;
+
+`include "umi_messages.vh"
 
    /*AUTOWIRE*/
    // Beginning of automatic wires (for undeclared instantiated-module outputs)
-   wire [CW-1:0]        phy_in_cmd;
-   wire [RW-1:0]        phy_in_data;
-   wire [AW-1:0]        phy_in_dstaddr;
-   wire                 phy_in_ready;
-   wire [AW-1:0]        phy_in_srcaddr;
-   wire                 phy_in_valid;
-   wire [CW-1:0]        phy_out_cmd;
-   wire [RW-1:0]        phy_out_data;
-   wire [AW-1:0]        phy_out_dstaddr;
-   wire                 phy_out_ready;
-   wire [AW-1:0]        phy_out_srcaddr;
-   wire                 phy_out_valid;
-   wire [IOW-1:0]       phy_rxdata;
-   wire                 phy_rxvld;
-   wire [IOW-1:0]       phy_txdata;
-   wire                 phy_txvld;
+   wire [NLANE*CW-1:0]  phy_in_cmd;
+   wire [NLANE*RW-1:0]  phy_in_data;
+   wire [NLANE*AW-1:0]  phy_in_dstaddr;
+   wire [NLANE-1:0]     phy_in_ready;
+   wire [NLANE*AW-1:0]  phy_in_srcaddr;
+   wire [NLANE-1:0]     phy_in_valid;
+   wire [NLANE*CW-1:0]  phy_out_cmd;
+   wire [NLANE*RW-1:0]  phy_out_data;
+   wire [NLANE*AW-1:0]  phy_out_dstaddr;
+   wire [NLANE-1:0]     phy_out_ready;
+   wire [NLANE*AW-1:0]  phy_out_srcaddr;
+   wire [NLANE-1:0]     phy_out_valid;
+   wire [NLANE*IOW-1:0] phy_rxdata;
+   wire [NLANE-1:0]     phy_rxvld;
+   wire [NLANE*IOW-1:0] phy_txdata;
+   wire [NLANE-1:0]     phy_txvld;
    wire [CW-1:0]        udev_req_cmd;
    wire [DW-1:0]        udev_req_data;
    wire [AW-1:0]        udev_req_dstaddr;
@@ -197,199 +215,212 @@ module testbench (
             linkactive_device <= 1'b1;
        end
 
-   // instantiate dut with UMI ports
-   /* lumi AUTO_TEMPLATE(
-    .udev_\(.*\)      (host_\1[]),
-    .uhost_req_ready  ('0),
-    .uhost_req_.*     (),
-    .uhost_resp_ready (),
-    .uhost_resp_.*    ('0),
-    .phy_in_\(.*\)    (phy_out_\1[]),
-    .phy_out_\(.*\)   (phy_in_\1[]),
-    .sb_in_\(.*\)     (host_sb_req_\1[]),
-    .sb_out_\(.*\)    (host_sb_resp_\1[]),
-    .phy_rx\(.*\)     (phy_tx\1[]),
-    .phy_tx\(.*\)     (phy_rx\1[]),
-    .devicemode       (1'b0),
-    .deviceready      (1'b1),
-    .phy_linkactive   (linkactive_host),
-    .phy_iow          (8'h0),
-    .host_linkactive  (),
-    .vss              (),
-    .vdd.*            (),
-    );*/
-   lumi #(.IOW(IOW),
-          .RW(RW),
-          .CW(CW),
-          .AW(AW),
-          .DW(DW),
-          .GRPID(8'h70))
-   lumi_host_i(/*AUTOINST*/
-               // Outputs
-               .uhost_req_valid (),                      // Templated
-               .uhost_req_cmd   (),                      // Templated
-               .uhost_req_dstaddr(),                     // Templated
-               .uhost_req_srcaddr(),                     // Templated
-               .uhost_req_data  (),                      // Templated
-               .uhost_resp_ready(),                      // Templated
-               .udev_req_ready  (host_req_ready),        // Templated
-               .udev_resp_valid (host_resp_valid),       // Templated
-               .udev_resp_cmd   (host_resp_cmd[CW-1:0]), // Templated
-               .udev_resp_dstaddr(host_resp_dstaddr[AW-1:0]), // Templated
-               .udev_resp_srcaddr(host_resp_srcaddr[AW-1:0]), // Templated
-               .udev_resp_data  (host_resp_data[DW-1:0]), // Templated
-               .sb_in_ready     (host_sb_req_ready),     // Templated
-               .sb_out_valid    (host_sb_resp_valid),    // Templated
-               .sb_out_cmd      (host_sb_resp_cmd[CW-1:0]), // Templated
-               .sb_out_dstaddr  (host_sb_resp_dstaddr[AW-1:0]), // Templated
-               .sb_out_srcaddr  (host_sb_resp_srcaddr[AW-1:0]), // Templated
-               .sb_out_data     (host_sb_resp_data[RW-1:0]), // Templated
-               .phy_in_ready    (phy_out_ready),         // Templated
-               .phy_out_valid   (phy_in_valid),          // Templated
-               .phy_out_cmd     (phy_in_cmd[CW-1:0]),    // Templated
-               .phy_out_dstaddr (phy_in_dstaddr[AW-1:0]), // Templated
-               .phy_out_srcaddr (phy_in_srcaddr[AW-1:0]), // Templated
-               .phy_out_data    (phy_in_data[RW-1:0]),   // Templated
-               .phy_txdata      (phy_rxdata[IOW-1:0]),   // Templated
-               .phy_txvld       (phy_rxvld),             // Templated
-               .host_linkactive (),                      // Templated
+   // sideband requests go to the lane owning their register group (the
+   // host lane for 0x70+i, the host lane reaching the device for 0x60+i),
+   // anything else to lane 0. Lane responses are merged, lowest lane first.
+   wire [NLANE-1:0]     host_lane_sb_in_valid;
+   wire [NLANE*CW-1:0]  host_lane_sb_in_cmd;
+   wire [NLANE*AW-1:0]  host_lane_sb_in_dstaddr;
+   wire [NLANE*AW-1:0]  host_lane_sb_in_srcaddr;
+   wire [NLANE*RW-1:0]  host_lane_sb_in_data;
+   wire [NLANE-1:0]     host_lane_sb_out_ready;
+   wire [NLANE-1:0]     host_lane_sb_in_ready;
+   wire [NLANE-1:0]     host_lane_sb_out_valid;
+   wire [NLANE*CW-1:0]  host_lane_sb_out_cmd;
+   wire [NLANE*AW-1:0]  host_lane_sb_out_dstaddr;
+   wire [NLANE*AW-1:0]  host_lane_sb_out_srcaddr;
+   wire [NLANE*RW-1:0]  host_lane_sb_out_data;
+
+   wire [7:0]           host_sb_req_grp = host_sb_req_dstaddr[24+:8];
+   reg [7:0]            host_sb_req_lane;
+   reg [7:0]            host_sb_resp_lane;
+   integer              l;
+
+   always @(*)
+     begin
+        host_sb_req_lane = 8'd0;
+        if ((host_sb_req_grp >= 8'h70) && (host_sb_req_grp < 8'h70 + NLANE))
+          host_sb_req_lane = host_sb_req_grp - 8'h70;
+        else if ((host_sb_req_grp >= 8'h60) && (host_sb_req_grp < 8'h60 + NLANE))
+          host_sb_req_lane = host_sb_req_grp - 8'h60;
+        host_sb_resp_lane = 8'd0;
+        for (l = NLANE-1; l >= 0; l = l - 1)
+          if (host_lane_sb_out_valid[l])
+            host_sb_resp_lane = l[7:0];
+     end
+
+   genvar               i;
+   for (i = 0; i < NLANE; i = i + 1)
+     begin : gsb
+        assign host_lane_sb_in_valid[i]           = host_sb_req_valid & (host_sb_req_lane == i);
+        assign host_lane_sb_in_cmd[i*CW+:CW]      = host_sb_req_cmd;
+        assign host_lane_sb_in_dstaddr[i*AW+:AW]  = host_sb_req_dstaddr;
+        assign host_lane_sb_in_srcaddr[i*AW+:AW]  = host_sb_req_srcaddr;
+        assign host_lane_sb_in_data[i*RW+:RW]     = host_sb_req_data;
+        assign host_lane_sb_out_ready[i]          = host_sb_resp_ready & (host_sb_resp_lane == i);
+     end
+
+   assign host_sb_req_ready    = host_lane_sb_in_ready[host_sb_req_lane];
+   assign host_sb_resp_valid   = |host_lane_sb_out_valid;
+   assign host_sb_resp_cmd     = host_lane_sb_out_cmd[host_sb_resp_lane*CW+:CW];
+   assign host_sb_resp_dstaddr = host_lane_sb_out_dstaddr[host_sb_resp_lane*AW+:AW];
+   assign host_sb_resp_srcaddr = host_lane_sb_out_srcaddr[host_sb_resp_lane*AW+:AW];
+   assign host_sb_resp_data    = host_lane_sb_out_data[host_sb_resp_lane*RW+:RW];
+
+   // instantiate dut with UMI ports, NLANE lumi lanes on each side
+   lumi_bond #(.NLANE(NLANE),
+               .IOW(IOW),
+               .RW(RW),
+               .CW(CW),
+               .AW(AW),
+               .DW(DW),
+               .GRPID(8'h70))
+   lumi_host_i(// Outputs
+               .uhost_req_valid (),
+               .uhost_req_cmd   (),
+               .uhost_req_dstaddr(),
+               .uhost_req_srcaddr(),
+               .uhost_req_data  (),
+               .uhost_resp_ready(),
+               .udev_req_ready  (host_req_ready),
+               .udev_resp_valid (host_resp_valid),
+               .udev_resp_cmd   (host_resp_cmd[CW-1:0]),
+               .udev_resp_dstaddr(host_resp_dstaddr[AW-1:0]),
+               .udev_resp_srcaddr(host_resp_srcaddr[AW-1:0]),
+               .udev_resp_data  (host_resp_data[DW-1:0]),
+               .sb_in_ready     (host_lane_sb_in_ready[NLANE-1:0]),
+               .sb_out_valid    (host_lane_sb_out_valid[NLANE-1:0]),
+               .sb_out_cmd      (host_lane_sb_out_cmd[NLANE*CW-1:0]),
+               .sb_out_dstaddr  (host_lane_sb_out_dstaddr[NLANE*AW-1:0]),
+               .sb_out_srcaddr  (host_lane_sb_out_srcaddr[NLANE*AW-1:0]),
+               .sb_out_data     (host_lane_sb_out_data[NLANE*RW-1:0]),
+               .phy_in_ready    (phy_out_ready[NLANE-1:0]),
+               .phy_out_valid   (phy_in_valid[NLANE-1:0]),
+               .phy_out_cmd     (phy_in_cmd[NLANE*CW-1:0]),
+               .phy_out_dstaddr (phy_in_dstaddr[NLANE*AW-1:0]),
+               .phy_out_srcaddr (phy_in_srcaddr[NLANE*AW-1:0]),
+               .phy_out_data    (phy_in_data[NLANE*RW-1:0]),
+               .phy_txdata      (phy_rxdata[NLANE*IOW-1:0]),
+               .phy_txvld       (phy_rxvld[NLANE-1:0]),
+               .host_linkactive (),
                // Inputs
-               .devicemode      (1'b0),                  // Templated
-               .uhost_req_ready ('0),                    // Templated
-               .uhost_resp_valid('0),                    // Templated
-               .uhost_resp_cmd  ('0),                    // Templated
-               .uhost_resp_dstaddr('0),                  // Templated
-               .uhost_resp_srcaddr('0),                  // Templated
-               .uhost_resp_data ('0),                    // Templated
-               .udev_req_valid  (host_req_valid),        // Templated
-               .udev_req_cmd    (host_req_cmd[CW-1:0]),  // Templated
-               .udev_req_dstaddr(host_req_dstaddr[AW-1:0]), // Templated
-               .udev_req_srcaddr(host_req_srcaddr[AW-1:0]), // Templated
-               .udev_req_data   (host_req_data[DW-1:0]), // Templated
-               .udev_resp_ready (host_resp_ready),       // Templated
-               .sb_in_valid     (host_sb_req_valid),     // Templated
-               .sb_in_cmd       (host_sb_req_cmd[CW-1:0]), // Templated
-               .sb_in_dstaddr   (host_sb_req_dstaddr[AW-1:0]), // Templated
-               .sb_in_srcaddr   (host_sb_req_srcaddr[AW-1:0]), // Templated
-               .sb_in_data      (host_sb_req_data[RW-1:0]), // Templated
-               .sb_out_ready    (host_sb_resp_ready),    // Templated
+               .devicemode      (1'b0),
+               .uhost_req_ready ('0),
+               .uhost_resp_valid('0),
+               .uhost_resp_cmd  ('0),
+               .uhost_resp_dstaddr('0),
+               .uhost_resp_srcaddr('0),
+               .uhost_resp_data ('0),
+               .udev_req_valid  (host_req_valid),
+               .udev_req_cmd    (host_req_cmd[CW-1:0]),
+               .udev_req_dstaddr(host_req_dstaddr[AW-1:0]),
+               .udev_req_srcaddr(host_req_srcaddr[AW-1:0]),
+               .udev_req_data   (host_req_data[DW-1:0]),
+               .udev_resp_ready (host_resp_ready),
+               .sb_in_valid     (host_lane_sb_in_valid[NLANE-1:0]),
+               .sb_in_cmd       (host_lane_sb_in_cmd[NLANE*CW-1:0]),
+               .sb_in_dstaddr   (host_lane_sb_in_dstaddr[NLANE*AW-1:0]),
+               .sb_in_srcaddr   (host_lane_sb_in_srcaddr[NLANE*AW-1:0]),
+               .sb_in_data      (host_lane_sb_in_data[NLANE*RW-1:0]),
+               .sb_out_ready    (host_lane_sb_out_ready[NLANE-1:0]),
                .phy_clk         (phy_clk),
                .phy_nreset      (phy_nreset),
-               .phy_in_valid    (phy_out_valid),         // Templated
-               .phy_in_cmd      (phy_out_cmd[CW-1:0]),   // Templated
-               .phy_in_dstaddr  (phy_out_dstaddr[AW-1:0]), // Templated
-               .phy_in_srcaddr  (phy_out_srcaddr[AW-1:0]), // Templated
-               .phy_in_data     (phy_out_data[RW-1:0]),  // Templated
-               .phy_out_ready   (phy_in_ready),          // Templated
-               .phy_rxdata      (phy_txdata[IOW-1:0]),   // Templated
-               .phy_rxvld       (phy_txvld),             // Templated
-               .rxclk           (rxclk),
-               .rxnreset        (rxnreset),
-               .txclk           (txclk),
-               .txnreset        (txnreset),
-               .phy_linkactive  (linkactive_host),       // Templated
-               .phy_iow         (8'h0),                  // Templated
+               .phy_in_valid    (phy_out_valid[NLANE-1:0]),
+               .phy_in_cmd      (phy_out_cmd[NLANE*CW-1:0]),
+               .phy_in_dstaddr  (phy_out_dstaddr[NLANE*AW-1:0]),
+               .phy_in_srcaddr  (phy_out_srcaddr[NLANE*AW-1:0]),
+               .phy_in_data     (phy_out_data[NLANE*RW-1:0]),
+               .phy_out_ready   (phy_in_ready[NLANE-1:0]),
+               .phy_rxdata      (phy_txdata[NLANE*IOW-1:0]),
+               .phy_rxvld       (phy_txvld[NLANE-1:0]),
+               .rxclk           ({NLANE{rxclk}}),
+               .rxnreset        ({NLANE{rxnreset}}),
+               .txclk           ({NLANE{txclk}}),
+               .txnreset        ({NLANE{txnreset}}),
+               .phy_linkactive  ({NLANE{linkactive_host}}),
+               .phy_iow         (8'h0),
                .nreset          (nreset),
                .clk             (clk),
-               .deviceready     (1'b1),                  // Templated
-               .vss             (),                      // Templated
-               .vdd             ());                     // Templated
-
-   /* lumi AUTO_TEMPLATE(
-    .uhost_req_\(.*\)  (udev_req_\1[]),
-    .uhost_resp_\(.*\) (udev_resp_\1[]),
-    .udev_req_ready    (),
-    .udev_req_.*       ('h0),
-    .udev_resp_ready   (1'b0),
-    .udev_resp_.*      (),
-    .sb_in_ready       (),
-    .sb_in_.*          ('h0),
-    .sb_out_ready      (1'b0),
-    .sb_out.*          (),
-    .devicemode        (1'b1),
-    .deviceready       (1'b1),
-    .phy_linkactive    (linkactive_device),
-    .phy_iow           (8'h0),
-    .host_linkactive   (),
-    .vss               (),
-    .vdd.*             (),
-    );*/
-   lumi #(.IOW(IOW),
-          .RW(RW),
-          .CW(CW),
-          .AW(AW),
-          .DW(DW),
-          .GRPID(8'h60))
-   lumi_dev_i(/*AUTOINST*/
-              // Outputs
-              .uhost_req_valid  (udev_req_valid),        // Templated
-              .uhost_req_cmd    (udev_req_cmd[CW-1:0]),  // Templated
-              .uhost_req_dstaddr(udev_req_dstaddr[AW-1:0]), // Templated
-              .uhost_req_srcaddr(udev_req_srcaddr[AW-1:0]), // Templated
-              .uhost_req_data   (udev_req_data[DW-1:0]), // Templated
-              .uhost_resp_ready (udev_resp_ready),       // Templated
-              .udev_req_ready   (),                      // Templated
-              .udev_resp_valid  (),                      // Templated
-              .udev_resp_cmd    (),                      // Templated
-              .udev_resp_dstaddr(),                      // Templated
-              .udev_resp_srcaddr(),                      // Templated
-              .udev_resp_data   (),                      // Templated
-              .sb_in_ready      (),                      // Templated
-              .sb_out_valid     (),                      // Templated
-              .sb_out_cmd       (),                      // Templated
-              .sb_out_dstaddr   (),                      // Templated
-              .sb_out_srcaddr   (),                      // Templated
-              .sb_out_data      (),                      // Templated
-              .phy_in_ready     (phy_in_ready),
-              .phy_out_valid    (phy_out_valid),
-              .phy_out_cmd      (phy_out_cmd[CW-1:0]),
-              .phy_out_dstaddr  (phy_out_dstaddr[AW-1:0]),
-              .phy_out_srcaddr  (phy_out_srcaddr[AW-1:0]),
-              .phy_out_data     (phy_out_data[RW-1:0]),
-              .phy_txdata       (phy_txdata[IOW-1:0]),
-              .phy_txvld        (phy_txvld),
-              .host_linkactive  (),                      // Templated
+               .deviceready     (1'b1),
+               .vss             (),
+               .vdd             ());
+
+   lumi_bond #(.NLANE(NLANE),
+               .IOW(IOW),
+               .RW(RW),
+               .CW(CW),
+               .AW(AW),
+               .DW(DW),
+               .GRPID(8'h60))
+   lumi_dev_i(// Outputs
+              .uhost_req_valid  (udev_req_valid),
+              .uhost_req_cmd    (udev_req_cmd[CW-1:0]),
+              .uhost_req_dstaddr(udev_req_dstaddr[AW-1:0]),
+              .uhost_req_srcaddr(udev_req_srcaddr[AW-1:0]),
+              .uhost_req_data   (udev_req_data[DW-1:0]),
+              .uhost_resp_ready (udev_resp_ready),
+              .udev_req_ready   (),
+              .udev_resp_valid  (),
+              .udev_resp_cmd    (),
+              .udev_resp_dstaddr(),
+              .udev_resp_srcaddr(),
+              .udev_resp_data   (),
+              .sb_in_ready      (),
+              .sb_out_valid     (),
+              .sb_out_cmd       (),
+              .sb_out_dstaddr   (),
+              .sb_out_srcaddr   (),
+              .sb_out_data      (),
+              .phy_in_ready     (phy_in_ready[NLANE-1:0]),
+              .phy_out_valid    (phy_out_valid[NLANE-1:0]),
+              .phy_out_cmd      (phy_out_cmd[NLANE*CW-1:0]),
+              .phy_out_dstaddr  (phy_out_dstaddr[NLANE*AW-1:0]),
+              .phy_out_srcaddr  (phy_out_srcaddr[NLANE*AW-1:0]),
+              .phy_out_data     (phy_out_data[NLANE*RW-1:0]),
+              .phy_txdata       (phy_txdata[NLANE*IOW-1:0]),
+              .phy_txvld        (phy_txvld[NLANE-1:0]),
+              .host_linkactive  (),
               // Inputs
-              .devicemode       (1'b1),                  // Templated
-              .uhost_req_ready  (udev_req_ready),        // Templated
-              .uhost_resp_valid (udev_resp_valid),       // Templated
-              .uhost_resp_cmd   (udev_resp_cmd[CW-1:0]), // Templated
-              .uhost_resp_dstaddr(udev_resp_dstaddr[AW-1:0]), // Templated
-              .uhost_resp_srcaddr(udev_resp_srcaddr[AW-1:0]), // Templated
-              .uhost_resp_data  (udev_resp_data[DW-1:0]), // Templated
-              .udev_req_valid   ('h0),                   // Templated
-              .udev_req_cmd     ('h0),                   // Templated
-              .udev_req_dstaddr ('h0),                   // Templated
-              .udev_req_srcaddr ('h0),                   // Templated
-              .udev_req_data    ('h0),                   // Templated
-              .udev_resp_ready  (1'b0),                  // Templated
-              .sb_in_valid      ('h0),                   // Templated
-              .sb_in_cmd        ('h0),                   // Templated
-              .sb_in_dstaddr    ('h0),                   // Templated
-              .sb_in_srcaddr    ('h0),                   // Templated
-              .sb_in_data       ('h0),                   // Templated
-              .sb_out_ready     (1'b0),                  // Templated
+              .devicemode       (1'b1),
+              .uhost_req_ready  (udev_req_ready),
+              .uhost_resp_valid (udev_resp_valid),
+              .uhost_resp_cmd   (udev_resp_cmd[CW-1:0]),
+              .uhost_resp_dstaddr(udev_resp_dstaddr[AW-1:0]),
+              .uhost_resp_srcaddr(udev_resp_srcaddr[AW-1:0]),
+              .uhost_resp_data  (udev_resp_data[DW-1:0]),
+              .udev_req_valid   ('h0),
+              .udev_req_cmd     ('h0),
+              .udev_req_dstaddr ('h0),
+              .udev_req_srcaddr ('h0),
+              .udev_req_data    ('h0),
+              .udev_resp_ready  (1'b0),
+              .sb_in_valid      ('h0),
+              .sb_in_cmd        ('h0),
+              .sb_in_dstaddr    ('h0),
+              .sb_in_srcaddr    ('h0),
+              .sb_in_data       ('h0),
+              .sb_out_ready     ('h0),
               .phy_clk          (phy_clk),
               .phy_nreset       (phy_nreset),
-              .phy_in_valid     (phy_in_valid),
-              .phy_in_cmd       (phy_in_cmd[CW-1:0]),
-              .phy_in_dstaddr   (phy_in_dstaddr[AW-1:0]),
-              .phy_in_srcaddr   (phy_in_srcaddr[AW-1:0]),
-              .phy_in_data      (phy_in_data[RW-1:0]),
-              .phy_out_ready    (phy_out_ready),
-              .phy_rxdata       (phy_rxdata[IOW-1:0]),
-              .phy_rxvld        (phy_rxvld),
-              .rxclk            (rxclk),
-              .rxnreset         (rxnreset),
-              .txclk            (txclk),
-              .txnreset         (txnreset),
-              .phy_linkactive   (linkactive_device),     // Templated
-              .phy_iow          (8'h0),                  // Templated
+              .phy_in_valid     (phy_in_valid[NLANE-1:0]),
+              .phy_in_cmd       (phy_in_cmd[NLANE*CW-1:0]),
+              .phy_in_dstaddr   (phy_in_dstaddr[NLANE*AW-1:0]),
+              .phy_in_srcaddr   (phy_in_srcaddr[NLANE*AW-1:0]),
+              .phy_in_data      (phy_in_data[NLANE*RW-1:0]),
+              .phy_out_ready    (phy_out_ready[NLANE-1:0]),
+              .phy_rxdata       (phy_rxdata[NLANE*IOW-1:0]),
+              .phy_rxvld        (phy_rxvld[NLANE-1:0]),
+              .rxclk            ({NLANE{rxclk}}),
+              .rxnreset         ({NLANE{rxnreset}}),
+              .txclk            ({NLANE{txclk}}),
+              .txnreset         ({NLANE{txnreset}}),
+              .phy_linkactive   ({NLANE{linkactive_device}}),
+              .phy_iow          (8'h0),
               .nreset           (nreset),
               .clk              (clk),
-              .deviceready      (1'b1),                  // Templated
-              .vss              (),                      // Templated
-              .vdd              ());                     // Templated
+              .deviceready      (1'b1),
+              .vss              (),
+              .vdd              ());
 
    umi_memagent #(.DW(DW),
                    .AW(AW),
@@ -414,6 +445,83 @@ module testbench (
                    .udev_req_data       (udev_req_data[DW-1:0]),
                    .udev_resp_ready     (udev_resp_ready));
 
+   ///////////////////////////////////////////
+   // Latency statistics
+   ///////////////////////////////////////////
+
+`include "umi_stats.vh"
+
+   integer      cycles;
+   integer      req_cnt, req_first, req_last;
+   integer      resp_cnt, resp_first, resp_last;
+   integer      write_bytes, busy_cycles;
+   integer      req_start [$];
+   integer      resp_start [$];
+   reg          req_cont, resp_cont;
+
+   initial
+     begin
+        cycles = 0;
+        req_cnt = 0;
+        req_first = 0;
+        req_last = 0;
+        resp_cnt = 0;
+        resp_first = 0;
+        resp_last = 0;
+        write_bytes = 0;
+        busy_cycles = 0;
+        req_cont = 1'b0;
+        resp_cont = 1'b0;
+     end
+
+   always @(posedge clk)
+     if (nreset)
+       begin
+          cycles <= cycles + 1;
+          // requests enter at the host lumi and leave at the device lumi
+          if (req_start.size() != 0)
+            busy_cycles <= busy_cycles + 1;
+          if (host_req_valid & host_req_ready)
+            req_start.push_back(cycles);
+          if (udev_req_valid & udev_req_ready & (req_start.size() != 0))
+            begin
+               if (~req_cont)
+                 req_first <= req_first + cycles - req_start[0];
+               if (udev_req_cmd[UMI_EOM_BIT])
+                 begin
+                    req_cnt <= req_cnt + 1;
+                    req_last <= req_last + cycles - req_start[0];
+                    void'(req_start.pop_front());
+                 end
+               if ((udev_req_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_WRITE) ||
+                   (udev_req_cmd[UMI_OPCODE_MSB:UMI_OPCODE_LSB] == UMI_REQ_POSTED))
+                 write_bytes <= write_bytes +
+                                ((udev_req_cmd[UMI_LEN_MSB:UMI_LEN_LSB] + 1) <<
+                                 udev_req_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB]);
+               req_cont <= ~udev_req_cmd[UMI_EOM_BIT];
+            end
+          // responses enter at the device lumi and leave at the host lumi
+          if (udev_resp_valid & udev_resp_ready)
+            resp_start.push_back(cycles);
+          if (host_resp_valid & host_resp_ready & (resp_start.size() != 0))
+            begin
+               if (~resp_cont)
+                 resp_first <= resp_first + cycles - resp_start[0];
+               if (host_resp_cmd[UMI_EOM_BIT])
+                 begin
+                    resp_cnt <= resp_cnt + 1;
+                    resp_last <= resp_last + cycles - resp_start[0];
+                    void'(resp_start.pop_front());
+                 end
+               resp_cont <= ~host_resp_cmd[UMI_EOM_BIT];
+            end
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d %0d %0d %0d %0d %0d %0d", cycles,
+                                  req_cnt, req_first, req_last,
+                                  resp_cnt, resp_first, resp_last,
+                                  write_bytes, busy_cycles));
+       end
+
             // Initialize UMI
    integer valid_mode, ready_mode;
 
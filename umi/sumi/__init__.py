@@ -1,25 +1,32 @@
-from .umi_arbiter.umi_arbiter import Arbiter
-from .umi_buffer.umi_buffer import Buffer
-from .umi_crossbar.umi_crossbar import Crossbar
-from .umi_decode.umi_decode import Decode
-from .umi_endpoint.umi_endpoint import Endpoint
-from .umi_fifo.umi_fifo import Fifo
-from .umi_fifoflex.umi_fifoflex import FifoFlex
-from .umi_isolate.umi_isolate import Isolate
-from .umi_memagent.umi_memagent import MemAgent
-from .umi_memif.umi_memif import Memif
-from .umi_monitor.umi_monitor import Monitor
-from .umi_mux.umi_mux import Mux
-from .umi_mux2.umi_mux2 import Mux2
-from .umi_pack.umi_pack import Pack
-from .umi_pipeline.umi_pipeline import Pipeline
-from .umi_ram.umi_ram import RAM
-from .umi_regif.umi_regif import Regif
-from .umi_stream.umi_stream import Stream
-# from .umi_switch.umi_switch import Switch
-from .umi_tester.umi_tester import Tester
-from .umi_unpack.umi_unpack import Unpack
-from .umi_demux.umi_demux import Demux
+from umi._lazy import lazy_exports
+
+
+# Design objects, only imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Arbiter': '.umi_arbiter.umi_arbiter',
+    'Buffer': '.umi_buffer.umi_buffer',
+    'Crossbar': '.umi_crossbar.umi_crossbar',
+    'Decode': '.umi_decode.umi_decode',
+    'Endpoint': '.umi_endpoint.umi_endpoint',
+    'Fifo': '.umi_fifo.umi_fifo',
+    'FifoFlex': '.umi_fifoflex.umi_fifoflex',
+    'Isolate': '.umi_isolate.umi_isolate',
+    'MemAgent': '.umi_memagent.umi_memagent',
+    'Memif': '.umi_memif.umi_memif',
+    'Monitor': '.umi_monitor.umi_monitor',
+    'Mux': '.umi_mux.umi_mux',
+    'Mux2': '.umi_mux2.umi_mux2',
+    'Pack': '.umi_pack.umi_pack',
+    'PerfMon': '.umi_perfmon.umi_perfmon',
+    'Pipeline': '.umi_pipeline.umi_pipeline',
+    'RAM': '.umi_ram.umi_ram',
+    'Regif': '.umi_regif.umi_regif',
+    'Stream': '.umi_stream.umi_stream',
+    # 'Switch': '.umi_switch.umi_switch',
+    'Tester': '.umi_tester.umi_tester',
+    'Unpack': '.umi_unpack.umi_unpack',
+    'Demux': '.umi_demux.umi_demux'
+})
 
 
 __all__ = ['Arbiter',
@@ -36,6 +43,7 @@ __all__ = ['Arbiter',
            'Mux',
            'Mux2',
            'Pack',
+           'PerfMon',
            'Pipeline',
            'RAM',
            'Regif',
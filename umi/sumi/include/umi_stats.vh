@@ -0,0 +1,54 @@
+/*******************************************************************************
+ * Copyright 2025 Zero ASIC Corporation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *
+ * ----
+ *
+ * ##Documentation##
+ *
+ * - Statistics file shared by the testbenches that report performance,
+ *   included inside the testbench module after clk is declared.
+ * - +stats=<file> opens the file, stats_due is then set once every
+ *   STATS_PERIOD clk cycles and the testbench writes one line of
+ *   counters with stats_write(), the cycle count first.
+ * - tests/tb_stats.py reads the file back.
+ *
+ ******************************************************************************/
+
+localparam STATS_PERIOD = 256;
+
+string       stats_file;
+integer      stats_fd;
+integer      stats_tick;
+wire         stats_due;
+
+initial
+  begin
+     stats_fd = 0;
+     stats_tick = 0;
+     if ($value$plusargs("stats=%s", stats_file))
+       stats_fd = $fopen(stats_file, "w");
+  end
+
+always @(posedge clk)
+  stats_tick <= stats_tick + 1;
+
+assign stats_due = (stats_fd != 0) && (stats_tick % STATS_PERIOD == 0);
+
+task stats_write(input string line);
+   begin
+      $fdisplay(stats_fd, "%0s", line);
+      $fflush(stats_fd);
+   end
+endtask
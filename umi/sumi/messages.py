@@ -0,0 +1,215 @@
+'''
+Vectorized encoding and decoding of UMI commands.
+
+Python mirror of umi/sumi/include/umi_messages.vh. All functions operate
+on whole arrays of 32 bit commands at once, so captured traffic can be
+post-processed without a Python loop per packet.
+
+>>> cmd = encode(opcode=REQ_WRITE, size=3, len=[0, 7], eom=1)
+>>> decode(cmd)['len']
+array([0, 7], dtype=uint8)
+>>> nbytes(cmd)
+array([ 8, 64], dtype=uint32)
+'''
+
+import numpy as np
+
+
+# Command decode [31:0], (lsb, msb) of each field
+FIELDS = {
+    'opcode': (0, 4),
+    'size': (5, 7),
+    'len': (8, 15),
+    'qos': (16, 19),
+    'prot': (20, 21),
+    'eom': (22, 22),
+    'eof': (23, 23),
+    'ex': (24, 24),
+    'user': (25, 26),
+    'hostid': (27, 31)
+}
+
+CMD_DTYPE = np.dtype([(name, np.uint8) for name in FIELDS])
+
+MAXSIZE = 1024  # max word size per transaction
+MAXLEN = 256    # max word transfers per transaction
+
+# Invalid transaction indicator (cmd[7:0])
+INVALID = 0x00
+
+# Requests (host -> device) (cmd[7:0])
+REQ_READ = 0x01
+REQ_WRITE = 0x03
+REQ_POSTED = 0x05
+REQ_RDMA = 0x07
+REQ_ATOMIC = 0x09
+REQ_USER0 = 0x0B
+REQ_FUTURE0 = 0x0D
+REQ_ERROR = 0x0F
+REQ_LINK = 0x2F
+
+# Response (device -> host) (cmd[7:0])
+RESP_READ = 0x02
+RESP_WRITE = 0x04
+RESP_USER0 = 0x06
+RESP_USER1 = 0x08
+RESP_FUTURE0 = 0x0A
+RESP_FUTURE1 = 0x0C
+RESP_LINK = 0x0E
+
+# Atomic command decode (cmd[15:8])
+ATOMIC_ADD = 0x00
+ATOMIC_AND = 0x01
+ATOMIC_OR = 0x02
+ATOMIC_XOR = 0x03
+ATOMIC_MAX = 0x04
+ATOMIC_MIN = 0x05
+ATOMIC_MAXU = 0x06
+ATOMIC_MINU = 0x07
+ATOMIC_SWAP = 0x08
+
+# Commands that may be split and merged (README 4.1.1, 4.1.2)
+SPLITTABLE = (REQ_READ, REQ_WRITE, REQ_POSTED, REQ_RDMA, RESP_READ, RESP_WRITE)
+
+
+def _field(cmd, name):
+    lsb, msb = FIELDS[name]
+    mask = (1 << (msb - lsb + 1)) - 1
+    return (cmd >> np.uint32(lsb)) & np.uint32(mask)
+
+
+def _mask(name):
+    lsb, msb = FIELDS[name]
+    return ((1 << (msb - lsb + 1)) - 1) << lsb
+
+
+def decode(cmd):
+    '''
+    Splits an array of commands into a structured array with one uint8
+    column per field of CMD_DTYPE.
+    '''
+    cmd = np.asarray(cmd, dtype=np.uint32)
+    fields = np.empty(cmd.shape, dtype=CMD_DTYPE)
+    for name in FIELDS:
+        fields[name] = _field(cmd, name)
+    return fields
+
+
+def encode(fields=None, **kwargs):
+    '''
+    Packs command fields into an array of uint32 commands.
+
+    Fields come from a structured array (such as the output of decode) or
+    from keyword arguments, which are broadcast against each other.
+    Missing fields are zero and values wider than their field are
+    truncated.
+    '''
+    if fields is not None:
+        kwargs = {name: fields[name] for name in fields.dtype.names
+                  if name in FIELDS} | kwargs
+
+    unknown = set(kwargs) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"unknown UMI command fields: {sorted(unknown)}")
+
+    values = np.broadcast_arrays(*[np.asarray(v, dtype=np.uint32) for v in kwargs.values()])
+
+    cmd = np.zeros(values[0].shape if values else (), dtype=np.uint32)
+    for name, value in zip(kwargs, values):
+        lsb, msb = FIELDS[name]
+        mask = np.uint32((1 << (msb - lsb + 1)) - 1)
+        cmd |= (value & mask) << np.uint32(lsb)
+    return cmd
+
+
+def opcode(cmd):
+    return _field(np.asarray(cmd, dtype=np.uint32), 'opcode')
+
+
+def is_request(cmd):
+    '''Host to device commands have an odd opcode.'''
+    return (opcode(cmd) & 1) == 1
+
+
+def is_response(cmd):
+    '''Device to host commands have an even, non-zero opcode.'''
+    op = opcode(cmd)
+    return ((op & 1) == 0) & (op != INVALID)
+
+
+def is_atomic(cmd):
+    return opcode(cmd) == REQ_ATOMIC
+
+
+def atomic_type(cmd):
+    '''
+    Returns the atomic operation (ATOMIC_*) of each command, or -1 for
+    commands that are not atomics.
+    '''
+    cmd = np.asarray(cmd, dtype=np.uint32)
+    return np.where(is_atomic(cmd), _field(cmd, 'len').astype(np.int16), np.int16(-1))
+
+
+def nbytes(cmd):
+    '''
+    Returns the number of bytes moved by each command, (len+1)<<size.
+    Atomics always operate on a single word, the len field holds the
+    atomic type instead.
+    '''
+    cmd = np.asarray(cmd, dtype=np.uint32)
+    words = np.where(is_atomic(cmd), np.uint32(1), _field(cmd, 'len') + np.uint32(1))
+    return (words << _field(cmd, 'size')).astype(np.uint32)
+
+
+def split(cmd, dstaddr, srcaddr, data=None, dw=64, boundary=False):
+    '''
+    Reference model of splitting a single packet for a dw bit bus
+    (README 4.1.1), as done by umi_fifoflex.
+
+    Every piece carries as many words as fit on the bus. With
+    boundary=True (SPLIT=1) pieces also end where dstaddr crosses a
+    multiple of dw/8. Words wider than the bus are sent as bus wide words
+    (SIZE=log2(dw/8)), the one departure from rule 2, which keeps every
+    piece at the full bus width. Atomics and exclusive commands cannot be
+    split, a ValueError is raised when they do not fit the bus.
+
+    Returns a list of (cmd, dstaddr, srcaddr, data) tuples, data being
+    None when no data was given.
+    '''
+    cmd = int(cmd)
+    fields = decode(cmd)
+    bus = dw // 8
+    size = int(fields['size'])
+    words = int(fields['len']) + 1
+    if data is not None:
+        data = bytes(data)
+
+    if int(fields['opcode']) not in SPLITTABLE or fields['ex']:
+        if words << size > bus:
+            raise ValueError(f"command 0x{cmd:08x} does not fit {dw} bits and cannot be split")
+        return [(cmd, dstaddr, srcaddr, data)]
+
+    if (1 << size) > bus:
+        words <<= size - (bus.bit_length() - 1)
+        size = bus.bit_length() - 1
+
+    # fields rewritten for every piece
+    eom = 1 << FIELDS['eom'][0]
+    base = cmd & ~(_mask('size') | _mask('len') | eom)
+
+    pieces = []
+    offset = 0
+    while words:
+        count = bus >> size
+        if boundary:
+            count = (bus - (dstaddr + offset) % bus) >> size
+        count = max(1, min(count, words))
+        words -= count
+        nbytes = count << size
+        piece = base | (size << FIELDS['size'][0]) | ((count - 1) << FIELDS['len'][0])
+        if words == 0:
+            piece |= cmd & eom
+        pieces.append((piece, dstaddr + offset, srcaddr + offset,
+                       None if data is None else data[offset:offset + nbytes]))
+        offset += nbytes
+    return pieces
@@ -17,6 +17,10 @@
  *
  * Documentation:
  * - Simple umi crossbar testbench
+ * - VOQ selects the virtual output queue depth of the crossbar (0=off)
+ * - +load=<percent> throttles every input to the given share of cycles
+ * - +stats=<file> periodically writes throughput statistics to file:
+ *   "<cycles> <first beat cycle> <last beat cycle> <out beats> <stall cycles>"
  *
  ******************************************************************************/
 
@@ -25,7 +29,8 @@ module testbench
     parameter RW=32,
     parameter DW=512,
     parameter AW=64,
-    parameter CW=32)
+    parameter CW=32,
+    parameter VOQ=0)
    (
 `ifdef VERILATOR
     input clk
@@ -64,6 +69,8 @@ module testbench
    wire [N*N-1:0]    umi_in_request;
 
    wire [N-1:0]      umi_in_valid;
+   wire [N-1:0]      umi_rx_valid;
+   reg [N-1:0]       throttle;
    wire [N-1:0]      umi_in_ready;
    wire [N*CW-1:0]   umi_in_cmd;
    wire [N*DW-1:0]   umi_in_data;
@@ -94,8 +101,10 @@ module testbench
                      .srcaddr(umi_in_srcaddr[i*AW+:AW]),
                      .dstaddr(umi_in_dstaddr[i*AW+:AW]),
                      .cmd(umi_in_cmd[i*CW+:CW]),
-                     .ready(umi_in_ready[i] & initdone),
-                     .valid(umi_in_valid[i]));
+                     .ready(umi_in_ready[i] & initdone & throttle[i]),
+                     .valid(umi_rx_valid[i]));
+
+           assign umi_in_valid[i] = umi_rx_valid[i] & throttle[i];
 
            assign umi_in_data[i*DW+256+:256] = 'h0;
 
@@ -130,7 +139,8 @@ module testbench
    umi_crossbar #(.CW(CW),
                   .AW(AW),
                   .DW(DW),
-                  .N(N))
+                  .N(N),
+                  .VOQ(VOQ))
    umi_crossbar_i(/*AUTOINST*/
                   // Outputs
                   .umi_in_ready         (umi_in_ready[N-1:0]),
@@ -191,6 +201,49 @@ module testbench
         portif[3].umi_tx_i.set_ready_mode(ready_mode);
      end
 
+   // Load throttle
+   integer load;
+
+   initial
+     if (!$value$plusargs("load=%d", load))
+       load = 100;
+
+   integer t;
+   always @(posedge clk)
+     for (t=0;t<N;t=t+1)
+       throttle[t] <= ($urandom % 100) < load;
+
+   // Throughput statistics
+`include "umi_stats.vh"
+
+   integer      cycles, first_beat, last_beat, out_beats, stall_cycles;
+
+   initial
+     begin
+        cycles = 0;
+        first_beat = -1;
+        last_beat = -1;
+        out_beats = 0;
+        stall_cycles = 0;
+     end
+
+   always @(posedge clk)
+     if (initdone)
+       begin
+          cycles <= cycles + 1;
+          if (|(umi_out_valid & umi_out_ready))
+            begin
+               if (first_beat < 0)
+                 first_beat <= cycles;
+               last_beat <= cycles;
+               out_beats <= out_beats + $countones(umi_out_valid & umi_out_ready);
+            end
+          stall_cycles <= stall_cycles + $countones(umi_in_valid & ~umi_in_ready);
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d %0d %0d",
+                                  cycles, first_beat, last_beat, out_beats, stall_cycles));
+       end
+
    // waveform dump
    `SB_SETUP_PROBES();
 
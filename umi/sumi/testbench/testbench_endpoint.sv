@@ -0,0 +1,252 @@
+/*******************************************************************************
+ * Copyright 2020 Zero ASIC Corporation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *
+ * ----
+ *
+ * Documentation:
+ * - umi_endpoint testbench with a byte addressed register file behind the
+ *   local interface (read data returned the cycle after the request)
+ * - +stats=<file> periodically writes read burst statistics to file:
+ *   "<cycles> <bursts> <burst bytes> <burst cycles>", a burst spanning
+ *   from its first response beat to the beat with EOM set
+ *
+ ******************************************************************************/
+
+`default_nettype none
+
+module testbench (
+`ifdef VERILATOR
+    input clk
+`endif
+);
+
+`include "switchboard.vh"
+`include "umi_messages.vh"
+
+   parameter integer DW=64;
+   parameter integer AW=64;
+   parameter integer CW=32;
+   parameter integer REG=0;
+   parameter integer DEPTH=1024;
+
+   localparam PERIOD_CLK   = 10;
+   localparam RST_CYCLES   = 16;
+
+`ifndef VERILATOR
+    // Generate clock for non verilator sim tools
+    reg clk;
+
+    initial
+        clk  = 1'b0;
+    always #(PERIOD_CLK/2) clk = ~clk;
+`endif
+
+   // Reset control
+   reg [RST_CYCLES:0]   nreset_vec;
+   wire                 nreset;
+   wire                 initdone;
+
+   assign nreset = nreset_vec[RST_CYCLES-1];
+   assign initdone = nreset_vec[RST_CYCLES];
+
+   initial
+      nreset_vec = 'b1;
+   always @(negedge clk) nreset_vec <= {nreset_vec[RST_CYCLES-1:0], 1'b1};
+
+   wire                 udev_resp_ready;
+   wire [CW-1:0]        udev_resp_cmd;
+   wire [DW-1:0]        udev_resp_data;
+   wire [AW-1:0]        udev_resp_dstaddr;
+   wire [AW-1:0]        udev_resp_srcaddr;
+   wire                 udev_resp_valid;
+
+   wire                 udev_req_ready;
+   wire [CW-1:0]        udev_req_cmd;
+   wire [DW-1:0]        udev_req_data;
+   wire [AW-1:0]        udev_req_dstaddr;
+   wire [AW-1:0]        udev_req_srcaddr;
+   wire                 udev_req_valid;
+
+   wire [AW-1:0]        loc_addr;
+   wire                 loc_write;
+   wire                 loc_read;
+   wire                 loc_atomic;
+   wire [7:0]           loc_opcode;
+   wire [2:0]           loc_size;
+   wire [7:0]           loc_len;
+   wire [7:0]           loc_atype;
+   wire [DW-1:0]        loc_wrdata;
+   reg  [DW-1:0]        loc_rddata;
+
+   ///////////////////////////////////////////
+   // Host side umi agents
+   ///////////////////////////////////////////
+
+   queue_to_umi_sim #(
+                .VALID_MODE_DEFAULT(2),
+                .DW(DW)
+                )
+   host_umi_rx_i (.clk(clk),
+                  .reset(~nreset),
+                  .data(udev_req_data[DW-1:0]),
+                  .srcaddr(udev_req_srcaddr[AW-1:0]),
+                  .dstaddr(udev_req_dstaddr[AW-1:0]),
+                  .cmd(udev_req_cmd[CW-1:0]),
+                  .ready(udev_req_ready & initdone),
+                  .valid(udev_req_valid)
+                  );
+
+   umi_to_queue_sim #(
+                .READY_MODE_DEFAULT(2),
+                .DW(DW)
+                )
+   host_umi_tx_i (.clk(clk),
+                  .reset(~nreset),
+                  .data(udev_resp_data[DW-1:0]),
+                  .srcaddr(udev_resp_srcaddr[AW-1:0]),
+                  .dstaddr(udev_resp_dstaddr[AW-1:0]),
+                  .cmd(udev_resp_cmd[CW-1:0]),
+                  .ready(udev_resp_ready),
+                  .valid(udev_resp_valid & initdone)
+                  );
+
+   // instantiate dut with UMI ports
+   umi_endpoint #(.REG(REG),
+                  .CW(CW),
+                  .AW(AW),
+                  .DW(DW))
+   umi_endpoint_i(// Outputs
+                  .udev_req_ready      (udev_req_ready),
+                  .udev_resp_valid     (udev_resp_valid),
+                  .udev_resp_cmd       (udev_resp_cmd[CW-1:0]),
+                  .udev_resp_dstaddr   (udev_resp_dstaddr[AW-1:0]),
+                  .udev_resp_srcaddr   (udev_resp_srcaddr[AW-1:0]),
+                  .udev_resp_data      (udev_resp_data[DW-1:0]),
+                  .loc_addr            (loc_addr[AW-1:0]),
+                  .loc_write           (loc_write),
+                  .loc_read            (loc_read),
+                  .loc_atomic          (loc_atomic),
+                  .loc_opcode          (loc_opcode[7:0]),
+                  .loc_size            (loc_size[2:0]),
+                  .loc_len             (loc_len[7:0]),
+                  .loc_atype           (loc_atype[7:0]),
+                  .loc_wrdata          (loc_wrdata[DW-1:0]),
+                  // Inputs
+                  .nreset              (nreset),
+                  .clk                 (clk),
+                  .udev_req_valid      (udev_req_valid & initdone),
+                  .udev_req_cmd        (udev_req_cmd[CW-1:0]),
+                  .udev_req_dstaddr    (udev_req_dstaddr[AW-1:0]),
+                  .udev_req_srcaddr    (udev_req_srcaddr[AW-1:0]),
+                  .udev_req_data       (udev_req_data[DW-1:0]),
+                  .udev_resp_ready     (udev_resp_ready & initdone),
+                  .loc_rddata          (loc_rddata[DW-1:0]),
+                  .loc_ready           (1'b1));
+
+   ///////////////////////////////////////////
+   // Register file
+   ///////////////////////////////////////////
+
+   reg [7:0]            regs [0:DEPTH-1];
+   integer              i;
+
+   always @(posedge clk)
+     begin
+        for (i=0;i<DW/8;i=i+1)
+          begin
+             if (loc_write & (i < ((loc_len + 1) << loc_size)))
+               regs[(loc_addr + i) % DEPTH] <= loc_wrdata[i*8+:8];
+             loc_rddata[i*8+:8] <= regs[(loc_addr + i) % DEPTH];
+          end
+     end
+
+   ///////////////////////////////////////////
+   // Read burst statistics
+   ///////////////////////////////////////////
+
+`include "umi_stats.vh"
+
+   integer      cycles, bursts, burst_bytes, burst_cycles, burst_start;
+   wire         resp_beat;
+
+   assign resp_beat = udev_resp_valid & udev_resp_ready & initdone &
+                      (udev_resp_cmd[4:0] == UMI_RESP_READ);
+
+   initial
+     begin
+        cycles = 0;
+        bursts = 0;
+        burst_bytes = 0;
+        burst_cycles = 0;
+        burst_start = -1;
+     end
+
+   always @(posedge clk)
+     if (initdone)
+       begin
+          cycles <= cycles + 1;
+          if (resp_beat)
+            begin
+               burst_bytes <= burst_bytes +
+                              ((udev_resp_cmd[UMI_LEN_MSB:UMI_LEN_LSB] + 1) <<
+                               udev_resp_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB]);
+               if (udev_resp_cmd[UMI_EOM_BIT])
+                 begin
+                    bursts <= bursts + 1;
+                    burst_cycles <= burst_cycles + cycles -
+                                    ((burst_start < 0) ? cycles : burst_start) + 1;
+                    burst_start <= -1;
+                 end
+               else if (burst_start < 0)
+                 burst_start <= cycles;
+            end
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d %0d", cycles,
+                                  bursts, burst_bytes, burst_cycles));
+       end
+
+   // Initialize UMI
+   integer valid_mode, ready_mode;
+
+   initial begin
+      /* verilator lint_off IGNOREDRETURN */
+      if (!$value$plusargs("valid_mode=%d", valid_mode)) begin
+         valid_mode = 2;  // default if not provided as a plusarg
+      end
+
+      if (!$value$plusargs("ready_mode=%d", ready_mode)) begin
+         ready_mode = 2;  // default if not provided as a plusarg
+      end
+
+      host_umi_rx_i.init("host2dut_0.q");
+      host_umi_rx_i.set_valid_mode(valid_mode);
+
+      host_umi_tx_i.init("dut2host_0.q");
+      host_umi_tx_i.set_ready_mode(ready_mode);
+      /* verilator lint_on IGNOREDRETURN */
+   end
+
+   // waveform dump
+   `SB_SETUP_PROBES();
+
+   // auto-stop
+   auto_stop_sim auto_stop_sim_i (.clk(clk));
+
+endmodule
+// Local Variables:
+// verilog-library-directories:("../rtl")
+// End:
+
+`default_nettype wire
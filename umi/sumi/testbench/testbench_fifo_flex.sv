@@ -272,6 +272,33 @@ module testbench (
       /* verilator lint_on IGNOREDRETURN */
    end
 
+   // Response bus utilization (+stats=<file>), written every 256 cycles:
+   // "<cycles> <read response beats> <read response bytes>"
+`include "umi_stats.vh"
+
+   integer      cycles, resp_beats, resp_bytes;
+
+   initial
+     begin
+        cycles = 0;
+        resp_beats = 0;
+        resp_bytes = 0;
+     end
+
+   always @(posedge clk)
+     if (initdone)
+       begin
+          cycles <= cycles + 1;
+          if (umi_resp_out_valid & umi_resp_out_ready &
+              (umi_resp_out_cmd[4:0] == 5'h02))
+            begin
+               resp_beats <= resp_beats + 1;
+               resp_bytes <= resp_bytes + ((umi_resp_out_cmd[15:8] + 1) << umi_resp_out_cmd[7:5]);
+            end
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d", cycles, resp_beats, resp_bytes));
+       end
+
    // waveform dump
    `SB_SETUP_PROBES();
 
@@ -36,6 +36,7 @@ module testbench (
    parameter integer CW=32;
    parameter integer CTRLW=8;
    parameter integer RAMDEPTH=512;
+   parameter integer BANKS=1;
 
    localparam PERIOD_CLK   = 10;
    localparam RST_CYCLES   = 16;
@@ -120,7 +121,8 @@ module testbench (
                    .AW(AW),
                    .DW(DW),
                    .CTRLW(CTRLW),
-                   .RAMDEPTH(RAMDEPTH))
+                   .RAMDEPTH(RAMDEPTH),
+                   .BANKS(BANKS))
    umi_memagent_i(/*AUTOINST*/
                    // Outputs
                    .udev_req_ready      (udev_req_ready),
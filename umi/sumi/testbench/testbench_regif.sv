@@ -36,6 +36,7 @@ module testbench (
    parameter integer CW=32;
    parameter integer CTRLW=8;
    parameter integer REGS=512;
+   parameter integer SAFE=1;
 
    localparam PERIOD_CLK   = 10;
    localparam RST_CYCLES   = 16;
@@ -131,7 +132,8 @@ module testbench (
                .AW(AW),
                .DW(DW),
                .RAW(RAW),
-               .RW(RW))
+               .RW(RW),
+               .SAFE(SAFE))
    umi_regif(.reg_ready       (1'b1), // no bw to test for this rare feature
              .reg_err         (2'b0), // TODO: implement when needed
              /*AUTOINST*/
@@ -171,6 +173,36 @@ module testbench (
 
    assign reg_rdata[RW-1:0] = regs[reg_addr[2+:$clog2(REGS)]];
 
+   // Register access statistics (+stats=<file>), written every 256 cycles:
+   // "<cycles> <accesses> <first access cycle> <last access cycle>"
+`include "umi_stats.vh"
+
+   integer      cycles, accesses, first_access, last_access;
+
+   initial
+     begin
+        cycles = 0;
+        accesses = 0;
+        first_access = -1;
+        last_access = -1;
+     end
+
+   always @(posedge clk)
+     if (initdone)
+       begin
+          cycles <= cycles + 1;
+          if (reg_read | reg_write)
+            begin
+               if (first_access < 0)
+                 first_access <= cycles;
+               last_access <= cycles;
+               accesses <= accesses + 1;
+            end
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d %0d", cycles,
+                                  accesses, first_access, last_access));
+       end
+
    ///////////////////////////////////////////
    // Switchboard setup
    ///////////////////////////////////////////
@@ -17,6 +17,8 @@
  *
  * Documentation:
  * - Simple umi_ram testbench
+ * - +stats=<file> periodically writes response statistics to file:
+ *   "<cycles> <first beat cycle> <last beat cycle> <resp beats>"
  *
  ******************************************************************************/
 
@@ -36,6 +38,7 @@ module testbench (
    parameter integer DW=256;
    parameter integer CTRLW=8;
    parameter integer RAMDEPTH=512;
+   parameter integer BANKS=1;
 
    localparam PERIOD_CLK   = 10;
    localparam RST_CYCLES   = 16;
@@ -150,6 +153,7 @@ module testbench (
              .AW(AW),
              .DW(DW),
              .RAMDEPTH(RAMDEPTH),
+             .BANKS(BANKS),
              .CTRLW(CTRLW))
    umi_ram_i(/*AUTOINST*/
              // Outputs
@@ -171,6 +175,38 @@ module testbench (
              .udev_req_data       (udev_req_data[N*DW-1:0]),
              .udev_resp_ready     (udev_resp_ready[N-1:0] & {N{initdone}}));
 
+   // Throughput statistics
+`include "umi_stats.vh"
+
+   integer      cycles, first_beat, last_beat, resp_beats;
+   wire [N-1:0] resp_beat;
+
+   assign resp_beat = udev_resp_valid & udev_resp_ready & {N{initdone}};
+
+   initial
+     begin
+        cycles = 0;
+        first_beat = -1;
+        last_beat = -1;
+        resp_beats = 0;
+     end
+
+   always @(posedge clk)
+     if (initdone)
+       begin
+          cycles <= cycles + 1;
+          if (|resp_beat)
+            begin
+               if (first_beat < 0)
+                 first_beat <= cycles;
+               last_beat <= cycles;
+               resp_beats <= resp_beats + $countones(resp_beat);
+            end
+          if (stats_due)
+            stats_write($sformatf("%0d %0d %0d %0d",
+                                  cycles, first_beat, last_beat, resp_beats));
+       end
+
    // waveform dump
    `SB_SETUP_PROBES();
 
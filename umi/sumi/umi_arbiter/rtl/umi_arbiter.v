@@ -18,24 +18,45 @@
  * Documentation:
  * - Dynamically configurable arbiter (fixed, roundrobin, reserve,...)
  *
+ * - QoS mode (mode=2'b11): the request with the highest priority wins,
+ *   ties go to the lowest index. The priority of a request is its 4 bit
+ *   'qos' value plus the top 4 bits of an age counter. The age counter
+ *   of an input grows by WEIGHTS[4*i+:4] every cycle the input requests
+ *   without being granted and is cleared on a grant. A saturated age
+ *   counter wins over any request that is not saturated, so every input
+ *   with a non-zero weight is eventually served no matter how much high
+ *   QoS traffic there is. Among requests of equal QoS the age also acts
+ *   as tie breaker, which shares the bandwidth in proportion to WEIGHTS.
+ *   A weight of zero disables aging for that input (strict QoS).
+ *
  ******************************************************************************/
 
-module umi_arbiter #(parameter N = 4,    // number of inputs
-                     parameter PROP = "" // cell selector
+module umi_arbiter #(parameter N = 4,     // number of inputs
+                     parameter PROP = "", // cell selector
+                     parameter AGEW = 8,  // age counter width (qos mode, >=4)
+                     parameter [4*N-1:0] WEIGHTS = {N{4'd1}} // aging weights (qos mode)
                      )
    (// controls
-    input          clk,
-    input          nreset,
-    input [1:0]    mode,     // [00]=priority,[01]=roundrobin,[1x]=reserved
-    input [N-1:0]  mask,     // 1 = disable request, 0 = enable request
-    input [N-1:0]  requests, // incoming requests
-    output [N-1:0] grants    // outgoing grants
+    input            clk,
+    input            nreset,
+    input [1:0]      mode,     // [00]=priority,[10]=roundrobin,[11]=qos
+    input [N-1:0]    mask,     // 1 = disable request, 0 = enable request
+    input [N-1:0]    requests, // incoming requests
+    input [4*N-1:0]  qos,      // request qos (qos mode only)
+    output [N-1:0]   grants    // outgoing grants
     );
 
+   // priority = {age saturated, qos + age[MSB-:4], age}
+   localparam PW = AGEW + 6;
+
    wire                collision;
    reg [N-1:0]         thermometer;
    wire [N-1:0]        spec_requests;
    wire [N-1:0]        block;
+   wire                qos_mode;
+   wire [N-1:0]        qos_requests;
+   wire [N-1:0]        qos_grants;
+   wire [N*PW-1:0]     qos_priority;
    genvar              i,j;
 
    // NOTE: The thermometer mask works correctly in case of a collision
@@ -87,7 +108,56 @@ module umi_arbiter #(parameter N = 4,    // number of inputs
         assign block[j] = |spec_requests[j-1:0];
      end
 
-   assign grants[N-1:0] = spec_requests[N-1:0] & ~block[N-1:0];
+   assign qos_mode = (mode[1:0]==2'b11);
+
+   assign grants[N-1:0] = qos_mode ? qos_grants[N-1:0] :
+                                     spec_requests[N-1:0] & ~block[N-1:0];
+
+   //##############################
+   // QoS arbitration
+   //##############################
+
+   assign qos_requests[N-1:0] = ~mask[N-1:0] & requests[N-1:0];
+
+   for (i=0; i<N; i=i+1)
+     begin : iage
+        reg [AGEW-1:0] age;
+        wire [AGEW:0]  age_next;
+        wire [4:0]     level;
+
+        assign age_next[AGEW:0] = {1'b0, age[AGEW-1:0]} + {{(AGEW-3){1'b0}}, WEIGHTS[4*i+:4]};
+
+        always @ (posedge clk or negedge nreset)
+          if (~nreset)
+            age[AGEW-1:0] <= {AGEW{1'b0}};
+          else if (~qos_mode | ~qos_requests[i] | grants[i])
+            age[AGEW-1:0] <= {AGEW{1'b0}};
+          else
+            age[AGEW-1:0] <= age_next[AGEW] ? {AGEW{1'b1}} : age_next[AGEW-1:0];
+
+        assign level[4:0] = {1'b0, qos[4*i+:4]} + {1'b0, age[AGEW-1-:4]};
+
+        assign qos_priority[PW*i+:PW] = {&age[AGEW-1:0], level[4:0], age[AGEW-1:0]};
+     end
+
+   // a request wins unless a higher priority (or equal priority, lower
+   // index) request is present
+   for (i=0; i<N; i=i+1)
+     begin : iqos
+        wire [N-1:0] beaten;
+        for (j=0; j<N; j=j+1)
+          begin : icmp
+             if (j < i)
+               assign beaten[j] = qos_requests[j] &
+                                  (qos_priority[PW*j+:PW] >= qos_priority[PW*i+:PW]);
+             else if (j > i)
+               assign beaten[j] = qos_requests[j] &
+                                  (qos_priority[PW*j+:PW] > qos_priority[PW*i+:PW]);
+             else
+               assign beaten[j] = 1'b0;
+          end
+        assign qos_grants[i] = qos_requests[i] & ~(|beaten[N-1:0]);
+     end
 
    // Detect collision on pushback
    assign collision = |(requests[N-1:0] & ~grants[N-1:0]);
@@ -32,6 +32,15 @@
  * Input to output paths are enabled through the [NxN] wide 'mask' input,
  * which follows ordering of the input valid convention shown above.
  *
+ * - VOQ=0: inputs are arbitrated per output with umi_arbiter ('mode'),
+ *   a request blocked on a busy output stalls its input.
+ * - VOQ>=2: every input has one queue of VOQ entries per output (virtual
+ *   output queues), so a blocked output only stalls traffic to that
+ *   output. Queue heads are matched to outputs with a single iteration
+ *   iSLIP scheduler (round robin grant per output, round robin accept per
+ *   input, pointers move past a match once it transfers). 'mode' is not
+ *   used, adds VOQ cycles of latency at most and N*N queues of area.
+ *
  ******************************************************************************/
 
 module umi_crossbar
@@ -39,7 +48,8 @@ module umi_crossbar
     parameter DW = 256,           // UMI width
     parameter CW = 32,
     parameter AW = 64,
-    parameter N = 2               // Total UMI ports
+    parameter N = 2,              // Total UMI ports
+    parameter VOQ = 0             // virtual output queue depth (0=off)
     )
    (// controls
     input             clk,
@@ -62,52 +72,217 @@ module umi_crossbar
     input [N-1:0]     umi_out_ready
     );
 
+`include "umi_messages.vh"
+
    wire [N*N-1:0]    grants;
    reg [N-1:0]       umi_ready;
    wire [N*N-1:0]    umi_out_sel;
-   genvar            i;
+   // output mux sources, [o*N+i] = input i to output o
+   wire [N*N*CW-1:0] src_cmd;
+   wire [N*N*AW-1:0] src_dstaddr;
+   wire [N*N*AW-1:0] src_srcaddr;
+   wire [N*N*DW-1:0] src_data;
+   genvar            i,o;
 
-   //##############################
-   // Arbiters for all outputs
-   //##############################
+   // Round robin pick, lowest request at or above the pointer ('hi' has
+   // all positions at or above the pointer set), else the lowest request
+   function [N-1:0] rr_pick;
+      input [N-1:0] req;
+      input [N-1:0] hi;
+      reg [N-1:0]   sel;
+      begin
+         sel = req & hi;
+         if (~|sel)
+           sel = req;
+         rr_pick = sel & (~sel + 1'b1);
+      end
+   endfunction
 
-   for (i=0;i<N;i=i+1)
-     begin
-        umi_arbiter #(.N(N))
-        umi_arbiter (// Outputs
-                     .grants   (grants[N*i+:N]),
-                     // Inputs
-                     .clk      (clk),
-                     .nreset   (nreset),
-                     .mode     (mode[1:0]),
-                     .mask     (mask[N*i+:N]),
-                     .requests (umi_in_request[N*i+:N]));
+   // Pointer positions past a one-hot pick
+   function [N-1:0] rr_next;
+      input [N-1:0] pick;
+      reg [N-1:0]   low;
+      begin
+         low = pick | (pick - 1'b1);
+         rr_next = ~low;
+      end
+   endfunction
 
-        assign umi_out_valid[i] = |grants[N*i+:N];
-     end // for (i=0;i<N;i=i+1)
+   // Parameter validation, a single entry queue has no pointer bits
+   if (VOQ == 1)
+     begin : gvoq_check
+        initial
+          $error("VOQ=%0d must be 0 or at least 2.", VOQ);
+     end
 
-   // masking final select to help synthesis pruning
+   if (VOQ == 0)
+     begin : gdirect
+        wire [4*N-1:0] qos;
 
-   assign umi_out_sel[N*N-1:0] = grants[N*N-1:0] & ~mask[N*N-1:0];
+        //##############################
+        // Arbiters for all outputs
+        //##############################
 
-   //##############################
-   // Ready
-   //##############################
+        for (i=0;i<N;i=i+1)
+          begin : iqos
+             assign qos[4*i+:4] = umi_in_cmd[i*CW+UMI_QOS_LSB+:4];
+          end
+
+        for (i=0;i<N;i=i+1)
+          begin : iarb
+             umi_arbiter #(.N(N))
+             umi_arbiter (// Outputs
+                          .grants   (grants[N*i+:N]),
+                          // Inputs
+                          .clk      (clk),
+                          .nreset   (nreset),
+                          .mode     (mode[1:0]),
+                          .mask     (mask[N*i+:N]),
+                          .requests (umi_in_request[N*i+:N]),
+                          .qos      (qos[4*N-1:0]));
+          end // for (i=0;i<N;i=i+1)
+
+        //##############################
+        // Ready
+        //##############################
+
+        // Amir - The ready should be taking into account the incoming ready from
+        // the target of the transaction.
+        // Therefore you need to replicate umi_out_ready bits and not as a bus and
+        // it can only be done inside the loop.
+        integer j,k;
+        always @(*)
+          begin
+             umi_ready[N-1:0] = {N{1'b1}};
+             for (j=0;j<N;j=j+1)
+               for (k=0;k<N;k=k+1)
+                 umi_ready[j] = umi_ready[j] & ~(umi_in_request[j+N*k] &
+                                                 (~grants[j+N*k] | ~umi_out_ready[k]));
+          end
+
+        // all outputs select from the inputs directly
+        for (o=0;o<N;o=o+1)
+          begin : isrc
+             assign src_cmd[o*N*CW+:N*CW]     = umi_in_cmd[N*CW-1:0];
+             assign src_dstaddr[o*N*AW+:N*AW] = umi_in_dstaddr[N*AW-1:0];
+             assign src_srcaddr[o*N*AW+:N*AW] = umi_in_srcaddr[N*AW-1:0];
+             assign src_data[o*N*DW+:N*DW]    = umi_in_data[N*DW-1:0];
+          end
+     end
+   else if (VOQ >= 2)
+     begin : gvoq
+        wire [N*N-1:0] voq_full;
+        wire [N*N-1:0] voq_empty;
+        wire [N*N-1:0] voq_write;
+        wire [N*N-1:0] voq_read;
+        wire [N*N-1:0] voq_request;
+        wire [N*N-1:0] out_grant;
+        wire [N*N-1:0] in_grant;   // out_grant transposed, [i*N+o]
+        wire [N*N-1:0] in_accept;  // [i*N+o]
+
+        //##############################
+        // Virtual output queues
+        //##############################
+
+        // an input is ready when the queue of its destination has room
+        always @(*)
+          begin : iready
+             integer j,k;
+             umi_ready[N-1:0] = {N{1'b1}};
+             for (j=0;j<N;j=j+1)
+               for (k=0;k<N;k=k+1)
+                 umi_ready[j] = umi_ready[j] & ~(umi_in_request[j+N*k] & voq_full[j+N*k]);
+          end
 
-   // Amir - The ready should be taking into account the incoming ready from
-   // the target of the transaction.
-   // Therefore you need to replicate umi_out_ready bits and not as a bus and
-   // it can only be done inside the loop.
-   integer j,k;
-   always @(*)
-     begin
-        umi_ready[N-1:0] = {N{1'b1}};
-        for (j=0;j<N;j=j+1)
-          for (k=0;k<N;k=k+1)
-            umi_ready[j] = umi_ready[j] & ~(umi_in_request[j+N*k] &
-                                            (~grants[j+N*k] | ~umi_out_ready[k]));
+        for (o=0;o<N;o=o+1)
+          begin : ioq
+             for (i=0;i<N;i=i+1)
+               begin : iiq
+                  assign voq_write[o*N+i] = umi_in_request[o*N+i] & umi_ready[i];
+
+                  la_syncfifo #(.DW(CW+AW+AW+DW),
+                                .DEPTH(VOQ))
+                  voq (// Outputs
+                       .wr_full  (voq_full[o*N+i]),
+                       .rd_dout  ({src_data[(o*N+i)*DW+:DW],
+                                   src_srcaddr[(o*N+i)*AW+:AW],
+                                   src_dstaddr[(o*N+i)*AW+:AW],
+                                   src_cmd[(o*N+i)*CW+:CW]}),
+                       .rd_empty (voq_empty[o*N+i]),
+                       .status   (),
+                       // Inputs
+                       .clk      (clk),
+                       .nreset   (nreset),
+                       .clear    (1'b0),
+                       .wr_en    (voq_write[o*N+i]),
+                       .wr_din   ({umi_in_data[i*DW+:DW],
+                                   umi_in_srcaddr[i*AW+:AW],
+                                   umi_in_dstaddr[i*AW+:AW],
+                                   umi_in_cmd[i*CW+:CW]}),
+                       .rd_en    (voq_read[o*N+i]),
+                       .selctrl  (1'b0),
+                       .ctrl     ('b0));
+               end
+          end
+
+        assign voq_request[N*N-1:0] = ~voq_empty[N*N-1:0] & ~mask[N*N-1:0];
+
+        //##############################
+        // iSLIP matching
+        //##############################
+
+        // grant: every output picks one of the inputs with a queue for it
+        for (o=0;o<N;o=o+1)
+          begin : igrant
+             reg [N-1:0] ptr;
+
+             assign out_grant[o*N+:N] = rr_pick(voq_request[o*N+:N], ptr[N-1:0]);
+
+             always @ (posedge clk or negedge nreset)
+               if (~nreset)
+                 ptr[N-1:0] <= {N{1'b1}};
+               else if (|voq_read[o*N+:N])
+                 ptr[N-1:0] <= rr_next(voq_read[o*N+:N]);
+          end
+
+        // accept: every input picks one of the outputs granting it
+        for (i=0;i<N;i=i+1)
+          begin : iaccept
+             reg [N-1:0] ptr;
+             wire [N-1:0] read;
+
+             for (o=0;o<N;o=o+1)
+               begin : itrans
+                  assign in_grant[i*N+o] = out_grant[o*N+i];
+                  assign grants[o*N+i]   = in_accept[i*N+o];
+                  assign read[o]         = voq_read[o*N+i];
+               end
+
+             assign in_accept[i*N+:N] = rr_pick(in_grant[i*N+:N], ptr[N-1:0]);
+
+             always @ (posedge clk or negedge nreset)
+               if (~nreset)
+                 ptr[N-1:0] <= {N{1'b1}};
+               else if (|read[N-1:0])
+                 ptr[N-1:0] <= rr_next(read[N-1:0]);
+          end
+
+        // pointers only move on a transfer
+        for (o=0;o<N;o=o+1)
+          begin : iread
+             assign voq_read[o*N+:N] = grants[o*N+:N] & {N{umi_out_ready[o]}};
+          end
+     end
+
+   for (o=0;o<N;o=o+1)
+     begin : ivalid
+        assign umi_out_valid[o] = |grants[N*o+:N];
      end
 
+   // masking final select to help synthesis pruning
+
+   assign umi_out_sel[N*N-1:0] = grants[N*N-1:0] & ~mask[N*N-1:0];
+
    assign umi_in_ready[N-1:0] = umi_ready[N-1:0];
 
    //##############################
@@ -122,7 +297,7 @@ module umi_crossbar
                      .out (umi_out_data[i*DW+:DW]),
                      // Inputs
                      .sel (umi_out_sel[i*N+:N]),
-                     .in  (umi_in_data[N*DW-1:0]));
+                     .in  (src_data[i*N*DW+:N*DW]));
 
         la_vmux #(.N(N),
                   .W(AW))
@@ -130,7 +305,7 @@ module umi_crossbar
                     .out (umi_out_srcaddr[i*AW+:AW]),
                     // Inputs
                     .sel (umi_out_sel[i*N+:N]),
-                    .in  (umi_in_srcaddr[N*AW-1:0]));
+                    .in  (src_srcaddr[i*N*AW+:N*AW]));
 
         la_vmux #(.N(N),
                   .W(AW))
@@ -138,7 +313,7 @@ module umi_crossbar
                     .out (umi_out_dstaddr[i*AW+:AW]),
                     // Inputs
                     .sel (umi_out_sel[i*N+:N]),
-                    .in  (umi_in_dstaddr[N*AW-1:0]));
+                    .in  (src_dstaddr[i*N*AW+:N*AW]));
 
         la_vmux #(.N(N),
                   .W(CW))
@@ -146,7 +321,7 @@ module umi_crossbar
                     .out (umi_out_cmd[i*CW+:CW]),
                     // Inputs
                     .sel (umi_out_sel[i*N+:N]),
-                    .in  (umi_in_cmd[N*CW-1:0]));
+                    .in  (src_cmd[i*N*CW+:N*CW]));
      end
 
 endmodule // umi_crossbar
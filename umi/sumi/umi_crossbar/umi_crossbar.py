@@ -1,5 +1,6 @@
 from umi.common import UMI
 from lambdalib.veclib import Vmux
+from lambdalib.ramlib import Syncfifo
 from umi.sumi.umi_arbiter.umi_arbiter import Arbiter
 
 
@@ -7,8 +8,9 @@ class Crossbar(UMI):
     def __init__(self):
         super().__init__('umi_crossbar',
                          files=['rtl/umi_crossbar.v'],
-                         deps=[Vmux(),
-                               Arbiter()])
+                         deps=[Vmux,
+                               Syncfifo,
+                               Arbiter])
 
 
 if __name__ == "__main__":
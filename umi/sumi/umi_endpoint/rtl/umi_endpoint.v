@@ -17,8 +17,13 @@
  *
  * Documentation:
  * - A simple register file UMI device endpoint.
- * - It can only receive UMI requests that require a single response beat.
- * - (udev_req_cmd.len + 1)*(1 << udev_req_cmd.size) <= DW/8.
+ * - Writes and atomics must fit a single beat:
+ *   (udev_req_cmd.len + 1)*(1 << udev_req_cmd.size) <= DW/8.
+ * - Reads of more than DW/8 bytes are served as a burst of local reads of
+ *   DW/8 bytes, streamed back one response beat per cycle with DSTADDR
+ *   advancing and EOM set on the last beat only (README 4.1.1). The
+ *   request is accepted with the first beat, udev_req_ready stays low
+ *   until the burst is done.
  *
  ******************************************************************************/
 
@@ -93,6 +98,8 @@ module umi_endpoint
    wire                 cmd_write_resp;
    wire                 loc_eof;
    wire                 loc_eom;
+   wire                 req_eom;
+   wire [7:0]           req_len;
    wire [1:0]           loc_err;
    wire                 loc_ex;
    wire [4:0]           loc_hostid;
@@ -102,6 +109,19 @@ module umi_endpoint
    wire [23:0]          loc_user_extended;
    wire [CW-1:0]        packet_cmd;
    // End of automatics
+   // burst reads
+   reg                  burst_active;
+   reg [CW-1:0]         burst_cmd;
+   reg [AW-1:0]         burst_dstaddr;
+   reg [AW-1:0]         burst_srcaddr;
+   wire                 burst_split;
+   wire [7:0]           burst_words;
+   wire [7:0]           burst_next_len;
+   wire [CW-1:0]        burst_next_cmd;
+   wire                 req_valid;
+   wire [CW-1:0]        req_cmd;
+   wire [AW-1:0]        req_dstaddr;
+   wire [AW-1:0]        req_srcaddr;
 
    // local regs
    reg                  loc_resp_vld;
@@ -124,14 +144,86 @@ module umi_endpoint
    wire                 loc_resp;
    wire [4:0]           cmd_opcode;
 
+   //########################
+   // Burst read
+   //########################
+
+   // The current request is the remainder of a burst or a new request
+   assign req_valid            = burst_active | udev_req_valid;
+   assign req_cmd[CW-1:0]      = burst_active ? burst_cmd[CW-1:0]     : udev_req_cmd[CW-1:0];
+   assign req_dstaddr[AW-1:0]  = burst_active ? burst_dstaddr[AW-1:0] : udev_req_dstaddr[AW-1:0];
+   assign req_srcaddr[AW-1:0]  = burst_active ? burst_srcaddr[AW-1:0] : udev_req_srcaddr[AW-1:0];
+
+   // words per beat
+   /* verilator lint_off WIDTHTRUNC */
+   assign burst_words[7:0] = (DW >> 3) >> loc_size[2:0];
+   /* verilator lint_on WIDTHTRUNC */
+
+   assign burst_split = cmd_read & (burst_words[7:0] != 8'h00) &
+                        (req_len[7:0] >= burst_words[7:0]);
+
+   assign burst_next_len[7:0] = req_len[7:0] - burst_words[7:0];
+
+   assign loc_len[7:0] = burst_split ? burst_words[7:0] - 8'h01 : req_len[7:0];
+   assign loc_eom      = ~burst_split & req_eom;
+
+   /* umi_pack AUTO_TEMPLATE(
+    .packet_cmd (burst_next_cmd[]),
+    .cmd_\(.*\) (loc_\1[]),
+    .cmd_opcode (loc_opcode[4:0]),
+    .cmd_len    (burst_next_len[]),
+    .cmd_eom    (req_eom),
+    );
+    */
+   umi_pack #(.CW(CW))
+   umi_pack_burst(/*AUTOINST*/
+                  // Outputs
+                  .packet_cmd           (burst_next_cmd[CW-1:0]), // Templated
+                  // Inputs
+                  .cmd_opcode           (loc_opcode[4:0]),       // Templated
+                  .cmd_size             (loc_size[2:0]),         // Templated
+                  .cmd_len              (burst_next_len[7:0]),   // Templated
+                  .cmd_atype            (loc_atype[7:0]),        // Templated
+                  .cmd_prot             (loc_prot[1:0]),         // Templated
+                  .cmd_qos              (loc_qos[3:0]),          // Templated
+                  .cmd_eom              (req_eom),               // Templated
+                  .cmd_eof              (loc_eof),               // Templated
+                  .cmd_user             (loc_user[1:0]),         // Templated
+                  .cmd_err              (loc_err[1:0]),          // Templated
+                  .cmd_ex               (loc_ex),                // Templated
+                  .cmd_hostid           (loc_hostid[4:0]),       // Templated
+                  .cmd_user_extended    (loc_user_extended[23:0])); // Templated
+
+   always @(posedge clk or negedge nreset)
+     if (!nreset)
+       burst_active <= 1'b0;
+     else if (loc_resp)
+       burst_active <= burst_split;
+
+   always @(posedge clk or negedge nreset)
+     if (!nreset)
+       begin
+          burst_cmd[CW-1:0]     <= {CW{1'b0}};
+          burst_dstaddr[AW-1:0] <= {AW{1'b0}};
+          burst_srcaddr[AW-1:0] <= {AW{1'b0}};
+       end
+     else if (loc_resp & burst_split)
+       begin
+          burst_cmd[CW-1:0]     <= burst_next_cmd[CW-1:0];
+          burst_dstaddr[AW-1:0] <= req_dstaddr[AW-1:0] + (DW >> 3);
+          burst_srcaddr[AW-1:0] <= req_srcaddr[AW-1:0] + (DW >> 3);
+       end
+
    //########################
    // UMI UNPACK
    //########################
-   assign loc_addr[AW-1:0]    = udev_req_dstaddr[AW-1:0];
+   assign loc_addr[AW-1:0]    = req_dstaddr[AW-1:0];
    assign loc_wrdata[DW-1:0]  = udev_req_data[DW-1:0];
 
    /* umi_unpack AUTO_TEMPLATE(
-    .packet_\(.*\)   (udev_req_\1[]),
+    .packet_\(.*\)   (req_\1[]),
+    .cmd_len         (req_len[]),
+    .cmd_eom         (req_eom),
     .cmd_\(.*\)      (loc_\1[]),
     );
     */
@@ -141,11 +233,11 @@ module umi_endpoint
               // Outputs
               .cmd_opcode       (loc_opcode[4:0]),       // Templated
               .cmd_size         (loc_size[2:0]),         // Templated
-              .cmd_len          (loc_len[7:0]),          // Templated
+              .cmd_len          (req_len[7:0]),          // Templated
               .cmd_atype        (loc_atype[7:0]),        // Templated
               .cmd_qos          (loc_qos[3:0]),          // Templated
               .cmd_prot         (loc_prot[1:0]),         // Templated
-              .cmd_eom          (loc_eom),               // Templated
+              .cmd_eom          (req_eom),               // Templated
               .cmd_eof          (loc_eof),               // Templated
               .cmd_ex           (loc_ex),                // Templated
               .cmd_user         (loc_user[1:0]),         // Templated
@@ -153,12 +245,12 @@ module umi_endpoint
               .cmd_err          (loc_err[1:0]),          // Templated
               .cmd_hostid       (loc_hostid[4:0]),       // Templated
               // Inputs
-              .packet_cmd       (udev_req_cmd[CW-1:0])); // Templated
+              .packet_cmd       (req_cmd[CW-1:0]));      // Templated
 
    assign loc_opcode[7:5] = 'b0;
 
    /* umi_decode AUTO_TEMPLATE(
-    .command (udev_req_cmd[]),
+    .command (req_cmd[]),
     );*/
    umi_decode #(.CW(CW))
    umi_decode(/*AUTOINST*/
@@ -192,18 +284,18 @@ module umi_endpoint
               .cmd_atomic_minu  (cmd_atomic_minu),
               .cmd_atomic_swap  (cmd_atomic_swap),
               // Inputs
-              .command          (udev_req_cmd[CW-1:0])); // Templated
+              .command          (req_cmd[CW-1:0]));      // Templated
 
-   assign loc_read   = cmd_read & udev_req_valid & ~request_stall;
-   assign loc_write  = (cmd_write | cmd_write_posted) & udev_req_valid & ~request_stall;
-   assign loc_atomic = cmd_atomic & udev_req_valid & ~request_stall;
-   assign loc_resp   = (cmd_read | cmd_write | cmd_atomic) & udev_req_valid & loc_ready & ~request_stall;
+   assign loc_read   = cmd_read & req_valid & ~request_stall;
+   assign loc_write  = (cmd_write | cmd_write_posted) & req_valid & ~request_stall;
+   assign loc_atomic = cmd_atomic & req_valid & ~request_stall;
+   assign loc_resp   = (cmd_read | cmd_write | cmd_atomic) & req_valid & loc_ready & ~request_stall;
 
    //############################
    //# Outgoing Transaction
    //############################
 
-   assign udev_req_ready = loc_ready & ~request_stall;
+   assign udev_req_ready = loc_ready & ~request_stall & ~burst_active;
 
    //#############################
    //# Pipeline Packet
@@ -259,7 +351,7 @@ module umi_endpoint
      else if (loc_resp)
        begin
           loc_cmd_out[CW-1:0]     <= packet_cmd[CW-1:0];
-          loc_dstaddr_out[AW-1:0] <= udev_req_srcaddr[AW-1:0];
+          loc_dstaddr_out[AW-1:0] <= req_srcaddr[AW-1:0];
           loc_srcaddr_out[AW-1:0] <= loc_addr[AW-1:0];
        end
 
@@ -8,9 +8,9 @@ class Endpoint(UMI):
     def __init__(self):
         super().__init__('umi_endpoint',
                          files=['rtl/umi_endpoint.v'],
-                         deps=[Decode(),
-                               Pack(),
-                               Unpack()])
+                         deps=[Decode,
+                               Pack,
+                               Unpack])
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ class Fifo(UMI):
     def __init__(self):
         super().__init__('umi_fifo',
                          files=['rtl/umi_fifo.v'],
-                         deps=[Asyncfifo()])
+                         deps=[Asyncfifo])
 
 
 if __name__ == "__main__":
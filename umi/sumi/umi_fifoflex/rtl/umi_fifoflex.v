@@ -21,10 +21,19 @@
  * Future enhancements:
  * 1. do not split large->small transactions in case they carry no data
  *
- * Known limitation/bugs:
- * - Does not handle cases where SIZE>ODW (does not manipulate SIZE)
- * - When ODW>IDW, incoming transaction is merged only if merged transaction
- *   does not cross ODW boundary (num_merged_bits + IDW)<=ODW
+ * - When ODW>IDW, back to back contiguous transactions are merged (README
+ *   4.1.2). A transaction that does not fit in the remaining ODW bytes is
+ *   split (README 4.1.1): the words that fit complete a full output beat
+ *   (EOM=0) and the rest is carried over as the start of the next beat.
+ *
+ * - When IDW>ODW and the word size (2^SIZE) is larger than ODW, every
+ *   word is sent as 2^SIZE/(ODW/8) beats of one ODW word each
+ *   (SIZE=log2(ODW/8), LEN=0), which keeps the link at full rate.
+ *   Addresses are expected to be aligned to SIZE. This applies to the
+ *   commands that can be split (reads, writes, posted writes, RDMA and
+ *   read/write responses without EX). An atomic or exclusive word wider
+ *   than ODW cannot be split: it is held at the input (umi_in_ready low)
+ *   and reported in simulation rather than passed on with truncated data.
  *
  ******************************************************************************/
 
@@ -66,6 +75,8 @@ module umi_fifoflex
     input            vss
     );
 
+`include "umi_messages.vh"
+
    // Local FIFO
    wire [ODW+AW+AW+CW-1:0] fifo_dout;
    wire [ODW+AW+AW+CW-1:0] fifo_din;
@@ -92,6 +103,7 @@ module umi_fifoflex
    wire [AW-1:0]           latch2fifo_srcaddr;
    wire [MAX_DW-1:0]       latch2fifo_data;
    wire [7:0]              latch2fifo_len;
+   wire [2:0]              latch2fifo_size;
    wire                    latch2fifo_eom;
    wire                    latch2fifo_valid;
    wire                    latch2fifo_ready;
@@ -105,6 +117,15 @@ module umi_fifoflex
    wire [AW-1:0]           addr_mask;
    wire [AW-1:0]           dstaddr_masked;
    localparam [AW-1:0]     ODW_BYTES = {{(AW-32){1'b0}}, ODW[31:0] >> 3};
+   localparam [2:0]        ODW_SIZE = $clog2(ODW/8);
+
+   // Words wider than the output
+   wire                    wide_word;
+   wire                    wide_splittable;
+   wire                    wide_error;
+   wire                    split_wide;
+   wire                    split_wide_last;
+   reg [7:0]               split_wide_beat;
 
    /*AUTOWIRE*/
    // Beginning of automatic wires (for undeclared instantiated-module outputs)
@@ -260,6 +281,53 @@ module umi_fifoflex
    // cmd manipulation - at each cycle need to remove the bytes sent out
    // SPLIT will also split based on crossing DW boundary and not only size
 
+   //#################################
+   // Wide words (2^SIZE > ODW)
+   //#################################
+
+   // Each wide word goes out as 2^(SIZE-ODW_SIZE) beats of one ODW word,
+   // split_wide_beat counts the beats sent of the current word. Atomic and
+   // exclusive wide words cannot be split and are held at the input.
+   assign wide_word = (IDW > ODW) & (cmd_size > ODW_SIZE);
+
+   assign wide_splittable = ((cmd_opcode == UMI_REQ_READ) |
+                             (cmd_opcode == UMI_REQ_WRITE) |
+                             (cmd_opcode == UMI_REQ_POSTED) |
+                             (cmd_opcode == UMI_REQ_RDMA) |
+                             (cmd_opcode == UMI_RESP_READ) |
+                             (cmd_opcode == UMI_RESP_WRITE)) & ~cmd_ex;
+
+   assign split_wide = wide_word & wide_splittable;
+
+   assign wide_error = wide_word & ~wide_splittable & (umi_in_valid | packet_latch_valid);
+
+`ifndef SYNTHESIS
+   reg wide_error_q;
+   always @(posedge umi_in_clk or negedge umi_in_nreset)
+     if (~umi_in_nreset)
+       wide_error_q <= 1'b0;
+     else
+       begin
+          wide_error_q <= wide_error;
+          if (wide_error & ~wide_error_q)
+            $display("[UMI_FIFOFLEX]: cannot split cmd=0x%h, word wider than ODW=%0d, input stalled",
+                     packet_cmd, ODW);
+       end
+`endif
+
+   assign split_wide_last = (split_wide_beat[7:0] ==
+                             ((8'h01 << (cmd_size - ODW_SIZE)) - 8'h01));
+
+   assign latch2fifo_size = split_wide ? ODW_SIZE : cmd_size;
+
+   always @(posedge umi_in_clk or negedge umi_in_nreset)
+     if (~umi_in_nreset)
+       split_wide_beat[7:0] <= 8'h00;
+     else if (fifo_write)
+       split_wide_beat[7:0] <= (split_wide & packet_latch_en & ~split_wide_last) ?
+                               split_wide_beat[7:0] + 8'h01 :
+                               8'h00;
+
    generate if (ODW > IDW)
      begin
 
@@ -271,6 +339,9 @@ module umi_fifoflex
         reg  [8:0]      latch_bytes;
         wire [8:0]      latch_in_bytes;
         wire [8:0]      latch_out_bytes;
+        wire [8:0]      carry_bytes;   // input bytes completing a full beat
+        wire            tx_overflow;
+        reg             packet_latch_eom;
 
         wire [ODW-1:0]  umi_in_data_shifted;
 
@@ -279,6 +350,8 @@ module umi_fifoflex
         always @(posedge umi_in_clk or negedge umi_in_nreset)
           if (~umi_in_nreset)
                latch_bytes <= 'b0;
+          else if (umi_in_valid & umi_in_ready & tx_overflow)
+               latch_bytes <= latch_in_bytes - carry_bytes;
           else if (umi_in_valid & umi_in_ready & fifo_write)
                latch_bytes <= latch_in_bytes;
            else if (umi_in_valid & umi_in_ready)
@@ -319,7 +392,20 @@ module umi_fifoflex
                               dstaddr_mergeable & srcaddr_mergeable &
                               len_mergeable & (latch_bytes != 0);
 
-        reg             packet_latch_eom;
+        // Merge across the ODW boundary: the first carry_bytes of the input
+        // fill up the latch, which goes out as a full beat in the same
+        // cycle, the remaining words of the input stay in the latch.
+        // carry_bytes must be a whole number of words, it is zero when the
+        // latch is already full.
+        assign carry_bytes = ODW_BYTES[8:0] - latch_bytes;
+
+        assign tx_overflow = umi_in_valid &
+                             opcode_mergeable & misc_mergeable &
+                             dstaddr_mergeable & srcaddr_mergeable &
+                             ~len_mergeable & (latch_bytes != 0) &
+                             ~packet_latch_eom &
+                             ~|(carry_bytes & ~({9{1'b1}} << umi_in_cmd_size));
+
         wire            packet_boundary;
         reg             packet_boundary_latch;
 
@@ -330,16 +416,25 @@ module umi_fifoflex
         // Fifo signal - current command going out
         assign latch2fifo_dstaddr = packet_dstaddr_latch;
         assign latch2fifo_srcaddr = packet_srcaddr_latch;
-        assign latch2fifo_data    = packet_data_latch;
+        /* verilator lint_off WIDTHEXPAND */
+        assign latch2fifo_data    = tx_overflow ?
+                                    packet_data_latch | umi_in_data_shifted :
+                                    packet_data_latch;
+        /* verilator lint_on WIDTHEXPAND */
         // cmd manipulation - at each cycle need to remove the bytes sent out
-        assign latch2fifo_eom     = packet_latch_eom;
+        assign latch2fifo_eom     = packet_latch_eom & ~tx_overflow;
         /* verilator lint_off WIDTHTRUNC */
-        assign latch2fifo_len     = (latch_bytes >> cmd_size) - 8'h1;
+        assign latch_out_bytes    = tx_overflow ? ODW_BYTES[8:0] : latch_bytes;
+        assign latch2fifo_len     = (latch_out_bytes >> cmd_size) - 8'h1;
         /* verilator lint_on WIDTHTRUNC */
-        assign latch2fifo_valid   = (packet_boundary | packet_boundary_latch) & (latch_bytes > 0);
+        assign latch2fifo_valid   = ((packet_boundary | packet_boundary_latch) & (latch_bytes > 0)) |
+                                    tx_overflow;
+        // An overflow merge writes the completed beat out in the same
+        // cycle, the input can only be taken when that write goes through.
         assign latch2fifo_ready   = (tx_mergeable & !packet_latch_eom) |
                                     (tx_mergeable & packet_latch_eom & (latch_bytes == 0)) |
-                                    (!tx_mergeable & (latch_bytes == 0));
+                                    (!tx_mergeable & (latch_bytes == 0)) |
+                                    (tx_overflow & ~fifo_full);
         assign latch2in_ready     = latch2fifo_ready;
 
         // Latched command for next split
@@ -366,6 +461,12 @@ module umi_fifoflex
                packet_dstaddr_latch <= {AW{1'b0}};
                packet_srcaddr_latch <= {AW{1'b0}};
             end
+          else if ((umi_in_ready & umi_in_valid) & tx_overflow)
+            begin
+               packet_latch_valid   <= 1'b1;
+               packet_dstaddr_latch <= umi_in_dstaddr + {{(AW-9){1'b0}}, carry_bytes};
+               packet_srcaddr_latch <= umi_in_srcaddr + {{(AW-9){1'b0}}, carry_bytes};
+            end
           else if ((umi_in_ready & umi_in_valid) & (packet_boundary | fifo_write))
             begin
                packet_latch_valid   <= 1'b1;
@@ -395,12 +496,14 @@ module umi_fifoflex
         // in the always block will be hit and umi_in_data_shifted will not
         // be used. So to simplify we can use (latch_bytes << 3).
         /* verilator lint_off WIDTHEXPAND */
-        assign umi_in_data_shifted = umi_in_data << (latch_bytes << 3);
+        assign umi_in_data_shifted = umi_in_data << ({3'b0, latch_bytes} << 3);
         /* verilator lint_on WIDTHEXPAND */
 
         always @(posedge umi_in_clk or negedge umi_in_nreset)
           if (~umi_in_nreset)
                packet_data_latch    <= {ODW{1'b0}};
+          else if ((umi_in_ready & umi_in_valid) & tx_overflow)
+               packet_data_latch    <= {{ODW-IDW{1'b0}}, umi_in_data >> ({3'b0, carry_bytes} << 3)};
           else if ((umi_in_ready & umi_in_valid) & (packet_boundary | fifo_write))
                packet_data_latch    <= {{ODW-IDW{1'b0}}, umi_in_data};
           else if (umi_in_ready & umi_in_valid)
@@ -413,8 +516,11 @@ module umi_fifoflex
 
         assign addr_mask[AW-1:0] = {{AW-$clog2(ODW/8){1'b0}},{$clog2(ODW/8){1'b1}}};
         assign dstaddr_masked[AW-1:0] = latch2fifo_dstaddr[AW-1:0] & addr_mask[AW-1:0];
-        assign packet_latch_en = ({23'b0, cmd_len_plus_one} + ({22'b0, dstaddr_masked[9:0]} >> cmd_size)) >
-                                 (ODW >> cmd_size >> 3);
+        assign packet_latch_en = split_wide ?
+                                 ~(split_wide_last & (cmd_len[7:0] == 8'h00)) :
+                                 ~wide_word &
+                                 (({23'b0, cmd_len_plus_one} + ({22'b0, dstaddr_masked[9:0]} >> cmd_size)) >
+                                  (ODW >> cmd_size >> 3));
 
         assign packet_cmd[CW-1:0] = packet_latch_valid ?
                                     packet_cmd_latch[CW-1:0] :
@@ -426,19 +532,21 @@ module umi_fifoflex
         assign latch2fifo_data    = packet_latch_valid ? packet_data_latch    : umi_in_data;
         // cmd manipulation - at each cycle need to remove the bytes sent out
         assign latch2fifo_eom     = packet_latch_en    ? 1'b0                 : cmd_eom;
-        assign latch2fifo_len     = packet_latch_en    ?
+        assign latch2fifo_len     = split_wide         ? 8'h00 :
+                                    packet_latch_en    ?
                               (((ODW[10:3]) - dstaddr_masked[7:0]) >> cmd_size) - 1'b1 :
                               cmd_len[7:0];
-        assign latch2fifo_valid   = umi_in_valid | packet_latch_valid;
-        assign latch2fifo_ready   = ~packet_latch_valid;
-        assign latch2in_ready     = ~packet_latch_valid & umi_out_ready;
+        assign latch2fifo_valid   = (umi_in_valid | packet_latch_valid) & ~wide_error;
+        assign latch2fifo_ready   = ~packet_latch_valid & ~wide_error;
+        assign latch2in_ready     = ~packet_latch_valid & umi_out_ready & ~wide_error;
 
         // Latched command for next split
         assign latch_dstaddr = latch2fifo_dstaddr + (ODW_BYTES - dstaddr_masked[AW-1:0]);
         assign latch_srcaddr = latch2fifo_srcaddr + (ODW_BYTES - dstaddr_masked[AW-1:0]);
         assign latch_data    = latch2fifo_data >> (ODW - ({22'b0, dstaddr_masked[9:0]} << 3));
-        assign latch_len     = cmd_len -
-                               ((ODW[10:3] - dstaddr_masked[7:0]) >> cmd_size);
+        assign latch_len     = split_wide ?
+                               cmd_len - {7'b0, split_wide_last} :
+                               cmd_len - ((ODW[10:3] - dstaddr_masked[7:0]) >> cmd_size);
 
         // Packet latch
         always @(posedge umi_in_clk or negedge umi_in_nreset)
@@ -463,7 +571,9 @@ module umi_fifoflex
      begin // split only based on (LEN-1)*(2^SIZE) > DW
         reg  [IDW-1:0]  packet_data_latch;
 
-        assign packet_latch_en = cmd_len_plus_one > (ODW[11:3] >> cmd_size);
+        assign packet_latch_en = split_wide ?
+                                 ~(split_wide_last & (cmd_len[7:0] == 8'h00)) :
+                                 ~wide_word & (cmd_len_plus_one > (ODW[11:3] >> cmd_size));
 
         assign packet_cmd[CW-1:0] = packet_latch_valid ?
                                     packet_cmd_latch[CW-1:0] :
@@ -475,16 +585,19 @@ module umi_fifoflex
         assign latch2fifo_data    = packet_latch_valid ? packet_data_latch    : umi_in_data;
         // cmd manipulation - at each cycle need to remove the bytes sent out
         assign latch2fifo_eom     = packet_latch_en    ? 1'b0                            : cmd_eom;
-        assign latch2fifo_len     = packet_latch_en    ? ((ODW[10:3] >> cmd_size) - 1'b1) : cmd_len;
-        assign latch2fifo_valid   = umi_in_valid | packet_latch_valid;
-        assign latch2fifo_ready   = ~packet_latch_valid;
-        assign latch2in_ready     = ~packet_latch_valid & umi_out_ready;
+        assign latch2fifo_len     = split_wide         ? 8'h00                            :
+                                    packet_latch_en    ? ((ODW[10:3] >> cmd_size) - 1'b1) : cmd_len;
+        assign latch2fifo_valid   = (umi_in_valid | packet_latch_valid) & ~wide_error;
+        assign latch2fifo_ready   = ~packet_latch_valid & ~wide_error;
+        assign latch2in_ready     = ~packet_latch_valid & umi_out_ready & ~wide_error;
 
         // Latched command for next split
         assign latch_dstaddr = latch2fifo_dstaddr + ODW_BYTES;
         assign latch_srcaddr = latch2fifo_srcaddr + ODW_BYTES;
         assign latch_data    = latch2fifo_data >> ODW;
-        assign latch_len     = cmd_len - (ODW[10:3] >> cmd_size);
+        assign latch_len     = split_wide ?
+                               cmd_len - {7'b0, split_wide_last} :
+                               cmd_len - (ODW[10:3] >> cmd_size);
 
         // Packet latch
         always @(posedge umi_in_clk or negedge umi_in_nreset)
@@ -533,6 +646,7 @@ module umi_fifoflex
 
    /* umi_pack AUTO_TEMPLATE(
     .packet_cmd (latch2fifo_cmd[]),
+    .cmd_size   (latch2fifo_size),
     .cmd_len    (latch2fifo_len),
     .cmd_eom    (latch2fifo_eom),
     );*/
@@ -543,7 +657,7 @@ module umi_fifoflex
                  .packet_cmd            (latch2fifo_cmd[CW-1:0]),      // Templated
                  // Inputs
                  .cmd_opcode            (cmd_opcode[4:0]),
-                 .cmd_size              (cmd_size[2:0]),
+                 .cmd_size              (latch2fifo_size),             // Templated
                  .cmd_len               (latch2fifo_len),              // Templated
                  .cmd_atype             (cmd_atype[7:0]),
                  .cmd_prot              (cmd_prot[1:0]),
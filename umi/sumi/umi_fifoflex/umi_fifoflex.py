@@ -8,10 +8,10 @@ class FifoFlex(UMI):
     def __init__(self):
         super().__init__('umi_fifoflex',
                          files=['rtl/umi_fifoflex.v'],
-                         deps=[Pack(),
-                               Unpack(),
-                               Syncfifo(),
-                               Asyncfifo()])
+                         deps=[Pack,
+                               Unpack,
+                               Syncfifo,
+                               Asyncfifo])
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ class Isolate(UMI):
         name = 'umi_isolate'
         super().__init__(name,
                          files=[f'rtl/{name}.v'],
-                         deps=[ll.auxlib.Isolo()])
+                         deps=[ll.auxlib.Isolo])
 
 
 if __name__ == "__main__":
@@ -17,6 +17,12 @@
  *
  * Documentation:
  * - Implements a simple memory array
+ * - Requests crossing a DW boundary are split (umi_fifoflex SPLIT=1)
+ * - Accepts a request every cycle, read data is returned one cycle later.
+ *   Atomics take a second cycle to write back the result.
+ * - BANKS>1 interleaves the array across BANKS single port banks on DW
+ *   wide words (bank = dstaddr[log2(DW/8)+:log2(BANKS)]). An atomic only
+ *   stalls the request following it when both go to the same bank.
  *
  ******************************************************************************/
 
@@ -25,6 +31,7 @@ module umi_memagent
     parameter AW = 64,            // address width
     parameter CW = 32,            // command width
     parameter RAMDEPTH = 512,
+    parameter BANKS = 1,          // number of interleaved banks (power of 2)
     parameter CTRLW = 8,
     parameter SRAMTYPE = "DEFAULT"
     )
@@ -107,6 +114,7 @@ module umi_memagent
    wire [11:0]          loc_bytes;
 
    wire                 loc_atomic;
+   wire                 loc_accept;
    wire [7:0]           loc_atype;
    wire [DW-1:0]        loc_rddata;
    wire                 loc_ready;
@@ -183,16 +191,41 @@ module umi_memagent
 
 
    wire [DW-1:0]    mem_rddata;
-   wire             mem_we;
-   wire [DW-1:0]    mem_wmask;
-   wire [AW-1:0]    mem_addr;
    wire [DW-1:0]    mem_wrdata;
+   wire [DW-1:0]    mem_wrdata_atomic;
 
    wire [DW-1:0]    mem_rddata_atomic;
    reg  [31:0]      postatomic_shift;
 
-   // Deassert ready to get additional cycle to write data
-   assign loc_ready = ~loc_atomic_r;
+   //##################################################################
+   //# Banks
+   //##################################################################
+
+   localparam DWB    = $clog2(DW/8);                  // byte offset bits
+   localparam BB     = (BANKS > 1) ? $clog2(BANKS) : 1; // bank select bits
+   localparam ROWAW  = $clog2(RAMDEPTH/BANKS);        // bank address bits
+   localparam ROWLSB = DWB + $clog2(BANKS);
+
+   wire [BB-1:0]    loc_bank;
+   wire [BB-1:0]    loc_bank_r;
+
+   generate if (BANKS > 1)
+     begin : gbanksel
+        assign loc_bank[BB-1:0]   = loc_addr[DWB+:BB];
+        assign loc_bank_r[BB-1:0] = loc_addr_r[DWB+:BB];
+     end
+   else
+     begin : gnobanksel
+        assign loc_bank[BB-1:0]   = 'b0;
+        assign loc_bank_r[BB-1:0] = 'b0;
+     end
+   endgenerate
+
+   // Deassert ready to get additional cycle to write data, only
+   // requests to the bank being written back have to wait
+   assign loc_ready = ~(loc_atomic_r & (loc_bank == loc_bank_r));
+
+   assign loc_accept = loc_ready;
 
    always @(posedge clk or negedge nreset) begin
      if (~nreset) begin
@@ -209,7 +242,7 @@ module umi_memagent
        loc_addr_r       <= loc_addr;
        loc_write_r      <= loc_write;
        loc_read_r       <= loc_read;
-       loc_atomic_r     <= loc_atomic;
+       loc_atomic_r     <= loc_atomic & loc_accept;
        loc_atype_r      <= loc_atype;
        loc_wrdata_r     <= loc_wrdata<<(DW - ({20'h0,loc_bytes}<<3));
        wmask_r          <= wmask;
@@ -248,30 +281,44 @@ module umi_memagent
        loc_wrdata_atomic = loc_wrdata_r;
    end
 
-   assign mem_we = loc_write | loc_atomic_r;
-   assign mem_addr = loc_atomic_r ? loc_addr_r : loc_addr;
-   assign mem_wmask = loc_atomic_r ? wmask_r : wmask;
-   assign mem_wrdata = loc_atomic_r ?
-                       (loc_wrdata_atomic[DW-1:0]>>postatomic_shift) :
-                       (loc_wrdata[DW-1:0]<<(8*loc_addr[$clog2(DW/8)-1:0]));
-
-   la_spram #(.DW    (DW),               // Memory width
-              .AW    ($clog2(RAMDEPTH)), // Address width (derived)
-              .PROP  (SRAMTYPE),         // Pass through variable for hard macro
-              .CTRLW (CTRLW)             // Width of ctrl interface
-              )
-   la_spram(// Outputs
-            .dout             (mem_rddata[DW-1:0]),
-            // Inputs
-            .clk              (clk),
-            .ce               (1'b1),
-            .we               (mem_we),
-            .wmask            (mem_wmask[DW-1:0]),
-            .addr             (mem_addr[$clog2(DW/8)+:$clog2(RAMDEPTH)]),
-            .din              (mem_wrdata),
-            .selctrl          (1'b0),
-            .ctrl             (sram_ctrl),
-            .status           ());
+   assign mem_wrdata = loc_wrdata[DW-1:0]<<(8*loc_addr[$clog2(DW/8)-1:0]);
+   assign mem_wrdata_atomic = loc_wrdata_atomic[DW-1:0]>>postatomic_shift;
+
+   wire [BANKS*DW-1:0] bank_rddata;
+
+   genvar b;
+   for (b=0;b<BANKS;b=b+1)
+     begin : ibank
+        wire            writeback;
+        wire            we;
+        wire [AW-1:0]   addr;
+
+        // the atomic write back takes the bank over from the request
+        assign writeback = loc_atomic_r & (loc_bank_r == b);
+        assign we        = writeback | (loc_write & loc_accept & (loc_bank == b));
+        assign addr      = writeback ? loc_addr_r : loc_addr;
+
+        la_spram #(.DW    (DW),        // Memory width
+                   .AW    (ROWAW),     // Address width (derived)
+                   .PROP  (SRAMTYPE),  // Pass through variable for hard macro
+                   .CTRLW (CTRLW)      // Width of ctrl interface
+                   )
+        la_spram(// Outputs
+                 .dout             (bank_rddata[b*DW+:DW]),
+                 // Inputs
+                 .clk              (clk),
+                 .ce               (1'b1),
+                 .we               (we),
+                 .wmask            (writeback ? wmask_r : wmask),
+                 .addr             (addr[ROWLSB+:ROWAW]),
+                 .din              (writeback ? mem_wrdata_atomic : mem_wrdata),
+                 .selctrl          (1'b0),
+                 .ctrl             (sram_ctrl),
+                 .status           ());
+     end
+
+   // read data comes from the bank accessed in the previous cycle
+   assign mem_rddata[DW-1:0] = bank_rddata[loc_bank_r*DW+:DW];
 
    assign loc_rddata = mem_rddata >> (8*loc_addr_r[$clog2(DW/8)-1:0]);
 
@@ -8,9 +8,9 @@ class MemAgent(UMI):
     def __init__(self):
         super().__init__('umi_memagent',
                          files=['rtl/umi_memagent.v'],
-                         deps=[FifoFlex(),
-                               Spram(),
-                               Endpoint()])
+                         deps=[FifoFlex,
+                               Spram,
+                               Endpoint])
 
 
 if __name__ == "__main__":
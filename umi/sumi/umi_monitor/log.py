@@ -0,0 +1,279 @@
+'''
+Streaming parser and performance analysis for umi_monitor text output.
+
+The simulation log is consumed line by line, so arbitrarily long logs are
+processed in constant memory (apart from the requests still waiting for a
+response). Requests are paired with their response by address, a
+response is sent to the srcaddr of the request it answers (advanced by
+the bytes already returned for the later beats of a multi beat response).
+
+    with open("sim.log") as f:
+        report = analyze(f, period=1.0)
+    print(report.format())
+'''
+
+import re
+from typing import NamedTuple, Optional
+
+from umi.sumi import messages
+
+
+# "%10t    %s    UMI_REQ_READ:    dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)"
+_BEAT = re.compile(r'^\s*(?P<time>[\d.]+)\s*(?P<unit>[munpf]?s)\s+(?P<name>\S.*?)\s+'
+                   r'UMI_(?:OPCODE=0x(?P<code>[0-9a-fA-FxXzZ]+)|(?P<op>[A-Z0-9_]+)):\s+'
+                   r'(?P<fields>dst=.*?)\s*\((?P<path>[^()]*)\)\s*$')
+
+# "%10t %s WARNING: UMI_TIMEOUT: valid=%b ready=%b dst=0x%h ... (%0d cycles) (%m)"
+_TIMEOUT = re.compile(r'^\s*(?P<time>[\d.]+)\s*(?P<unit>[munpf]?s)\s+(?P<name>\S.*?)\s+'
+                      r'WARNING: UMI_TIMEOUT:.*\((?P<cycles>\d+) cycles\)')
+
+_FIELD = re.compile(r'(\w+)=(0x[0-9a-fA-FxXzZ]+|\d+)')
+
+_OPCODES = {name: getattr(messages, name) for name in dir(messages)
+            if name.startswith(('REQ_', 'RESP_'))}
+
+_UNITS = {'s': 1e9, 'ms': 1e6, 'us': 1e3, 'ns': 1.0, 'ps': 1e-3, 'fs': 1e-6}
+
+# Commands carrying data on the bus
+_DATA_OPCODES = {messages.REQ_WRITE, messages.REQ_POSTED, messages.REQ_ATOMIC,
+                 messages.RESP_READ}
+
+# Requests that are answered with a response
+_RESPONDED = {messages.REQ_READ: messages.RESP_READ,
+              messages.REQ_WRITE: messages.RESP_WRITE,
+              messages.REQ_ATOMIC: messages.RESP_READ}
+
+
+def _int(value):
+    # 4-state values (x/z) show up as such in %h, count them as 0
+    if value.startswith('0x'):
+        return int(re.sub('[xXzZ]', '0', value[2:]) or '0', 16)
+    return int(value)
+
+
+class Beat(NamedTuple):
+    time: float        # ns
+    name: str          # NAME of the monitor
+    opcode: int
+    dstaddr: int
+    srcaddr: int
+    data: int
+    nbytes: int        # payload bytes carried by this beat
+    cmd: Optional[int]
+    stall: Optional[int]
+    path: str
+
+
+class Timeout(NamedTuple):
+    time: float        # ns
+    name: str
+    cycles: int
+
+
+def _nbytes(opcode, cmd, data_digits):
+    if opcode not in _DATA_OPCODES:
+        return 0
+    if cmd is None:
+        # older logs without cmd, assume a full data beat
+        return data_digits // 2
+    fields = messages.FIELDS
+    size = (cmd >> fields['size'][0]) & 0x7
+    words = 1 if opcode == messages.REQ_ATOMIC else ((cmd >> fields['len'][0]) & 0xff) + 1
+    return min(words << size, data_digits // 2)
+
+
+def parse(lines):
+    '''
+    Generator yielding a Beat for every handshake and a Timeout for every
+    stall warning found in lines. Anything else is skipped.
+    '''
+    for line in lines:
+        match = _BEAT.match(line)
+        if match:
+            fields = dict(_FIELD.findall(match.group('fields')))
+            cmd = _int(fields['cmd']) if 'cmd' in fields else None
+            if cmd is not None:
+                opcode = cmd & 0x1f
+            elif match.group('code'):
+                opcode = _int('0x' + match.group('code')) & 0x1f
+            else:
+                opcode = _OPCODES.get(match.group('op'), messages.INVALID) & 0x1f
+            data = fields.get('data', '0x')
+            yield Beat(time=float(match.group('time')) * _UNITS[match.group('unit')],
+                       name=match.group('name').strip(),
+                       opcode=opcode,
+                       dstaddr=_int(fields.get('dst', '0')),
+                       srcaddr=_int(fields.get('src', '0')),
+                       data=_int(data),
+                       nbytes=_nbytes(opcode, cmd, len(data) - 2),
+                       cmd=cmd,
+                       stall=int(fields['stall']) if 'stall' in fields else None,
+                       path=match.group('path'))
+            continue
+
+        match = _TIMEOUT.match(line)
+        if match:
+            yield Timeout(time=float(match.group('time')) * _UNITS[match.group('unit')],
+                          name=match.group('name').strip(),
+                          cycles=int(match.group('cycles')))
+
+
+class Histogram:
+    '''
+    Latency histogram with power of two buckets, bucket i counts
+    latencies in [2**(i-1), 2**i) cycles (bucket 0 is a latency of 0).
+    '''
+
+    def __init__(self):
+        self.buckets = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        value = max(0, int(round(value)))
+        bucket = value.bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct):
+        '''Upper bound of the bucket holding the given percentile.'''
+        target = pct / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return (1 << bucket) - 1
+        return 0
+
+
+class PortStats:
+    def __init__(self, name):
+        self.name = name
+        self.beats = 0
+        self.nbytes = 0
+        self.first = None
+        self.last = None
+        self.stall_cycles = 0
+        self.stalled_beats = 0
+        self.timeouts = 0
+        self.opcodes = {}
+
+    @property
+    def cycles(self):
+        if self.first is None:
+            return 0
+        return self.last - self.first + 1
+
+    @property
+    def throughput(self):
+        '''Payload bytes per cycle between the first and last handshake.'''
+        return self.nbytes / self.cycles if self.cycles else 0.0
+
+
+class Report:
+    '''
+    Per port (monitor NAME) throughput and stall statistics and request
+    to response latency histograms, accumulated with add().
+    '''
+
+    def __init__(self, period=1.0):
+        self.period = period
+        self.ports = {}
+        self.latency = {}
+        self.unmatched = 0
+        self._pending = {}
+
+    def _port(self, name):
+        if name not in self.ports:
+            self.ports[name] = PortStats(name)
+        return self.ports[name]
+
+    def add(self, item):
+        port = self._port(item.name)
+        cycle = item.time / self.period
+
+        if isinstance(item, Timeout):
+            port.timeouts += 1
+            return
+
+        port.beats += 1
+        port.nbytes += item.nbytes
+        port.first = cycle if port.first is None else port.first
+        port.last = cycle
+        port.opcodes[item.opcode] = port.opcodes.get(item.opcode, 0) + 1
+        if item.stall:
+            port.stall_cycles += item.stall
+            port.stalled_beats += 1
+
+        if item.opcode in _RESPONDED:
+            self._pending.setdefault(item.srcaddr, []).append([item.opcode, cycle, False])
+        elif item.opcode in _RESPONDED.values():
+            queue = self._pending.get(item.dstaddr)
+            if not queue:
+                self.unmatched += 1
+                return
+            # latency is measured to the first response beat, multi beat
+            # responses complete on the beat with EOM set
+            request = queue[0]
+            if not request[2]:
+                opcode, start, _ = request
+                self.latency.setdefault(opcode, Histogram()).add(cycle - start)
+                request[2] = True
+            queue.pop(0)
+            if not queue:
+                del self._pending[item.dstaddr]
+            if item.cmd is not None and not (item.cmd >> messages.FIELDS['eom'][0]) & 1:
+                # the next beat of a multi beat response is sent to the
+                # address following the bytes covered by this one
+                fields = messages.FIELDS
+                size = (item.cmd >> fields['size'][0]) & 0x7
+                words = ((item.cmd >> fields['len'][0]) & 0xff) + 1
+                self._pending.setdefault(item.dstaddr + (words << size), []).insert(0, request)
+
+    @property
+    def outstanding(self):
+        '''Requests still waiting for a response.'''
+        return sum(len(queue) for queue in self._pending.values())
+
+    def format(self):
+        lines = [f"{'port':<20} {'beats':>10} {'bytes':>12} {'bytes/cycle':>12} "
+                 f"{'stall cyc':>10} {'stalled':>8} {'timeouts':>8}"]
+        for port in self.ports.values():
+            lines.append(f"{port.name:<20} {port.beats:>10} {port.nbytes:>12} "
+                         f"{port.throughput:>12.3f} {port.stall_cycles:>10} "
+                         f"{port.stalled_beats:>8} {port.timeouts:>8}")
+
+        names = {value: name for name, value in _OPCODES.items()}
+        lines.append("")
+        lines.append(f"{'latency (cycles)':<20} {'count':>10} {'min':>8} {'mean':>10} "
+                     f"{'p99':>8} {'max':>8}")
+        for opcode, hist in sorted(self.latency.items()):
+            lines.append(f"{names.get(opcode, hex(opcode)):<20} {hist.count:>10} {hist.min:>8} "
+                         f"{hist.mean:>10.1f} {hist.percentile(99):>8} {hist.max:>8}")
+        if self.unmatched or self.outstanding:
+            lines.append(f"unmatched responses: {self.unmatched}, "
+                         f"outstanding requests: {self.outstanding}")
+        return "\n".join(lines)
+
+
+def analyze(lines, period=1.0):
+    '''
+    Parses umi_monitor output from lines (any iterable of str, such as an
+    open file or a simulator pipe) and returns a Report. period is the
+    clock period in ns used to convert times into cycles.
+    '''
+    report = Report(period=period)
+    for item in parse(lines):
+        report.add(item)
+    return report
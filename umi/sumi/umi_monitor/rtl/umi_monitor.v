@@ -24,8 +24,24 @@
  * monitors, or activity indicators.
  *
  * Simulation: on negedge clock, displays the full transaction
- * (opcode name, addresses, data) whenever a handshake occurs.
- * Acts as a built-in protocol analyzer for debug.
+ * (opcode name, addresses, data, cmd and the number of cycles valid was
+ * stalled before the handshake) whenever a handshake occurs.
+ * Acts as a built-in protocol analyzer for debug. The output can be
+ * analyzed with umi.sumi.umi_monitor.log.
+ *
+ * Binary trace (simulation only, TRACE=1): every handshake is appended
+ * to a set of fixed width column files named after TRACEFILE, meant for
+ * long runs where the text output gets too large. Each column is
+ * written with $fwrite("%u"), ie. little endian, in 32 bit words.
+ *
+ * TRACEFILE.meta    : "umitrace 1 <CW> <AW> <DW> <NAME>"
+ * TRACEFILE.time    : 64 bits, clock cycles since reset
+ * TRACEFILE.cmd     : CW bits
+ * TRACEFILE.dstaddr : AW bits
+ * TRACEFILE.srcaddr : AW bits
+ * TRACEFILE.data    : DW bits
+ *
+ * Traces are read back with umi.sumi.umi_monitor.trace.UmiTrace.
  *
  ******************************************************************************/
 
@@ -35,6 +51,8 @@ module umi_monitor
     parameter            DW = 128,
     parameter            TIMEOUT = 100, // simulation only
     parameter            VERBOSE = 0,   // set to 1 always enable tracing
+    parameter            TRACE = 0,     // set to 1 to write a binary trace
+    parameter            TRACEFILE = "umi_trace", // binary trace file prefix
     parameter [20*8-1:0] NAME = "umi")  // short label (20 chars max)
    (// UMI bus tap
     input          valid,
@@ -74,14 +92,21 @@ module umi_monitor
    // sane printing
    initial $timeformat(-9, 2, "ns", 0);
 
-   // Pad NAME with leading spaces for aligned display
+   // Pad NAME with leading spaces for aligned display. The trace header
+   // is written here, once name_padded is set.
    reg [20*8-1:0] name_padded;
    integer ni;
+   integer fd_meta;
    initial begin
       name_padded = "                    "; // 20 spaces
       for (ni = 0; ni < 20; ni = ni + 1)
         if (NAME[ni*8+:8] != 0)
           name_padded[ni*8+:8] = NAME[ni*8+:8];
+      if (TRACE) begin
+         fd_meta = $fopen({TRACEFILE, ".meta"}, "w");
+         $fdisplay(fd_meta, "umitrace 1 %0d %0d %0d %0s", CW, AW, DW, name_padded);
+         $fclose(fd_meta);
+      end
    end
 
    wire [7:0] opcode;
@@ -110,21 +135,55 @@ module umi_monitor
       always @(negedge clk) begin
          if (nreset & beat) begin
             case (opcode)
-              {3'b0, UMI_REQ_READ}:   $display("%10t    %s    UMI_REQ_READ:    dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_REQ_WRITE}:  $display("%10t    %s    UMI_REQ_WRITE:   dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_REQ_POSTED}: $display("%10t    %s    UMI_REQ_POSTED:  dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_RESP_READ}:  $display("%10t    %s    UMI_RESP_READ:   dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_RESP_WRITE}: $display("%10t    %s    UMI_RESP_WRITE:  dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_REQ_ATOMIC}: $display("%10t    %s    UMI_REQ_ATOMIC:  dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_REQ_RDMA}:   $display("%10t    %s    UMI_REQ_RDMA:    dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              {3'b0, UMI_REQ_USER0}:  $display("%10t    %s    UMI_REQ_USER0:   dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              UMI_REQ_ERROR:           $display("%10t    %s    UMI_REQ_ERROR:   dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              UMI_REQ_LINK:            $display("%10t    %s    UMI_REQ_LINK:    dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, dstaddr, srcaddr, data);
-              default:                 $display("%10t    %s    UMI_OPCODE=0x%h: dst=0x%h src=0x%h data=0x%h (%m)", $realtime, name_padded, opcode, dstaddr, srcaddr, data);
+              {3'b0, UMI_REQ_READ}:   $display("%10t    %s    UMI_REQ_READ:    dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_REQ_WRITE}:  $display("%10t    %s    UMI_REQ_WRITE:   dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_REQ_POSTED}: $display("%10t    %s    UMI_REQ_POSTED:  dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_RESP_READ}:  $display("%10t    %s    UMI_RESP_READ:   dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_RESP_WRITE}: $display("%10t    %s    UMI_RESP_WRITE:  dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_REQ_ATOMIC}: $display("%10t    %s    UMI_REQ_ATOMIC:  dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_REQ_RDMA}:   $display("%10t    %s    UMI_REQ_RDMA:    dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              {3'b0, UMI_REQ_USER0}:  $display("%10t    %s    UMI_REQ_USER0:   dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              UMI_REQ_ERROR:           $display("%10t    %s    UMI_REQ_ERROR:   dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              UMI_REQ_LINK:            $display("%10t    %s    UMI_REQ_LINK:    dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, dstaddr, srcaddr, data, cmd, stall_count);
+              default:                 $display("%10t    %s    UMI_OPCODE=0x%h: dst=0x%h src=0x%h data=0x%h cmd=0x%h stall=%0d (%m)", $realtime, name_padded, opcode, dstaddr, srcaddr, data, cmd, stall_count);
             endcase
          end
       end
    end
+
+   // Binary trace, one record per handshake in each column file
+   if (TRACE) begin : g_trace
+      integer    fd_time;
+      integer    fd_cmd;
+      integer    fd_dstaddr;
+      integer    fd_srcaddr;
+      integer    fd_data;
+      reg [63:0] cycle;
+
+      initial begin
+         fd_time    = $fopen({TRACEFILE, ".time"}, "wb");
+         fd_cmd     = $fopen({TRACEFILE, ".cmd"}, "wb");
+         fd_dstaddr = $fopen({TRACEFILE, ".dstaddr"}, "wb");
+         fd_srcaddr = $fopen({TRACEFILE, ".srcaddr"}, "wb");
+         fd_data    = $fopen({TRACEFILE, ".data"}, "wb");
+      end
+
+      always @(posedge clk or negedge nreset)
+        if (!nreset)
+          cycle <= 64'b0;
+        else
+          cycle <= cycle + 64'd1;
+
+      always @(negedge clk) begin
+         if (nreset & beat) begin
+            $fwrite(fd_time, "%u", cycle);
+            $fwrite(fd_cmd, "%u", cmd);
+            $fwrite(fd_dstaddr, "%u", dstaddr);
+            $fwrite(fd_srcaddr, "%u", srcaddr);
+            $fwrite(fd_data, "%u", data);
+         end
+      end
+   end
 `endif
 
 endmodule
@@ -0,0 +1,201 @@
+'''
+Reader and writer for the binary umi_monitor trace (TRACE=1).
+
+A trace is a set of column files sharing a prefix, one fixed width record
+per handshake in each (see rtl/umi_monitor.v for the layout). Columns are
+memory-mapped, so slicing a multi-GB trace only touches the pages that
+are actually used:
+
+    trace = UmiTrace("umi_trace")
+    rows = trace.select(start=1000, stop=2000, opcode=messages.REQ_WRITE)
+    addrs = trace[rows]['dstaddr']
+'''
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from umi.sumi import messages
+
+
+COLUMNS = ('time', 'cmd', 'dstaddr', 'srcaddr', 'data')
+
+_MAGIC = 'umitrace'
+_VERSION = 1
+
+
+def _words(width):
+    # $fwrite("%u") pads every value to a multiple of 32 bits
+    return (width + 31) // 32
+
+
+def _addr_dtype(aw):
+    if aw > 64:
+        raise ValueError(f"unsupported address width: {aw}")
+    return np.dtype('<u4') if aw <= 32 else np.dtype('<u8')
+
+
+class UmiTrace:
+    '''
+    Memory-mapped view of a binary umi_monitor trace.
+
+    Args:
+        path (str or Path): trace file prefix (TRACEFILE of umi_monitor).
+    '''
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+        meta = Path(f"{path}.meta").read_text().split(maxsplit=5)
+        if meta[0] != _MAGIC or int(meta[1]) != _VERSION:
+            raise ValueError(f"{path}.meta is not a version {_VERSION} umi trace")
+        self.cw, self.aw, self.dw = (int(v) for v in meta[2:5])
+        self.name = meta[5].strip() if len(meta) > 5 else ''
+
+        if _words(self.cw) != 1:
+            raise ValueError(f"unsupported command width: {self.cw}")
+
+        self.dtype = np.dtype([('time', '<u8'),
+                               ('cmd', '<u4'),
+                               ('dstaddr', _addr_dtype(self.aw)),
+                               ('srcaddr', _addr_dtype(self.aw)),
+                               ('data', np.uint8, (4 * _words(self.dw),))])
+
+        # A simulation that is still running may have written a partial
+        # record, only expose the records that are complete in all columns.
+        sizes = {name: Path(f"{path}.{name}").stat().st_size // self._record_size(name)
+                 for name in COLUMNS}
+        self._len = min(sizes.values())
+
+        self._columns = {name: self._map(name) for name in COLUMNS}
+        self._opcode_index = None
+
+    def _record_size(self, name):
+        return self.dtype[name].itemsize
+
+    def _map(self, name):
+        if self._len == 0:
+            # numpy cannot map empty files
+            return np.zeros((0,) + self.dtype[name].shape, dtype=self.dtype[name].base)
+        return np.memmap(f"{self.path}.{name}", mode='r',
+                         dtype=self.dtype[name].base,
+                         shape=(self._len,) + self.dtype[name].shape)
+
+    def __len__(self):
+        return self._len
+
+    def __getattr__(self, name):
+        if name in COLUMNS:
+            return self._columns[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, index):
+        '''
+        Returns the selected records (an int, slice, index array or mask)
+        as a structured array loaded into memory.
+        '''
+        if isinstance(index, slice):
+            shape = (len(range(self._len)[index]),)
+        else:
+            index = np.asarray(index)
+            if index.dtype == bool:
+                index = np.flatnonzero(index)
+            shape = index.shape
+
+        records = np.empty(shape, dtype=self.dtype)
+        for name in COLUMNS:
+            records[name] = self._columns[name][index]
+        return records
+
+    def window(self, start=None, stop=None):
+        '''
+        Returns the slice of records with start <= time < stop. Time is
+        monotonic so this is a binary search over the time column.
+        '''
+        lo = 0 if start is None else int(np.searchsorted(self.time, start, side='left'))
+        hi = self._len if stop is None else int(np.searchsorted(self.time, stop, side='left'))
+        return slice(lo, max(lo, hi))
+
+    def opcode_index(self):
+        '''
+        Returns {opcode: sorted record indices}. The index is built with a
+        single pass over the cmd column and cached next to the trace in
+        PATH.index.npz, keyed on a digest of the cmd column so that a
+        rewritten trace of the same length is not served a stale index.
+        '''
+        if self._opcode_index is not None:
+            return self._opcode_index
+
+        digest = hashlib.sha256(np.ascontiguousarray(self.cmd)).hexdigest()
+
+        cache = Path(f"{self.path}.index.npz")
+        if cache.exists():
+            with np.load(cache) as saved:
+                if 'digest' in saved.files and str(saved['digest']) == digest:
+                    self._opcode_index = {int(key[2:]): saved[key] for key in saved.files
+                                          if key.startswith('op')}
+                    return self._opcode_index
+
+        opcodes = messages.opcode(self.cmd)
+        order = np.argsort(opcodes, kind='stable')
+        values, first = np.unique(opcodes[order], return_index=True)
+        self._opcode_index = {int(op): rows.astype(np.int64)
+                              for op, rows in zip(values, np.split(order, first[1:]))}
+
+        try:
+            np.savez(cache, digest=digest,
+                     **{f"op{op}": rows for op, rows in self._opcode_index.items()})
+        except OSError:
+            # read-only trace location, keep the index in memory only
+            pass
+
+        return self._opcode_index
+
+    def select(self, start=None, stop=None, opcode=None, dstaddr=None, srcaddr=None):
+        '''
+        Returns the indices of the records matching all given filters.
+
+        Args:
+            start, stop (int): time window, start <= time < stop.
+            opcode (int or list of int): UMI opcode(s), see umi.sumi.messages.
+            dstaddr, srcaddr ((int, int)): address range, lo <= addr < hi.
+        '''
+        window = self.window(start, stop)
+
+        if opcode is not None:
+            index = self.opcode_index()
+            rows = np.concatenate([np.zeros(0, dtype=np.int64)] +
+                                  [index.get(int(op), np.zeros(0, dtype=np.int64))
+                                   for op in np.atleast_1d(opcode)])
+            rows.sort()
+            rows = rows[(rows >= window.start) & (rows < window.stop)]
+        else:
+            rows = np.arange(window.start, window.stop)
+
+        for name, bounds in (('dstaddr', dstaddr), ('srcaddr', srcaddr)):
+            if bounds is None:
+                continue
+            lo, hi = bounds
+            addr = self._columns[name][rows]
+            rows = rows[(addr >= lo) & (addr < hi)]
+
+        return rows
+
+
+def write_trace(path, time, cmd, dstaddr, srcaddr, data, cw=32, aw=64, dw=256, name='umi'):
+    '''
+    Writes records in the same format as umi_monitor with TRACE=1. data
+    is an array of DW/8 bytes per record.
+    '''
+    count = len(time)
+    data = np.asarray(data, dtype=np.uint8).reshape(count, -1)
+    padded = np.zeros((count, 4 * _words(dw)), dtype=np.uint8)
+    padded[:, :data.shape[1]] = data
+
+    Path(f"{path}.meta").write_text(f"{_MAGIC} {_VERSION} {cw} {aw} {dw} {name}\n")
+    np.asarray(time, dtype='<u8').tofile(f"{path}.time")
+    np.asarray(cmd, dtype='<u4').tofile(f"{path}.cmd")
+    np.asarray(dstaddr, dtype=_addr_dtype(aw)).tofile(f"{path}.dstaddr")
+    np.asarray(srcaddr, dtype=_addr_dtype(aw)).tofile(f"{path}.srcaddr")
+    padded.tofile(f"{path}.data")
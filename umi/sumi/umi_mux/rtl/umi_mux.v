@@ -17,13 +17,18 @@
  *
  * N:1 UMI transaction mux with arbiter and flow control.
  *
+ * With arbmode=2'b11 inputs are arbitrated by the QOS field of their
+ * command, with per input aging WEIGHTS (see umi_arbiter).
+ *
  ******************************************************************************/
 
 module umi_mux
   #(parameter N  = 2,   // mumber of inputs
     parameter DW = 128, // umi data width
     parameter CW = 32,  // umi command width
-    parameter AW = 6   // umi address width
+    parameter AW = 6,  // umi address width
+    parameter AGEW = 8, // qos arbiter age counter width
+    parameter [4*N-1:0] WEIGHTS = {N{4'd1}} // qos arbiter aging weights
     )
    (// controls
     input             clk,
@@ -46,13 +51,24 @@ module umi_mux
     input             umi_out_ready
     );
 
+`include "umi_messages.vh"
+
    wire [N-1:0]    grants;
+   wire [4*N-1:0]  qos;
+   genvar          i;
 
    //##############################
    // Valid Arbiter
    //##############################
 
-   umi_arbiter #(.N(N))
+   for (i=0; i<N; i=i+1)
+     begin : iqos
+        assign qos[4*i+:4] = umi_in_cmd[i*CW+UMI_QOS_LSB+:4];
+     end
+
+   umi_arbiter #(.N(N),
+                 .AGEW(AGEW),
+                 .WEIGHTS(WEIGHTS))
    umi_arbiter (// Outputs
                 .grants   (grants[N-1:0]),
                 // Inputs
@@ -60,7 +76,8 @@ module umi_mux
                 .nreset   (nreset),
                 .mode     (arbmode[1:0]),
                 .mask     (arbmask[N-1:0]),
-                .requests (umi_in_valid[N-1:0]));
+                .requests (umi_in_valid[N-1:0]),
+                .qos      (qos[4*N-1:0]));
 
    assign umi_out_valid = |grants[N-1:0];
 
@@ -7,8 +7,8 @@ class Mux(UMI):
     def __init__(self):
         super().__init__('umi_mux',
                          files=['rtl/umi_mux.v'],
-                         deps=[Arbiter(),
-                               Vmux()])
+                         deps=[Arbiter,
+                               Vmux])
 
 
 if __name__ == "__main__":
@@ -7,8 +7,8 @@ class Mux2(UMI):
     def __init__(self):
         super().__init__('umi_mux2',
                          files=['rtl/umi_mux2.v'],
-                         deps=[Arbiter(),
-                               Vmux2b()])
+                         deps=[Arbiter,
+                               Vmux2b])
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ class Pack(UMI):
     def __init__(self):
         super().__init__('umi_pack',
                          files=['rtl/umi_pack.v'],
-                         deps=[Decode()])
+                         deps=[Decode])
 
 
 if __name__ == "__main__":
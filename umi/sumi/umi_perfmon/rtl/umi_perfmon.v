@@ -0,0 +1,374 @@
+/*******************************************************************************
+ * Copyright 2026 Zero ASIC Corporation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *
+ * ----
+ *
+ * Documentation:
+ *
+ * - Passive performance monitor for a UMI request/response port pair.
+ *   Both busses are tapped with umi_monitor, nothing is driven.
+ * - Counters are read through a umi_regif register window, see
+ *   umi_perfmon_regmap.vh for the register map.
+ * - Per channel: handshakes, payload bytes ((LEN+1)<<SIZE for commands
+ *   carrying data) and stall cycles (valid high while ready is low).
+ * - Request to response latency for reads, writes and atomics. Latency is
+ *   sampled: one request per class is timed at a time, and is closed by the
+ *   first response of the matching type sent back to its srcaddr. Hosts
+ *   with several outstanding requests of the same class sharing a srcaddr
+ *   will see the latency of the oldest one.
+ * - All counters are 32 bits and wrap. CTRL[0] enables counting (on after
+ *   reset), writing 1 to CTRL[1] clears all counters.
+ *
+ ******************************************************************************/
+
+module umi_perfmon
+  #(parameter GRPOFFSET = 24, // group address offset
+    parameter GRPAW = 0,      // group address width
+    parameter GRPID = 0,      // group ID
+    parameter [15*8-1:0] NAME = "umi", // monitor label (15 chars max)
+    // umi standard parameters
+    parameter CW = 32,        // command width
+    parameter AW = 64,        // address width
+    parameter DW = 256,       // monitored bus data width
+    parameter RW = 32,        // register width
+    parameter RAW = 32        // register addr width
+    )
+   (// clk, reset
+    input           clk,
+    input           nreset,
+    // monitored request bus
+    input           req_valid,
+    input           req_ready,
+    input [CW-1:0]  req_cmd,
+    input [AW-1:0]  req_dstaddr,
+    input [AW-1:0]  req_srcaddr,
+    input [DW-1:0]  req_data,
+    // monitored response bus
+    input           resp_valid,
+    input           resp_ready,
+    input [CW-1:0]  resp_cmd,
+    input [AW-1:0]  resp_dstaddr,
+    input [AW-1:0]  resp_srcaddr,
+    input [DW-1:0]  resp_data,
+    // register access
+    input           udev_req_valid,
+    input [CW-1:0]  udev_req_cmd,
+    input [AW-1:0]  udev_req_dstaddr,
+    input [AW-1:0]  udev_req_srcaddr,
+    input [RW-1:0]  udev_req_data,
+    output          udev_req_ready,
+    output          udev_resp_valid,
+    output [CW-1:0] udev_resp_cmd,
+    output [AW-1:0] udev_resp_dstaddr,
+    output [AW-1:0] udev_resp_srcaddr,
+    output [RW-1:0] udev_resp_data,
+    input           udev_resp_ready
+    );
+
+`include "umi_messages.vh"
+`include "umi_perfmon_regmap.vh"
+
+   // latency classes
+   localparam NLAT = 3; // read, write, atomic
+
+   genvar     i;
+
+   // registers
+   reg [RW-1:0] ctrl_reg;
+   reg [31:0]   cycles;
+   reg [31:0]   req_beats;
+   reg [31:0]   req_bytes;
+   reg [31:0]   req_stall_cycles;
+   reg [31:0]   resp_beats;
+   reg [31:0]   resp_bytes;
+   reg [31:0]   resp_stall_cycles;
+
+   // regif interface
+   wire [RAW-1:0] reg_addr;
+   wire [RW-1:0]  reg_wdata;
+   reg [RW-1:0]   reg_rdata;
+   wire           reg_write;
+   wire           reg_read;
+   wire [1:0]     reg_prot;
+
+   wire           write_ctrl;
+   wire           enable;
+   wire           clear;
+
+   // monitored busses
+   wire           req_beat;
+   wire           resp_beat;
+   wire           req_read;
+   wire           req_write;
+   wire           req_posted;
+   wire           req_atomic;
+   wire           resp_read;
+   wire           resp_write;
+   wire           req_payload;
+   wire           resp_payload;
+   wire [15:0]    req_nbytes;
+   wire [15:0]    resp_nbytes;
+
+   wire [NLAT-1:0] lat_req;
+   wire [NLAT-1:0] lat_resp;
+   wire [32*NLAT-1:0] lat_cnt;
+   wire [32*NLAT-1:0] lat_min;
+   wire [32*NLAT-1:0] lat_max;
+   wire [32*NLAT-1:0] lat_sum;
+
+   //######################################
+   // Bus Taps
+   //######################################
+
+   umi_monitor #(.CW(CW),
+                 .AW(AW),
+                 .DW(DW),
+                 .NAME({NAME, "_req"}))
+   umi_monitor_req (.clk     (clk),
+                    .nreset  (nreset),
+                    .valid   (req_valid),
+                    .ready   (req_ready),
+                    .cmd     (req_cmd[CW-1:0]),
+                    .dstaddr (req_dstaddr[AW-1:0]),
+                    .srcaddr (req_srcaddr[AW-1:0]),
+                    .data    (req_data[DW-1:0]),
+                    .beat    (req_beat));
+
+   umi_monitor #(.CW(CW),
+                 .AW(AW),
+                 .DW(DW),
+                 .NAME({NAME, "_resp"}))
+   umi_monitor_resp (.clk     (clk),
+                     .nreset  (nreset),
+                     .valid   (resp_valid),
+                     .ready   (resp_ready),
+                     .cmd     (resp_cmd[CW-1:0]),
+                     .dstaddr (resp_dstaddr[AW-1:0]),
+                     .srcaddr (resp_srcaddr[AW-1:0]),
+                     .data    (resp_data[DW-1:0]),
+                     .beat    (resp_beat));
+
+   assign req_read   = (req_cmd[4:0]==UMI_REQ_READ);
+   assign req_write  = (req_cmd[4:0]==UMI_REQ_WRITE);
+   assign req_posted = (req_cmd[4:0]==UMI_REQ_POSTED);
+   assign req_atomic = (req_cmd[4:0]==UMI_REQ_ATOMIC);
+   assign resp_read  = (resp_cmd[4:0]==UMI_RESP_READ);
+   assign resp_write = (resp_cmd[4:0]==UMI_RESP_WRITE);
+
+   // payload bytes, atomics carry a single word (LEN holds the atomic type)
+   assign req_payload = req_write | req_posted | req_atomic;
+   assign resp_payload = resp_read;
+
+   assign req_nbytes[15:0] = ~req_payload ? 16'd0 :
+                             req_atomic   ? 16'd1 << req_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB] :
+                             ({8'd0, req_cmd[UMI_LEN_MSB:UMI_LEN_LSB]} + 16'd1) <<
+                             req_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB];
+
+   assign resp_nbytes[15:0] = ~resp_payload ? 16'd0 :
+                              ({8'd0, resp_cmd[UMI_LEN_MSB:UMI_LEN_LSB]} + 16'd1) <<
+                              resp_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB];
+
+   //######################################
+   // Traffic Counters
+   //######################################
+
+   always @ (posedge clk or negedge nreset)
+     if (!nreset)
+       begin
+          cycles[31:0]            <= 'b0;
+          req_beats[31:0]         <= 'b0;
+          req_bytes[31:0]         <= 'b0;
+          req_stall_cycles[31:0]  <= 'b0;
+          resp_beats[31:0]        <= 'b0;
+          resp_bytes[31:0]        <= 'b0;
+          resp_stall_cycles[31:0] <= 'b0;
+       end
+     else if (clear)
+       begin
+          cycles[31:0]            <= 'b0;
+          req_beats[31:0]         <= 'b0;
+          req_bytes[31:0]         <= 'b0;
+          req_stall_cycles[31:0]  <= 'b0;
+          resp_beats[31:0]        <= 'b0;
+          resp_bytes[31:0]        <= 'b0;
+          resp_stall_cycles[31:0] <= 'b0;
+       end
+     else if (enable)
+       begin
+          cycles[31:0]            <= cycles[31:0] + 32'd1;
+          req_beats[31:0]         <= req_beats[31:0] + {31'd0, req_beat};
+          req_bytes[31:0]         <= req_bytes[31:0] + (req_beat ? {16'd0, req_nbytes[15:0]} : 32'd0);
+          req_stall_cycles[31:0]  <= req_stall_cycles[31:0] + {31'd0, req_valid & ~req_ready};
+          resp_beats[31:0]        <= resp_beats[31:0] + {31'd0, resp_beat};
+          resp_bytes[31:0]        <= resp_bytes[31:0] + (resp_beat ? {16'd0, resp_nbytes[15:0]} : 32'd0);
+          resp_stall_cycles[31:0] <= resp_stall_cycles[31:0] + {31'd0, resp_valid & ~resp_ready};
+       end
+
+   //######################################
+   // Latency Counters
+   //######################################
+
+   assign lat_req[0]  = req_read;
+   assign lat_resp[0] = resp_read;
+   assign lat_req[1]  = req_write;
+   assign lat_resp[1] = resp_write;
+   assign lat_req[2]  = req_atomic;
+   assign lat_resp[2] = resp_read;
+
+   for (i = 0; i < NLAT; i = i + 1)
+     begin : g_lat
+        reg          busy;
+        reg [AW-1:0] addr;
+        reg [31:0]   timer;
+        reg [31:0]   cnt;
+        reg [31:0]   min;
+        reg [31:0]   max;
+        reg [31:0]   sum;
+        wire         start;
+        wire         done;
+
+        // time one request at a time, closed by its first response
+        assign start = enable & req_beat & lat_req[i] & ~busy;
+        assign done  = busy & resp_beat & lat_resp[i] & (resp_dstaddr[AW-1:0] == addr[AW-1:0]);
+
+        always @ (posedge clk or negedge nreset)
+          if (!nreset)
+            busy <= 1'b0;
+          else if (clear | done)
+            busy <= 1'b0;
+          else if (start)
+            busy <= 1'b1;
+
+        always @ (posedge clk)
+          if (start)
+            addr[AW-1:0] <= req_srcaddr[AW-1:0];
+
+        always @ (posedge clk)
+          if (start)
+            timer[31:0] <= 32'd1;
+          else if (busy & ~(&timer[31:0]))
+            timer[31:0] <= timer[31:0] + 32'd1;
+
+        always @ (posedge clk or negedge nreset)
+          if (!nreset)
+            begin
+               cnt[31:0] <= 'b0;
+               min[31:0] <= {32{1'b1}};
+               max[31:0] <= 'b0;
+               sum[31:0] <= 'b0;
+            end
+          else if (clear)
+            begin
+               cnt[31:0] <= 'b0;
+               min[31:0] <= {32{1'b1}};
+               max[31:0] <= 'b0;
+               sum[31:0] <= 'b0;
+            end
+          else if (done)
+            begin
+               cnt[31:0] <= cnt[31:0] + 32'd1;
+               min[31:0] <= (timer[31:0] < min[31:0]) ? timer[31:0] : min[31:0];
+               max[31:0] <= (timer[31:0] > max[31:0]) ? timer[31:0] : max[31:0];
+               sum[31:0] <= sum[31:0] + timer[31:0];
+            end
+
+        assign lat_cnt[32*i+:32] = cnt[31:0];
+        assign lat_min[32*i+:32] = min[31:0];
+        assign lat_max[32*i+:32] = max[31:0];
+        assign lat_sum[32*i+:32] = sum[31:0];
+     end
+
+   //######################################
+   // Control Register
+   //######################################
+
+   always @ (posedge clk or negedge nreset)
+     if (!nreset)
+       ctrl_reg[RW-1:0] <= {{(RW-1){1'b0}}, 1'b1};
+     else if (write_ctrl)
+       ctrl_reg[RW-1:0] <= {{(RW-1){1'b0}}, reg_wdata[0]};
+
+   assign enable = ctrl_reg[0];
+   assign clear  = write_ctrl & reg_wdata[1];
+
+   //######################################
+   // UMI Interface
+   //######################################
+
+   umi_regif #(.DW(RW),
+               .AW(AW),
+               .CW(CW),
+               .RW(RW),
+               .RAW(RAW),
+               .GRPOFFSET(GRPOFFSET),
+               .GRPAW(GRPAW),
+               .GRPID(GRPID))
+   umi_regif (.reg_err          (2'b0),
+              .reg_ready        (1'b1),
+              // Outputs
+              .udev_req_ready   (udev_req_ready),
+              .udev_resp_valid  (udev_resp_valid),
+              .udev_resp_cmd    (udev_resp_cmd[CW-1:0]),
+              .udev_resp_dstaddr(udev_resp_dstaddr[AW-1:0]),
+              .udev_resp_srcaddr(udev_resp_srcaddr[AW-1:0]),
+              .udev_resp_data   (udev_resp_data[RW-1:0]),
+              .reg_write        (reg_write),
+              .reg_read         (reg_read),
+              .reg_addr         (reg_addr[RAW-1:0]),
+              .reg_wdata        (reg_wdata[RW-1:0]),
+              .reg_prot         (reg_prot[1:0]),
+              // Inputs
+              .clk              (clk),
+              .nreset           (nreset),
+              .udev_req_valid   (udev_req_valid),
+              .udev_req_cmd     (udev_req_cmd[CW-1:0]),
+              .udev_req_dstaddr (udev_req_dstaddr[AW-1:0]),
+              .udev_req_srcaddr (udev_req_srcaddr[AW-1:0]),
+              .udev_req_data    (udev_req_data[RW-1:0]),
+              .udev_resp_ready  (udev_resp_ready),
+              .reg_rdata        (reg_rdata[RW-1:0]));
+
+   // Write Decode
+   assign write_ctrl = reg_write & (reg_addr[7:2]==UMI_PERF_CTRL[7:2]);
+
+   always @ *
+     case (reg_addr[7:2])
+       UMI_PERF_CTRL[7:2]        : reg_rdata[RW-1:0] = ctrl_reg[RW-1:0];
+       UMI_PERF_CYCLES[7:2]      : reg_rdata[RW-1:0] = {{RW-32{1'b0}},cycles[31:0]};
+       UMI_PERF_REQBEATS[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},req_beats[31:0]};
+       UMI_PERF_REQBYTES[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},req_bytes[31:0]};
+       UMI_PERF_REQSTALLCYC[7:2] : reg_rdata[RW-1:0] = {{RW-32{1'b0}},req_stall_cycles[31:0]};
+       UMI_PERF_RESPBEATS[7:2]   : reg_rdata[RW-1:0] = {{RW-32{1'b0}},resp_beats[31:0]};
+       UMI_PERF_RESPBYTES[7:2]   : reg_rdata[RW-1:0] = {{RW-32{1'b0}},resp_bytes[31:0]};
+       UMI_PERF_RESPSTALLCYC[7:2]: reg_rdata[RW-1:0] = {{RW-32{1'b0}},resp_stall_cycles[31:0]};
+       UMI_PERF_RDLATCNT[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_cnt[0+:32]};
+       UMI_PERF_RDLATMIN[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_min[0+:32]};
+       UMI_PERF_RDLATMAX[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_max[0+:32]};
+       UMI_PERF_RDLATSUM[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_sum[0+:32]};
+       UMI_PERF_WRLATCNT[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_cnt[32+:32]};
+       UMI_PERF_WRLATMIN[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_min[32+:32]};
+       UMI_PERF_WRLATMAX[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_max[32+:32]};
+       UMI_PERF_WRLATSUM[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_sum[32+:32]};
+       UMI_PERF_ATLATCNT[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_cnt[64+:32]};
+       UMI_PERF_ATLATMIN[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_min[64+:32]};
+       UMI_PERF_ATLATMAX[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_max[64+:32]};
+       UMI_PERF_ATLATSUM[7:2]    : reg_rdata[RW-1:0] = {{RW-32{1'b0}},lat_sum[64+:32]};
+       default:                    reg_rdata[RW-1:0] = 'b0;
+     endcase
+
+endmodule
+// Local Variables:
+// verilog-library-directories:("." "../../umi_monitor/rtl" "../../umi_regif/rtl")
+// End:
@@ -0,0 +1,43 @@
+/*******************************************************************************
+ * Copyright 2026 Zero ASIC Corporation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ *
+ * ----
+ *
+ * Documentation:
+ * - UMI Performance Monitor Register Map
+ *
+ ******************************************************************************/
+
+// registers (addr[7:0]), 32bit aligned
+localparam UMI_PERF_CTRL         = 8'h00; // [0] count enable, [1] clear counters (self clearing)
+localparam UMI_PERF_CYCLES       = 8'h04; // Cycle count while counting is enabled
+localparam UMI_PERF_REQBEATS     = 8'h10; // Request handshakes
+localparam UMI_PERF_REQBYTES     = 8'h14; // Request payload bytes
+localparam UMI_PERF_REQSTALLCYC  = 8'h18; // Cycle count of request valid and not ready
+localparam UMI_PERF_RESPBEATS    = 8'h20; // Response handshakes
+localparam UMI_PERF_RESPBYTES    = 8'h24; // Response payload bytes
+localparam UMI_PERF_RESPSTALLCYC = 8'h28; // Cycle count of response valid and not ready
+localparam UMI_PERF_RDLATCNT     = 8'h40; // Number of timed read requests
+localparam UMI_PERF_RDLATMIN     = 8'h44; // Minimum read latency (cycles)
+localparam UMI_PERF_RDLATMAX     = 8'h48; // Maximum read latency (cycles)
+localparam UMI_PERF_RDLATSUM     = 8'h4C; // Sum of read latencies (cycles)
+localparam UMI_PERF_WRLATCNT     = 8'h50; // Number of timed write requests
+localparam UMI_PERF_WRLATMIN     = 8'h54; // Minimum write latency (cycles)
+localparam UMI_PERF_WRLATMAX     = 8'h58; // Maximum write latency (cycles)
+localparam UMI_PERF_WRLATSUM     = 8'h5C; // Sum of write latencies (cycles)
+localparam UMI_PERF_ATLATCNT     = 8'h60; // Number of timed atomic requests
+localparam UMI_PERF_ATLATMIN     = 8'h64; // Minimum atomic latency (cycles)
+localparam UMI_PERF_ATLATMAX     = 8'h68; // Maximum atomic latency (cycles)
+localparam UMI_PERF_ATLATSUM     = 8'h6C; // Sum of atomic latencies (cycles)
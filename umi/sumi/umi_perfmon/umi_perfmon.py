@@ -0,0 +1,17 @@
+from umi.common import UMI
+from umi.sumi.umi_monitor.umi_monitor import Monitor
+from umi.sumi.umi_regif.umi_regif import Regif
+
+
+class PerfMon(UMI):
+    def __init__(self):
+        super().__init__('umi_perfmon',
+                         files=['rtl/umi_perfmon.v'],
+                         idirs=['rtl'],
+                         deps=[Monitor,
+                               Regif])
+
+
+if __name__ == "__main__":
+    d = PerfMon()
+    d.write_fileset(f"{d.name}.f", fileset="rtl")
@@ -17,7 +17,17 @@
  *
  * Documentation:
  * - Implements a simple memory array with multiple UMI access ports
- * - The array allows only a single read or write per cycle
+ * - BANKS=1: the ports share a single umi_memagent, the array allows only
+ *   a single read or write per cycle.
+ * - BANKS>1: the array is interleaved across BANKS umi_memagents on DW
+ *   wide words (bank = dstaddr[log2(DW/8)+:log2(BANKS)]), each with its
+ *   own arbiter, so ports accessing different banks proceed in the same
+ *   cycle and only ports hitting the same bank are arbitrated ('mode').
+ *   Requests are split at DW boundaries before the bank select. Every
+ *   port keeps the banks of its requests awaiting a response in order
+ *   (up to ORDER_DEPTH) and only takes the response of the bank at the
+ *   head, so a port streams across banks without waiting for responses
+ *   and still sees them in request order.
  *
  ****************************************************************************/
 
@@ -28,6 +38,7 @@ module umi_ram
     parameter CW = 32,            // command width
     parameter IDOFF = 40,         // offset into AW for unique UMI port ID
     parameter RAMDEPTH = 512,
+    parameter BANKS = 1,          // number of interleaved banks (power of 2)
     parameter CTRLW = 8,
     parameter SRAMTYPE = "DEFAULT"
     )
@@ -35,7 +46,7 @@ module umi_ram
     input               clk,    // clock signals
     input               nreset, // async active low reset
     input  [CTRLW-1:0]  sram_ctrl, // Control signal for SRAM
-    input  [1:0]        mode,   // [00]=priority,[10]=roundrobin,[x1]=reserved
+    input  [1:0]        mode,   // [00]=priority,[10]=roundrobin,[11]=qos
     // Device port
     input  [N-1:0]      udev_req_valid,
     input  [N*CW-1:0]   udev_req_cmd,
@@ -51,6 +62,8 @@ module umi_ram
     input  [N-1:0]      udev_resp_ready
     );
 
+`include "umi_messages.vh"
+
    /*AUTOREG*/
 
    /*AUTOWIRE*/
@@ -69,69 +82,297 @@ module umi_ram
    // End of automatics
    wire                 mem_resp_ready;
 
-   //##################################################################
-   //# UMI ENDPOINT (Pipelined Request/Response)
-   //##################################################################
-
-   /*umi_mux AUTO_TEMPLATE(
-    .arbmode       (mode),
-    .arbmask       ({N{1'b0}}),
-    .umi_in_\(.*\) (udev_req_\1[]),
-    );*/
-
-   umi_mux #(.CW(CW),
-             .AW(AW),
-             .DW(DW),
-             .N(N))
-   umi_mux(/*AUTOINST*/
-           // Outputs
-           .umi_in_ready        (udev_req_ready[N-1:0]),   // Templated
-           .umi_out_valid       (umi_out_valid),
-           .umi_out_cmd         (umi_out_cmd[CW-1:0]),
-           .umi_out_dstaddr     (umi_out_dstaddr[AW-1:0]),
-           .umi_out_srcaddr     (umi_out_srcaddr[AW-1:0]),
-           .umi_out_data        (umi_out_data[DW-1:0]),
-           // Inputs
-           .clk                 (clk),
-           .nreset              (nreset),
-           .arbmode             (mode),
-           .arbmask             ({N{1'b0}}),
-           .umi_in_valid        (udev_req_valid[N-1:0]), // Templated
-           .umi_in_cmd          (udev_req_cmd[N*CW-1:0]), // Templated
-           .umi_in_dstaddr      (udev_req_dstaddr[N*AW-1:0]), // Templated
-           .umi_in_srcaddr      (udev_req_srcaddr[N*AW-1:0]), // Templated
-           .umi_in_data         (udev_req_data[N*DW-1:0]), // Templated
-           .umi_out_ready       (umi_out_ready));
-
-   assign udev_resp_valid[N-1:0]      = mem_resp_dstaddr[IDOFF+:N] & {N{mem_resp_valid}};
-   assign mem_resp_ready              = |(mem_resp_dstaddr[IDOFF+:N] & udev_resp_ready[N-1:0]) |
-                                        ~mem_resp_valid;
-   assign udev_resp_cmd[N*CW-1:0]     = {N{mem_resp_cmd[CW-1:0]}};
-   assign udev_resp_dstaddr[N*AW-1:0] = {N{mem_resp_dstaddr[AW-1:0]}};
-   assign udev_resp_srcaddr[N*AW-1:0] = {N{mem_resp_srcaddr[AW-1:0]}};
-   assign udev_resp_data[N*DW-1:0]    = {N{mem_resp_data[DW-1:0]}};
-
-   umi_memagent #(.CW(CW),
+   generate if (BANKS == 1)
+     begin : gsingle
+        //##################################################################
+        //# UMI ENDPOINT (Pipelined Request/Response)
+        //##################################################################
+
+        /*umi_mux AUTO_TEMPLATE(
+         .arbmode       (mode),
+         .arbmask       ({N{1'b0}}),
+         .umi_in_\(.*\) (udev_req_\1[]),
+         );*/
+
+        umi_mux #(.CW(CW),
                   .AW(AW),
                   .DW(DW),
-                  .RAMDEPTH(RAMDEPTH),
-                  .CTRLW(CTRLW),
-                  .SRAMTYPE(SRAMTYPE))
-   umi_memagent (.clk                   (clk),
-                 .nreset                (nreset),
-                 .sram_ctrl             (sram_ctrl),
-                 .udev_req_valid        (umi_out_valid),
-                 .udev_req_cmd          (umi_out_cmd[CW-1:0]),
-                 .udev_req_dstaddr      (umi_out_dstaddr[AW-1:0]),
-                 .udev_req_srcaddr      (umi_out_srcaddr[AW-1:0]),
-                 .udev_req_data         (umi_out_data[DW-1:0]),
-                 .udev_req_ready        (umi_out_ready),
-                 .udev_resp_valid       (mem_resp_valid),
-                 .udev_resp_cmd         (mem_resp_cmd[CW-1:0]),
-                 .udev_resp_dstaddr     (mem_resp_dstaddr[AW-1:0]),
-                 .udev_resp_srcaddr     (mem_resp_srcaddr[AW-1:0]),
-                 .udev_resp_data        (mem_resp_data[DW-1:0]),
-                 .udev_resp_ready       (mem_resp_ready));
+                  .N(N))
+        umi_mux(/*AUTOINST*/
+                // Outputs
+                .umi_in_ready        (udev_req_ready[N-1:0]),   // Templated
+                .umi_out_valid       (umi_out_valid),
+                .umi_out_cmd         (umi_out_cmd[CW-1:0]),
+                .umi_out_dstaddr     (umi_out_dstaddr[AW-1:0]),
+                .umi_out_srcaddr     (umi_out_srcaddr[AW-1:0]),
+                .umi_out_data        (umi_out_data[DW-1:0]),
+                // Inputs
+                .clk                 (clk),
+                .nreset              (nreset),
+                .arbmode             (mode),
+                .arbmask             ({N{1'b0}}),
+                .umi_in_valid        (udev_req_valid[N-1:0]), // Templated
+                .umi_in_cmd          (udev_req_cmd[N*CW-1:0]), // Templated
+                .umi_in_dstaddr      (udev_req_dstaddr[N*AW-1:0]), // Templated
+                .umi_in_srcaddr      (udev_req_srcaddr[N*AW-1:0]), // Templated
+                .umi_in_data         (udev_req_data[N*DW-1:0]), // Templated
+                .umi_out_ready       (umi_out_ready));
+
+        assign udev_resp_valid[N-1:0]      = mem_resp_dstaddr[IDOFF+:N] & {N{mem_resp_valid}};
+        assign mem_resp_ready              = |(mem_resp_dstaddr[IDOFF+:N] & udev_resp_ready[N-1:0]) |
+                                             ~mem_resp_valid;
+        assign udev_resp_cmd[N*CW-1:0]     = {N{mem_resp_cmd[CW-1:0]}};
+        assign udev_resp_dstaddr[N*AW-1:0] = {N{mem_resp_dstaddr[AW-1:0]}};
+        assign udev_resp_srcaddr[N*AW-1:0] = {N{mem_resp_srcaddr[AW-1:0]}};
+        assign udev_resp_data[N*DW-1:0]    = {N{mem_resp_data[DW-1:0]}};
+
+        umi_memagent #(.CW(CW),
+                       .AW(AW),
+                       .DW(DW),
+                       .RAMDEPTH(RAMDEPTH),
+                       .CTRLW(CTRLW),
+                       .SRAMTYPE(SRAMTYPE))
+        umi_memagent (.clk                   (clk),
+                      .nreset                (nreset),
+                      .sram_ctrl             (sram_ctrl),
+                      .udev_req_valid        (umi_out_valid),
+                      .udev_req_cmd          (umi_out_cmd[CW-1:0]),
+                      .udev_req_dstaddr      (umi_out_dstaddr[AW-1:0]),
+                      .udev_req_srcaddr      (umi_out_srcaddr[AW-1:0]),
+                      .udev_req_data         (umi_out_data[DW-1:0]),
+                      .udev_req_ready        (umi_out_ready),
+                      .udev_resp_valid       (mem_resp_valid),
+                      .udev_resp_cmd         (mem_resp_cmd[CW-1:0]),
+                      .udev_resp_dstaddr     (mem_resp_dstaddr[AW-1:0]),
+                      .udev_resp_srcaddr     (mem_resp_srcaddr[AW-1:0]),
+                      .udev_resp_data        (mem_resp_data[DW-1:0]),
+                      .udev_resp_ready       (mem_resp_ready));
+     end
+   else
+     begin : gbank
+        localparam DWB = $clog2(DW/8);
+        localparam BB  = $clog2(BANKS);
+        localparam ORDER_DEPTH = 8;     // responses in flight per port
+        localparam OB  = $clog2(ORDER_DEPTH);
+
+        // port side, after splitting at DW boundaries
+        wire [N-1:0]        split_valid;
+        wire [N*CW-1:0]     split_cmd;
+        wire [N*AW-1:0]     split_dstaddr;
+        wire [N*AW-1:0]     split_srcaddr;
+        wire [N*DW-1:0]     split_data;
+        wire [N-1:0]        split_ready;
+
+        // bank side, [b*N+i] = port i requesting bank b
+        wire [BANKS*N-1:0]  bank_req_valid;
+        wire [BANKS*N-1:0]  bank_req_ready;
+        wire [BANKS-1:0]    bank_valid;
+        wire [BANKS*CW-1:0] bank_cmd;
+        wire [BANKS*AW-1:0] bank_dstaddr;
+        wire [BANKS*AW-1:0] bank_srcaddr;
+        wire [BANKS*DW-1:0] bank_data;
+        wire [BANKS-1:0]    bank_ready;
+        wire [BANKS-1:0]    bank_resp_valid;
+        wire [BANKS*CW-1:0] bank_resp_cmd;
+        wire [BANKS*AW-1:0] bank_resp_dstaddr;
+        wire [BANKS*AW-1:0] bank_resp_srcaddr;
+        wire [BANKS*DW-1:0] bank_resp_data;
+        wire [BANKS-1:0]    bank_resp_ready;
+        wire [BANKS*(CW+AW+AW+DW)-1:0] resp_in;
+        // response of bank b goes to port i, [i*BANKS+b]
+        wire [N*BANKS-1:0]  resp_sel;
+
+        genvar              i,b;
+
+        //##################################################################
+        //# Ports
+        //##################################################################
+
+        for (i=0;i<N;i=i+1)
+          begin : iport
+             wire [BB-1:0]  bank;
+             wire [BB-1:0]  resp_bank;
+             wire           blocked;
+             wire           responded;
+             wire           order_full;
+             reg [BB-1:0]   order_bank [0:ORDER_DEPTH-1];
+             reg [OB:0]     order_wr;
+             reg [OB:0]     order_rd;
+
+             umi_fifoflex #(.ASYNC  (0),
+                            .SPLIT  (1),
+                            .DEPTH  (0),
+                            .CW     (CW),
+                            .AW     (AW),
+                            .IDW    (DW),
+                            .ODW    (DW))
+             umi_fifoflex (.bypass             (1'b1),
+                           .chaosmode          (1'b0),
+                           .fifo_full          (),
+                           .fifo_empty         (),
+                           .umi_in_clk         (clk),
+                           .umi_in_nreset      (nreset),
+                           .umi_in_valid       (udev_req_valid[i]),
+                           .umi_in_cmd         (udev_req_cmd[i*CW+:CW]),
+                           .umi_in_dstaddr     (udev_req_dstaddr[i*AW+:AW]),
+                           .umi_in_srcaddr     (udev_req_srcaddr[i*AW+:AW]),
+                           .umi_in_data        (udev_req_data[i*DW+:DW]),
+                           .umi_in_ready       (udev_req_ready[i]),
+                           .umi_out_clk        (clk),
+                           .umi_out_nreset     (nreset),
+                           .umi_out_valid      (split_valid[i]),
+                           .umi_out_cmd        (split_cmd[i*CW+:CW]),
+                           .umi_out_dstaddr    (split_dstaddr[i*AW+:AW]),
+                           .umi_out_srcaddr    (split_srcaddr[i*AW+:AW]),
+                           .umi_out_data       (split_data[i*DW+:DW]),
+                           .umi_out_ready      (split_ready[i]),
+                           .vdd                (1'b1),
+                           .vss                (1'b0));
+
+             assign bank[BB-1:0] = split_dstaddr[i*AW+DWB+:BB];
+
+             // banks of the requests awaiting a response, oldest at order_rd
+             assign responded = ((split_cmd[i*CW+:5] == UMI_REQ_READ) |
+                                 (split_cmd[i*CW+:5] == UMI_REQ_WRITE) |
+                                 (split_cmd[i*CW+:5] == UMI_REQ_ATOMIC)) &
+                                split_valid[i] & split_ready[i];
+
+             always @(posedge clk or negedge nreset)
+               if (~nreset)
+                 begin
+                    order_wr[OB:0] <= 'b0;
+                    order_rd[OB:0] <= 'b0;
+                 end
+               else
+                 begin
+                    if (responded)
+                      order_wr[OB:0] <= order_wr[OB:0] + 1'b1;
+                    if (udev_resp_valid[i] & udev_resp_ready[i])
+                      order_rd[OB:0] <= order_rd[OB:0] + 1'b1;
+                 end
+
+             always @(posedge clk)
+               if (responded)
+                 order_bank[order_wr[OB-1:0]] <= bank[BB-1:0];
+
+             assign resp_bank[BB-1:0] = order_bank[order_rd[OB-1:0]];
+
+             assign order_full = (order_wr[OB-1:0] == order_rd[OB-1:0]) &
+                                 (order_wr[OB] != order_rd[OB]);
+
+             assign blocked = order_full &
+                              ((split_cmd[i*CW+:5] == UMI_REQ_READ) |
+                               (split_cmd[i*CW+:5] == UMI_REQ_WRITE) |
+                               (split_cmd[i*CW+:5] == UMI_REQ_ATOMIC));
+
+             for (b=0;b<BANKS;b=b+1)
+               begin : ireq
+                  assign bank_req_valid[b*N+i] = split_valid[i] & ~blocked & (bank == b);
+               end
+
+             assign split_ready[i] = ~blocked & bank_req_ready[bank*N+i];
+
+             //###########################
+             // Responses
+             //###########################
+
+             for (b=0;b<BANKS;b=b+1)
+               begin : iresp
+                  assign resp_sel[i*BANKS+b] = bank_resp_valid[b] &
+                                               bank_resp_dstaddr[b*AW+IDOFF+i] &
+                                               (resp_bank == b);
+               end
+
+             assign udev_resp_valid[i] = |resp_sel[i*BANKS+:BANKS];
+
+             la_vmux #(.N(BANKS),
+                       .W(CW+AW+AW+DW))
+             la_resp_vmux(// Outputs
+                          .out ({udev_resp_data[i*DW+:DW],
+                                 udev_resp_srcaddr[i*AW+:AW],
+                                 udev_resp_dstaddr[i*AW+:AW],
+                                 udev_resp_cmd[i*CW+:CW]}),
+                          // Inputs
+                          .sel (resp_sel[i*BANKS+:BANKS]),
+                          .in  (resp_in[BANKS*(CW+AW+AW+DW)-1:0]));
+          end
+
+        //##################################################################
+        //# Banks
+        //##################################################################
+
+        for (b=0;b<BANKS;b=b+1)
+          begin : ibank
+             wire [AW-1:0] dstaddr;
+             reg           ready;
+             integer       j;
+
+             umi_mux #(.CW(CW),
+                       .AW(AW),
+                       .DW(DW),
+                       .N(N))
+             umi_mux(// Outputs
+                     .umi_in_ready    (bank_req_ready[b*N+:N]),
+                     .umi_out_valid   (bank_valid[b]),
+                     .umi_out_cmd     (bank_cmd[b*CW+:CW]),
+                     .umi_out_dstaddr (bank_dstaddr[b*AW+:AW]),
+                     .umi_out_srcaddr (bank_srcaddr[b*AW+:AW]),
+                     .umi_out_data    (bank_data[b*DW+:DW]),
+                     // Inputs
+                     .clk             (clk),
+                     .nreset          (nreset),
+                     .arbmode         (mode),
+                     .arbmask         ({N{1'b0}}),
+                     .umi_in_valid    (bank_req_valid[b*N+:N]),
+                     .umi_in_cmd      (split_cmd[N*CW-1:0]),
+                     .umi_in_dstaddr  (split_dstaddr[N*AW-1:0]),
+                     .umi_in_srcaddr  (split_srcaddr[N*AW-1:0]),
+                     .umi_in_data     (split_data[N*DW-1:0]),
+                     .umi_out_ready   (bank_ready[b]));
+
+             // bank select bits removed from the bank address
+             assign dstaddr[AW-1:0] = {{BB{1'b0}},
+                                       bank_dstaddr[b*AW+DWB+BB+:AW-DWB-BB],
+                                       bank_dstaddr[b*AW+:DWB]};
+
+             umi_memagent #(.CW(CW),
+                            .AW(AW),
+                            .DW(DW),
+                            .RAMDEPTH(RAMDEPTH/BANKS),
+                            .CTRLW(CTRLW),
+                            .SRAMTYPE(SRAMTYPE))
+             umi_memagent (.clk                   (clk),
+                           .nreset                (nreset),
+                           .sram_ctrl             (sram_ctrl),
+                           .udev_req_valid        (bank_valid[b]),
+                           .udev_req_cmd          (bank_cmd[b*CW+:CW]),
+                           .udev_req_dstaddr      (dstaddr[AW-1:0]),
+                           .udev_req_srcaddr      (bank_srcaddr[b*AW+:AW]),
+                           .udev_req_data         (bank_data[b*DW+:DW]),
+                           .udev_req_ready        (bank_ready[b]),
+                           .udev_resp_valid       (bank_resp_valid[b]),
+                           .udev_resp_cmd         (bank_resp_cmd[b*CW+:CW]),
+                           .udev_resp_dstaddr     (bank_resp_dstaddr[b*AW+:AW]),
+                           .udev_resp_srcaddr     (bank_resp_srcaddr[b*AW+:AW]),
+                           .udev_resp_data        (bank_resp_data[b*DW+:DW]),
+                           .udev_resp_ready       (bank_resp_ready[b]));
+
+             assign resp_in[b*(CW+AW+AW+DW)+:CW+AW+AW+DW] = {bank_resp_data[b*DW+:DW],
+                                                             bank_resp_srcaddr[b*AW+:AW],
+                                                             bank_resp_dstaddr[b*AW+:AW],
+                                                             bank_resp_cmd[b*CW+:CW]};
+
+             always @(*)
+               begin
+                  ready = ~bank_resp_valid[b];
+                  for (j=0;j<N;j=j+1)
+                    ready = ready | (resp_sel[j*BANKS+b] & udev_resp_ready[j]);
+               end
+
+             assign bank_resp_ready[b] = ready;
+          end
+     end
+   endgenerate
 
 endmodule
 // Local Variables:
@@ -1,5 +1,7 @@
 from umi.common import UMI
+from lambdalib.veclib import Vmux
 from umi.sumi.umi_mux.umi_mux import Mux
+from umi.sumi.umi_fifoflex.umi_fifoflex import FifoFlex
 from umi.sumi.umi_memagent.umi_memagent import MemAgent
 
 
@@ -7,8 +9,10 @@ class RAM(UMI):
     def __init__(self):
         super().__init__('umi_ram',
                          files=['rtl/umi_ram.v'],
-                         deps=[Mux(),
-                               MemAgent()])
+                         deps=[Mux,
+                               Vmux,
+                               FifoFlex,
+                               MemAgent])
 
 
 if __name__ == "__main__":
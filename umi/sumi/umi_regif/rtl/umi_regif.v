@@ -18,9 +18,19 @@
  * Documentation:
  *
  * - The module translates a UMI request into a simple register interface.
- * - Reads requests consume two cycles.
+ * - SAFE=1: one register access every two cycles.
+ * - SAFE=0: one register access per cycle, combinatorial path from
+ *   udev_resp_ready to udev_req_ready.
+ * - SAFE=2: one register access per cycle with no combinatorial path,
+ *   a response that cannot be sent is parked in a skid register.
  * - Read data must return on same cycle immediately (no pipeline)
- * - Only read/writes/posted <= DW is supported.
+ * - A request with SIZE=log2(RW/8) and LEN>0 is a burst walking LEN+1
+ *   consecutive registers, one per cycle (register i at DSTADDR+i*RW/8).
+ *   Read data is returned DW/RW registers per response beat, EOM is only
+ *   set on the last beat. A write burst must fit DW, a longer one writes
+ *   no register and is answered with ERR=DEVERR.
+ * - Any other request accesses the single register at DSTADDR, the
+ *   response keeps the request SIZE and LEN.
  * - No atomics support
  * - This module can check if the incoming access is within the designated
  *   address range by setting the GRPOFFSET, GRPAW, and GRPID parameter.
@@ -41,6 +51,8 @@ module umi_regif
     parameter GRPAW = 0,      // group address width
     parameter GRPID = 0,      // group ID
     parameter SAFE = 1,       // 1: no combinatorial path, low performance
+                              // 0: combinatorial path, full performance
+                              // 2: no combinatorial path, full performance
     // umi standard parameters
     parameter CW = 32,        // command width
     parameter AW = 64,        // address width
@@ -75,18 +87,52 @@ module umi_regif
 
 `include "umi_messages.vh"
 
+   localparam WORDS = DW / RW; // registers per response beat
+   localparam [2:0] RW_SIZE = $clog2(RW / 8);
+
    // local state
    reg udev_req_safe_ready;
-
+   reg                 burst_active;
+   reg [CW-1:0]        burst_cmd;
+   reg [AW-1:0]        burst_dstaddr;
+   reg [AW-1:0]        burst_srcaddr;
+   reg [DW-1:0]        burst_data;
+   reg [7:0]           word_index;
+   reg [AW-1:0]        beat_dstaddr;
+   reg [AW-1:0]        beat_srcaddr;
+   reg [DW-1:0]        beat_data;
+   reg                 skid_valid;
+   reg [CW-1:0]        skid_cmd;
+   reg [AW-1:0]        skid_dstaddr;
+   reg [AW-1:0]        skid_srcaddr;
+   reg [DW-1:0]        skid_data;
 
    // local wires
    wire [CW-1:0] resp_cmd;
+   wire [AW-1:0] resp_dstaddr;
+   wire [AW-1:0] resp_srcaddr;
+   wire [DW-1:0] resp_data;
    wire          cmd_read;
    wire          cmd_write;
    wire          cmd_posted;
    wire          cmd_atomic;
    wire          match;
    wire          beat;
+   wire          access;
+   wire          room;
+   wire          resp_free;
+   wire          resp_push;
+   wire [7:0]    req_len;
+   wire          rw_word;
+   wire          burst;
+   wire          burst_error;
+   wire          last_word;
+   wire          beat_end;
+   wire [CW-1:0] req_cmd;
+   wire [AW-1:0] req_dstaddr;
+   wire [AW-1:0] req_srcaddr;
+   wire [DW-1:0] req_data;
+   wire [DW+RW-1:0] next_data;
 
    //######################################
    // UMI Request
@@ -99,73 +145,180 @@ module umi_regif
        assign match = 1'b1;
    endgenerate
 
-   assign cmd_read = (udev_req_cmd[4:0]==UMI_REQ_READ);
-   assign cmd_write = (udev_req_cmd[4:0]==UMI_REQ_WRITE);
-   assign cmd_posted = (udev_req_cmd[4:0]==UMI_REQ_POSTED);
-   assign cmd_atomic = (udev_req_cmd[4:0]==UMI_REQ_ATOMIC);
+   // the current register access, the remainder of a burst or a new request
+   assign req_cmd[CW-1:0]     = burst_active ? burst_cmd[CW-1:0]     : udev_req_cmd[CW-1:0];
+   assign req_dstaddr[AW-1:0] = burst_active ? burst_dstaddr[AW-1:0] : udev_req_dstaddr[AW-1:0];
+   assign req_srcaddr[AW-1:0] = burst_active ? burst_srcaddr[AW-1:0] : udev_req_srcaddr[AW-1:0];
+   assign req_data[DW-1:0]    = burst_active ? burst_data[DW-1:0]    : udev_req_data[DW-1:0];
 
-    // single cycle stall on every ready
+   assign cmd_read = (req_cmd[4:0]==UMI_REQ_READ);
+   assign cmd_write = (req_cmd[4:0]==UMI_REQ_WRITE);
+   assign cmd_posted = (req_cmd[4:0]==UMI_REQ_POSTED);
+   assign cmd_atomic = (req_cmd[4:0]==UMI_REQ_ATOMIC);
+
+    // single cycle stall on every access
    always @ (posedge clk or negedge nreset)
      if(!nreset)
        udev_req_safe_ready <= 1'b0;
-     else if (udev_req_valid & udev_req_ready)
+     else if (access)
        udev_req_safe_ready <= 1'b0;
      else
        udev_req_safe_ready <= 1'b1;
 
    // The unsafe combinatorial path from resp_ready-->req_ready has the
    // potential of causing cominatiro loops in designs if the that are
-   if(SAFE)
-     assign udev_req_ready = reg_ready & udev_req_safe_ready;
-   else
-     assign udev_req_ready = reg_ready & (udev_resp_ready|~udev_resp_valid);
+   // SAFE=2 only looks at the (registered) skid register instead
+   assign resp_free = udev_resp_ready | ~udev_resp_valid;
+
+   generate
+     if (SAFE == 2)
+       assign room = ~skid_valid;
+     else if (SAFE != 0)
+       assign room = udev_req_safe_ready & ~skid_valid;
+     else
+       assign room = resp_free;
+   endgenerate
+
+   assign udev_req_ready = reg_ready & room & ~burst_active;
 
    // request accepted
    assign beat = udev_req_valid & udev_req_ready;
 
+   // register accessed
+   assign access = beat | (burst_active & reg_ready & room);
+
+   //######################################
+   // Burst
+   //######################################
+
+   assign req_len[7:0] = req_cmd[UMI_LEN_MSB:UMI_LEN_LSB];
+
+   // only register sized words walk the register file
+   assign rw_word = (req_cmd[UMI_SIZE_MSB:UMI_SIZE_LSB] == RW_SIZE);
+
+   // write bursts carry all their data in one beat
+   assign burst_error = ~burst_active & rw_word & (cmd_write | cmd_posted) &
+                        (req_len >= WORDS);
+
+   assign burst = rw_word & ~burst_error;
+
+   assign last_word = ~burst | (req_len == 8'h00);
+
+   always @(posedge clk or negedge nreset)
+     if (!nreset)
+       burst_active <= 1'b0;
+     else if (access)
+       burst_active <= ~last_word;
+
+   // write data of the next register (DW=RW safe)
+   assign next_data[DW+RW-1:0] = {{RW{1'b0}}, req_data[DW-1:0]} >> RW;
+
+   always @(posedge clk)
+     if (access & ~last_word)
+       begin
+          burst_cmd[CW-1:0]     <= req_cmd - (1 << UMI_LEN_LSB);
+          burst_dstaddr[AW-1:0] <= req_dstaddr + (RW >> 3);
+          burst_srcaddr[AW-1:0] <= req_srcaddr + (RW >> 3);
+          burst_data[DW-1:0]    <= next_data[DW-1:0];
+       end
+
    //######################################
    // Register Interface
    //######################################
 
-   assign reg_write = (cmd_write | cmd_posted) & beat;
-   assign reg_read = cmd_read & beat;
-   assign reg_addr[RAW-1:0] = udev_req_dstaddr[RAW-1:0];
-   assign reg_wdata[RW-1:0] = udev_req_data[RW-1:0];
-   assign reg_prot[1:0] = udev_req_cmd[21:20];
+   assign reg_write = (cmd_write | cmd_posted) & access & ~burst_error;
+   assign reg_read = cmd_read & access;
+   assign reg_addr[RAW-1:0] = req_dstaddr[RAW-1:0];
+   assign reg_wdata[RW-1:0] = req_data[RW-1:0];
+   assign reg_prot[1:0] = req_cmd[21:20];
 
    //######################################
    // UMI Response
    //######################################
 
-   //1. Set on incoming valid read
-   //2. Keep high as long as incoming read is set
-   //3. If no incoming read and output is ready, clear
+   // registers are collected until the beat is full or the burst ends
+   assign beat_end = last_word | (word_index == WORDS - 1);
+
    always @(posedge clk or negedge nreset)
      if (!nreset)
-       udev_resp_valid <= 1'b0;
-     else if (beat & (cmd_write | cmd_read))
-       udev_resp_valid <= 1'b1;
-     else if (udev_resp_valid & udev_resp_ready)
-       udev_resp_valid <= 1'b0;
+       word_index[7:0] <= 8'h00;
+     else if (access)
+       word_index[7:0] <= beat_end ? 8'h00 : word_index + 8'h01;
+
+   always @(posedge clk)
+     if (access & ~beat_end)
+       begin
+          beat_data[DW-1:0] <= resp_data[DW-1:0];
+          if (word_index == 8'h00)
+            begin
+               beat_dstaddr[AW-1:0] <= req_srcaddr;
+               beat_srcaddr[AW-1:0] <= req_dstaddr;
+            end
+       end
+
+   assign resp_push = access & beat_end & (cmd_write | cmd_read);
 
    // read/write responses
    assign resp_cmd[4:0] = (cmd_read)  ? UMI_RESP_READ :
                           (cmd_write) ? UMI_RESP_WRITE :
                                         5'b0;
 
-   assign resp_cmd[24:5] = udev_req_cmd[24:5];
-   assign resp_cmd[26:25] = reg_err[1:0];
-   assign resp_cmd[31:27] = udev_req_cmd[31:27];
+   assign resp_cmd[7:5] = req_cmd[7:5];
+   assign resp_cmd[15:8] = burst ? word_index[7:0] : req_len[7:0];
+   assign resp_cmd[21:16] = req_cmd[21:16];
+   // EOM on the last beat of the burst only
+   assign resp_cmd[22] = req_cmd[22] & last_word;
+   assign resp_cmd[24:23] = req_cmd[24:23];
+   assign resp_cmd[26:25] = burst_error ? 2'b10 : reg_err[1:0];
+   assign resp_cmd[31:27] = req_cmd[31:27];
+
+   assign resp_dstaddr[AW-1:0] = (word_index == 8'h00) ? req_srcaddr : beat_dstaddr;
+   assign resp_srcaddr[AW-1:0] = (word_index == 8'h00) ? req_dstaddr : beat_srcaddr;
+   assign resp_data[DW-1:0]    = ((word_index == 8'h00) ? {DW{1'b0}} : beat_data) |
+                                 ({{(DW-RW){1'b0}}, reg_rdata[RW-1:0]} << (word_index * RW));
+
+   //1. Set on incoming valid read
+   //2. Keep high as long as incoming read is set
+   //3. If no incoming read and output is ready, clear
+   always @(posedge clk or negedge nreset)
+     if (!nreset)
+       udev_resp_valid <= 1'b0;
+     else if (resp_free)
+       udev_resp_valid <= resp_push | skid_valid;
+
+   // a response pushed while the output is stalled waits in the skid register
+   always @(posedge clk or negedge nreset)
+     if (!nreset)
+       skid_valid <= 1'b0;
+     else if (resp_free)
+       skid_valid <= 1'b0;
+     else if (resp_push)
+       skid_valid <= 1'b1;
+
+   always @ (posedge clk)
+     if (resp_push & ~resp_free)
+       begin
+          skid_cmd[CW-1:0]     <= resp_cmd;
+          skid_dstaddr[AW-1:0] <= resp_dstaddr;
+          skid_srcaddr[AW-1:0] <= resp_srcaddr;
+          skid_data[DW-1:0]    <= resp_data;
+       end
 
    // sample data on read/write
    always @ (posedge clk)
-     if (beat & (cmd_write | cmd_read))
+     if (resp_free & skid_valid)
+       begin
+          udev_resp_cmd[CW-1:0]     <= skid_cmd;
+          udev_resp_dstaddr[AW-1:0] <= skid_dstaddr;
+          udev_resp_srcaddr[AW-1:0] <= skid_srcaddr;
+          udev_resp_data[DW-1:0]    <= skid_data;
+       end
+     else if (resp_push & resp_free)
        begin
           udev_resp_cmd[CW-1:0]     <= resp_cmd;
-          udev_resp_dstaddr[AW-1:0] <= udev_req_srcaddr;
-          udev_resp_srcaddr[AW-1:0] <= udev_req_dstaddr;
-          udev_resp_data[DW-1:0]    <= {{(DW-RW){1'b0}},
-                                        reg_rdata[RW-1:0]};
+          udev_resp_dstaddr[AW-1:0] <= resp_dstaddr;
+          udev_resp_srcaddr[AW-1:0] <= resp_srcaddr;
+          udev_resp_data[DW-1:0]    <= resp_data;
        end
 
 endmodule
@@ -6,14 +6,14 @@ class Stream(UMI):
     def __init__(self):
         super().__init__('umi_stream',
                          files=['rtl/umi_stream.v'],
-                         deps=[Asyncfifo()])
+                         deps=[Asyncfifo])
 
 
 class StreamTB(UMI):
     def __init__(self):
         super().__init__('tb_umi_stream',
                          files=['testbench/tb_umi_stream.v'],
-                         deps=[Stream()])
+                         deps=[Stream])
 
 
 if __name__ == "__main__":
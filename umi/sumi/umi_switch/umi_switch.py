@@ -6,7 +6,7 @@ class Switch(UMI):
     def __init__(self):
         super().__init__('umi_switch',
                          files=['rtl/umi_switch.v'],
-                         deps=[Mux()])
+                         deps=[Mux])
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ class Tester(UMI):
     def __init__(self):
         super().__init__('umi_tester',
                          files=['rtl/umi_tester.v'],
-                         deps=[Spram()])
+                         deps=[Spram])
 
 
 if __name__ == "__main__":